@@ -0,0 +1,12 @@
+"""Reproducible signing benchmarks.
+
+Everything runs offline: the PDF corpus is generated (corpus.py), the signer
+and TSA certificates come from a throwaway test CA (identity.py) and
+timestamps are issued by a local stand-in for the TSA and the SelladoMX API
+(tsa_server.py).
+
+Usage:
+    python -m benchmarks.run [--suite quick|full] [--compare]
+
+See run.py for the scenarios and the results format.
+"""
@@ -0,0 +1,233 @@
+"""Generated PDF corpus for the benchmarks.
+
+Files are written straight to disk (the 500 MB case never sits in memory)
+and are deterministic for a given spec, so runs on different machines sign
+the same bytes. Three layouts cover the paths that matter to pyhanko:
+
+- "plain": one classic xref table
+- "many_xref": followed by a long chain of incremental updates
+- "object_streams": PDF 1.5 cross-reference stream with pages in an ObjStm
+"""
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List
+
+_CHUNK = 1024 * 1024
+_CONTENT = b"BT /F1 12 Tf 72 720 Td (SelladoMX benchmark) Tj ET"
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """One generated document."""
+
+    name: str
+    pages: int
+    size_bytes: int = 0  # Padding up to (about) this size; 0 = no padding
+    layout: str = "plain"  # "plain", "many_xref" or "object_streams"
+    updates: int = 0  # Incremental updates appended (many_xref)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.pdf"
+
+
+SUITES: Dict[str, List[CorpusSpec]] = {
+    "quick": [
+        CorpusSpec("p1_10kb", pages=1, size_bytes=10 * 1024),
+        CorpusSpec("p50_1mb", pages=50, size_bytes=1024 * 1024),
+        CorpusSpec("p200", pages=200),
+        CorpusSpec("xref_100", pages=10, layout="many_xref", updates=100),
+        CorpusSpec("objstm_100", pages=100, layout="object_streams"),
+    ],
+    "full": [
+        CorpusSpec("p1_10kb", pages=1, size_bytes=10 * 1024),
+        CorpusSpec("p50_1mb", pages=50, size_bytes=1024 * 1024),
+        CorpusSpec("p2000", pages=2000),
+        CorpusSpec("p10_50mb", pages=10, size_bytes=50 * 1024 * 1024),
+        CorpusSpec("p10_500mb", pages=10, size_bytes=500 * 1024 * 1024),
+        CorpusSpec("xref_1000", pages=10, layout="many_xref", updates=1000),
+        CorpusSpec("objstm_2000", pages=2000, layout="object_streams"),
+    ],
+}
+
+
+class _Writer:
+    """Tracks object offsets while writing a PDF sequentially."""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.pos = 0
+        self.offsets: Dict[int, int] = {}
+
+    def write(self, data: bytes):
+        self.f.write(data)
+        self.pos += len(data)
+
+    def obj(self, number: int, body: bytes):
+        self.offsets[number] = self.pos
+        self.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def stream(self, number: int, extra: bytes, chunks: Iterable[bytes], length: int):
+        self.offsets[number] = self.pos
+        self.write(b"%d 0 obj\n<< %s /Length %d >>\nstream\n" % (number, extra, length))
+        for chunk in chunks:
+            self.write(chunk)
+        self.write(b"\nendstream\nendobj\n")
+
+    def xref_table(self, numbers: List[int], trailer: bytes) -> int:
+        """Write an xref section for contiguous runs of `numbers`."""
+        start = self.pos
+        lines = [b"xref\n"]
+        numbers = sorted(numbers)
+        run: List[int] = []
+        for number in numbers + [None]:
+            if run and (number is None or number != run[-1] + 1):
+                lines.append(b"%d %d\n" % (run[0], len(run)))
+                for n in run:
+                    if n == 0:
+                        lines.append(b"0000000000 65535 f \n")
+                    else:
+                        lines.append(b"%010d 00000 n \n" % self.offsets[n])
+                run = []
+            if number is not None:
+                run.append(number)
+        self.write(b"".join(lines))
+        self.write(b"trailer\n" + trailer + b"\nstartxref\n%d\n%%%%EOF\n" % start)
+        return start
+
+
+def _padding(rng: random.Random, length: int) -> Iterable[bytes]:
+    """Incompressible bytes, so the file size is what is read and hashed."""
+    remaining = length
+    while remaining > 0:
+        size = min(_CHUNK, remaining)
+        yield rng.randbytes(size)
+        remaining -= size
+
+
+def _page(parent: int, contents: int) -> bytes:
+    return (
+        b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+        b"/Contents %d 0 R /Resources << >> >>" % (parent, contents)
+    )
+
+
+def _write_classic(w: _Writer, spec: CorpusSpec, rng: random.Random):
+    # 1 catalog, 2 pages, 3 info, 4 contents, 5 padding, 6.. pages
+    page_ids = list(range(6, 6 + spec.pages))
+    w.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    w.obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = b" ".join(b"%d 0 R" % n for n in page_ids)
+    w.obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, spec.pages))
+    w.obj(3, b"<< /Producer (SelladoMX benchmarks) >>")
+    w.stream(4, b"", [_CONTENT], len(_CONTENT))
+    padding = max(0, spec.size_bytes - 200 * spec.pages - 1024)
+    w.stream(5, b"", _padding(rng, padding), padding)
+    for n in page_ids:
+        w.obj(n, _page(2, 4))
+
+    size = page_ids[-1] + 1
+    trailer = b"<< /Size %d /Root 1 0 R /Info 3 0 R >>" % size
+    prev = w.xref_table([0] + list(range(1, size)), trailer)
+
+    for i in range(spec.updates):
+        w.obj(3, b"<< /Producer (SelladoMX benchmarks, update %d) >>" % (i + 1))
+        trailer = b"<< /Size %d /Root 1 0 R /Info 3 0 R /Prev %d >>" % (size, prev)
+        prev = w.xref_table([3], trailer)
+
+
+def _write_object_streams(w: _Writer, spec: CorpusSpec, rng: random.Random):
+    # 1 ObjStm with catalog (2), pages (3) and every page (6..);
+    # 4 contents, 5 padding, then the xref stream
+    page_ids = list(range(6, 6 + spec.pages))
+    kids = b" ".join(b"%d 0 R" % n for n in page_ids)
+    packed = [
+        (2, b"<< /Type /Catalog /Pages 3 0 R >>"),
+        (3, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, spec.pages)),
+    ] + [(n, _page(3, 4)) for n in page_ids]
+
+    header_parts = []
+    body = bytearray()
+    for number, obj in packed:
+        header_parts.append(b"%d %d" % (number, len(body)))
+        body += obj + b"\n"
+    header = b" ".join(header_parts) + b"\n"
+
+    w.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    w.stream(
+        1,
+        b"/Type /ObjStm /N %d /First %d" % (len(packed), len(header)),
+        [header, bytes(body)],
+        len(header) + len(body),
+    )
+    w.stream(4, b"", [_CONTENT], len(_CONTENT))
+    padding = max(0, spec.size_bytes - 200 * spec.pages - 1024)
+    w.stream(5, b"", _padding(rng, padding), padding)
+
+    xref_id = page_ids[-1] + 1
+    w.offsets[xref_id] = w.pos
+    rows = [None] * (xref_id + 1)
+    rows[0] = (0, 0, 65535)
+    for index, (number, _) in enumerate(packed):
+        rows[number] = (2, 1, index)
+    for number in (1, 4, 5, xref_id):
+        rows[number] = (1, w.offsets[number], 0)
+    data = b"".join(
+        t.to_bytes(1, "big") + f2.to_bytes(4, "big") + f3.to_bytes(2, "big")
+        for t, f2, f3 in rows
+    )
+    start = w.pos
+    w.stream(
+        xref_id,
+        b"/Type /XRef /Size %d /W [1 4 2] /Root 2 0 R" % (xref_id + 1),
+        [data],
+        len(data),
+    )
+    w.write(b"startxref\n%d\n%%%%EOF\n" % start)
+
+
+def generate(spec: CorpusSpec, path: Path, seed: int = 0) -> Path:
+    """Write one corpus document.
+
+    Args:
+        spec: Document to generate
+        path: Output file
+        seed: Seed for the padding bytes
+
+    Returns:
+        The output path
+    """
+    rng = random.Random(f"{seed}:{spec.name}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        writer = _Writer(f)
+        if spec.layout == "object_streams":
+            _write_object_streams(writer, spec, rng)
+        elif spec.layout in ("plain", "many_xref"):
+            _write_classic(writer, spec, rng)
+        else:
+            raise ValueError(f"Unknown corpus layout: {spec.layout}")
+    tmp.replace(path)
+    return path
+
+
+def ensure_corpus(suite: str, directory: Path, seed: int = 0) -> List[Path]:
+    """Generate the documents of a suite that are not in `directory` yet.
+
+    Args:
+        suite: Key of SUITES
+        directory: Cache directory for generated files
+        seed: Seed for the padding bytes
+
+    Returns:
+        Paths of the suite's documents, in suite order
+    """
+    paths = []
+    for spec in SUITES[suite]:
+        path = directory / spec.filename
+        if not path.exists():
+            generate(spec, path, seed)
+        paths.append(path)
+    return paths
@@ -0,0 +1,115 @@
+"""Throwaway test CA with a signer and a TSA certificate."""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+
+@dataclass
+class BenchIdentity:
+    """Certificates and keys used by the benchmarks (cryptography objects)."""
+
+    ca_cert: x509.Certificate
+    ca_key: rsa.RSAPrivateKey
+    signer_cert: x509.Certificate
+    signer_key: rsa.RSAPrivateKey
+    tsa_cert: x509.Certificate
+    tsa_key: rsa.RSAPrivateKey
+
+    def tsa_asn1(self):
+        """TSA certificate and key as asn1crypto objects (for pyhanko)."""
+        from asn1crypto import keys, x509 as asn1_x509
+
+        cert = asn1_x509.Certificate.load(
+            self.tsa_cert.public_bytes(serialization.Encoding.DER)
+        )
+        key = keys.PrivateKeyInfo.load(
+            self.tsa_key.private_bytes(
+                serialization.Encoding.DER,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        return cert, key
+
+
+def _name(common_name: str) -> x509.Name:
+    return x509.Name(
+        [
+            x509.NameAttribute(NameOID.COMMON_NAME, common_name),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SelladoMX Benchmarks"),
+        ]
+    )
+
+
+def _issue(subject, public_key, issuer, issuer_key, extensions=()):
+    now = datetime.now(timezone.utc)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(issuer)
+        .public_key(public_key)
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=365))
+    )
+    for extension, critical in extensions:
+        builder = builder.add_extension(extension, critical=critical)
+    return builder.sign(issuer_key, hashes.SHA256())
+
+
+def make_identity(key_size: int = 2048) -> BenchIdentity:
+    """Create a CA, a signer certificate and a TSA certificate.
+
+    Args:
+        key_size: RSA key size for every key
+
+    Returns:
+        The generated identity
+    """
+    ca_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    ca_name = _name("SelladoMX Benchmark CA")
+    ca_cert = _issue(
+        ca_name,
+        ca_key.public_key(),
+        ca_name,
+        ca_key,
+        [(x509.BasicConstraints(ca=True, path_length=None), True)],
+    )
+
+    signer_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    signer_cert = _issue(
+        _name("Firmante de Prueba"),
+        signer_key.public_key(),
+        ca_name,
+        ca_key,
+        [
+            (
+                x509.KeyUsage(
+                    digital_signature=True,
+                    content_commitment=True,  # nonRepudiation, as in e.firma
+                    key_encipherment=False,
+                    data_encipherment=False,
+                    key_agreement=False,
+                    key_cert_sign=False,
+                    crl_sign=False,
+                    encipher_only=False,
+                    decipher_only=False,
+                ),
+                True,
+            )
+        ],
+    )
+
+    tsa_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+    tsa_cert = _issue(
+        _name("SelladoMX Benchmark TSA"),
+        tsa_key.public_key(),
+        ca_name,
+        ca_key,
+        [(x509.ExtendedKeyUsage([ExtendedKeyUsageOID.TIME_STAMPING]), True)],
+    )
+    return BenchIdentity(ca_cert, ca_key, signer_cert, signer_key, tsa_cert, tsa_key)
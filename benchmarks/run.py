@@ -0,0 +1,341 @@
+"""Run the signing benchmarks and store the results.
+
+Scenarios (each runs in a fresh process so peak RSS is its own):
+    sign_free            PDFSigner.sign_pdf with the free TSA path
+    sign_professional    PDFSigner.sign_pdf with APITimeStamper (stub API)
+    worker_free          SigningWorker over the whole corpus, free TSA
+    worker_professional  SigningWorker over the whole corpus, stub API
+    verify               PDFSigner.verify_signature on signed documents
+
+Each result reports docs/sec, MB/sec, p50/p99 latency per document and peak
+RSS, and is appended to a JSONL file (default build/benchmarks/results.jsonl)
+so later runs can be compared with --compare.
+
+Usage:
+    python -m benchmarks.run [--suite quick|full] [--repeat N]
+                             [--scenario NAME ...] [--compare [--threshold 0.1]]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(ROOT / "src"))
+
+from .corpus import SUITES, ensure_corpus  # noqa: E402
+from .identity import make_identity  # noqa: E402
+from .tsa_server import LocalTSAServer  # noqa: E402
+
+SCENARIOS = (
+    "sign_free",
+    "sign_professional",
+    "worker_free",
+    "worker_professional",
+    "verify",
+)
+DEFAULT_OUTPUT = ROOT / "build" / "benchmarks" / "results.jsonl"
+DEFAULT_CORPUS = ROOT / "build" / "benchmarks" / "corpus"
+# Higher is better for these; lower is better for the rest
+_HIGHER_IS_BETTER = ("docs_per_sec", "mb_per_sec")
+_COMPARED = ("docs_per_sec", "mb_per_sec", "p50_ms", "p99_ms", "peak_rss_mb")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_scenario(
+    scenario: str,
+    paths: List[str],
+    repeat: int,
+    tsa_url: str,
+    identity_pem: Dict[str, bytes],
+) -> dict:
+    """Run one scenario (in a child process) and return its measurements."""
+    # Read by selladomx.config at import time, so set before importing it
+    os.environ["SELLADOMX_FREE_TSA_URL"] = f"{tsa_url}/tsr"
+    os.environ["SELLADOMX_API_URL"] = tsa_url
+    # pyhanko logs every untrusted benchmark certificate as a warning
+    logging.disable(logging.WARNING)
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import serialization
+
+    from selladomx.api.client import SelladoMXAPIClient
+    from selladomx.signing.pdf_signer import PDFSigner
+    from selladomx.signing.tsa import APITimeStamper, TSAClient
+    from selladomx.signing.worker import SigningWorker
+    from selladomx.utils import metrics
+
+    cert = x509.load_pem_x509_certificate(identity_pem["cert"])
+    key = serialization.load_pem_private_key(identity_pem["key"], password=None)
+    tsa_client = TSAClient(tsa_url=f"{tsa_url}/tsr", enable_fallback=False)
+    pdf_paths = [Path(p) for p in paths]
+    latencies: List[float] = []
+    docs = 0
+    total_bytes = 0
+
+    with tempfile.TemporaryDirectory(prefix="selladomx-bench-") as tmp:
+        out_dir = Path(tmp)
+
+        def sign_one(path: Path, professional: bool) -> Path:
+            timestamper = None
+            if professional:
+                timestamper = APITimeStamper(
+                    SelladoMXAPIClient(api_key="bench", base_url=tsa_url),
+                    filename=path.name,
+                    size_bytes=path.stat().st_size,
+                )
+            signer = PDFSigner(cert, key, tsa_client, timestamper=timestamper)
+            return signer.sign_pdf(path, out_dir / path.name)
+
+        started = time.perf_counter()
+        if scenario in ("sign_free", "sign_professional"):
+            for _ in range(repeat):
+                for path in pdf_paths:
+                    t0 = time.perf_counter()
+                    sign_one(path, scenario == "sign_professional")
+                    latencies.append(time.perf_counter() - t0)
+                    docs += 1
+                    total_bytes += path.stat().st_size
+
+        elif scenario in ("worker_free", "worker_professional"):
+            # Per-document latency: sum of its phase timings (utils/metrics)
+            per_doc: Dict[str, float] = {}
+
+            def listener(name, labels, value, document):
+                if name == "signing_phase_seconds" and document:
+                    per_doc[document] = per_doc.get(document, 0.0) + value
+
+            metrics.registry().add_listener(listener)
+            for _ in range(repeat):
+                per_doc.clear()
+                worker = SigningWorker(
+                    pdf_paths,
+                    cert,
+                    key,
+                    tsa_client=tsa_client,
+                    output_dir=out_dir,
+                    use_professional_tsa=scenario == "worker_professional",
+                    api_key="bench",
+                )
+                worker.run()
+                if worker.errors:
+                    raise RuntimeError(f"Worker errors: {worker.errors[:3]}")
+                latencies.extend(per_doc.values())
+                docs += len(pdf_paths)
+                total_bytes += sum(path.stat().st_size for path in pdf_paths)
+
+        elif scenario == "verify":
+            signed = [sign_one(path, False) for path in pdf_paths]
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for path in signed:
+                    t0 = time.perf_counter()
+                    if not PDFSigner.verify_signature(path):
+                        raise RuntimeError(f"Signature of {path.name} is invalid")
+                    latencies.append(time.perf_counter() - t0)
+                    docs += 1
+                    total_bytes += path.stat().st_size
+        else:
+            raise ValueError(f"Unknown scenario: {scenario}")
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": scenario,
+        "docs": docs,
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(docs / elapsed, 3) if elapsed else 0.0,
+        "mb_per_sec": (
+            round(total_bytes / (1024 * 1024) / elapsed, 3) if elapsed else 0.0
+        ),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_results(path: Path) -> List[dict]:
+    """Read every stored result (one JSON object per line)."""
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(current: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """Describe metrics that regressed by more than `threshold` (a fraction).
+
+    Args:
+        current: Results of this run
+        baseline: Results of the run to compare against
+        threshold: Allowed relative change, e.g. 0.1 for 10 %
+
+    Returns:
+        One line per regression (empty if none)
+    """
+    previous = {result["scenario"]: result for result in baseline}
+    regressions = []
+    for result in current:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for metric in _COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if metric in _HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f"{result['scenario']}: {metric} {old} -> {new} "
+                    f"({change * 100:+.1f}% worse)"
+                )
+    return regressions
+
+
+def _print_table(results: List[dict]):
+    print(
+        f"{'scenario':<22}{'docs':>6}{'docs/s':>10}{'MB/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>10}"
+    )
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        print(
+            f"{r['scenario']:<22}{r['docs']:>6}{r['docs_per_sec']:>10.2f}"
+            f"{r['mb_per_sec']:>10.2f}{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+            f"{rss:>10}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SelladoMX signing benchmarks")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("--corpus-dir", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Compare with the previous run of the same suite",
+    )
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    from cryptography.hazmat.primitives import serialization
+
+    print(f"Generating corpus '{args.suite}' in {args.corpus_dir} ...")
+    paths = [str(p) for p in ensure_corpus(args.suite, args.corpus_dir / args.suite)]
+    identity = make_identity()
+    identity_pem = {
+        "cert": identity.signer_cert.public_bytes(serialization.Encoding.PEM),
+        "key": identity.signer_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ),
+    }
+
+    run = {
+        "run_id": uuid.uuid4().hex[:12],
+        "timestamp": time.time(),
+        "suite": args.suite,
+        "repeat": args.repeat,
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    results = []
+    with LocalTSAServer(identity) as server:
+        for scenario in args.scenario or SCENARIOS:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(
+                    _run_scenario,
+                    scenario,
+                    paths,
+                    args.repeat,
+                    server.url,
+                    identity_pem,
+                ).result()
+            results.append({**run, **result})
+            print(f"  {scenario}: {result['docs_per_sec']:.2f} docs/s")
+
+    baseline = []
+    if args.compare:
+        previous = [
+            r
+            for r in load_results(args.output)
+            if r["suite"] == args.suite and r["repeat"] == args.repeat
+        ]
+        if previous:
+            last_run = previous[-1]["run_id"]
+            baseline = [r for r in previous if r["run_id"] == last_run]
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+    print()
+    _print_table(results)
+    print(f"\nResults appended to {args.output}")
+
+    if args.compare:
+        if not baseline:
+            print("No previous run of this suite to compare with")
+            return 0
+        regressions = compare(results, baseline, args.threshold)
+        print(f"Compared with run {baseline[0]['run_id']}:")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if regressions:
+            return 1
+        print("  no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
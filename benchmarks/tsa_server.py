@@ -0,0 +1,646 @@
+"""Local stand-in for an RFC 3161 TSA and the SelladoMX timestamp API.
+
+Routes:
+    POST /tsr                          RFC 3161 TimeStampReq -> TimeStampResp
+    GET  /api/v1/balance               {"credits_remaining": N}
+    POST /api/v1/timestamp/sign        Same contract as the SelladoMX proxy
+    POST /api/v1/timestamp/sign/batch  Several TimeStampReqs in one call
+    PATCH /api/v1/timestamp/sign/<id>  complete_timestamp()
+    GET  /stats                        Request counters (JSON)
+
+Tokens are real: signed by a TSA certificate issued by the benchmark CA
+(identity.py), with the requested digest, nonce and a serial number. Load
+can be shaped with FaultProfile: added latency, random errors and a
+requests/second limit (429 from the API, 503 from the TSA, as the real
+services do when overloaded).
+
+Point the app at it with SELLADOMX_FREE_TSA_URL=<url>/tsr and
+SELLADOMX_API_URL=<url> (both are read when selladomx.config is imported).
+
+Usage:
+    python -m benchmarks.tsa_server [--port 8318] [--latency-ms 50]
+        [--jitter-ms 20] [--error-rate 0.01] [--rate-limit 500]
+        [--processes 4] [--credits N]
+    python -m benchmarks.tsa_server --selftest 5000 [--concurrency 16]
+"""
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+from asn1crypto import algos, cms, tsp, x509 as asn1_x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+
+from .identity import BenchIdentity, make_identity
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary test policy OID for the issued tokens
+TSA_POLICY = "1.3.6.1.4.1.4146.2.2"
+_HASHES = {
+    "sha1": hashes.SHA1,
+    "sha256": hashes.SHA256,
+    "sha384": hashes.SHA384,
+    "sha512": hashes.SHA512,
+}
+
+
+@dataclass
+class FaultProfile:
+    """How the stand-in degrades its answers."""
+
+    latency_ms: float = 0.0  # Added to every request
+    jitter_ms: float = 0.0  # Uniform extra latency in [0, jitter_ms]
+    error_rate: float = 0.0  # Fraction of requests answered with HTTP 500
+    rate_limit: float = 0.0  # Requests/second before throttling (0 = none)
+    burst: int = 0  # Token bucket size (default: one second of rate_limit)
+
+
+class _TokenBucket:
+    """Thread-safe requests/second limiter."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def _frozen(value):
+    """Reparse an asn1crypto value so it dumps its cached encoding."""
+    return value.__class__.load(value.dump())
+
+
+class TSAResponder:
+    """Builds signed TimeStampResp tokens (RFC 3161) from a TimeStampReq.
+
+    Same token layout as pyhanko's DummyTimeStamper, but the private key
+    and the certificate attributes are loaded once instead of per request.
+    """
+
+    def __init__(self, identity: BenchIdentity):
+        tsa_cert, _ = identity.tsa_asn1()
+        self.tsa_cert = tsa_cert
+        self._key = identity.tsa_key
+        # Fixed parts are parsed back from DER so asn1crypto reuses the
+        # encoded bytes instead of re-serializing them on every response
+        self._certificates = _frozen(
+            cms.CertificateSet(
+                [
+                    tsa_cert,
+                    asn1_x509.Certificate.load(
+                        identity.ca_cert.public_bytes(serialization.Encoding.DER)
+                    ),
+                ]
+            )
+        )
+        self._signing_certificate = _frozen(
+            tsp.SigningCertificateV2(
+                {
+                    "certs": [
+                        {
+                            "cert_hash": hashlib.sha256(tsa_cert.dump()).digest(),
+                            "issuer_serial": {
+                                "issuer": [
+                                    asn1_x509.GeneralName(
+                                        name="directory_name", value=tsa_cert.issuer
+                                    )
+                                ],
+                                "serial_number": tsa_cert.serial_number,
+                            },
+                        }
+                    ]
+                }
+            )
+        )
+        self._sid = _frozen(
+            cms.SignerIdentifier(
+                {
+                    "issuer_and_serial_number": cms.IssuerAndSerialNumber(
+                        {
+                            "issuer": tsa_cert.issuer,
+                            "serial_number": tsa_cert.serial_number,
+                        }
+                    )
+                }
+            )
+        )
+        self._tsa_name = _frozen(
+            asn1_x509.GeneralName(name="directory_name", value=tsa_cert.subject)
+        )
+        self._serials = itertools.count(int(time.time()) << 20)
+        self._serial_lock = threading.Lock()
+
+    def _next_serial(self) -> int:
+        with self._serial_lock:
+            return next(self._serials)
+
+    def respond(self, request: tsp.TimeStampReq) -> tsp.TimeStampResp:
+        """Grant a timestamp for the request's message imprint."""
+        imprint = request["message_imprint"]
+        md_name = imprint["hash_algorithm"]["algorithm"].native
+        if md_name not in _HASHES:
+            return self.reject("bad_alg")
+        digest_algorithm = algos.DigestAlgorithm({"algorithm": md_name})
+        now = datetime.now(timezone.utc)
+
+        tst_info = {
+            "version": "v1",
+            "policy": TSA_POLICY,
+            "message_imprint": imprint,
+            "serial_number": self._next_serial(),
+            "gen_time": now,
+            "tsa": self._tsa_name,
+        }
+        if request["nonce"].native is not None:
+            tst_info["nonce"] = request["nonce"]
+        tst_info_data = tsp.TSTInfo(tst_info).dump()
+
+        md = hashes.Hash(_HASHES[md_name]())
+        md.update(tst_info_data)
+        signed_attrs = cms.CMSAttributes(
+            [
+                {"type": "content_type", "values": ["tst_info"]},
+                {"type": "signing_time", "values": [cms.Time({"utc_time": now})]},
+                {
+                    "type": "signing_certificate_v2",
+                    "values": [self._signing_certificate],
+                },
+                {"type": "message_digest", "values": [md.finalize()]},
+            ]
+        )
+        signature = self._key.sign(signed_attrs.dump(), PKCS1v15(), _HASHES[md_name]())
+
+        signer_info = cms.SignerInfo(
+            {
+                "version": "v1",
+                "sid": self._sid,
+                "digest_algorithm": digest_algorithm,
+                "signature_algorithm": algos.SignedDigestAlgorithm(
+                    {"algorithm": "rsassa_pkcs1v15"}
+                ),
+                "signed_attrs": signed_attrs,
+                "signature": signature,
+            }
+        )
+        signed_data = cms.SignedData(
+            {
+                "version": "v3",
+                "digest_algorithms": [digest_algorithm],
+                "encap_content_info": {
+                    "content_type": "tst_info",
+                    "content": cms.ParsableOctetString(tst_info_data),
+                },
+                "certificates": self._certificates,
+                "signer_infos": [signer_info],
+            }
+        )
+        return tsp.TimeStampResp(
+            {
+                "status": {"status": "granted"},
+                "time_stamp_token": {
+                    "content_type": "signed_data",
+                    "content": signed_data,
+                },
+            }
+        )
+
+    @staticmethod
+    def reject(failure: str) -> tsp.TimeStampResp:
+        """A rejection response (e.g. failure="bad_alg")."""
+        return tsp.TimeStampResp(
+            {
+                "status": {
+                    "status": "rejection",
+                    "fail_info": tsp.PKIFailureInfo({failure}),
+                }
+            }
+        )
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+class _Counters:
+    """Request counters and the API balance, shared across processes."""
+
+    FIELDS = ("requests", "granted", "errors", "throttled", "completed", "credits")
+
+    def __init__(self, credits: int, shared: bool):
+        if shared:
+            ctx = get_context("fork")
+            self._values = {name: ctx.Value("q", 0, lock=False) for name in self.FIELDS}
+            self._lock = ctx.Lock()
+        else:
+            self._values = {name: _Value() for name in self.FIELDS}
+            self._lock = threading.Lock()
+        self._values["credits"].value = credits
+
+    def add(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._values[name].value += amount
+            return self._values[name].value
+
+    def take_credit(self) -> Optional[int]:
+        """Spend one credit; returns the remaining balance or None if empty."""
+        with self._lock:
+            credits = self._values["credits"]
+            if credits.value <= 0:
+                return None
+            credits.value -= 1
+            return credits.value
+
+    def get(self, name: str) -> int:
+        return self._values[name].value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: value.value for name, value in self._values.items()}
+
+
+class LocalTSAServer:
+    """HTTP server issuing timestamps signed by the benchmark TSA certificate."""
+
+    def __init__(
+        self,
+        identity: Optional[BenchIdentity] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        credits: int = 1_000_000,
+        faults: Optional[FaultProfile] = None,
+        processes: int = 1,
+    ):
+        """
+        Args:
+            identity: Certificates of the benchmark CA (default: a new one)
+            host: Interface to listen on
+            port: Port to listen on (0 = pick a free one)
+            credits: Initial balance of the emulated API
+            faults: Latency, errors and throttling to apply
+            processes: Processes accepting on the socket (POSIX only); the
+                counters and the balance are shared, the rate limit applies
+                per process
+        """
+        self.identity = identity or make_identity()
+        self.responder = TSAResponder(self.identity)
+        self.faults = faults or FaultProfile()
+        self.processes = max(1, processes) if hasattr(os, "fork") else 1
+        self.counters = _Counters(credits, shared=self.processes > 1)
+        self._bucket = (
+            _TokenBucket(self.faults.rate_limit / self.processes, self.faults.burst)
+            if self.faults.rate_limit
+            else None
+        )
+        self._children: List[int] = []
+        self._random = random.Random()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path == "/api/v1/balance":
+                    credits = server.counters.get("credits")
+                    self._json(200, {"credits_remaining": credits})
+                elif self.path == "/stats":
+                    self._json(200, server.counters.snapshot())
+                else:
+                    self._json(404, {"error": "not_found"})
+
+            def do_POST(self):
+                body = self._body()
+                if self.path == "/tsr":
+                    status, content_type, payload = server.handle_tsr(body)
+                    self._send(status, content_type, payload)
+                elif self.path == "/api/v1/timestamp/sign":
+                    status, payload = server.handle_api_sign(body)
+                    self._json(status, payload)
+                elif self.path == "/api/v1/timestamp/sign/batch":
+                    status, payload = server.handle_api_sign_batch(body)
+                    self._json(status, payload)
+                else:
+                    self._json(404, {"error": "not_found"})
+
+            def do_PATCH(self):
+                self._body()
+                if self.path.startswith("/api/v1/timestamp/sign/"):
+                    server.counters.add("completed")
+                    self._json(200, {"success": True})
+                else:
+                    self._json(404, {"error": "not_found"})
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length", 0))
+                return self.rfile.read(length)
+
+            def _json(self, status: int, payload: dict):
+                self._send(status, "application/json", json.dumps(payload).encode())
+
+            def _send(self, status: int, content_type: str, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status in (429, 503):
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 1024
+
+        self._server = Server((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _admit(self) -> Optional[str]:
+        """Apply the fault profile; returns "throttled"/"error" or None."""
+        faults = self.faults
+        self.counters.add("requests")
+        if self._bucket is not None and not self._bucket.take():
+            self.counters.add("throttled")
+            return "throttled"
+        delay = faults.latency_ms
+        if faults.jitter_ms:
+            delay += self._random.uniform(0, faults.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if faults.error_rate and self._random.random() < faults.error_rate:
+            self.counters.add("errors")
+            return "error"
+        return None
+
+    def timestamp(self, request_der: bytes) -> bytes:
+        """Answer a DER TimeStampReq with a DER TimeStampResp."""
+        response = self.responder.respond(tsp.TimeStampReq.load(request_der))
+        self.counters.add("granted")
+        return response.dump()
+
+    def handle_tsr(self, body: bytes) -> Tuple[int, str, bytes]:
+        """POST /tsr: HTTP status, content type and body."""
+        outcome = self._admit()
+        if outcome == "throttled":
+            return 503, "text/plain", b"Service busy"
+        if outcome == "error":
+            return 500, "text/plain", b"Internal error"
+        try:
+            return 200, "application/timestamp-reply", self.timestamp(body)
+        except ValueError:
+            return 400, "text/plain", b"Malformed TimeStampReq"
+
+    def handle_api_sign(self, body: bytes) -> Tuple[int, dict]:
+        """POST /api/v1/timestamp/sign (one credit per granted request)."""
+        outcome = self._admit()
+        if outcome == "throttled":
+            return 429, {"error": "rate_limited", "message": "Demasiadas solicitudes"}
+        if outcome == "error":
+            return 500, {"error": "tsa_unavailable", "message": "TSA no disponible"}
+
+        try:
+            return self._api_grant(json.loads(body))
+        except ValueError:
+            return 400, {"error": "invalid_request"}
+
+    def handle_api_sign_batch(self, body: bytes) -> Tuple[int, dict]:
+        """POST /api/v1/timestamp/sign/batch: one result per request.
+
+        Admission (throttling, latency, errors) applies to the whole call;
+        each request then spends its own credit, so a batch larger than the
+        balance is granted partially.
+        """
+        outcome = self._admit()
+        if outcome == "throttled":
+            return 429, {"error": "rate_limited", "message": "Demasiadas solicitudes"}
+        if outcome == "error":
+            return 500, {"error": "tsa_unavailable", "message": "TSA no disponible"}
+
+        try:
+            requests = json.loads(body)["requests"]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": "invalid_request"}
+        results = []
+        for payload in requests:
+            status, result = self._api_grant(payload)
+            if status != 200:
+                result["status_code"] = status
+            results.append(result)
+        return 200, {
+            "results": results,
+            "credits_remaining": self.counters.get("credits"),
+        }
+
+    def _api_grant(self, payload: dict) -> Tuple[int, dict]:
+        """Spend a credit and timestamp one API request payload."""
+        try:
+            request_der = base64.b64decode(payload["tsa_req_b64"])
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": "invalid_request"}
+
+        credits_remaining = self.counters.take_credit()
+        if credits_remaining is None:
+            return 403, {
+                "error": "insufficient_credits",
+                "message": "Sin créditos disponibles",
+                "available_credits": 0,
+            }
+        try:
+            response = self.timestamp(request_der)
+        except ValueError:
+            self.counters.add("credits")  # Refund
+            return 400, {"error": "invalid_request"}
+        record_id = f"bench-{os.getpid()}-{self.counters.get('granted')}"
+        return 200, {
+            "tsa_resp_b64": base64.b64encode(response).decode("ascii"),
+            "record_id": record_id,
+            "verification_token": record_id,
+            "verification_url": f"{self.url}/verify/{record_id}",
+            "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+            "credits_remaining": credits_remaining,
+        }
+
+    def start(self):
+        """Serve in the background (and fork the extra processes)."""
+        for _ in range(self.processes - 1):
+            pid = os.fork()
+            if pid == 0:  # Child: accept on the inherited socket until killed
+                try:
+                    self._server.serve_forever()
+                finally:
+                    os._exit(0)
+            self._children.append(pid)
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="bench-tsa", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Local TSA listening on {self.url} ({self.processes} processes)")
+
+    def stop(self):
+        for pid in self._children:
+            try:
+                os.kill(pid, 15)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        self._children.clear()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalTSAServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def timestamp_request(digest: Optional[bytes] = None) -> bytes:
+    """A DER TimeStampReq for a SHA-256 digest (random if not given)."""
+    request = tsp.TimeStampReq(
+        {
+            "version": 1,
+            "message_imprint": {
+                "hash_algorithm": {"algorithm": "sha256"},
+                "hashed_message": digest or hashlib.sha256(os.urandom(32)).digest(),
+            },
+            "nonce": random.getrandbits(63),
+            "cert_req": True,
+        }
+    )
+    return request.dump()
+
+
+def selftest(url: str, requests: int, concurrency: int) -> dict:
+    """Fire `requests` TimeStampReqs at url/tsr and report throughput.
+
+    Args:
+        url: Base URL of the server
+        requests: Total requests
+        concurrency: Client threads, each with a keep-alive connection
+
+    Returns:
+        Requests, failures, seconds and requests/second
+    """
+    import http.client
+    from urllib.parse import urlparse
+
+    parsed = urlparse(url)
+    local = threading.local()
+    body = timestamp_request()
+
+    def one(_):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(
+                parsed.hostname, parsed.port, timeout=30
+            )
+        conn.request(
+            "POST", "/tsr", body, {"Content-Type": "application/timestamp-query"}
+        )
+        response = conn.getresponse()
+        response.read()
+        return response.status == 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "failures": results.count(False),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(requests / elapsed, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local RFC 3161 TSA stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8318)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--burst", type=int, default=0)
+    parser.add_argument("--credits", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--selftest",
+        type=int,
+        metavar="N",
+        help="Start on a free port, send N requests and print the throughput",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    faults = FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+    )
+    server = LocalTSAServer(
+        host=args.host,
+        port=0 if args.selftest else args.port,
+        credits=args.credits,
+        faults=faults,
+        processes=args.processes,
+    )
+    with server:
+        if args.selftest:
+            print(json.dumps(selftest(server.url, args.selftest, args.concurrency)))
+            print(json.dumps(server.counters.snapshot()))
+            return 0
+        print(f"TSA: {server.url}/tsr")
+        print(f"API: {server.url}/api/v1/timestamp/sign")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -39,6 +39,10 @@ find . -type f -name "*.pyo" -delete 2>/dev/null || true
 echo "Cleaning PyInstaller cache..."
 rm -rf ~/.pyinstaller_cache 2>/dev/null || true
 
+# Bundle QML into a Qt resource module (loaded instead of loose files)
+echo "Compiling QML resources..."
+poetry run python scripts/build_qml_resources.py
+
 # Build with PyInstaller
 echo "Building executable..."
 poetry run pyinstaller selladomx.spec
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Compile the QML UI into a Qt resource bundle.
+
+Source: src/selladomx/ui/qml (all .qml files and qmldir)
+Output: src/selladomx/ui/qml_rc.py (registers qrc:/qml/... when imported)
+
+main() loads qrc:/qml/main.qml when this module exists, so release builds
+read the UI from one in-memory bundle instead of dozens of files. Qt caches
+the compiled QML bytecode of bundled files after the first launch.
+Run it again whenever the QML changes (scripts/build.sh does it for you).
+
+Usage: python scripts/build_qml_resources.py
+Requires: pyside6-rcc (installed with PySide6)
+"""
+
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+
+ROOT = Path(__file__).resolve().parent.parent
+QML_DIR = ROOT / "src" / "selladomx" / "ui" / "qml"
+OUTPUT = ROOT / "src" / "selladomx" / "ui" / "qml_rc.py"
+
+
+def qml_files() -> list[Path]:
+    """All files the QML engine needs, sorted for reproducible output."""
+    files = [*QML_DIR.rglob("*.qml"), *QML_DIR.rglob("qmldir")]
+    return sorted(files)
+
+
+def write_qrc(path: Path, files: list[Path]):
+    """Write a .qrc that maps each file to qrc:/qml/<relative path>."""
+    entries = "\n".join(
+        f'        <file alias="{escape(f.relative_to(QML_DIR).as_posix())}">'
+        f"{escape(str(f))}</file>"
+        for f in files
+    )
+    path.write_text(
+        "<!DOCTYPE RCC>\n<RCC version=\"1.0\">\n"
+        '    <qresource prefix="/qml">\n'
+        f"{entries}\n"
+        "    </qresource>\n</RCC>\n",
+        encoding="utf-8",
+    )
+
+
+def main():
+    rcc = shutil.which("pyside6-rcc")
+    if rcc is None:
+        print("Error: pyside6-rcc not found (install PySide6)")
+        sys.exit(1)
+
+    files = qml_files()
+    with tempfile.TemporaryDirectory() as tmp:
+        qrc = Path(tmp) / "qml.qrc"
+        write_qrc(qrc, files)
+        subprocess.run([rcc, "-g", "python", str(qrc), "-o", str(OUTPUT)], check=True)
+
+    print(f"✓ {len(files)} QML files bundled into {OUTPUT.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
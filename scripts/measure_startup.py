@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure SelladoMX launch latency (time to first frame).
+
+Launches the app several times with SELLADOMX_EXIT_AFTER_FIRST_FRAME=1 and
+appends each run to a JSONL file (default: build/startup_metrics.jsonl), so
+results can be compared across releases.
+
+Usage: python scripts/measure_startup.py [--runs N] [--output FILE] [--onscreen]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first frame")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, default=ROOT / "build" / "startup_metrics.jsonl"
+    )
+    parser.add_argument(
+        "--onscreen", action="store_true", help="Use the real display"
+    )
+    args = parser.parse_args()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ)
+    env["SELLADOMX_STARTUP_METRICS"] = str(args.output)
+    env["SELLADOMX_EXIT_AFTER_FIRST_FRAME"] = "1"
+    env["PYTHONPATH"] = str(ROOT / "src")
+    if not args.onscreen:
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    first_line = sum(1 for _ in open(args.output)) if args.output.exists() else 0
+    for _ in range(args.runs):
+        subprocess.run(
+            [sys.executable, "-m", "selladomx.main"],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    with open(args.output, encoding="utf-8") as f:
+        runs = [json.loads(line) for line in f.readlines()[first_line:]]
+    if not runs:
+        print("Error: no measurements recorded")
+        sys.exit(1)
+
+    first_frame = [run["first_frame_ms"] for run in runs]
+    qml_load = [run["qml_load_ms"] for run in runs]
+    print(f"Version {runs[0]['version']} ({runs[0]['qml_source']}), {len(runs)} runs")
+    print(f"  First frame: median {statistics.median(first_frame):.0f} ms")
+    print(f"  QML load:    median {statistics.median(qml_load):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from selladomx.utils.settings_manager import SettingsManager
 def main():
     manager = SettingsManager()
     manager.reset_onboarding()
+    manager.flush()
     print("✓ Onboarding reseteado")
     print("\nAhora ejecuta: poetry run selladomx")
 
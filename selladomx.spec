@@ -60,6 +60,10 @@ hidden_imports = [
     'PIL',
 ]
 
+# Precompiled QML bundle (scripts/build_qml_resources.py), imported lazily
+if Path('src/selladomx/ui/qml_rc.py').exists():
+    hidden_imports.append('selladomx.ui.qml_rc')
+
 # Additional submodules
 hidden_imports += collect_submodules('pyhanko')
 hidden_imports += collect_submodules('pyhanko_certvalidator')
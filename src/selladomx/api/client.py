@@ -1,10 +1,10 @@
 """HTTP client for SelladoMX API."""
 import logging
-from typing import Optional
+from typing import List, Optional
 
 import requests
 
-from ..config import API_BASE_URL
+from ..config import API_BASE_URL, TSA_BATCH_MAX_REQUESTS
 from .exceptions import (
     APIError,
     AuthenticationError,
@@ -257,6 +257,81 @@ class SelladoMXAPIClient:
 
         return response
 
+    def request_tsa_sign_batch(
+        self, tsa_requests: List[dict], chunk_size: int = TSA_BATCH_MAX_REQUESTS
+    ) -> List[dict]:
+        """Proxy several TimeStampReqs through the API (1 credit per grant).
+
+        Requests are sent in chunks of at most chunk_size per call. Once a
+        chunk has been granted, a failing later chunk does not raise: its
+        requests get error entries so the granted ones are not lost.
+
+        Args:
+            tsa_requests: One dict per document with the request_tsa_sign
+                arguments (tsa_req_b64, filename, size_bytes, signer_cn,
+                signer_serial)
+            chunk_size: Maximum requests per API call
+
+        Returns:
+            One dict per request, in order: the request_tsa_sign response
+            fields on success, or {"error", "message", "status_code"} for a
+            request that was not granted
+
+        Raises:
+            InsufficientCreditsError: If user has no credits (first chunk)
+            AuthenticationError: If API key is invalid (first chunk)
+            NetworkError: If connection fails (first chunk)
+            APIError: If the first chunk is rejected (404 = endpoint missing)
+        """
+        results: List[dict] = []
+        for start in range(0, len(tsa_requests), chunk_size):
+            chunk = tsa_requests[start : start + chunk_size]
+            try:
+                response = self._request(
+                    "POST",
+                    "/api/v1/timestamp/sign/batch",
+                    json_data={"requests": chunk},
+                )
+            except APIError as e:
+                if not results:
+                    raise
+                logger.error(f"TSA batch chunk at {start} failed: {e}")
+                results.extend(self._batch_error(e) for _ in chunk)
+                continue
+
+            chunk_results = response.get("results", [])
+            credits = response.get("credits_remaining")
+            for index in range(len(chunk)):
+                if index < len(chunk_results):
+                    result = chunk_results[index]
+                else:
+                    result = {
+                        "error": "missing_result",
+                        "message": "La API no devolvió el sello",
+                    }
+                if "error" not in result and credits is not None:
+                    result.setdefault("credits_remaining", credits)
+                results.append(result)
+
+        granted = sum(1 for result in results if "error" not in result)
+        logger.info(f"TSA batch request: {granted}/{len(tsa_requests)} granted")
+        return results
+
+    @staticmethod
+    def _batch_error(error: APIError) -> dict:
+        """Error entry for a request of a batch chunk that failed as a whole."""
+        if isinstance(error, InsufficientCreditsError):
+            code = "insufficient_credits"
+        elif isinstance(error, NetworkError):
+            code = "network_error"
+        else:
+            code = "api_error"
+        return {
+            "error": code,
+            "message": error.message,
+            "status_code": error.status_code,
+        }
+
     def complete_timestamp(
         self,
         record_id: str,
@@ -268,10 +343,18 @@ class SelladoMXAPIClient:
         Called after signing completes to replace the "pending" hash with
         the actual SHA-256 hash of the signed PDF.
 
+        A Merkle-mode batch (see signing/merkle.py) has one record for the
+        whole batch: its document_hash is the Merkle root (hex) of the
+        batch's signatures and file_size the total size of the signed PDFs.
+        Each PDF's proof file carries the record_id and proves that the PDF
+        belongs to that root.
+
         Args:
             record_id: UUID of the timestamp record
-            document_hash: SHA-256 hex hash of the signed PDF
-            file_size: Final file size in bytes (optional)
+            document_hash: SHA-256 hex hash of the signed PDF (or the
+                Merkle root of the batch)
+            file_size: Final file size in bytes (optional; for a Merkle
+                root, the size of every signed PDF of the batch)
 
         Returns:
             Dictionary with: {"success": true}
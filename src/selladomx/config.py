@@ -43,6 +43,7 @@ PAID_TSA_PROVIDER: Final[str] = os.environ.get(
     "certum",  # Certum eIDAS (default)
 )
 BUY_CREDITS_URL: Final[str] = f"{API_BASE_URL}/precios"
+VERIFICATION_URL: Final[str] = f"{API_BASE_URL}/verificar"  # QR del sello visible
 
 # ============================================================================
 # PRICING CONFIGURATION
@@ -58,9 +59,144 @@ OCSP_TIMEOUT: Final[int] = 10
 CRL_TIMEOUT: Final[int] = 15
 ENABLE_CRL_FALLBACK: Final[bool] = True
 
+# Firma de largo plazo: "B-T" (firma + sello), "B-LT" (+ cadena y OCSP/CRL
+# incrustados) o "B-LTA" (+ sello de documento sobre todo lo anterior)
+SIGNATURE_LEVEL_DEFAULT: Final[str] = "B-T"
+# Raíces de confianza adicionales para B-LT/B-LTA (archivos PEM o DER)
+# Override with SELLADOMX_LTV_TRUST_ROOTS (paths separated by os.pathsep)
+LTV_TRUST_ROOTS: Final[list[str]] = [
+    path
+    for path in os.environ.get("SELLADOMX_LTV_TRUST_ROOTS", "").split(os.pathsep)
+    if path
+]
+
+# Sello visible (opcional): caja en puntos (x1, y1, x2, y2) desde la esquina
+# inferior izquierda y páginas que lo llevan (0 = primera, -1 = última)
+STAMP_BOX: Final[tuple[float, float, float, float]] = (36.0, 36.0, 336.0, 96.0)
+STAMP_PAGES_DEFAULT: Final[tuple[int, ...]] = (-1,)
+
 # Archivos
 SIGNED_SUFFIX: Final[str] = "_firmado"
 
+# Búsqueda de PDFs en carpetas
+SCAN_MAX_WORKERS: Final[int] = 8  # Directorios escaneados en paralelo
+SCAN_BATCH_SIZE: Final[int] = 200  # Archivos por lote enviado a la UI
+SCAN_EMIT_INTERVAL: Final[float] = 0.25  # Segundos máximos entre lotes
+
+# Caché de documentos ya firmados (evita volver a firmar y gastar créditos)
+SIGNING_CACHE_FILE: Final[str] = "signing_cache.json"
+SIGNING_CACHE_MAX_ENTRIES: Final[int] = 100_000
+
+# Análisis previo a la firma (pre-flight)
+PREFLIGHT_MAX_WORKERS: Final[int] = 4
+MAX_SIGNABLE_FILE_SIZE: Final[int] = 500 * 1024 * 1024  # 500 MB
+# Estimación de tiempo por documento (segundos) + costo por MB leído/escrito
+ESTIMATE_SECONDS_PER_DOC_FREE: Final[float] = 1.5
+ESTIMATE_SECONDS_PER_DOC_PROFESSIONAL: Final[float] = 2.5
+ESTIMATE_SECONDS_PER_MB: Final[float] = 0.05
+
+# Pipeline de firma: preparar (CPU/disco) → sellar (TSA) → escribir (disco)
+PIPELINE_QUEUE_SIZE: Final[int] = 2  # Documentos preparados en espera por etapa
+PIPELINE_PREPARE_WORKERS: Final[int] = 1
+PIPELINE_SEAL_WORKERS: Final[int] = 2  # Solicitudes a la TSA en paralelo
+PIPELINE_WRITE_WORKERS: Final[int] = 1
+# Al detener un lote, los documentos en curso terminan (y el reporte se
+# cierra); pasado este tiempo (segundos) el hilo se termina a la fuerza
+SIGNING_STOP_TIMEOUT: Final[float] = 30.0
+
+# Reporte del lote (ver signing/report): "" (sin reporte), "csv", "jsonl" o
+# "parquet" (requiere pyarrow). Se escribe mientras los archivos terminan.
+REPORT_FORMAT_DEFAULT: Final[str] = ""
+REPORT_FILE_PREFIX: Final[str] = "selladomx-reporte"
+REPORT_FLUSH_ROWS: Final[int] = 100  # Filas entre escrituras a disco (CSV/JSONL)
+REPORT_PARQUET_ROW_GROUP: Final[int] = 10_000  # Filas en memoria (Parquet)
+
+# Resellado de archivos firmados (sello de documento /DocTimeStamp)
+RETIMESTAMP_WORKERS: Final[int] = 8  # Documentos sellándose en paralelo
+RETIMESTAMP_JOURNAL: Final[str] = ".selladomx-resellado.jsonl"  # Progreso
+
+# Sellos profesionales por lotes: las solicitudes de varios documentos se
+# envían juntas a la API (1 = una llamada por documento). Cada solicitud en
+# espera retiene su documento preparado en memoria.
+TSA_BATCH_MAX_REQUESTS: Final[int] = 16  # Solicitudes por llamada a la API
+TSA_BATCH_MAX_WAIT: Final[float] = 0.25  # Segundos que se espera a llenar un lote
+# Con sellos por lotes se preparan documentos mientras el lote anterior está
+# en la API (hasta TSA_BATCH_MAX_REQUESTS en cola, el siguiente lote)
+TSA_BATCH_PREPARE_WORKERS: Final[int] = 2
+
+# Planeación de créditos para TSA profesional
+# "professional_only": los documentos sin crédito no se firman
+# "fallback_free": los documentos sin crédito se sellan con la TSA gratuita
+CREDIT_POLICY_DEFAULT: Final[str] = "professional_only"
+# Segundos que el saldo de créditos se considera vigente antes de consultarlo
+CREDIT_BALANCE_TTL: Final[float] = 300.0
+
+# Fallas del servicio de TSA profesional (ver signing/failure_policy)
+# "abort": se detiene el lote; "retry": se reintenta cada documento con espera
+# creciente; "defer": se reintenta al final del lote; "fallback_free": el
+# documento se sella con la TSA gratuita
+FAILURE_POLICY_DEFAULT: Final[str] = "abort"
+SERVICE_RETRY_ATTEMPTS: Final[int] = 3  # Reintentos por documento
+SERVICE_RETRY_BACKOFF: Final[float] = 1.0  # Segundos antes del primer reintento
+SERVICE_RETRY_BACKOFF_MAX: Final[float] = 30.0
+# Circuit breaker: tras N fallas seguidas se pausa la cola y cada
+# CIRCUIT_BREAKER_COOLDOWN segundos un solo documento prueba si el servicio
+# volvió; si sigue caído después de CIRCUIT_BREAKER_MAX_OPEN se deja de esperar
+CIRCUIT_BREAKER_THRESHOLD: Final[int] = 5
+CIRCUIT_BREAKER_COOLDOWN: Final[float] = 15.0
+CIRCUIT_BREAKER_MAX_OPEN: Final[float] = 600.0
+
+# Preferencias: segundos que se agrupan escrituras antes de guardarlas en disco
+SETTINGS_FLUSH_DELAY: Final[float] = 0.5
+
+# Tareas en segundo plano de la capa QML (llamadas a la API, metadatos, etc.)
+TASK_EXECUTOR_MAX_THREADS: Final[int] = 4
+
+
+def _env_port(name: str) -> int:
+    """Puerto TCP de una variable de entorno (0 si falta o no es válido)"""
+    value = os.environ.get(name, "").strip()
+    try:
+        port = int(value or 0)
+    except ValueError:
+        port = -1
+    if not 0 <= port <= 65535:
+        logger.warning(f"Ignoring invalid {name}={value!r}")
+        return 0
+    return port
+
+
+# Métricas de tiempo por fase de firma (ver utils/metrics)
+# Límites superiores (segundos) de los buckets de los histogramas
+METRICS_BUCKETS: Final[tuple[float, ...]] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+# Si se define, cada medición se agrega como una línea JSON
+METRICS_FILE: Final[str] = os.environ.get("SELLADOMX_METRICS_FILE", "")
+# Si se define, se sirven las métricas en formato Prometheus en /metrics
+METRICS_PORT: Final[int] = _env_port("SELLADOMX_METRICS_PORT")
+
+# Presupuesto de tiempo para importar selladomx.main (ver utils/startup_profiler)
+STARTUP_IMPORT_BUDGET_MS: Final[int] = 1500
+# Si se define, cada arranque agrega una línea JSON con la latencia del primer frame
+STARTUP_METRICS_FILE: Final[str] = os.environ.get("SELLADOMX_STARTUP_METRICS", "")
+# Cerrar la app tras el primer frame (para medir el arranque en CI)
+EXIT_AFTER_FIRST_FRAME: Final[bool] = (
+    os.environ.get("SELLADOMX_EXIT_AFTER_FIRST_FRAME", "0") == "1"
+)
+
 # Seguridad
 LOG_SENSITIVE_DATA: Final[bool] = False
 
@@ -2,7 +2,14 @@
 import sys
 import os
 import logging
+import threading
+import time
+from importlib import import_module
 from pathlib import Path
+from typing import Optional
+
+# Reference point for launch latency (before Qt and the app modules load)
+_LAUNCH_STARTED = time.perf_counter()
 
 # Load environment variables BEFORE importing config (which reads env vars at module level)
 from dotenv import load_dotenv
@@ -21,8 +28,13 @@ from .ui.qml_bridge.settings_bridge import SettingsBridge
 from .utils.settings_manager import SettingsManager
 from .utils.deep_link_handler import DeepLinkHandler
 from .utils.update_checker import UpdateChecker
+from .utils.startup_profiler import record_startup_metrics
+from .utils.task_executor import TaskExecutor
 from . import __version__
 from .config import (
+    IS_DEBUG,
+    EXIT_AFTER_FIRST_FRAME,
+    STARTUP_METRICS_FILE,
     ONBOARDING_VERSION,
     COLOR_SUCCESS,
     COLOR_ERROR,
@@ -34,6 +46,15 @@ logger = logging.getLogger(__name__)
 
 _SINGLE_INSTANCE_KEY = "selladomx-single-instance"
 
+# Imported in the background after the first frame instead of at startup
+_WARMUP_MODULES = (
+    "selladomx.signing.certificate_validator",
+    "selladomx.signing.preflight",
+    "selladomx.signing.worker",
+    "selladomx.api.client",
+    "selladomx.ui.qml_bridge.history_view_model",
+)
+
 
 class SelladoMXApplication(QGuiApplication):
     """Custom QGuiApplication with single-instance and deep link support.
@@ -111,6 +132,73 @@ def setup_logging():
     )
 
 
+def _warm_up_imports():
+    """Import the signing/crypto stack so the first signing does not wait."""
+    started = time.perf_counter()
+    for module in _WARMUP_MODULES:
+        try:
+            import_module(module)
+        except Exception as e:
+            logger.warning(f"Warm-up import of {module} failed: {e}")
+    logger.info(f"Background imports ready in {time.perf_counter() - started:.2f}s")
+
+
+def _main_qml_url() -> Optional[QUrl]:
+    """URL of main.qml: the precompiled resource bundle if it was built.
+
+    scripts/build_qml_resources.py generates ui/qml_rc.py; without it (or in
+    debug mode, to pick up QML edits) the UI is loaded from the source tree.
+    """
+    if not IS_DEBUG:
+        try:
+            from .ui import qml_rc  # noqa: F401 (registers qrc:/qml/...)
+
+            return QUrl("qrc:/qml/main.qml")
+        except ImportError:
+            pass
+
+    qml_file = Path(__file__).parent / "ui" / "qml" / "main.qml"
+    if not qml_file.exists():
+        logger.error(f"QML file not found: {qml_file}")
+        return None
+    return QUrl.fromLocalFile(str(qml_file))
+
+
+def _on_first_frame(window, qml_load_seconds: float, qml_source: str):
+    """Measure launch latency and start the background warm-up.
+
+    Args:
+        window: Root QQuickWindow
+        qml_load_seconds: Time spent in QQmlApplicationEngine.load
+        qml_source: URL scheme main.qml was loaded from ("qrc" or "file")
+    """
+
+    def on_frame_swapped():
+        window.frameSwapped.disconnect(on_frame_swapped)
+        first_frame = time.perf_counter() - _LAUNCH_STARTED
+        logger.info(
+            f"First frame after {first_frame:.2f}s "
+            f"(QML load {qml_load_seconds:.2f}s from {qml_source})"
+        )
+        if STARTUP_METRICS_FILE:
+            record_startup_metrics(
+                STARTUP_METRICS_FILE,
+                version=__version__,
+                first_frame_ms=first_frame * 1000,
+                qml_load_ms=qml_load_seconds * 1000,
+                qml_source=qml_source,
+            )
+        if EXIT_AFTER_FIRST_FRAME:
+            QGuiApplication.quit()
+            return
+
+        threading.Thread(
+            target=_warm_up_imports, name="import-warmup", daemon=True
+        ).start()
+
+    window.frameSwapped.connect(on_frame_swapped)
+
+
 def _handle_deep_link_token(
     token: str, settings_manager: SettingsManager, view_model: MainViewModel
 ):
@@ -136,8 +224,8 @@ def _handle_deep_link_token(
         settings_manager.set_token_info(balance_response["token_info"])
         settings_manager.set_last_credit_balance(balance_response["credits_remaining"])
 
-        # Refresh view model
-        view_model._refresh_credit_balance()
+        # Refresh view model with the balance we already have
+        view_model._update_credit_balance(balance_response["credits_remaining"])
 
         # Show success message via status log
         view_model._append_status_log(
@@ -175,8 +263,19 @@ def main():
     if not app.setup_single_instance():
         sys.exit(0)
 
-    # Initialize settings manager
+    # Initialize settings manager (writes are flushed in the background)
     settings_manager = SettingsManager()
+    app.aboutToQuit.connect(settings_manager.flush)
+    settings_manager.watch_external_changes()
+
+    # Background tasks of the bridge objects: stop them before Qt tears down
+    app.aboutToQuit.connect(TaskExecutor.shared().shutdown)
+
+    # Signing phase timings: JSONL file / Prometheus endpoint if enabled
+    from .utils.metrics import start_exporters, stop_exporters
+
+    exporters = start_exporters()
+    app.aboutToQuit.connect(lambda: stop_exporters(exporters))
 
     # Register URL scheme on first launch (silent registration)
     if not settings_manager.has_attempted_url_scheme_registration():
@@ -235,13 +334,13 @@ def main():
     app.deepLinkReceived.connect(deep_link_handler.handle_url)
 
     # Load main QML file
-    qml_file = Path(__file__).parent / "ui" / "qml" / "main.qml"
-
-    if not qml_file.exists():
-        logger.error(f"QML file not found: {qml_file}")
+    qml_url = _main_qml_url()
+    if qml_url is None:
         sys.exit(-1)
 
-    engine.load(QUrl.fromLocalFile(str(qml_file)))
+    load_started = time.perf_counter()
+    engine.load(qml_url)
+    qml_load_seconds = time.perf_counter() - load_started
 
     # Check if QML loaded successfully
     if not engine.rootObjects():
@@ -249,6 +348,7 @@ def main():
         sys.exit(-1)
 
     logger.info("QML UI loaded successfully")
+    _on_first_frame(engine.rootObjects()[0], qml_load_seconds, qml_url.scheme())
 
     # Process deep link if provided on startup
     if deep_link_url:
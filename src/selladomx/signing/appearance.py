@@ -0,0 +1,478 @@
+"""Sello visible de la firma con apariencias precalculadas
+
+El sello muestra el logo, el nombre y la serie del firmante, la fecha de la
+firma y un código QR con la URL de verificación. Todo lo que depende solo
+del certificado (logo, textos fijos y su acomodo) se dibuja y comprime una
+vez por certificado en una plantilla (StampTemplate); en cada documento solo
+se agregan esos flujos ya codificados como form XObjects y se generan la
+fecha y el QR (este último también se reutiliza si la URL no cambia).
+
+Las fuentes son Helvetica estándar (sin incrustar), así que el sello no
+necesita subconjuntos de fuentes por documento.
+"""
+import logging
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import qrcode
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from pyhanko.pdf_utils import generic
+from pyhanko.pdf_utils.content import ResourceType
+from pyhanko.pdf_utils.generic import pdf_name
+from pyhanko.pdf_utils.layout import BoxConstraints
+from pyhanko.pdf_utils.qr import PdfStreamQRImage
+from pyhanko.pdf_utils.writer import BasePdfFileWriter, init_xobject_dictionary
+from pyhanko.stamp import BaseStamp, BaseStampStyle
+
+from ..config import STAMP_BOX, STAMP_PAGES_DEFAULT, VERIFICATION_URL
+
+logger = logging.getLogger(__name__)
+
+# Márgenes y tipografía del sello (puntos)
+_PADDING = 4.0
+_LINE_GAP = 1.25
+_MAX_FONT_SIZE = 8.0
+_SLOT_GAP = 6.0  # Separación entre sellos de varias firmas
+# Ancho medio de un carácter de Helvetica en em (para recortar textos)
+_AVG_CHAR_WIDTH = 0.55
+_NAVY = b"0.059 0.165 0.267"  # DesignTokens.primary (#0f2a44)
+
+_FONTS = {
+    "/Helv": "/Helvetica",
+    "/HelvB": "/Helvetica-Bold",
+}
+
+# Logo vectorial (sello con palomita) en una caja de 100 x 100
+_LOGO = b"\n".join(
+    [
+        _NAVY + b" rg",
+        b"50 0 m 77.6 0 100 22.4 100 50 c 100 77.6 77.6 100 50 100 c",
+        b"22.4 100 0 77.6 0 50 c 0 22.4 22.4 0 50 0 c f",
+        b"1 1 1 RG 9 w 1 J 1 j",
+        b"27 51 m 43 35 l 74 68 l S",
+    ]
+)
+
+
+def parse_page_spec(spec: str) -> Tuple[int, ...]:
+    """
+    Interpreta las páginas elegidas para el sello.
+
+    Args:
+        spec: Números de página separados por comas, empezando en 1; los
+            negativos cuentan desde el final ("1,-1" = primera y última)
+
+    Returns:
+        Índices de página (desde 0; negativos desde el final)
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    pages = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        number = int(part)
+        if number == 0:
+            raise ValueError("Las páginas se numeran desde 1")
+        pages.append(number - 1 if number > 0 else number)
+    if not pages:
+        raise ValueError("No se indicó ninguna página para el sello")
+    return tuple(pages)
+
+
+@dataclass(frozen=True)
+class StampPlacement:
+    """Dónde se dibuja el sello"""
+
+    pages: Tuple[int, ...] = STAMP_PAGES_DEFAULT  # Ver parse_page_spec
+    box: Tuple[float, float, float, float] = STAMP_BOX  # x1, y1, x2, y2
+
+    @property
+    def width(self) -> float:
+        return self.box[2] - self.box[0]
+
+    @property
+    def height(self) -> float:
+        return self.box[3] - self.box[1]
+
+    def box_at(self, slot: int) -> Tuple[float, float, float, float]:
+        """Caja del sello de la firma número `slot` (0 = la primera), apilada
+        encima de las anteriores"""
+        offset = slot * (self.height + _SLOT_GAP)
+        x1, y1, x2, y2 = self.box
+        return x1, y1 + offset, x2, y2 + offset
+
+    def resolve(self, page_count: int) -> List[int]:
+        """
+        Páginas del documento que llevan el sello, sin repetir.
+
+        La primera aloja el campo de firma; las demás llevan una copia.
+        Las páginas fuera de rango se ignoran (si no queda ninguna, se usa
+        la última).
+        """
+        resolved = []
+        for page in self.pages:
+            index = page if page >= 0 else page_count + page
+            if 0 <= index < page_count and index not in resolved:
+                resolved.append(index)
+        return resolved or [page_count - 1]
+
+
+def _pdf_text(text: str) -> bytes:
+    """Cadena literal PDF en WinAnsiEncoding"""
+    data = text.encode("cp1252", errors="replace")
+    data = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return b"(" + data + b")"
+
+
+def _fit(text: str, width: float, size: float) -> str:
+    """Recorta el texto para que quepa en `width` (aproximado)"""
+    max_chars = max(1, int(width / (size * _AVG_CHAR_WIDTH)))
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1] + "…"
+
+
+def _text_line(font: bytes, size: float, x: float, y: float, text: str) -> bytes:
+    return b"BT %s %g Tf %g %g Td %s Tj ET" % (font, size, x, y, _pdf_text(text))
+
+
+def _font_resources() -> generic.DictionaryObject:
+    return generic.DictionaryObject(
+        {
+            pdf_name(name): generic.DictionaryObject(
+                {
+                    pdf_name("/Type"): pdf_name("/Font"),
+                    pdf_name("/Subtype"): pdf_name("/Type1"),
+                    pdf_name("/BaseFont"): pdf_name(base_font),
+                    pdf_name("/Encoding"): pdf_name("/WinAnsiEncoding"),
+                }
+            )
+            for name, base_font in _FONTS.items()
+        }
+    )
+
+
+def _encoded_xobject(
+    encoded: bytes,
+    width: float,
+    height: float,
+    resources: Optional[generic.DictionaryObject] = None,
+) -> generic.StreamObject:
+    """Form XObject a partir de un flujo ya comprimido (no se recomprime)"""
+    xobject = init_xobject_dictionary(b"", width, height, resources)
+    xobject[pdf_name("/Filter")] = pdf_name("/FlateDecode")
+    return generic.StreamObject(dict(xobject), encoded_data=encoded)
+
+
+def _signer_lines(cert: x509.Certificate) -> Tuple[str, str]:
+    """Nombre y serie del firmante (atributo serialNumber o serie del certificado)"""
+    name = "Firmante Digital"
+    cn_attrs = cert.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME)
+    if cn_attrs:
+        name = cn_attrs[0].value
+    serial_attrs = cert.subject.get_attributes_for_oid(x509.NameOID.SERIAL_NUMBER)
+    # En la e.firma el atributo suele venir como " / CURP"
+    serial = serial_attrs[0].value.strip(" /") if serial_attrs else ""
+    serial = serial or format(cert.serial_number, "x")
+    return name, serial
+
+
+@lru_cache(maxsize=256)
+def _qr_stream(url: str) -> Tuple[bytes, int]:
+    """Flujo comprimido del QR de `url` y el lado de su caja"""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=1)
+    qr.add_data(url)
+    qr.make()
+    image = qr.make_image(image_factory=PdfStreamQRImage)
+    size = (qr.modules_count + 2 * qr.border) * qr.box_size
+    return zlib.compress(image.render_command_stream()), size
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Geometría del sello para una caja dada"""
+
+    width: float
+    height: float
+
+    @property
+    def side(self) -> float:
+        # Logo y QR son cuadrados del alto útil de la caja
+        return self.height - 2 * _PADDING
+
+    @property
+    def text_x(self) -> float:
+        return 2 * _PADDING + self.side
+
+    @property
+    def text_width(self) -> float:
+        return self.width - 2 * (self.side + 2 * _PADDING)
+
+    @property
+    def font_size(self) -> float:
+        # Cuatro renglones: leyenda, nombre, serie y fecha
+        return min(_MAX_FONT_SIZE, self.side / (4 * _LINE_GAP))
+
+    def line_y(self, line: int) -> float:
+        """Línea base del renglón `line` (0 = el de arriba)"""
+        return self.height - _PADDING - (line + 1) * self.font_size * _LINE_GAP
+
+
+class StampTemplate:
+    """Parte estática del sello de un certificado, ya codificada"""
+
+    def __init__(self, cert: x509.Certificate, width: float, height: float):
+        """
+        Dibuja y comprime el logo y los textos fijos.
+
+        Args:
+            cert: Certificado del firmante
+            width: Ancho del sello (puntos)
+            height: Alto del sello (puntos)
+        """
+        self.layout = _Layout(width, height)
+        layout = self.layout
+        name, serial = _signer_lines(cert)
+        size = layout.font_size
+        text_width = layout.text_width
+        scale = layout.side / 100
+
+        commands = [
+            b"q %g 0 0 %g %g %g cm /Logo Do Q" % (scale, scale, _PADDING, _PADDING),
+            _NAVY + b" rg",
+            _text_line(
+                b"/Helv",
+                size,
+                layout.text_x,
+                layout.line_y(0),
+                _fit("Firmado digitalmente por", text_width, size),
+            ),
+            _text_line(
+                b"/HelvB",
+                size,
+                layout.text_x,
+                layout.line_y(1),
+                _fit(name, text_width, size),
+            ),
+            _text_line(
+                b"/Helv",
+                size,
+                layout.text_x,
+                layout.line_y(2),
+                _fit(f"Serie: {serial}", text_width, size),
+            ),
+        ]
+        self._logo = zlib.compress(_LOGO)
+        self._static = zlib.compress(b"\n".join(commands))
+
+    def register(self, writer: BasePdfFileWriter) -> generic.IndirectObject:
+        """
+        Agrega la plantilla a un documento.
+
+        Args:
+            writer: Writer del documento que se firma
+
+        Returns:
+            Referencia al form XObject estático
+        """
+        logo = writer.add_object(_encoded_xobject(self._logo, 100, 100))
+        resources = generic.DictionaryObject(
+            {
+                pdf_name("/Font"): _font_resources(),
+                pdf_name("/XObject"): generic.DictionaryObject(
+                    {pdf_name("/Logo"): logo}
+                ),
+            }
+        )
+        return writer.add_object(
+            _encoded_xobject(
+                self._static, self.layout.width, self.layout.height, resources
+            )
+        )
+
+
+def _add_copy(
+    writer: BasePdfFileWriter,
+    page: int,
+    box: Tuple[float, float, float, float],
+    appearance: generic.IndirectObject,
+):
+    """Agrega a una página una anotación fija que muestra el sello"""
+    page_ref, _ = writer.find_page_for_modification(page)
+    annot = generic.DictionaryObject(
+        {
+            pdf_name("/Type"): pdf_name("/Annot"),
+            pdf_name("/Subtype"): pdf_name("/Stamp"),
+            pdf_name("/Rect"): generic.ArrayObject(
+                [generic.FloatObject(value) for value in box]
+            ),
+            # Imprimible y bloqueada
+            pdf_name("/F"): generic.NumberObject(4 | 128),
+            pdf_name("/P"): page_ref,
+            pdf_name("/AP"): generic.DictionaryObject({pdf_name("/N"): appearance}),
+        }
+    )
+    writer.register_annotation(page_ref, writer.add_object(annot))
+
+
+class VisibleStamp(BaseStamp):
+    """Sello de un documento: plantilla + fecha + QR"""
+
+    def __init__(
+        self,
+        writer: BasePdfFileWriter,
+        style: "VisibleStampStyle",
+        box: BoxConstraints,
+        template: StampTemplate,
+        timestamp: str,
+    ):
+        super().__init__(writer=writer, style=style, box=box)
+        self.template = template
+        self.timestamp = timestamp
+
+    def _render_inner_content(self):
+        writer = self._ensure_writer
+        layout = self.template.layout
+        qr_stream, qr_size = _qr_stream(self.style.verification_url)
+        qr = writer.add_object(_encoded_xobject(qr_stream, qr_size, qr_size))
+        self.set_resource(
+            ResourceType.XOBJECT, pdf_name("/Static"), self.template.register(writer)
+        )
+        self.set_resource(ResourceType.XOBJECT, pdf_name("/QR"), qr)
+        self.set_resource(
+            ResourceType.FONT, pdf_name("/Helv"), _font_resources()["/Helv"]
+        )
+
+        qr_scale = layout.side / qr_size
+        size = layout.font_size
+        return [
+            b"q /Static Do Q",
+            b"q %g 0 0 %g %g %g cm /QR Do Q"
+            % (qr_scale, qr_scale, layout.width - _PADDING - layout.side, _PADDING),
+            _NAVY + b" rg",
+            _text_line(
+                b"/Helv",
+                size,
+                layout.text_x,
+                layout.line_y(3),
+                _fit(f"Fecha: {self.timestamp}", layout.text_width, size),
+            ),
+        ]
+
+
+@dataclass(frozen=True)
+class VisibleStampStyle(BaseStampStyle):
+    """Estilo de pyhanko que arma el sello con una plantilla cacheada"""
+
+    border_width: int = 1
+    background_opacity: float = 1.0
+    appearance: Optional["SignatureAppearance"] = None
+    cert: Optional[x509.Certificate] = None
+    signing_time: Optional[datetime] = None
+    verification_url: str = VERIFICATION_URL
+    # Páginas (además de la del campo) que llevan una copia del sello
+    copy_pages: Tuple[int, ...] = ()
+    copy_box: Tuple[float, float, float, float] = STAMP_BOX
+
+    def create_stamp(
+        self, writer: BasePdfFileWriter, box: BoxConstraints, text_params: dict
+    ) -> VisibleStamp:
+        template = self.appearance.template_for(self.cert, box.width, box.height)
+        signing_time = (self.signing_time or datetime.now()).astimezone()
+        stamp = VisibleStamp(
+            writer,
+            self,
+            box,
+            template,
+            signing_time.strftime("%Y-%m-%d %H:%M:%S %Z").strip(),
+        )
+        # Las copias apuntan al mismo form XObject que el campo de firma
+        for page in self.copy_pages:
+            _add_copy(writer, page, self.copy_box, stamp.register())
+        return stamp
+
+
+class SignatureAppearance:
+    """Sellos visibles de un lote, con una plantilla por certificado"""
+
+    def __init__(
+        self,
+        placement: Optional[StampPlacement] = None,
+        verification_url: str = VERIFICATION_URL,
+    ):
+        """
+        Inicializa las apariencias del lote.
+
+        Args:
+            placement: Páginas y caja del sello (por defecto las de config)
+            verification_url: URL que codifica el QR
+        """
+        self.placement = placement or StampPlacement()
+        self.verification_url = verification_url
+        self._templates: Dict[Tuple[bytes, float, float], StampTemplate] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def template_for(
+        self, cert: x509.Certificate, width: float, height: float
+    ) -> StampTemplate:
+        """
+        Plantilla del certificado para una caja (la crea la primera vez).
+
+        Args:
+            cert: Certificado del firmante
+            width: Ancho del sello
+            height: Alto del sello
+
+        Returns:
+            StampTemplate compartida por los documentos del lote
+        """
+        key = (cert.fingerprint(hashes.SHA256()), width, height)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self.hits += 1
+                return template
+            self.misses += 1
+            template = StampTemplate(cert, width, height)
+            self._templates[key] = template
+            logger.info(f"Signature stamp template rendered ({width}x{height})")
+            return template
+
+    def style_for(
+        self,
+        cert: x509.Certificate,
+        pages: List[int],
+        signing_time: datetime,
+        box: Optional[Tuple[float, float, float, float]] = None,
+    ) -> VisibleStampStyle:
+        """
+        Estilo del sello de un documento.
+
+        Args:
+            cert: Certificado del firmante
+            pages: Páginas resueltas (StampPlacement.resolve); la primera
+                aloja el campo de firma
+            signing_time: Hora que muestra el sello
+            box: Caja del campo de firma (por defecto la de placement)
+
+        Returns:
+            Estilo para signers.PdfSigner
+        """
+        return VisibleStampStyle(
+            appearance=self,
+            cert=cert,
+            signing_time=signing_time,
+            verification_url=self.verification_url,
+            copy_pages=tuple(pages[1:]),
+            copy_box=box or self.placement.box,
+        )
@@ -0,0 +1,77 @@
+"""Planeación de lotes según los créditos disponibles de TSA profesional"""
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CreditPolicy(str, Enum):
+    """Qué hacer con los documentos que exceden el saldo de créditos"""
+
+    PROFESSIONAL_ONLY = "professional_only"  # No se firman, se reportan
+    FALLBACK_FREE = "fallback_free"  # Se sellan con la TSA gratuita
+
+
+@dataclass
+class BatchPlan:
+    """Reparto de un lote entre TSA profesional y TSA gratuita"""
+
+    professional: List[Path] = field(default_factory=list)
+    free: List[Path] = field(default_factory=list)
+    unfunded: List[Path] = field(default_factory=list)
+    balance: Optional[int] = None  # None = saldo desconocido
+
+    @property
+    def total(self) -> int:
+        return len(self.professional) + len(self.free) + len(self.unfunded)
+
+
+def plan_batch(
+    pdf_paths: List[Path],
+    use_professional_tsa: bool,
+    balance: Optional[int] = None,
+    policy: CreditPolicy = CreditPolicy.PROFESSIONAL_ONLY,
+) -> BatchPlan:
+    """
+    Reparte un lote según el saldo consultado una sola vez antes de firmar.
+
+    Los primeros documentos (hasta agotar el saldo) van a la TSA profesional;
+    el resto se manda a la TSA gratuita o se marca sin fondos según la política.
+    Con saldo desconocido todo el lote se intenta con TSA profesional.
+    Los documentos que se reutilizan de la caché de firmas no se incluyen:
+    no consumen créditos.
+
+    Args:
+        pdf_paths: PDFs a firmar, en orden (sin los reutilizados)
+        use_professional_tsa: Si el lote usa TSA profesional
+        balance: Créditos disponibles (None = desconocido)
+        policy: Política para los documentos que exceden el saldo
+
+    Returns:
+        Plan con las particiones del lote
+    """
+    pdf_paths = list(pdf_paths)
+
+    if not use_professional_tsa:
+        return BatchPlan(free=pdf_paths, balance=balance)
+    if balance is None:
+        return BatchPlan(professional=pdf_paths)
+
+    funded = max(balance, 0)
+    overflow = pdf_paths[funded:]
+    plan = BatchPlan(professional=pdf_paths[:funded], balance=balance)
+    if policy is CreditPolicy.FALLBACK_FREE:
+        plan.free = overflow
+    else:
+        plan.unfunded = overflow
+
+    if overflow:
+        logger.info(
+            f"Batch plan: {len(plan.professional)} professional, "
+            f"{len(plan.free)} free, {len(plan.unfunded)} unfunded "
+            f"(balance {balance}, policy {policy.value})"
+        )
+    return plan
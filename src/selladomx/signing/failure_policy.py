@@ -0,0 +1,201 @@
+"""Políticas ante fallas del servicio de TSA profesional
+
+Un error 502 o una caída de red de la API no deberían detener un lote de
+miles de documentos. La política decide qué pasa con el documento afectado:
+
+- abort: el lote se detiene (comportamiento original)
+- retry: se reintenta el documento con espera exponencial
+- defer: el documento se aparta y se reintenta al terminar el lote
+- fallback_free: el documento se sella con la TSA gratuita
+
+Con retry y defer, un CircuitBreaker compartido por el lote pausa la cola
+mientras la API está caída: tras varias fallas seguidas, los hilos esperan y
+cada cierto tiempo un solo documento prueba el servicio; cuando responde,
+todos continúan.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable, Optional
+
+from ..api.exceptions import (
+    APIError,
+    AuthenticationError,
+    InsufficientCreditsError,
+    NetworkError,
+)
+from ..config import (
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_MAX_OPEN,
+    CIRCUIT_BREAKER_THRESHOLD,
+    SERVICE_RETRY_BACKOFF,
+    SERVICE_RETRY_BACKOFF_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+SERVICE_DOWN_MSG = "Servicio no disponible. Intenta más tarde."
+
+
+class FailurePolicy(str, Enum):
+    """Qué hacer con un documento cuando falla el servicio de TSA"""
+
+    ABORT = "abort"
+    RETRY = "retry"
+    DEFER = "defer"
+    FALLBACK_FREE = "fallback_free"
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Indica si un error del servicio puede desaparecer al reintentar.
+
+    Args:
+        error: Excepción de la API
+
+    Returns:
+        True para fallas de red, 429 y 5xx (no para token ni créditos)
+    """
+    if isinstance(error, (AuthenticationError, InsufficientCreditsError)):
+        return False
+    if isinstance(error, NetworkError):
+        return True
+    if isinstance(error, APIError):
+        status = error.status_code
+        return status is None or status == 429 or status >= 500
+    return False
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Espera antes de un reintento (exponencial, con variación aleatoria para
+    que los hilos no reintenten a la vez).
+
+    Args:
+        attempt: Número de reintento (1 = el primero)
+
+    Returns:
+        Segundos de espera
+    """
+    delay = min(SERVICE_RETRY_BACKOFF * 2 ** (attempt - 1), SERVICE_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitBreaker:
+    """Pausa las llamadas a un servicio caído y lo prueba de uno en uno.
+
+    Cerrado: las llamadas pasan. Tras `threshold` fallas seguidas se abre y
+    wait() bloquea; pasado `cooldown`, un solo hilo hace la llamada de prueba
+    mientras los demás esperan su resultado. Si la prueba funciona se cierra;
+    si falla, se espera otro `cooldown`. Si el servicio sigue caído después
+    de `max_open` segundos, los hilos que esperan fallan de inmediato con
+    NetworkError, pero cada `cooldown` se sigue dejando pasar una prueba: si
+    el servicio vuelve, el circuito se cierra y el lote continúa.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+        cooldown: float = CIRCUIT_BREAKER_COOLDOWN,
+        max_open: float = CIRCUIT_BREAKER_MAX_OPEN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_open = max_open
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._retry_at = 0.0
+        self._probing = False
+        self.trips = 0  # Veces que se abrió
+
+    @property
+    def is_open(self) -> bool:
+        with self._cond:
+            return self._opened_at is not None
+
+    def wait(self):
+        """
+        Bloquea mientras el circuito está abierto.
+
+        Raises:
+            NetworkError: Si el servicio lleva más de max_open caído y no es
+                turno de una prueba
+        """
+        with self._cond:
+            while self._opened_at is not None:
+                now = self._clock()
+                if not self._probing and now >= self._retry_at:
+                    self._probing = True  # Este hilo prueba el servicio
+                    return
+                remaining = self._opened_at + self.max_open - now
+                if remaining <= 0:
+                    raise NetworkError(SERVICE_DOWN_MSG)
+                timeout = remaining
+                if not self._probing:
+                    timeout = min(timeout, self._retry_at - now)
+                self._cond.wait(timeout)
+
+    def record_success(self):
+        """El servicio respondió: se cierra el circuito."""
+        with self._cond:
+            if self._opened_at is not None:
+                logger.info("TSA service recovered, resuming the queue")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_failure(self):
+        """Falla del servicio: cuenta hacia abrir el circuito (o lo reabre)."""
+        with self._cond:
+            self._failures += 1
+            now = self._clock()
+            if self._opened_at is not None:
+                # Falló la prueba (o una llamada que ya estaba en curso)
+                self._probing = False
+                self._retry_at = now + self.cooldown
+                self._cond.notify_all()
+            elif self._failures >= self.threshold:
+                self._opened_at = now
+                self._retry_at = now + self.cooldown
+                self.trips += 1
+                logger.warning(
+                    f"TSA service failed {self._failures} times in a row, "
+                    f"pausing the queue for {self.cooldown:.0f}s"
+                )
+
+    def _release(self):
+        """Termina una prueba sin saber el estado del servicio."""
+        with self._cond:
+            if self._probing:
+                self._probing = False
+                self._retry_at = self._clock()
+                self._cond.notify_all()
+
+    @contextmanager
+    def guard(self):
+        """
+        Espera a que el circuito permita la llamada y registra su resultado.
+
+        Las fallas transitorias (is_transient) cuentan como caída; cualquier
+        otra respuesta de la API indica que el servicio está arriba.
+        """
+        self.wait()
+        try:
+            yield
+        except APIError as e:
+            if is_transient(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self.record_success()
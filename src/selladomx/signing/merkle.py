@@ -0,0 +1,349 @@
+"""Sello de tiempo agregado con árbol de Merkle (opcional)
+
+En lugar de pedir un sello de tiempo por documento, se construye un árbol de
+Merkle con el valor de la firma de cada documento del lote y se pide un solo
+sello sobre la raíz. La prueba de inclusión de cada PDF y el sello de la raíz
+se guardan junto a él, en <pdf>.merkle.json: el PDF no se modifica después de
+firmarlo, porque una actualización posterior a la firma haría que los
+lectores lo mostraran como alterado.
+
+No es un sello PAdES: la firma CMS no lleva signatureTimeStampToken y los
+lectores de PDF no lo muestran. Lo verifica verify_proofs(), que también usa
+PDFSigner.verify_signature.
+
+Hojas y nodos siguen RFC 6962: hoja = SHA-256(0x00 || valor de la firma),
+nodo = SHA-256(0x01 || izquierdo || derecho); un nodo sin pareja sube sin
+cambios al nivel siguiente.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from asn1crypto import cms
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.sign.timestamps import TimeStamper
+
+from ..errors import PDFError
+
+logger = logging.getLogger(__name__)
+
+# Sufijo del archivo con las pruebas, junto al PDF firmado
+PROOF_SUFFIX = ".merkle.json"
+
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    """Hash de una hoja del árbol"""
+    return hashlib.sha256(_LEAF_PREFIX + data).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """Árbol de Merkle sobre una lista de valores"""
+
+    def __init__(self, values: List[bytes]):
+        """
+        Construye el árbol.
+
+        Args:
+            values: Valores de las hojas, en orden (al menos uno)
+        """
+        if not values:
+            raise ValueError("El árbol de Merkle necesita al menos una hoja")
+        self._levels: List[List[bytes]] = [[leaf_hash(value) for value in values]]
+        while len(self._levels[-1]) > 1:
+            level = self._levels[-1]
+            parents = [
+                _node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)
+            ]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self._levels.append(parents)
+
+    def __len__(self) -> int:
+        return len(self._levels[0])
+
+    @property
+    def root(self) -> bytes:
+        return self._levels[-1][0]
+
+    def proof(self, index: int) -> List[bytes]:
+        """
+        Hermanos desde la hoja hasta la raíz (ver verify_inclusion).
+
+        Args:
+            index: Posición de la hoja
+
+        Returns:
+            Hashes de los nodos hermanos, de abajo hacia arriba
+        """
+        path = []
+        for level in self._levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(level[sibling])
+            index //= 2
+        return path
+
+
+def verify_inclusion(
+    value: bytes, index: int, count: int, path: List[bytes], root: bytes
+) -> bool:
+    """
+    Comprueba que `value` es la hoja `index` de un árbol de `count` hojas.
+
+    Args:
+        value: Valor de la hoja (sin hashear)
+        index: Posición de la hoja
+        count: Número de hojas del árbol
+        path: Hermanos devueltos por MerkleTree.proof
+        root: Raíz esperada
+
+    Returns:
+        True si la prueba lleva a la raíz
+    """
+    if not 0 <= index < count:
+        return False
+    node = leaf_hash(value)
+    remaining = list(path)
+    size = count
+    while size > 1:
+        if index % 2:
+            if not remaining:
+                return False
+            node = _node_hash(remaining.pop(0), node)
+        elif index + 1 < size:
+            if not remaining:
+                return False
+            node = _node_hash(node, remaining.pop(0))
+        # Sin pareja: el nodo sube sin cambios
+        index //= 2
+        size = (size + 1) // 2
+    return not remaining and node == root
+
+
+def signature_value(cms_contents: bytes) -> bytes:
+    """Valor de la firma (SignerInfo.signature) de un contenedor CMS"""
+    signed_data = cms.ContentInfo.load(cms_contents)["content"]
+    return signed_data["signer_infos"][0]["signature"].native
+
+
+@dataclass
+class MerkleProof:
+    """Prueba de inclusión de una firma en un sello agregado"""
+
+    field_name: str  # Campo de firma al que pertenece
+    index: int
+    count: int
+    path: List[bytes]
+    root: bytes
+    token: bytes  # TimeStampToken (ContentInfo DER) sobre la raíz
+    # Registro de la API con sello profesional: su document_hash es la raíz,
+    # así que el registro se relaciona con cada PDF del lote por esta prueba
+    record_id: str = ""
+    verification_url: str = ""
+
+    def to_dict(self) -> dict:
+        data = {
+            "field": self.field_name,
+            "index": self.index,
+            "count": self.count,
+            "path": [node.hex() for node in self.path],
+            "root": self.root.hex(),
+            "token": base64.b64encode(self.token).decode("ascii"),
+        }
+        if self.record_id:
+            data["record_id"] = self.record_id
+            data["verification_url"] = self.verification_url
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MerkleProof":
+        return cls(
+            field_name=data["field"],
+            index=int(data["index"]),
+            count=int(data["count"]),
+            path=[bytes.fromhex(node) for node in data["path"]],
+            root=bytes.fromhex(data["root"]),
+            token=base64.b64decode(data["token"]),
+            record_id=data.get("record_id", ""),
+            verification_url=data.get("verification_url", ""),
+        )
+
+
+@dataclass
+class MerkleTimestampStatus:
+    """Resultado de verificar una prueba de inclusión"""
+
+    field_name: str
+    valid: bool
+    timestamp: Optional[datetime] = None  # Hora del sello sobre la raíz
+    reason: str = ""
+
+
+def timestamp_signatures(
+    signatures: List[Tuple[str, bytes]], timestamper: TimeStamper
+) -> List[MerkleProof]:
+    """
+    Obtiene un solo sello de tiempo para un lote de firmas.
+
+    Args:
+        signatures: (campo de firma, contenedor CMS) de cada documento
+        timestamper: TSA que sella la raíz
+
+    Returns:
+        Una prueba por firma, en el mismo orden
+    """
+    tree = MerkleTree([signature_value(contents) for _, contents in signatures])
+    token = asyncio.run(timestamper.async_timestamp(tree.root, "sha256"))
+    logger.info(f"Merkle root timestamped for {len(tree)} signatures")
+    return [
+        MerkleProof(
+            field_name=field_name,
+            index=index,
+            count=len(tree),
+            path=tree.proof(index),
+            root=tree.root,
+            token=token.dump(),
+        )
+        for index, (field_name, _) in enumerate(signatures)
+    ]
+
+
+def proof_path(pdf_path: Path) -> Path:
+    """Archivo de pruebas de un PDF firmado (documento.pdf.merkle.json)"""
+    pdf_path = Path(pdf_path)
+    return pdf_path.with_name(pdf_path.name + PROOF_SUFFIX)
+
+
+def save_proof(pdf_path: Path, proof: MerkleProof):
+    """
+    Guarda la prueba junto al PDF firmado, sin modificar el PDF.
+
+    Si el archivo de pruebas ya existe, se reemplaza la prueba del mismo
+    campo de firma y se conservan las demás.
+
+    Args:
+        pdf_path: PDF ya firmado
+        proof: Prueba de su firma
+    """
+    path = proof_path(pdf_path)
+    proofs = [
+        entry for entry in read_proofs(pdf_path) if entry.field_name != proof.field_name
+    ]
+    proofs.append(proof)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(
+        json.dumps({"proofs": [entry.to_dict() for entry in proofs]}),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, path)
+
+
+def read_proofs(pdf_path: Path) -> List[MerkleProof]:
+    """Pruebas guardadas junto a un PDF (vacío si no tiene)"""
+    try:
+        data = json.loads(proof_path(pdf_path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    return [MerkleProof.from_dict(entry) for entry in data["proofs"]]
+
+
+def verify_proofs(
+    proofs: List[MerkleProof], embedded_signatures: Dict[str, object]
+) -> List[MerkleTimestampStatus]:
+    """
+    Verifica las pruebas de inclusión de un PDF.
+
+    Para cada prueba comprueba que la firma del campo es la hoja indicada,
+    que la ruta lleva a la raíz y que el sello sobre la raíz es íntegro.
+
+    Args:
+        proofs: Pruebas del PDF (read_proofs)
+        embedded_signatures: Firmas del PDF por nombre de campo
+
+    Returns:
+        Un estado por prueba (vacío si el PDF no usa sello agregado)
+    """
+    from pyhanko.sign.validation.generic_cms import validate_tst_signed_data
+
+    statuses = []
+    for proof in proofs:
+        embedded_sig = embedded_signatures.get(proof.field_name)
+        if embedded_sig is None:
+            statuses.append(
+                MerkleTimestampStatus(proof.field_name, False, reason="no_signature")
+            )
+            continue
+
+        value = embedded_sig.signer_info["signature"].native
+        if not verify_inclusion(
+            value, proof.index, proof.count, proof.path, proof.root
+        ):
+            statuses.append(
+                MerkleTimestampStatus(proof.field_name, False, reason="bad_proof")
+            )
+            continue
+
+        try:
+            signed_data = cms.ContentInfo.load(proof.token)["content"]
+            result = asyncio.run(
+                validate_tst_signed_data(
+                    signed_data, None, expected_tst_imprint=proof.root
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Merkle timestamp token of {proof.field_name}: {e}")
+            statuses.append(
+                MerkleTimestampStatus(proof.field_name, False, reason="bad_token")
+            )
+            continue
+
+        valid = bool(result.get("intact") and result.get("valid"))
+        statuses.append(
+            MerkleTimestampStatus(
+                proof.field_name,
+                valid,
+                timestamp=result.get("timestamp"),
+                reason="" if valid else "bad_token",
+            )
+        )
+    return statuses
+
+
+def verify_merkle_timestamp(pdf_path: Path) -> List[MerkleTimestampStatus]:
+    """
+    Verifica las pruebas de inclusión de un PDF en disco.
+
+    Args:
+        pdf_path: PDF firmado
+
+    Returns:
+        Un estado por prueba (vacío si el PDF no usa sello agregado)
+
+    Raises:
+        PDFError: Si hay un error leyendo el PDF o sus pruebas
+    """
+    try:
+        proofs = read_proofs(pdf_path)
+        if not proofs:
+            return []
+        with open(pdf_path, "rb") as f:
+            reader = PdfFileReader(f)
+            return verify_proofs(
+                proofs, {sig.field_name: sig for sig in reader.embedded_signatures}
+            )
+    except (OSError, ValueError, KeyError) as e:
+        raise PDFError(f"No se pudo leer el PDF: {e}")
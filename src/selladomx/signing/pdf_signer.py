@@ -1,8 +1,14 @@
 """Core de firma de PDFs con pyhanko"""
+import asyncio
+import dataclasses
+import hashlib
 import logging
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from enum import Enum
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from asn1crypto import keys as asn1_keys
 from asn1crypto import x509 as asn1_x509
@@ -10,8 +16,12 @@ from cryptography import x509
 from cryptography.hazmat.primitives import serialization
 from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
 from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.pdf_utils import generic
 from pyhanko.sign import fields, signers
-from pyhanko.sign.validation import validate_pdf_signature
+from pyhanko.sign.fields import MDPPerm
+from pyhanko.sign.signers.pdf_cms import PdfCMSSignedAttributes
+from pyhanko.sign.validation import validate_pdf_signature, validate_pdf_timestamp
+from pyhanko.sign.validation.pdf_embedded import read_certification_data
 
 from pyhanko.sign.timestamps import TimeStamper
 
@@ -21,13 +31,134 @@ from ..api.exceptions import (
     NetworkError,
     APIError,
 )
-from ..config import SIGNED_SUFFIX
+from ..config import SIGNATURE_LEVEL_DEFAULT, SIGNED_SUFFIX, TSA_TIMEOUT, TSA_URL
 from ..errors import PDFError, SigningError
+from ..utils import metrics
+from . import merkle
+from .appearance import SignatureAppearance
 from .certificate_validator import PrivateKey
-from .tsa import TSAClient
+from .tsa import TimedHTTPTimeStamper, TSAClient
+from .validation_data import ValidationDataCache
 
 logger = logging.getLogger(__name__)
 
+# Histograma de tiempos por fase (etiqueta "phase")
+PHASE_METRIC = "signing_phase_seconds"
+
+
+def _phase(name: str, pdf_path: Path):
+    """Mide una fase de la firma de un documento"""
+    return metrics.timer(PHASE_METRIC, document=str(pdf_path), phase=name)
+
+
+class SignatureLevel(str, Enum):
+    """Nivel PAdES de la firma"""
+
+    B_T = "B-T"  # Firma + sello de tiempo (si hay TSA)
+    B_LT = "B-LT"  # + cadena y OCSP/CRL incrustados (DSS)
+    B_LTA = "B-LTA"  # + sello de documento sobre la DSS
+
+
+@contextmanager
+def _signing_errors():
+    """Propaga los errores de la API y convierte el resto en SigningError"""
+    try:
+        yield
+    except (InsufficientCreditsError, AuthenticationError, NetworkError, APIError):
+        # Let API-specific exceptions propagate so the worker can handle them
+        raise
+    except SigningError:
+        raise
+    except Exception as e:
+        logger.error(f"Error signing PDF: {e}")
+        raise SigningError(f"No se pudo firmar el PDF: {e}")
+
+
+# Prefijo de los campos de firma que crea SelladoMX (Signature1, Signature2...)
+FIELD_PREFIX = "Signature"
+
+
+def signature_fields(reader: PdfFileReader) -> Dict[str, generic.DictionaryObject]:
+    """
+    Campos de firma de un documento, en un solo recorrido del AcroForm.
+
+    Args:
+        reader: Documento abierto
+
+    Returns:
+        Campo por nombre (los firmados tienen /V)
+    """
+    return {
+        name: field_ref.get_object()
+        for name, _, field_ref in fields.enumerate_sig_fields(reader)
+    }
+
+
+def next_field_names(existing: Sequence[str], count: int = 1) -> List[str]:
+    """
+    Siguientes nombres libres de la forma SignatureN.
+
+    Args:
+        existing: Nombres de los campos que ya tiene el documento
+        count: Cuántos nombres se necesitan
+
+    Returns:
+        Nombres numerados después del mayor SignatureN existente
+    """
+    numbers = [
+        int(name[len(FIELD_PREFIX) :])
+        for name in existing
+        if name.startswith(FIELD_PREFIX) and name[len(FIELD_PREFIX) :].isdigit()
+    ]
+    start = max(numbers, default=0) + 1
+    names = []
+    number = start
+    while len(names) < count:
+        name = f"{FIELD_PREFIX}{number}"
+        if name not in existing:
+            names.append(name)
+        number += 1
+    return names
+
+
+def _check_signable(reader: PdfFileReader):
+    """Falla antes de firmar si una firma de certificación lo impide"""
+    certification = read_certification_data(reader)
+    if certification is not None and certification.permission == MDPPerm.NO_CHANGES:
+        raise SigningError("El documento está certificado y no admite más firmas")
+
+
+def _output_path(pdf_path: Path, output_path: Optional[Path]) -> Path:
+    """Ruta del PDF firmado (por defecto agrega el sufijo)"""
+    if output_path is None:
+        return pdf_path.parent / f"{pdf_path.stem}{SIGNED_SUFFIX}{pdf_path.suffix}"
+    return Path(output_path)
+
+
+@dataclass
+class PreparedSignature:
+    """Documento preparado para firmar (ver PDFSigner.prepare)"""
+
+    pdf_path: Path
+    output_path: Path
+    signature_meta: signers.PdfSignatureMetadata
+    session: Any  # PdfSigningSession
+    validation_info: Any  # PreSignValidationStatus
+    tbs_document: Any  # PdfTBSDocument
+    prepared_digest: Any  # PreparedByteRangeDigest
+    output: BytesIO
+    post_signing: Any = None  # PdfPostSignatureDocument, tras seal()
+    # Campos creados en esta actualización (el primero es el que se firma;
+    # los demás quedan vacíos para los co-firmantes)
+    field_names: List[str] = dataclasses.field(default_factory=list)
+    # Para el resultado de la firma (ver signing/result.py); el original solo
+    # se mide si se leyó de disco y la salida al guardarla con write()
+    source_size: int = 0
+    source_sha256: str = ""
+    output_size: int = 0
+    output_sha256: str = ""
+    tsa_provider: str = ""
+
 
 class PDFSigner:
     """Firmador de PDFs con certificados digitales"""
@@ -38,6 +169,9 @@ class PDFSigner:
         private_key: PrivateKey,
         tsa_client: Optional[TSAClient] = None,
         timestamper: Optional[TimeStamper] = None,
+        level: str = SIGNATURE_LEVEL_DEFAULT,
+        validation_cache: Optional[ValidationDataCache] = None,
+        appearance: Optional[SignatureAppearance] = None,
     ):
         """
         Inicializa el firmador de PDFs.
@@ -47,17 +181,29 @@ class PDFSigner:
             private_key: Clave privada correspondiente
             tsa_client: Cliente TSA opcional para sellado de tiempo (free)
             timestamper: Pre-built pyhanko TimeStamper (e.g., APITimeStamper for professional TSA)
+            level: Nivel PAdES (un valor de SignatureLevel)
+            validation_cache: Datos de validación compartidos por el lote
+                (B-LT/B-LTA; por defecto uno propio de este firmador)
+            appearance: Sello visible compartido por el lote (None = firma
+                invisible)
         """
         self.cert = cert
         self.private_key = private_key
         self.tsa_client = tsa_client
         self.timestamper = timestamper
+        self.level = SignatureLevel(level)
+        self.validation_cache = validation_cache
+        self.appearance = appearance
+        self._cms_signer: Optional[signers.SimpleSigner] = None
         logger.info("PDF signer initialized")
 
     def sign_pdf(self, pdf_path: Path, output_path: Optional[Path] = None) -> Path:
         """
         Firma un PDF con el certificado digital.
 
+        Equivale a prepare() + seal() + write(); SigningPipeline llama a las
+        tres fases por separado para traslaparlas entre documentos.
+
         Args:
             pdf_path: Ruta al PDF a firmar
             output_path: Ruta del PDF firmado (opcional, por defecto agrega sufijo)
@@ -69,29 +215,285 @@ class PDFSigner:
             PDFError: Si hay un error leyendo el PDF
             SigningError: Si hay un error al firmar
         """
+        prepared = self.prepare(pdf_path, output_path)
+        self.seal(prepared)
+        return self.write(prepared)
+
+    def prepare(
+        self,
+        pdf_path: Path,
+        output_path: Optional[Path] = None,
+        source: Optional[BytesIO] = None,
+        field_name: Optional[str] = None,
+        field_count: int = 1,
+        source_sha256: str = "",
+    ) -> PreparedSignature:
+        """
+        Fase 1 (CPU/disco): lee el PDF, agrega el campo de firma, reserva
+        espacio para la firma y calcula el hash del documento.
+
+        El campo nuevo se numera después de los existentes (Signature1,
+        Signature2...), así que un PDF ya firmado se puede volver a firmar.
+
+        Args:
+            pdf_path: Ruta al PDF a firmar
+            output_path: Ruta del PDF firmado (opcional, por defecto agrega sufijo)
+            source: Documento ya leído (co-firma: la salida del firmante
+                anterior); por defecto se lee pdf_path
+            field_name: Campo vacío existente a firmar (por defecto se crea uno)
+            field_count: Campos que se crean si no se indica field_name; se
+                firma el primero y los demás quedan para co-firmantes
+            source_sha256: SHA-256 de pdf_path si ya se calculó (no se
+                vuelve a calcular al leerlo)
+
+        Returns:
+            Documento preparado para seal()
+
+        Raises:
+            PDFError: Si el PDF no existe
+            SigningError: Si hay un error al preparar o el documento no
+                admite la firma
+        """
         pdf_path = Path(pdf_path)
 
-        if not pdf_path.exists():
+        if source is None and not pdf_path.exists():
             raise PDFError(f"Archivo PDF no encontrado: {pdf_path}")
 
-        # Determinar ruta de salida
-        if output_path is None:
-            output_path = (
-                pdf_path.parent / f"{pdf_path.stem}{SIGNED_SUFFIX}{pdf_path.suffix}"
-            )
-        else:
-            output_path = Path(output_path)
+        output_path = _output_path(pdf_path, output_path)
 
         logger.info(f"Signing PDF: {pdf_path.name}")
 
-        try:
+        with _signing_errors():
             # Leer PDF en memoria
-            with open(pdf_path, "rb") as f:
-                pdf_data = BytesIO(f.read())
+            source_size = 0
+            if source is None:
+                with _phase("read", pdf_path), open(pdf_path, "rb") as f:
+                    data = f.read()
+                    source_size = len(data)
+                    if not source_sha256:
+                        source_sha256 = hashlib.sha256(data).hexdigest()
+                    source = BytesIO(data)
+            else:
+                source_sha256 = ""
 
             # Crear writer incremental (preserva PDF original)
-            writer = IncrementalPdfFileWriter(pdf_data)
+            writer = IncrementalPdfFileWriter(source)
+
+            # Firmas previas: se revisan antes de hacer trabajo caro
+            existing = signature_fields(writer.prev)
+            _check_signable(writer.prev)
+            new_fields: List[str] = []
+            if field_name is None:
+                new_fields = next_field_names(list(existing), field_count)
+                field_name = new_fields[0]
+            elif field_name not in existing:
+                raise SigningError(f"El documento no tiene el campo {field_name}")
+            elif "/V" in existing[field_name]:
+                raise SigningError(f"El campo {field_name} ya está firmado")
+
+            # B-LT/B-LTA: cadena y OCSP/CRL del firmante desde la caché del lote
+            validation_context = None
+            if self.level is not SignatureLevel.B_T:
+                if self.validation_cache is None:
+                    self.validation_cache = ValidationDataCache()
+                validation_context = self.validation_cache.context_for(
+                    self._get_cms_signer().signing_cert
+                )
+
+            # Configurar metadata de la firma
+            signature_meta = signers.PdfSignatureMetadata(
+                field_name=field_name,
+                name=self._get_signer_name(),
+                location="México",
+                # La DSS de B-LT/B-LTA solo aplica a firmas ETSI.CAdES.detached
+                subfilter=(
+                    fields.SigSeedSubFilter.PADES if validation_context else None
+                ),
+                validation_context=validation_context,
+                embed_validation_info=validation_context is not None,
+                use_pades_lta=self.level is SignatureLevel.B_LTA,
+            )
+
+            # Agregar campos de firma (invisibles, o con sello en la primera
+            # página elegida; las demás llevan una copia del sello). Cada
+            # sello va encima de los de firmas anteriores.
+            stamp_pages = [0]
+            stamp_box = None
+            if self.appearance is not None:
+                placement = self.appearance.placement
+                stamp_pages = placement.resolve(int(writer.root["/Pages"]["/Count"]))
+                if not new_fields:
+                    stamp_box = tuple(
+                        float(value)
+                        for value in fields.get_sig_field_annot(existing[field_name])[
+                            "/Rect"
+                        ]
+                    )
+            with _phase("field", pdf_path):
+                for slot, name in enumerate(new_fields, start=len(existing)):
+                    box = None  # Sin sello visual
+                    if self.appearance is not None:
+                        box = self.appearance.placement.box_at(slot)
+                        stamp_box = stamp_box or box
+                    fields.append_signature_field(
+                        writer,
+                        sig_field_spec=fields.SigFieldSpec(
+                            sig_field_name=name, on_page=stamp_pages[0], box=box
+                        ),
+                    )
+
+            timestamper = self._get_timestamper()
+            if timestamper is None and self.level is SignatureLevel.B_LTA:
+                raise SigningError("La firma B-LTA requiere un servicio TSA")
+
+            async def digest():
+                # Preparación del firmante: validación previa y reserva de
+                # espacio (la estimación pide un sello de prueba a la TSA)
+                with _phase("prepare", pdf_path):
+                    pdf_signer = signers.PdfSigner(
+                        signature_meta,
+                        signer=self._get_cms_signer(),
+                        timestamper=timestamper,
+                    )
+                    session = pdf_signer.init_signing_session(writer)
+                    if self.appearance is not None:
+                        # El sello muestra la hora de la firma, que fija la sesión
+                        pdf_signer.stamp_style = self.appearance.style_for(
+                            self.cert, stamp_pages, session.system_time, stamp_box
+                        )
+                    validation_info = await session.perform_presign_validation(writer)
+                    bytes_reserved = await session.estimate_signature_container_size(
+                        validation_info, tight=signature_meta.tight_size_estimates
+                    )
+                with _phase("digest", pdf_path):
+                    tbs_document = session.prepare_tbs_document(
+                        validation_info=validation_info, bytes_reserved=bytes_reserved
+                    )
+                    prepared_digest, output = tbs_document.digest_tbs_document(
+                        in_place=True
+                    )
+                return session, validation_info, tbs_document, prepared_digest, output
+
+            with self._exclusive(validation_context):
+                session, validation_info, tbs_document, prepared_digest, output = (
+                    asyncio.run(digest())
+                )
+
+        return PreparedSignature(
+            pdf_path=pdf_path,
+            output_path=output_path,
+            signature_meta=signature_meta,
+            session=session,
+            validation_info=validation_info,
+            tbs_document=tbs_document,
+            prepared_digest=prepared_digest,
+            output=output,
+            field_names=new_fields,
+            source_size=source_size,
+            source_sha256=source_sha256,
+            tsa_provider=getattr(timestamper, "provider", ""),
+        )
+
+    def seal(self, prepared: PreparedSignature):
+        """
+        Fase 2 (red): genera la firma CMS, obtiene el sello de tiempo de la
+        TSA y la inserta en el espacio reservado del documento.
 
+        Args:
+            prepared: Documento devuelto por prepare()
+
+        Raises:
+            APIError: Si la TSA profesional rechaza la solicitud
+            SigningError: Si hay un error al firmar
+        """
+        with _signing_errors():
+            validation_info = prepared.validation_info
+            signed_attrs = PdfCMSSignedAttributes(
+                signing_time=prepared.session.system_time,
+                adobe_revinfo_attr=(
+                    None
+                    if validation_info is None
+                    else validation_info.adobe_revinfo_attr
+                ),
+                cades_signed_attrs=prepared.signature_meta.cades_signed_attr_spec,
+            )
+            # Incluye la solicitud a la TSA (medida aparte en tsa_request_seconds)
+            with _phase("embed", prepared.pdf_path):
+                prepared.post_signing = asyncio.run(
+                    prepared.tbs_document.perform_signature(
+                        document_digest=prepared.prepared_digest.document_digest,
+                        pdf_cms_signed_attrs=signed_attrs,
+                    )
+                )
+
+            # B-LTA con TSA profesional: el sello de documento se pide a la
+            # TSA gratuita para no consumir un segundo crédito
+            instructions = prepared.post_signing.post_sign_instructions
+            if (
+                self.timestamper is not None
+                and instructions is not None
+                and instructions.timestamper is self.timestamper
+            ):
+                prepared.post_signing.post_sign_instructions = dataclasses.replace(
+                    instructions, timestamper=self._archive_timestamper()
+                )
+
+    def finish(self, prepared: PreparedSignature) -> BytesIO:
+        """
+        Termina el procesamiento posterior a la firma sin guardar (co-firma:
+        el siguiente firmante continúa sobre el resultado en memoria).
+
+        Args:
+            prepared: Documento ya sellado con seal()
+
+        Returns:
+            Documento firmado en memoria
+
+        Raises:
+            SigningError: Si hay un error al terminar la firma
+        """
+        with _signing_errors():
+            if prepared.post_signing is None:
+                raise SigningError("El documento no ha sido sellado")
+            # B-LT/B-LTA: agrega la DSS (y el sello de documento)
+            validation_context = prepared.signature_meta.validation_context
+            with self._exclusive(validation_context):
+                asyncio.run(
+                    prepared.post_signing.post_signature_processing(prepared.output)
+                )
+        return prepared.output
+
+    def write(self, prepared: PreparedSignature) -> Path:
+        """
+        Fase 3 (disco): termina el procesamiento posterior a la firma y
+        guarda el PDF firmado.
+
+        Args:
+            prepared: Documento ya sellado con seal()
+
+        Returns:
+            Ruta al PDF firmado
+
+        Raises:
+            SigningError: Si hay un error al guardar
+        """
+        with _signing_errors(), _phase("write", prepared.pdf_path):
+            output = self.finish(prepared)
+
+            # Guardar PDF firmado (el hash se calcula en memoria, sin releerlo)
+            buffer = output.getbuffer()
+            prepared.output_size = len(buffer)
+            prepared.output_sha256 = hashlib.sha256(buffer).hexdigest()
+            with open(prepared.output_path, "wb") as f:
+                f.write(buffer)
+            buffer.release()
+
+        logger.info(f"PDF signed successfully: {prepared.output_path.name}")
+        return prepared.output_path
+
+    def _get_cms_signer(self) -> signers.SimpleSigner:
+        """Signer CMS con el certificado y la clave convertidos a asn1crypto"""
+        if self._cms_signer is None:
             # Convertir certificado de cryptography a asn1crypto
             cert_bytes = self.cert.public_bytes(encoding=serialization.Encoding.DER)
             asn1_cert = asn1_x509.Certificate.load(cert_bytes)
@@ -104,62 +506,36 @@ class PDFSigner:
             )
             asn1_key = asn1_keys.PrivateKeyInfo.load(key_bytes)
 
-            # Crear signer con objetos asn1crypto
-            signer = signers.SimpleSigner(
+            self._cms_signer = signers.SimpleSigner(
                 signing_cert=asn1_cert, signing_key=asn1_key, cert_registry=None
             )
-
-            # Configurar metadata de la firma
-            signature_meta = signers.PdfSignatureMetadata(
-                field_name="Signature1",
-                name=self._get_signer_name(),
-                location="México",
-            )
-
-            # Agregar campo de firma invisible
-            fields.append_signature_field(
-                writer,
-                sig_field_spec=fields.SigFieldSpec(
-                    sig_field_name=signature_meta.field_name,
-                    box=None,  # Sin sello visual
-                ),
-            )
-
-            # Use provided timestamper (API-based) or fall back to TSA client (free)
-            timestamper = self.timestamper
-            if timestamper is None and self.tsa_client:
-                try:
-                    timestamper = self.tsa_client.get_timestamper()
-                    logger.info("Using free TSA for timestamp")
-                except Exception as e:
-                    logger.warning(
-                        f"Could not get timestamper, continuing without it: {e}"
-                    )
-            elif timestamper is not None:
-                logger.info("Using provided timestamper (professional TSA)")
-
-            # Firmar el PDF
-            out = signers.sign_pdf(
-                writer,
-                signature_meta=signature_meta,
-                signer=signer,
-                timestamper=timestamper,
-                in_place=True,
-            )
-
-            # Guardar PDF firmado
-            with open(output_path, "wb") as f:
-                f.write(out.getbuffer())
-
-            logger.info(f"PDF signed successfully: {output_path.name}")
-            return output_path
-
-        except (InsufficientCreditsError, AuthenticationError, NetworkError, APIError):
-            # Let API-specific exceptions propagate so the worker can handle them
-            raise
-        except Exception as e:
-            logger.error(f"Error signing PDF: {e}")
-            raise SigningError(f"No se pudo firmar el PDF: {e}")
+        return self._cms_signer
+
+    def _get_timestamper(self) -> Optional[TimeStamper]:
+        """TimeStamper de la API (profesional) o de la TSA gratuita"""
+        if self.timestamper is not None:
+            logger.info("Using provided timestamper (professional TSA)")
+            return self.timestamper
+        if self.tsa_client:
+            try:
+                timestamper = self.tsa_client.get_timestamper()
+                logger.info("Using free TSA for timestamp")
+                return timestamper
+            except Exception as e:
+                logger.warning(f"Could not get timestamper, continuing without it: {e}")
+        return None
+
+    def _archive_timestamper(self) -> TimeStamper:
+        """TSA gratuita para el sello de documento de B-LTA"""
+        if self.tsa_client is not None:
+            return self.tsa_client.get_timestamper()
+        return TimedHTTPTimeStamper(TSA_URL, timeout=TSA_TIMEOUT)
+
+    def _exclusive(self, validation_context):
+        """Lock del contexto de validación compartido (si lo hay)"""
+        if validation_context is None or self.validation_cache is None:
+            return nullcontext()
+        return self.validation_cache.exclusive(validation_context)
 
     def _get_signer_name(self) -> str:
         """Extrae el nombre del firmante del certificado"""
@@ -176,7 +552,10 @@ class PDFSigner:
     @staticmethod
     def verify_signature(pdf_path: Path) -> bool:
         """
-        Verifica las firmas de un PDF.
+        Verifica las firmas de un PDF y, si las tiene, las pruebas de
+        inclusión del sello de tiempo agregado (ver merkle.py). Una firma
+        íntegra no cuenta como válida si el documento tiene cambios
+        posteriores que su política DocMDP no permite.
 
         Args:
             pdf_path: Ruta al PDF firmado
@@ -196,33 +575,55 @@ class PDFSigner:
             with open(pdf_path, "rb") as f:
                 reader = PdfFileReader(f)
                 sig_fields = fields.enumerate_sig_fields(reader)
+                embedded = {sig.field_name: sig for sig in reader.embedded_signatures}
 
                 # Verificar cada firma
                 all_valid = True
-                for sig_field in sig_fields:
-                    logger.info(f"Verifying signature field: {sig_field.field_name}")
+                for field_name, _, _ in sig_fields:
+                    logger.info(f"Verifying signature field: {field_name}")
 
-                    embedded_sig = sig_field.sig_object
+                    embedded_sig = embedded.get(field_name)
                     if embedded_sig is None:
-                        logger.warning(
-                            f"Signature field {sig_field.field_name} has no signature"
-                        )
+                        logger.warning(f"Signature field {field_name} has no signature")
                         all_valid = False
                         continue
 
-                    # Validar firma
+                    # Validar firma (o el sello de documento de una firma B-LTA)
                     try:
-                        status = validate_pdf_signature(embedded_sig, reader)
-                        if status.valid:
-                            logger.info(f"Signature {sig_field.field_name} is valid")
+                        if embedded_sig.sig_object_type == "/DocTimeStamp":
+                            status = validate_pdf_timestamp(embedded_sig)
                         else:
+                            status = validate_pdf_signature(embedded_sig)
+                        if not status.valid:
+                            logger.warning(f"Signature {field_name} is invalid")
+                            all_valid = False
+                        elif status.docmdp_ok is False:
+                            # Cambios posteriores a la firma que no están
+                            # permitidos (los lectores lo muestran alterado)
                             logger.warning(
-                                f"Signature {sig_field.field_name} is invalid"
+                                f"Signature {field_name} is valid but the "
+                                f"document was modified after signing "
+                                f"({status.modification_level})"
                             )
                             all_valid = False
+                        else:
+                            logger.info(f"Signature {field_name} is valid")
                     except Exception as e:
-                        logger.error(
-                            f"Error validating signature {sig_field.field_name}: {e}"
+                        logger.error(f"Error validating signature {field_name}: {e}")
+                        all_valid = False
+
+                # Sello agregado (merkle.py): pruebas de inclusión, si las hay
+                proofs = merkle.read_proofs(pdf_path)
+                for merkle_status in merkle.verify_proofs(proofs, embedded):
+                    if merkle_status.valid:
+                        logger.info(
+                            f"Merkle timestamp of {merkle_status.field_name} "
+                            f"is valid ({merkle_status.timestamp})"
+                        )
+                    else:
+                        logger.warning(
+                            f"Merkle timestamp of {merkle_status.field_name} "
+                            f"is invalid: {merkle_status.reason}"
                         )
                         all_valid = False
 
@@ -231,3 +632,75 @@ class PDFSigner:
         except Exception as e:
             logger.error(f"Error verifying PDF signatures: {e}")
             raise PDFError(f"No se pudo verificar las firmas del PDF: {e}")
+
+
+def add_cosignatures(
+    signer: PDFSigner,
+    prepared: PreparedSignature,
+    cosigners: Sequence[PDFSigner],
+) -> Tuple[PDFSigner, PreparedSignature]:
+    """
+    Agrega las co-firmas en memoria sobre un documento ya sellado.
+
+    Cada co-firmante llena uno de los campos vacíos que creó el primer
+    firmante (prepare con field_count) sobre el resultado del anterior, sin
+    volver a leer ni escribir el archivo.
+
+    Args:
+        signer: Firmador de `prepared`
+        prepared: Documento sellado por el primer firmante
+        cosigners: Firmadores siguientes, en orden de firma
+
+    Returns:
+        El último firmador y su documento, listos para write()
+    """
+    if len(cosigners) > len(prepared.field_names) - 1:
+        raise SigningError("No se reservaron campos para todos los co-firmantes")
+    for cosigner, field_name in zip(cosigners, prepared.field_names[1:]):
+        source = signer.finish(prepared)
+        source.seek(0)
+        prepared = cosigner.prepare(
+            prepared.pdf_path,
+            prepared.output_path,
+            source=source,
+            field_name=field_name,
+        )
+        cosigner.seal(prepared)
+        signer = cosigner
+    return signer, prepared
+
+
+def cosign_pdf(
+    pdf_path: Path,
+    pdf_signers: Sequence[PDFSigner],
+    output_path: Optional[Path] = None,
+) -> Path:
+    """
+    Firma un PDF con varios certificados (co-firma).
+
+    El original se lee una sola vez y cada firma se agrega en memoria sobre
+    la anterior: una actualización incremental por firmante (el mínimo,
+    porque cada firma cubre a las anteriores) y una sola escritura a disco.
+    El primer firmante crea todos los campos, así que los demás solo llenan
+    un campo existente.
+
+    Args:
+        pdf_path: Ruta al PDF a firmar
+        pdf_signers: Firmadores, en orden de firma
+        output_path: Ruta del PDF firmado (opcional, por defecto agrega sufijo)
+
+    Returns:
+        Ruta al PDF firmado
+
+    Raises:
+        PDFError: Si el PDF no existe
+        SigningError: Si hay un error al firmar
+    """
+    if not pdf_signers:
+        raise SigningError("Se necesita al menos un firmante")
+
+    first = pdf_signers[0]
+    prepared = first.prepare(pdf_path, output_path, field_count=len(pdf_signers))
+    first.seal(prepared)
+    signer, prepared = add_cosignatures(first, prepared, pdf_signers[1:])
+    return signer.write(prepared)
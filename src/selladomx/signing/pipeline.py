@@ -0,0 +1,174 @@
+"""Pipeline por etapas para firmar lotes de documentos"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+from ..config import PIPELINE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Marca el fin de la entrada de una etapa
+_END = object()
+
+
+@dataclass(slots=True)
+class Stage:
+    """Etapa del pipeline.
+
+    `fn` recibe el elemento de la etapa anterior y devuelve el de la
+    siguiente; si devuelve None el elemento sale del pipeline (por ejemplo,
+    un documento que ya estaba firmado).
+
+    Con `batch` > 1, `fn` recibe una lista con los elementos en cola (hasta
+    `batch`, esperando a lo más `batch_wait` segundos a que se junten) y
+    devuelve la lista de elementos para la siguiente etapa.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    batch: int = 1
+    batch_wait: float = 0.0
+
+
+class SigningPipeline:
+    """Ejecuta etapas en hilos propios unidas por colas acotadas.
+
+    Con las etapas preparar (CPU/disco) → sellar (red) → escribir (disco),
+    el documento N+1 se prepara mientras el N espera a la TSA y el N-1 se
+    escribe. Las colas acotadas limitan cuántos documentos preparados hay en
+    memoria: si una etapa se atrasa, las anteriores esperan.
+
+    Un error en una etapa se entrega a `on_error(elemento, excepción)` y el
+    elemento sale del pipeline; las etapas siguientes no lo ven. cancel()
+    deja de alimentar el pipeline y descarta lo que esté en cola (lo que ya
+    esté en ejecución termina).
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        on_error: Callable[[Any, Exception], None],
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ):
+        """
+        Inicializa el pipeline.
+
+        Args:
+            stages: Etapas en orden
+            on_error: Se llama (desde el hilo de la etapa) cuando una etapa falla
+            queue_size: Elementos máximos en espera antes de cada etapa
+        """
+        if not stages:
+            raise ValueError("El pipeline necesita al menos una etapa")
+        self.stages = stages
+        self.on_error = on_error
+        self._queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self._cancelled = threading.Event()
+        self._alive = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Deja de procesar elementos nuevos."""
+        self._cancelled.set()
+
+    def run(self, items: Iterable[Any]):
+        """
+        Procesa los elementos y espera a que todas las etapas terminen.
+
+        Args:
+            items: Elementos de entrada de la primera etapa
+        """
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._stage_loop,
+                    args=(index,),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        # El hilo que llama alimenta la primera cola (bloquea si está llena)
+        for item in items:
+            if self.cancelled:
+                break
+            self._queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put(_END)
+
+        for thread in threads:
+            thread.join()
+
+    def _stage_loop(self, index: int):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox: Optional[queue.Queue] = (
+            self._queues[index + 1] if index + 1 < len(self.stages) else None
+        )
+
+        done = False
+        while not done:
+            item = inbox.get()
+            if item is _END:
+                break
+            if self.cancelled:
+                continue  # Drain so upstream stages never block
+
+            if stage.batch > 1:
+                items, done = self._take_batch(stage, inbox, item)
+                try:
+                    results = stage.fn(items)
+                except Exception as e:
+                    logger.debug(f"Pipeline stage {stage.name} failed: {e}")
+                    for failed in items:
+                        self.on_error(failed, e)
+                    continue
+            else:
+                try:
+                    results = [stage.fn(item)]
+                except Exception as e:
+                    logger.debug(f"Pipeline stage {stage.name} failed: {e}")
+                    self.on_error(item, e)
+                    continue
+
+            if outbox is not None:
+                for result in results:
+                    if result is not None:
+                        outbox.put(result)
+
+        # The last worker of a stage closes the next one
+        with self._lock:
+            self._alive[index] -= 1
+            last = self._alive[index] == 0
+        if last and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_END)
+
+    @staticmethod
+    def _take_batch(stage: Stage, inbox: queue.Queue, first: Any):
+        """Junta hasta stage.batch elementos de la cola.
+
+        Returns:
+            (elementos, True si llegó el fin de la entrada)
+        """
+        items = [first]
+        deadline = time.monotonic() + stage.batch_wait
+        while len(items) < stage.batch:
+            try:
+                item = inbox.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _END:
+                return items, True
+            items.append(item)
+        return items, False
@@ -0,0 +1,253 @@
+"""Análisis previo (pre-flight) de PDFs antes de firmar"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import QThread, Signal
+from pyhanko.pdf_utils.misc import PdfReadError
+from pyhanko.pdf_utils.reader import PdfFileReader
+
+from ..config import (
+    ESTIMATE_SECONDS_PER_DOC_FREE,
+    ESTIMATE_SECONDS_PER_DOC_PROFESSIONAL,
+    ESTIMATE_SECONDS_PER_MB,
+    MAX_SIGNABLE_FILE_SIZE,
+    PREFLIGHT_MAX_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PreflightStatus(str, Enum):
+    """Clasificación de un PDF antes de firmarlo"""
+
+    SIGNABLE = "signable"
+    NEEDS_REPAIR = "needs_repair"
+    ENCRYPTED = "encrypted"
+    ALREADY_SIGNED = "already_signed"
+    TOO_LARGE = "too_large"
+    UNREADABLE = "unreadable"
+
+
+@dataclass(slots=True)
+class PreflightResult:
+    """Resultado del análisis de un PDF"""
+
+    path: Path
+    status: PreflightStatus
+    size_bytes: int = 0
+    page_count: int = 0
+    signature_count: int = 0
+    detail: str = ""
+
+    @property
+    def signable(self) -> bool:
+        return self.status is PreflightStatus.SIGNABLE
+
+
+@dataclass
+class PreflightReport:
+    """Resumen del análisis de un lote con estimaciones de tiempo y créditos"""
+
+    results: List[PreflightResult] = field(default_factory=list)
+    use_professional_tsa: bool = False
+
+    @property
+    def signable(self) -> List[PreflightResult]:
+        return [result for result in self.results if result.signable]
+
+    @property
+    def signable_paths(self) -> List[Path]:
+        return [result.path for result in self.signable]
+
+    @property
+    def skipped(self) -> List[PreflightResult]:
+        return [result for result in self.results if not result.signable]
+
+    def matches(self, pdf_paths: List[Path], use_professional_tsa: bool) -> bool:
+        """Indica si el reporte analizó exactamente esta cola con este modo de TSA"""
+        analyzed = [result.path for result in self.results]
+        return use_professional_tsa == self.use_professional_tsa and analyzed == [
+            Path(path) for path in pdf_paths
+        ]
+
+    def count(self, status: PreflightStatus) -> int:
+        return sum(1 for result in self.results if result.status is status)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(result.size_bytes for result in self.signable)
+
+    @property
+    def estimated_credits(self) -> int:
+        """Créditos que consumirá el lote (1 por documento con TSA profesional)"""
+        return len(self.signable) if self.use_professional_tsa else 0
+
+    @property
+    def estimated_seconds(self) -> float:
+        """Tiempo estimado de firma del lote en segundos"""
+        per_doc = (
+            ESTIMATE_SECONDS_PER_DOC_PROFESSIONAL
+            if self.use_professional_tsa
+            else ESTIMATE_SECONDS_PER_DOC_FREE
+        )
+        megabytes = self.total_bytes / (1024 * 1024)
+        return len(self.signable) * per_doc + megabytes * ESTIMATE_SECONDS_PER_MB
+
+    def to_dict(self) -> dict:
+        """Resumen serializable para QML"""
+        return {
+            "total": len(self.results),
+            "signable": len(self.signable),
+            "skipped": len(self.skipped),
+            "counts": {
+                status.value: self.count(status)
+                for status in PreflightStatus
+                if self.count(status)
+            },
+            "totalBytes": self.total_bytes,
+            "estimatedSeconds": round(self.estimated_seconds),
+            "estimatedCredits": self.estimated_credits,
+        }
+
+
+def analyze_pdf(
+    pdf_path: Path,
+    signer_cert_der: Optional[bytes] = None,
+    max_size: int = MAX_SIGNABLE_FILE_SIZE,
+) -> PreflightResult:
+    """
+    Analiza un PDF en modo de solo lectura sin cargarlo completo en memoria.
+
+    Args:
+        pdf_path: Ruta al PDF
+        signer_cert_der: Certificado del firmante (DER) para detectar firmas propias
+        max_size: Tamaño máximo firmable en bytes
+
+    Returns:
+        Resultado con la clasificación del archivo
+    """
+    pdf_path = Path(pdf_path)
+
+    try:
+        size_bytes = pdf_path.stat().st_size
+    except OSError as e:
+        return PreflightResult(pdf_path, PreflightStatus.UNREADABLE, detail=str(e))
+
+    if size_bytes > max_size:
+        return PreflightResult(
+            pdf_path,
+            PreflightStatus.TOO_LARGE,
+            size_bytes=size_bytes,
+            detail=f"{size_bytes // (1024 * 1024)} MB",
+        )
+
+    try:
+        with open(pdf_path, "rb") as f:
+            status = PreflightStatus.SIGNABLE
+            detail = ""
+            try:
+                reader = PdfFileReader(f, strict=True)
+            except (PdfReadError, ValueError) as e:
+                # El firmador escribe en modo estricto; si solo abre en modo
+                # tolerante el archivo necesita reparación
+                f.seek(0)
+                reader = PdfFileReader(f, strict=False)
+                status = PreflightStatus.NEEDS_REPAIR
+                detail = str(e)
+
+            if reader.encrypted:
+                return PreflightResult(
+                    pdf_path, PreflightStatus.ENCRYPTED, size_bytes=size_bytes
+                )
+
+            page_count = int(reader.root["/Pages"]["/Count"])
+            signatures = reader.embedded_regular_signatures
+
+            if status is PreflightStatus.SIGNABLE and signer_cert_der:
+                for signature in signatures:
+                    if signature.signer_cert.dump() == signer_cert_der:
+                        status = PreflightStatus.ALREADY_SIGNED
+                        detail = signature.field_name
+                        break
+
+            return PreflightResult(
+                pdf_path,
+                status,
+                size_bytes=size_bytes,
+                page_count=page_count,
+                signature_count=len(signatures),
+                detail=detail,
+            )
+    except Exception as e:
+        logger.warning(f"Pre-flight could not read {pdf_path.name}: {e}")
+        return PreflightResult(
+            pdf_path, PreflightStatus.UNREADABLE, size_bytes=size_bytes, detail=str(e)
+        )
+
+
+def run_preflight(
+    pdf_paths: List[Path],
+    signer_cert_der: Optional[bytes] = None,
+    use_professional_tsa: bool = False,
+    max_workers: int = PREFLIGHT_MAX_WORKERS,
+) -> PreflightReport:
+    """
+    Analiza un lote de PDFs en paralelo.
+
+    Args:
+        pdf_paths: PDFs a analizar
+        signer_cert_der: Certificado del firmante (DER)
+        use_professional_tsa: Si el lote usará TSA profesional (para estimar créditos)
+        max_workers: Archivos analizados en paralelo
+
+    Returns:
+        Reporte con un resultado por archivo, en el mismo orden
+    """
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="preflight"
+    ) as executor:
+        results = list(
+            executor.map(lambda path: analyze_pdf(path, signer_cert_der), pdf_paths)
+        )
+
+    report = PreflightReport(results, use_professional_tsa)
+    logger.info(
+        f"Pre-flight: {len(report.signable)}/{len(results)} signable, "
+        f"~{report.estimated_seconds:.0f}s, {report.estimated_credits} credit(s)"
+    )
+    return report
+
+
+class PreflightWorker(QThread):
+    """Worker thread that runs the pre-flight analysis off the GUI thread."""
+
+    report_ready = Signal(object)  # PreflightReport
+
+    def __init__(
+        self,
+        pdf_paths: List[Path],
+        signer_cert_der: Optional[bytes] = None,
+        use_professional_tsa: bool = False,
+    ):
+        """Initialize pre-flight worker.
+
+        Args:
+            pdf_paths: PDFs to analyze
+            signer_cert_der: Signer certificate (DER) to detect own signatures
+            use_professional_tsa: Whether the batch will use professional TSA
+        """
+        super().__init__()
+        self.pdf_paths = pdf_paths
+        self.signer_cert_der = signer_cert_der
+        self.use_professional_tsa = use_professional_tsa
+
+    def run(self):
+        """Execute the analysis."""
+        report = run_preflight(
+            self.pdf_paths, self.signer_cert_der, self.use_professional_tsa
+        )
+        self.report_ready.emit(report)
@@ -0,0 +1,234 @@
+"""Reporte del lote en formato legible por máquina (CSV, JSON Lines o Parquet)
+
+El reporte se escribe mientras los archivos terminan, una fila por
+SigningResult, y nunca guarda el lote completo en memoria: CSV y JSONL
+escriben a disco cada REPORT_FLUSH_ROWS filas y Parquet cada
+REPORT_PARQUET_ROW_GROUP filas (un row group). Un lote de un millón de
+documentos se reporta con memoria constante.
+
+Parquet requiere pyarrow, que no es dependencia de la aplicación; se importa
+solo al abrir un reporte Parquet.
+"""
+import csv
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ..config import REPORT_FILE_PREFIX, REPORT_FLUSH_ROWS, REPORT_PARQUET_ROW_GROUP
+from .result import SigningResult
+
+logger = logging.getLogger(__name__)
+
+
+class ReportFormat(str, Enum):
+    """Formato del reporte (el valor es también la extensión del archivo)"""
+
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+
+# Columnas del reporte, en orden
+COLUMNS = (
+    "source",
+    "output",
+    "success",
+    "error",
+    "source_sha256",
+    "output_sha256",
+    "source_size",
+    "output_size",
+    "seconds",
+    "phases",
+    "tsa_provider",
+    "record_id",
+    "verification_url",
+    "credits_remaining",
+    "reused",
+    "message",
+)
+
+
+def report_row(result: SigningResult) -> Dict[str, Any]:
+    """
+    Fila del reporte para un resultado.
+
+    Args:
+        result: Resultado de un documento
+
+    Returns:
+        Valores por columna; "seconds" es la suma de las fases medidas
+    """
+    row = result.to_dict()
+    row["seconds"] = round(sum(result.phases.values()), 6)
+    return row
+
+
+class BatchReport(ABC):
+    """Reporte abierto; write() es seguro desde varios hilos"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def write(self, result: SigningResult):
+        """Agrega la fila de un documento"""
+        row = report_row(result)
+        with self._lock:
+            self._write_row(row)
+            self.rows += 1
+
+    def close(self):
+        """Escribe lo pendiente y cierra el archivo"""
+        with self._lock:
+            self._close()
+        logger.info(f"Batch report written: {self.path} ({self.rows} rows)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def _write_row(self, row: Dict[str, Any]):
+        """Escribe una fila (con el lock tomado)"""
+
+    @abstractmethod
+    def _close(self):
+        """Escribe lo pendiente y cierra el archivo (con el lock tomado)"""
+
+
+class CsvReport(BatchReport):
+    """Reporte CSV (las fases van como objeto JSON en su columna)"""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        self._writer.writeheader()
+
+    def _write_row(self, row: Dict[str, Any]):
+        row["phases"] = json.dumps(row["phases"])
+        self._writer.writerow(row)
+        if self.rows % REPORT_FLUSH_ROWS == 0:
+            self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonLinesReport(BatchReport):
+    """Reporte JSON Lines (un objeto por documento)"""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write_row(self, row: Dict[str, Any]):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        if self.rows % REPORT_FLUSH_ROWS == 0:
+            self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetReport(BatchReport):
+    """Reporte Parquet, un row group cada REPORT_PARQUET_ROW_GROUP filas"""
+
+    def __init__(self, path: Path, row_group: int = REPORT_PARQUET_ROW_GROUP):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError(
+                "El reporte Parquet requiere pyarrow (pip install pyarrow)"
+            ) from e
+        super().__init__(path)
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("source", pa.string()),
+                ("output", pa.string()),
+                ("success", pa.bool_()),
+                ("error", pa.string()),
+                ("source_sha256", pa.string()),
+                ("output_sha256", pa.string()),
+                ("source_size", pa.int64()),
+                ("output_size", pa.int64()),
+                ("seconds", pa.float64()),
+                ("phases", pa.string()),  # Objeto JSON, como en CSV
+                ("tsa_provider", pa.string()),
+                ("record_id", pa.string()),
+                ("verification_url", pa.string()),
+                ("credits_remaining", pa.int64()),
+                ("reused", pa.bool_()),
+                ("message", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+        self._row_group = max(1, row_group)
+        self._pending: List[Dict[str, Any]] = []
+
+    def _write_row(self, row: Dict[str, Any]):
+        row["phases"] = json.dumps(row["phases"])
+        self._pending.append(row)
+        if len(self._pending) >= self._row_group:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            table = self._pa.Table.from_pylist(self._pending, schema=self._schema)
+            self._writer.write_table(table)
+            self._pending = []
+
+    def _close(self):
+        self._flush()
+        self._writer.close()
+
+
+_REPORTS = {
+    ReportFormat.CSV: CsvReport,
+    ReportFormat.JSONL: JsonLinesReport,
+    ReportFormat.PARQUET: ParquetReport,
+}
+
+
+def open_report(path: Path) -> BatchReport:
+    """
+    Abre (y trunca) un reporte; el formato sale de la extensión.
+
+    Args:
+        path: Archivo .csv, .jsonl o .parquet
+
+    Returns:
+        Reporte listo para write()
+
+    Raises:
+        ValueError: Si la extensión no es de un formato o falta pyarrow
+    """
+    path = Path(path)
+    return _REPORTS[ReportFormat(path.suffix.lstrip(".").lower())](path)
+
+
+def default_report_path(directory: Path, report_format: str) -> Path:
+    """
+    Ruta del reporte de un lote que empieza ahora.
+
+    Args:
+        directory: Carpeta de salida del lote
+        report_format: Un valor de ReportFormat
+
+    Returns:
+        directory/selladomx-reporte-AAAAMMDD-HHMMSS.<formato>
+    """
+    extension = ReportFormat(report_format).value
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return Path(directory) / f"{REPORT_FILE_PREFIX}-{stamp}.{extension}"
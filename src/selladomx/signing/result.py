@@ -0,0 +1,111 @@
+"""Resultado estructurado de la firma de un documento
+
+SigningWorker emite un SigningResult por documento en lugar de mensajes de
+texto: rutas, hashes, tamaños, tiempos por fase, TSA y datos del registro
+profesional, con un código de error en vez de un mensaje que haya que
+interpretar. El mensaje en español se conserva solo para mostrarlo.
+"""
+import json
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ErrorCode(str, Enum):
+    """Motivo por el que un documento no se firmó"""
+
+    INSUFFICIENT_CREDITS = "insufficient_credits"
+    AUTHENTICATION = "authentication"
+    NETWORK = "network"
+    API = "api"
+    PDF = "pdf"  # Archivo ilegible o inexistente
+    SIGNING = "signing"  # Error de pyhanko, certificado o TSA gratuita
+    UNKNOWN = "unknown"
+
+
+@dataclass(slots=True)
+class SigningResult:
+    """Resultado de un documento (error None = firmado)"""
+
+    source: Path
+    output: Optional[Path] = None
+    error: Optional[ErrorCode] = None
+    message: str = ""  # Texto para la bitácora de la interfaz
+    source_sha256: str = ""
+    output_sha256: str = ""
+    source_size: int = 0
+    output_size: int = 0
+    phases: Dict[str, float] = field(default_factory=dict)  # Segundos por fase
+    tsa_provider: str = ""
+    record_id: str = ""  # Registro de la TSA profesional
+    verification_url: str = ""
+    credits_remaining: Optional[int] = None
+    reused: bool = False  # Se reutilizó una firma anterior (caché)
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        """Diccionario serializable a JSON (sin copiar más que lo necesario)"""
+        return {
+            "source": str(self.source),
+            "output": str(self.output) if self.output is not None else None,
+            "success": self.error is None,
+            "error": self.error.value if self.error is not None else None,
+            "message": self.message,
+            "source_sha256": self.source_sha256,
+            "output_sha256": self.output_sha256,
+            "source_size": self.source_size,
+            "output_size": self.output_size,
+            "phases": self.phases,
+            "tsa_provider": self.tsa_provider,
+            "record_id": self.record_id,
+            "verification_url": self.verification_url,
+            "credits_remaining": self.credits_remaining,
+            "reused": self.reused,
+        }
+
+    def to_json(self) -> str:
+        """Una línea JSON (para archivos JSONL)"""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+
+class PhaseRecorder:
+    """
+    Listener de métricas que acumula los tiempos por fase de cada documento.
+
+    Las fases ya se miden con metrics.timer(..., document=ruta, phase=...);
+    el recorder las agrupa por documento (por ruta completa: dos archivos de
+    distintas carpetas pueden llamarse igual) para copiarlas al resultado.
+    """
+
+    def __init__(self, metric: str):
+        """
+        Args:
+            metric: Histograma con la etiqueta "phase" (signing_phase_seconds)
+        """
+        self.metric = metric
+        self._phases: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(
+        self,
+        name: str,
+        labels: Dict[str, str],
+        value: float,
+        document: Optional[str],
+    ):
+        if name != self.metric or document is None:
+            return
+        phase = labels.get("phase", "")
+        with self._lock:
+            phases = self._phases.setdefault(document, {})
+            phases[phase] = phases.get(phase, 0.0) + value
+
+    def pop(self, document: str) -> Dict[str, float]:
+        """Tiempos de un documento (se olvidan al entregarlos)"""
+        with self._lock:
+            return self._phases.pop(document, {})
@@ -0,0 +1,307 @@
+"""Resellado masivo de archivos ya firmados (sello de documento)
+
+Un sello de tiempo de documento (/DocTimeStamp, PAdES B-LTA) se agrega sin
+volver a firmar, como revisión incremental al final del archivo. Antes de
+cada sello nuevo se valida el sello de documento anterior y su cadena y
+respuestas OCSP/CRL se guardan en la DSS: así el sello nuevo cubre los
+datos de validación del anterior y la cadena de sellos sigue verificable
+cuando sus certificados expiran. Para archivos de cientos de miles de
+documentos:
+
+- El archivo se abre en "r+b" y pyhanko solo lee el trailer, la tabla xref
+  y las firmas; las revisiones nuevas se escriben al final sin copiar el
+  resto. Si el sello falla, el archivo se trunca a su tamaño original.
+- Los documentos se sellan en paralelo con un solo timestamper y una sesión
+  HTTP compartida: las conexiones a la TSA se reutilizan y la estimación
+  del tamaño del sello se hace una sola vez. Cada hilo tiene su propia
+  ValidationDataCache, así que la cadena y el OCSP/CRL de cada emisor se
+  descargan una vez por hilo y los hilos no se esperan entre sí.
+- Cada resultado se agrega a un diario JSONL; al reanudar se omiten los
+  documentos que ya terminaron.
+
+Uso:
+    python -m selladomx.signing.retimestamp /ruta/al/archivo
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.sign import signers
+from pyhanko.sign.timestamps import TimeStamper
+
+from ..config import RETIMESTAMP_JOURNAL, RETIMESTAMP_WORKERS
+from ..errors import SigningError
+from ..utils import metrics
+from .pipeline import SigningPipeline, Stage
+from .tsa import TSAClient, shared_session
+from .validation_data import ValidationDataCache
+
+logger = logging.getLogger(__name__)
+
+# Histograma de tiempos por documento resellado
+RETIMESTAMP_METRIC = "retimestamp_seconds"
+
+# Estados del diario
+STAMPED = "ok"
+UNSIGNED = "sin_firmas"
+FAILED = "error"
+
+
+def retimestamp_pdf(
+    pdf_path: Path,
+    timestamper: TimeStamper,
+    output_path: Optional[Path] = None,
+    validation_cache: Optional[ValidationDataCache] = None,
+) -> bool:
+    """
+    Actualiza la DSS y agrega un sello de tiempo de documento a un PDF firmado.
+
+    Args:
+        pdf_path: PDF con al menos una firma
+        timestamper: TimeStamper de la TSA (compartido entre hilos)
+        output_path: Copia resellada; None = se agrega al mismo archivo
+        validation_cache: Datos de validación a reutilizar (None = nueva)
+
+    Returns:
+        True si se agregó el sello; False si el documento no tiene firmas
+
+    Raises:
+        SigningError: Si no se pudo sellar (el archivo queda como estaba y la
+            copia, si se pidió, se borra)
+    """
+    pdf_path = Path(pdf_path)
+    target = pdf_path
+    if output_path is not None and Path(output_path) != pdf_path:
+        target = Path(output_path)
+        shutil.copyfile(pdf_path, target)
+    if validation_cache is None:
+        validation_cache = ValidationDataCache()
+
+    try:
+        with open(target, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                reader = PdfFileReader(f)
+                signatures = reader.embedded_signatures
+                if not signatures:
+                    return False
+                # El contexto del emisor de la última firma o sello del documento
+                context = validation_cache.context_for(signatures[-1].signer_cert)
+                stamper = signers.PdfTimeStamper(timestamper)
+                with metrics.timer(RETIMESTAMP_METRIC):
+                    with validation_cache.exclusive(context):
+                        asyncio.run(
+                            stamper.async_update_archival_timestamp_chain(
+                                reader, context, in_place=True
+                            )
+                        )
+                return True
+            except Exception as e:
+                # Quita lo que se haya agregado antes de fallar
+                f.truncate(size)
+                raise SigningError(f"No se pudo resellar el PDF: {e}") from e
+    except SigningError:
+        if target != pdf_path:
+            target.unlink(missing_ok=True)
+        raise
+
+
+class RetimestampJournal:
+    """Diario JSONL de documentos resellados, para reanudar el proceso"""
+
+    def __init__(self, path: Path):
+        """
+        Abre (o crea) el diario.
+
+        Args:
+            path: Archivo JSONL; cada línea es {"path", "status", "error"}
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def completed(self) -> Set[str]:
+        """
+        Documentos que no hay que volver a procesar.
+
+        Returns:
+            Rutas selladas o sin firmas (los errores se reintentan)
+        """
+        done: Set[str] = set()
+        if not self.path.exists():
+            return done
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Última línea incompleta tras una interrupción
+                if entry.get("status") == FAILED:
+                    done.discard(entry["path"])
+                else:
+                    done.add(entry["path"])
+        return done
+
+    def record(self, pdf_path: Path, status: str, error: Optional[str] = None):
+        """Agrega un resultado y lo escribe a disco de inmediato"""
+        line = json.dumps(
+            {"path": str(pdf_path), "status": status, "error": error},
+            ensure_ascii=False,
+        )
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+@dataclass(slots=True)
+class RetimestampSummary:
+    """Conteo de un resellado masivo"""
+
+    stamped: int = 0
+    unsigned: int = 0
+    failed: int = 0
+    resumed: int = 0  # Omitidos porque el diario ya los tenía
+
+
+def iter_pdfs(paths: Iterable[Path]) -> Iterator[Path]:
+    """
+    Recorre archivos y carpetas (recursivamente) sin listarlos completos.
+
+    Args:
+        paths: Archivos PDF o carpetas
+
+    Yields:
+        Rutas de PDF en orden estable (el diario depende de él)
+    """
+    for path in paths:
+        path = Path(path)
+        if path.is_file():
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    yield Path(root) / name
+
+
+def retimestamp_archive(
+    paths: Iterable[Path],
+    timestamper: TimeStamper,
+    journal: RetimestampJournal,
+    workers: int = RETIMESTAMP_WORKERS,
+    on_progress: Optional[Callable[[RetimestampSummary], None]] = None,
+    new_validation_cache: Callable[[], ValidationDataCache] = ValidationDataCache,
+) -> RetimestampSummary:
+    """
+    Resella en el mismo lugar todos los PDF firmados de `paths`.
+
+    Args:
+        paths: Archivos o carpetas
+        timestamper: TimeStamper compartido por los hilos
+        journal: Diario de progreso (se omiten los documentos ya terminados)
+        workers: Documentos en paralelo
+        on_progress: Se llama (desde los hilos) después de cada documento
+        new_validation_cache: Crea la caché de datos de validación de cada hilo
+
+    Returns:
+        Conteo de documentos sellados, sin firmas, fallidos y omitidos
+    """
+    summary = RetimestampSummary()
+    done = journal.completed()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def pending() -> Iterator[Path]:
+        for pdf_path in iter_pdfs(paths):
+            if str(pdf_path) in done:
+                summary.resumed += 1
+            else:
+                yield pdf_path
+
+    def finish(pdf_path: Path, status: str, error: Optional[str] = None):
+        journal.record(pdf_path, status, error)
+        with lock:
+            if status == STAMPED:
+                summary.stamped += 1
+            elif status == UNSIGNED:
+                summary.unsigned += 1
+            else:
+                summary.failed += 1
+        if on_progress is not None:
+            on_progress(summary)
+
+    def stamp(pdf_path: Path):
+        if not hasattr(local, "validation_cache"):
+            local.validation_cache = new_validation_cache()
+        stamped = retimestamp_pdf(
+            pdf_path, timestamper, validation_cache=local.validation_cache
+        )
+        finish(pdf_path, STAMPED if stamped else UNSIGNED)
+
+    def on_error(pdf_path: Path, error: Exception):
+        logger.warning(f"Could not re-timestamp {pdf_path.name}: {error}")
+        finish(pdf_path, FAILED, str(error))
+
+    pipeline = SigningPipeline(
+        [Stage("retimestamp", stamp, workers=workers)],
+        on_error=on_error,
+        queue_size=workers * 2,
+    )
+    try:
+        pipeline.run(pending())
+    finally:
+        journal.close()
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="PDF o carpetas")
+    parser.add_argument(
+        "--journal", type=Path, default=Path(RETIMESTAMP_JOURNAL), help="Diario"
+    )
+    parser.add_argument("--workers", type=int, default=RETIMESTAMP_WORKERS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    timestamper = TSAClient().get_timestamper(session=shared_session(args.workers))
+
+    def progress(summary: RetimestampSummary):
+        total = summary.stamped + summary.unsigned + summary.failed
+        if total % 1000 == 0:
+            logger.info(f"{total} documents processed")
+
+    summary = retimestamp_archive(
+        args.paths,
+        timestamper,
+        RetimestampJournal(args.journal),
+        workers=args.workers,
+        on_progress=progress,
+    )
+    print(
+        f"Sellados: {summary.stamped}  Sin firmas: {summary.unsigned}  "
+        f"Fallidos: {summary.failed}  Ya procesados: {summary.resumed}"
+    )
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Caché direccionada por contenido de documentos ya firmados"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..config import SIGNING_CACHE_FILE, SIGNING_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_file(path: Path) -> str:
+    """
+    Calcula el SHA-256 de un archivo en una sola pasada sin cargarlo en memoria.
+
+    Args:
+        path: Ruta al archivo
+
+    Returns:
+        Hash SHA-256 en hexadecimal
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def default_cache_path() -> Path:
+    """Ruta del índice de firmas en el directorio de datos de la aplicación"""
+    from PySide6.QtCore import QStandardPaths
+
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    if not data_dir:
+        data_dir = str(Path.home() / ".selladomx")
+    return Path(data_dir) / SIGNING_CACHE_FILE
+
+
+@dataclass(slots=True)
+class CachedSignature:
+    """Documento firmado previamente y los datos para reutilizarlo"""
+
+    output_path: str
+    output_size: int
+    output_mtime_ns: int
+    verification_url: str = ""
+    record_id: str = ""
+    professional: bool = False
+    options: str = ""  # Opciones de firma con que se generó (nivel, sello...)
+
+
+class SigningCache:
+    """Índice de documentos firmados por SHA-256 del original + serie del certificado.
+
+    Permite reutilizar un `_firmado.pdf` existente (y su URL de verificación)
+    cuando se vuelve a encolar el mismo documento con el mismo certificado, sin
+    volver a firmar ni consumir un crédito de TSA. Una entrada solo es válida
+    mientras el archivo firmado exista y no haya cambiado (tamaño y mtime), y
+    si se firmó con la misma TSA y las mismas opciones que se piden ahora.
+
+    Es seguro usarla desde varios hilos. El índice se carga de disco en el
+    primer uso y se guarda con save().
+    """
+
+    def __init__(self, cache_file: Path, max_entries: int = SIGNING_CACHE_MAX_ENTRIES):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_file: Archivo JSON donde se persiste el índice
+            max_entries: Entradas máximas (se descartan las más antiguas)
+        """
+        self.cache_file = Path(cache_file)
+        self.max_entries = max_entries
+        self._entries: Optional[dict[str, CachedSignature]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(source_sha256: str, cert_serial: str) -> str:
+        return f"{source_sha256}:{cert_serial}"
+
+    def _load(self) -> dict[str, CachedSignature]:
+        """Carga el índice de disco (con el lock tomado)"""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                for key, data in json.load(f).items():
+                    self._entries[key] = CachedSignature(**data)
+            logger.info(f"Signing cache loaded: {len(self._entries)} entries")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Could not load signing cache, starting empty: {e}")
+        return self._entries
+
+    def lookup(
+        self,
+        source_sha256: str,
+        cert_serial: str,
+        output_path: Path,
+        professional: bool = False,
+        options: str = "",
+    ) -> Optional[CachedSignature]:
+        """
+        Busca una firma reutilizable para un documento.
+
+        Args:
+            source_sha256: SHA-256 del PDF original
+            cert_serial: Número de serie del certificado firmante
+            output_path: Ruta donde se espera el PDF firmado
+            professional: Si se requiere sello de TSA profesional
+            options: Opciones de firma pedidas (deben coincidir con las de
+                la entrada)
+
+        Returns:
+            La entrada si el PDF firmado existe y no ha cambiado, None si no
+        """
+        with self._lock:
+            entry = self._load().get(self.key(source_sha256, cert_serial))
+
+        if entry is None or entry.output_path != str(output_path):
+            return None
+        if entry.professional != professional or entry.options != options:
+            return None
+
+        try:
+            stat = os.stat(entry.output_path)
+        except OSError:
+            return None
+        if (
+            stat.st_size != entry.output_size
+            or stat.st_mtime_ns != entry.output_mtime_ns
+        ):
+            return None
+
+        return entry
+
+    def store(
+        self,
+        source_sha256: str,
+        cert_serial: str,
+        output_path: Path,
+        verification_url: str = "",
+        record_id: str = "",
+        professional: bool = False,
+        options: str = "",
+    ):
+        """
+        Registra un documento recién firmado.
+
+        Args:
+            source_sha256: SHA-256 del PDF original
+            cert_serial: Número de serie del certificado firmante
+            output_path: Ruta del PDF firmado
+            verification_url: URL de verificación (TSA profesional)
+            record_id: ID del registro de timestamp (TSA profesional)
+            professional: Si se usó TSA profesional
+            options: Opciones de firma usadas (ver lookup)
+        """
+        stat = os.stat(output_path)
+        entry = CachedSignature(
+            output_path=str(output_path),
+            output_size=stat.st_size,
+            output_mtime_ns=stat.st_mtime_ns,
+            verification_url=verification_url,
+            record_id=record_id,
+            professional=professional,
+            options=options,
+        )
+
+        with self._lock:
+            entries = self._load()
+            key = self.key(source_sha256, cert_serial)
+            entries.pop(key, None)  # Re-insert as newest
+            entries[key] = entry
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+            self._dirty = True
+
+    def save(self):
+        """Guarda el índice en disco si cambió (escritura atómica)"""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            data = {key: asdict(entry) for key, entry in self._entries.items()}
+            self._dirty = False
+
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save signing cache: {e}")
@@ -1,19 +1,100 @@
 """Cliente TSA para sellado de tiempo"""
+import asyncio
 import base64
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
-from asn1crypto import tsp
+from asn1crypto import cms, tsp
 from pyhanko.sign import timestamps
 from pyhanko.sign.timestamps import TimeStamper
 from pyhanko.sign.timestamps.api import dummy_digest
+from pyhanko.sign.timestamps.common_utils import TimestampRequestError
+from requests.adapters import HTTPAdapter
 
-from ..config import TSA_URL, TSA_TIMEOUT, TSA_FREE_PROVIDERS
+from ..api.exceptions import APIError, InsufficientCreditsError
+from ..config import (
+    PAID_TSA_PROVIDER,
+    TSA_BATCH_MAX_REQUESTS,
+    TSA_BATCH_MAX_WAIT,
+    TSA_URL,
+    TSA_TIMEOUT,
+    TSA_FREE_PROVIDERS,
+)
 from ..errors import TSAError
+from ..utils import metrics
 
 logger = logging.getLogger(__name__)
 
+# Histograma de tiempos de respuesta de la TSA (etiqueta "provider")
+TSA_METRIC = "tsa_request_seconds"
+
+
+def shared_session(pool_size: int) -> requests.Session:
+    """
+    Sesión HTTP con un pool de conexiones para compartir entre hilos.
+
+    pyhanko abre una conexión (y un handshake TLS) por cada sello; con una
+    sesión compartida las solicitudes reutilizan conexiones abiertas.
+
+    Args:
+        pool_size: Conexiones abiertas por host (una por hilo que sella)
+
+    Returns:
+        Sesión de requests
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class TimedHTTPTimeStamper(timestamps.HTTPTimeStamper):
+    """HTTPTimeStamper que registra el tiempo de cada solicitud a la TSA"""
+
+    def __init__(self, url: str, session: Optional[requests.Session] = None, **kwargs):
+        """
+        Args:
+            url: URL de la TSA
+            session: Sesión compartida (ver shared_session); None = una
+                conexión nueva por sello, como pyhanko
+        """
+        super().__init__(url, **kwargs)
+        self.provider = urlparse(url).hostname or url
+        self.session = session
+
+    async def async_request_tsa_response(
+        self, req: tsp.TimeStampReq
+    ) -> tsp.TimeStampResp:
+        with metrics.timer(TSA_METRIC, provider=self.provider):
+            if self.session is None:
+                return await super().async_request_tsa_response(req)
+            return await asyncio.to_thread(self._post, req)
+
+    def _post(self, req: tsp.TimeStampReq) -> tsp.TimeStampResp:
+        """Solicitud a la TSA por la sesión compartida (igual que pyhanko)"""
+        try:
+            response = self.session.post(
+                self.url,
+                req.dump(),
+                headers=self.request_headers(),
+                auth=self.auth,
+                timeout=self.timeout,
+            )
+        except IOError as e:
+            raise TimestampRequestError(
+                "Error in communication with timestamp server"
+            ) from e
+        if response.headers.get("Content-Type") != "application/timestamp-reply":
+            raise TimestampRequestError(
+                "Timestamp server response is malformed.", response
+            )
+        return tsp.TimeStampResp.load(response.content)
+
 
 class TSAClient:
     """Cliente para servicios de sellado de tiempo (TSA) con soporte multi-provider y fallback"""
@@ -44,10 +125,15 @@ class TSAClient:
                 f"Fallback enabled with {len(self.fallback_providers)} providers"
             )
 
-    def get_timestamper(self) -> timestamps.HTTPTimeStamper:
+    def get_timestamper(
+        self, session: Optional[requests.Session] = None
+    ) -> timestamps.HTTPTimeStamper:
         """
         Obtiene un timestamper configurado para pyhanko con fallback automático.
 
+        Args:
+            session: Sesión HTTP compartida (ver shared_session)
+
         Returns:
             Instancia de HTTPTimeStamper lista para usar
 
@@ -59,7 +145,9 @@ class TSAClient:
         for tsa_url in self.fallback_providers:
             try:
                 logger.info(f"Attempting to create timestamper with: {tsa_url}")
-                timestamper = timestamps.HTTPTimeStamper(tsa_url, timeout=self.timeout)
+                timestamper = TimedHTTPTimeStamper(
+                    tsa_url, session=session, timeout=self.timeout
+                )
                 logger.info(f"Successfully created timestamper with: {tsa_url}")
                 return timestamper
             except Exception as e:
@@ -115,23 +203,177 @@ class TSAClient:
         return results
 
 
+class TimestampBatcher:
+    """Agrupa las solicitudes de sello profesional de varios documentos.
+
+    Cada hilo que sella un documento llama a request() y queda bloqueado
+    hasta tener su respuesta. El primero de un lote espera hasta
+    `max_wait` segundos a que lleguen más solicitudes; el lote se envía en
+    una sola llamada a la API al llenarse o al terminar la espera. Quien
+    sella varios documentos a la vez avisa cuántos son con expect(), y el
+    lote se envía en cuanto todos pidieron su sello. Si la API no tiene el
+    endpoint de lotes, se vuelve a una llamada por documento.
+    """
+
+    def __init__(
+        self,
+        api_client,
+        max_requests: int = TSA_BATCH_MAX_REQUESTS,
+        max_wait: float = TSA_BATCH_MAX_WAIT,
+    ):
+        """
+        Inicializa el agrupador.
+
+        Args:
+            api_client: SelladoMXAPIClient compartido por el lote
+            max_requests: Solicitudes máximas por llamada a la API
+            max_wait: Segundos máximos que una solicitud espera a su lote
+        """
+        self.api_client = api_client
+        self.max_requests = max(1, max_requests)
+        self.max_wait = max_wait
+        self._pending: List[Tuple[dict, Future]] = []
+        self._size = self.max_requests  # Solicitudes que completan el lote
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._batch_supported = True
+
+    def expect(self, count: int):
+        """
+        Indica cuántas solicitudes llegarán para el siguiente lote.
+
+        Args:
+            count: Documentos que se están sellando juntos
+        """
+        with self._cond:
+            self._size = max(1, min(count, self.max_requests))
+            if len(self._pending) >= self._size:
+                self._cond.notify_all()
+
+    def request(self, payload: dict) -> dict:
+        """
+        Solicita un sello dentro del siguiente lote (bloquea hasta tenerlo).
+
+        Args:
+            payload: Argumentos de request_tsa_sign para un documento
+
+        Returns:
+            Respuesta de la API para este documento (como request_tsa_sign)
+
+        Raises:
+            InsufficientCreditsError: Si no hubo crédito para este documento
+            APIError: Si la API rechazó la solicitud o no respondió
+        """
+        if not self._batch_supported:
+            return self.api_client.request_tsa_sign(**payload)
+
+        future: Future = Future()
+        batch = None
+        with self._cond:
+            self._pending.append((payload, future))
+            generation = self._generation
+            if len(self._pending) >= self._size:
+                batch = self._take_batch()
+            elif len(self._pending) == 1:
+                # Primera del lote: espera a que se llene o se agote el tiempo
+                self._cond.wait_for(
+                    lambda: self._generation != generation
+                    or len(self._pending) >= self._size,
+                    timeout=self.max_wait,
+                )
+                if self._generation == generation:
+                    batch = self._take_batch()
+        if batch:
+            self._send(batch)
+        return future.result()
+
+    def _take_batch(self) -> List[Tuple[dict, Future]]:
+        """Saca las solicitudes en espera (con self._cond tomado)"""
+        batch, self._pending = self._pending, []
+        self._size = self.max_requests
+        self._generation += 1
+        self._cond.notify_all()
+        return batch
+
+    def _send(self, batch: List[Tuple[dict, Future]]):
+        """Envía un lote y entrega a cada solicitud su respuesta o su error"""
+        payloads = [payload for payload, _ in batch]
+        try:
+            results = self.api_client.request_tsa_sign_batch(
+                payloads, chunk_size=self.max_requests
+            )
+        except APIError as e:
+            if e.status_code in (404, 405):
+                logger.warning("TSA batch endpoint not available, sending one by one")
+                self._batch_supported = False
+                self._send_individually(batch)
+                return
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if "error" in result:
+                future.set_exception(self._result_error(result))
+            else:
+                future.set_result(result)
+
+    def _send_individually(self, batch: List[Tuple[dict, Future]]):
+        for payload, future in batch:
+            try:
+                future.set_result(self.api_client.request_tsa_sign(**payload))
+            except Exception as e:
+                future.set_exception(e)
+
+    @staticmethod
+    def _result_error(result: dict) -> APIError:
+        """Excepción equivalente a una solicitud rechazada dentro del lote"""
+        message = result.get("message") or result["error"]
+        if result["error"] == "insufficient_credits":
+            return InsufficientCreditsError(
+                message, available_credits=result.get("available_credits", 0)
+            )
+        return APIError(message, status_code=result.get("status_code"))
+
+
 class APITimeStamper(TimeStamper):
     """Timestamper that proxies through the SelladoMX API to Certum TSA.
 
     pyhanko calls async_request_tsa_response during signing with the signature
     digest. This class forwards the TimeStampReq to the API, which contacts
     Certum and returns the full TimeStampResp for embedding in the PDF.
+    With a TimestampBatcher, the request joins a batch shared with other
+    documents instead of making its own API call.
     """
 
+    # Dummy tokens for size estimation, by digest algorithm (process-wide)
+    _shared_dummies: Dict[str, cms.ContentInfo] = {}
+    _shared_dummy_lock = threading.Lock()
+
     def __init__(
-        self, api_client, filename, size_bytes, signer_cn="", signer_serial=""
+        self,
+        api_client,
+        filename,
+        size_bytes,
+        signer_cn="",
+        signer_serial="",
+        batcher: Optional[TimestampBatcher] = None,
+        document: Optional[str] = None,
     ):
         super().__init__()
         self.api_client = api_client
+        self.batcher = batcher
         self.filename = filename
+        # Metrics key: the source path, as two files may share a name
+        self.document = document or filename
         self.size_bytes = size_bytes
         self.signer_cn = signer_cn
         self.signer_serial = signer_serial
+        self.provider = PAID_TSA_PROVIDER
         # Stored after the real TSA call completes
         self.record_id: Optional[str] = None
         self.verification_url: Optional[str] = None
@@ -141,15 +383,21 @@ class APITimeStamper(TimeStamper):
         self, req: tsp.TimeStampReq
     ) -> tsp.TimeStampResp:
         """Send TimeStampReq to SelladoMX API, which forwards to Certum."""
-        tsa_req_b64 = base64.b64encode(req.dump()).decode("ascii")
-
-        response = self.api_client.request_tsa_sign(
-            tsa_req_b64=tsa_req_b64,
-            filename=self.filename,
-            size_bytes=self.size_bytes,
-            signer_cn=self.signer_cn,
-            signer_serial=self.signer_serial,
-        )
+        payload = {
+            "tsa_req_b64": base64.b64encode(req.dump()).decode("ascii"),
+            "filename": self.filename,
+            "size_bytes": self.size_bytes,
+            "signer_cn": self.signer_cn,
+            "signer_serial": self.signer_serial,
+        }
+
+        with metrics.timer(
+            TSA_METRIC, document=self.document, provider=PAID_TSA_PROVIDER
+        ):
+            if self.batcher is not None:
+                response = self.batcher.request(payload)
+            else:
+                response = self.api_client.request_tsa_sign(**payload)
 
         # Store response metadata for after-signing use
         self.record_id = response["record_id"]
@@ -161,13 +409,24 @@ class APITimeStamper(TimeStamper):
         return tsp.TimeStampResp.load(tsa_resp_bytes)
 
     async def async_dummy_response(self, md_algorithm):
-        """Use a free TSA for size estimation to avoid consuming credits."""
+        """Use a free TSA for size estimation to avoid consuming credits.
+
+        There is one APITimeStamper per document, so the dummy token is
+        shared by all of them: only the first document of the process pays
+        the round trip to the free TSA while it is being prepared.
+        """
         try:
             return self._dummy_response_cache[md_algorithm]
         except KeyError:
-            free_ts = timestamps.HTTPTimeStamper(TSA_URL, timeout=10)
+            pass
+        with APITimeStamper._shared_dummy_lock:
+            dummy = APITimeStamper._shared_dummies.get(md_algorithm)
+        if dummy is None:
+            free_ts = TimedHTTPTimeStamper(TSA_URL, timeout=10)
             dummy = await free_ts.async_timestamp(
                 dummy_digest(md_algorithm), md_algorithm
             )
+            with APITimeStamper._shared_dummy_lock:
+                APITimeStamper._shared_dummies.setdefault(md_algorithm, dummy)
         self._register_dummy(md_algorithm, dummy)
         return dummy
@@ -0,0 +1,135 @@
+"""Datos de validación compartidos para firmas de largo plazo (PAdES B-LT/B-LTA)
+
+Una firma LTV incrusta la cadena de certificados y las respuestas OCSP/CRL
+del firmante y de la TSA. Todos los documentos de un lote se firman con la
+misma e.firma, así que esos datos se obtienen una vez por emisor y se
+reutilizan: ValidationDataCache entrega el mismo ValidationContext de
+pyhanko a cada documento, y ese contexto guarda lo que ya descargó.
+
+Los fetchers de pyhanko-certvalidator coordinan descargas concurrentes con
+eventos de asyncio, que no sirven entre hilos con distintos event loops.
+Por eso el primer uso de cada emisor se valida una sola vez bajo un lock
+(precarga) y las fases que validan (preparar y escribir) usan exclusive().
+"""
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from asn1crypto import pem, x509 as asn1_x509
+from pyhanko_certvalidator import CertificateValidator, ValidationContext
+
+from ..config import ENABLE_CRL_FALLBACK, LTV_TRUST_ROOTS
+
+logger = logging.getLogger(__name__)
+
+
+def load_certificates(paths: List[str]) -> List[asn1_x509.Certificate]:
+    """
+    Carga certificados de archivos PEM (uno o varios por archivo) o DER.
+
+    Args:
+        paths: Rutas de los archivos
+
+    Returns:
+        Certificados leídos (los archivos ilegibles se omiten con un aviso)
+    """
+    certs = []
+    for path in paths:
+        try:
+            data = Path(path).read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read trust root {path}: {e}")
+            continue
+        if pem.detect(data):
+            certs.extend(
+                asn1_x509.Certificate.load(der) for _, _, der in pem.unarmor(data, True)
+            )
+        else:
+            certs.append(asn1_x509.Certificate.load(data))
+    return certs
+
+
+class ValidationDataCache:
+    """Contextos de validación compartidos por un lote, uno por emisor"""
+
+    def __init__(
+        self,
+        trust_roots: Optional[List[asn1_x509.Certificate]] = None,
+        other_certs: Optional[List[asn1_x509.Certificate]] = None,
+        allow_fetching: bool = True,
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            trust_roots: Raíces de confianza adicionales a las del sistema
+                (por defecto las de LTV_TRUST_ROOTS)
+            other_certs: Intermedios conocidos (evita descargarlos por AIA)
+            allow_fetching: Si False, no se consultan OCSP/CRL ni AIA
+        """
+        if trust_roots is None:
+            trust_roots = load_certificates(LTV_TRUST_ROOTS)
+        self.trust_roots = trust_roots
+        self.other_certs = other_certs or []
+        self.allow_fetching = allow_fetching
+        self._entries: Dict[bytes, Tuple[ValidationContext, threading.RLock]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def context_for(self, cert: asn1_x509.Certificate) -> ValidationContext:
+        """
+        Contexto de validación del emisor de `cert` (lo crea y precarga la
+        primera vez).
+
+        Args:
+            cert: Certificado del firmante
+
+        Returns:
+            ValidationContext compartido con los demás documentos del emisor
+        """
+        key = cert.issuer.dump()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0]
+
+            self.misses += 1
+            context = ValidationContext(
+                extra_trust_roots=self.trust_roots,
+                other_certs=self.other_certs,
+                allow_fetching=self.allow_fetching,
+                revocation_mode="soft-fail" if ENABLE_CRL_FALLBACK else "hard-fail",
+            )
+            self._prefetch(context, cert)
+            self._entries[key] = (context, threading.RLock())
+            return context
+
+    @contextmanager
+    def exclusive(self, context: ValidationContext):
+        """Serializa las validaciones que usan un mismo contexto"""
+        with self._lock:
+            lock = next(
+                (lock for ctx, lock in self._entries.values() if ctx is context),
+                None,
+            )
+        if lock is None:
+            yield
+            return
+        with lock:
+            yield
+
+    @staticmethod
+    def _prefetch(context: ValidationContext, cert: asn1_x509.Certificate):
+        """Construye la cadena y descarga OCSP/CRL del firmante una vez"""
+        validator = CertificateValidator(cert, validation_context=context)
+        try:
+            asyncio.run(validator.async_validate_usage(set()))
+            logger.info(f"Validation data cached for {cert.issuer.human_friendly}")
+        except Exception as e:
+            # La validación previa a la firma reportará el error real
+            logger.warning(f"Could not prefetch validation data: {e}")
@@ -1,8 +1,11 @@
 """Background worker for PDF signing operations."""
-import hashlib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from PySide6.QtCore import QThread, Signal
 
@@ -13,13 +16,79 @@ from ..api.exceptions import (
     NetworkError,
     APIError,
 )
-from ..config import SIGNED_SUFFIX
-from .pdf_signer import PDFSigner
-from .tsa import APITimeStamper, TSAClient
-
+from ..config import (
+    CREDIT_POLICY_DEFAULT,
+    FAILURE_POLICY_DEFAULT,
+    PIPELINE_PREPARE_WORKERS,
+    PIPELINE_SEAL_WORKERS,
+    PIPELINE_WRITE_WORKERS,
+    PREFLIGHT_MAX_WORKERS,
+    SERVICE_RETRY_ATTEMPTS,
+    SIGNATURE_LEVEL_DEFAULT,
+    SIGNED_SUFFIX,
+    TSA_BATCH_MAX_REQUESTS,
+    TSA_BATCH_MAX_WAIT,
+    TSA_BATCH_PREPARE_WORKERS,
+)
+from .appearance import SignatureAppearance, StampPlacement, parse_page_spec
+from .batch_planner import CreditPolicy, plan_batch
+from ..errors import PDFError, SigningError
+from .failure_policy import (
+    SERVICE_DOWN_MSG,
+    CircuitBreaker,
+    FailurePolicy,
+    is_transient,
+    retry_delay,
+)
+from ..utils import metrics
+from . import merkle
+from .pdf_signer import (
+    PHASE_METRIC,
+    PDFSigner,
+    PreparedSignature,
+    SignatureLevel,
+    add_cosignatures,
+)
+from .pipeline import SigningPipeline, Stage
+from .report import BatchReport, open_report
+from .result import ErrorCode, PhaseRecorder, SigningResult
+from .signing_cache import SigningCache, sha256_file
+from .tsa import APITimeStamper, TimestampBatcher, TSAClient
+from .validation_data import ValidationDataCache
 
 logger = logging.getLogger(__name__)
 
+INSUFFICIENT_CREDITS_MSG = (
+    "No tienes créditos suficientes. Compra más en selladomx.com/precios"
+)
+
+
+@dataclass
+class _FileJob:
+    """A file moving through the signing pipeline."""
+
+    pdf_path: Path
+    output_path: Path
+    api_client: Optional[SelladoMXAPIClient]
+    cert_serial: str
+    timestamper: Optional[APITimeStamper]
+    signer: PDFSigner
+    prepared: PreparedSignature
+
+
+@dataclass
+class _MerkleLeaf:
+    """A file signed in Merkle mode, waiting for the root timestamp.
+
+    The signed document is already on disk; only its signature and result
+    are kept until the whole batch is signed.
+    """
+
+    field_name: str
+    sig_contents: bytes
+    result: SigningResult
+    cert_serial: str
+
 
 class SigningWorker(QThread):
     """Worker thread for signing PDFs in the background.
@@ -28,10 +97,9 @@ class SigningWorker(QThread):
     """
 
     progress = Signal(int, int)  # current, total
-    file_completed = Signal(
-        str, bool, str, str
-    )  # filename, success, message, verification_url
-    finished = Signal(list)  # List of error messages
+    file_completed = Signal(object)  # SigningResult
+    finished = Signal(list)  # SigningResult of every failed file
+    credits_updated = Signal(int)  # credits_remaining reported by the TSA API
 
     def __init__(
         self,
@@ -44,6 +112,14 @@ class SigningWorker(QThread):
         api_key: Optional[str] = None,
         signer_cn: str = "",
         signer_serial: str = "",
+        signing_cache: Optional[SigningCache] = None,
+        credit_policy: str = CREDIT_POLICY_DEFAULT,
+        merkle_timestamp: bool = False,
+        signature_level: str = SIGNATURE_LEVEL_DEFAULT,
+        stamp_pages: str = "",
+        cosigners: Sequence[Tuple[object, object]] = (),
+        report_path: Optional[Path] = None,
+        failure_policy: str = FAILURE_POLICY_DEFAULT,
     ):
         """Initialize signing worker.
 
@@ -57,6 +133,28 @@ class SigningWorker(QThread):
             api_key: API key for professional TSA
             signer_cn: Signer common name
             signer_serial: Signer serial number
+            signing_cache: Cache of already-signed documents (None = always sign)
+            credit_policy: What to do with files beyond the credit balance
+                (a CreditPolicy value)
+            merkle_timestamp: Timestamp the whole batch with a single token
+                over a Merkle root instead of one token per file (see
+                signing/merkle.py)
+            signature_level: PAdES level (a SignatureLevel value). B-LT and
+                B-LTA embed validation data fetched once for the batch;
+                Merkle mode signs at most at B-LT, since the root token is
+                added after the signature
+            stamp_pages: Pages that show a visible signature stamp, e.g.
+                "1,-1" (see appearance.parse_page_spec); empty = invisible
+            cosigners: (certificate, private key) pairs that co-sign every
+                file after the main signer. Their signatures are added in
+                memory and the file is written once; they are timestamped
+                with the free TSA (none in Merkle mode)
+            report_path: Batch report (.csv, .jsonl or .parquet) written as
+                files complete (see signing/report.py); None = no report
+            failure_policy: What to do with a file when the professional
+                TSA service fails (a FailurePolicy value). Only "abort"
+                stops the batch; retry and defer pause the queue while the
+                service is down (see signing/failure_policy.py)
         """
         super().__init__()
         self.pdf_paths = pdf_paths
@@ -68,100 +166,841 @@ class SigningWorker(QThread):
         self.api_key = api_key
         self.signer_cn = signer_cn
         self.signer_serial = signer_serial
-        self.errors = []
+        self.signing_cache = signing_cache
+        self.credit_policy = CreditPolicy(credit_policy)
+        self.merkle_timestamp = merkle_timestamp
+        self.signature_level = SignatureLevel(signature_level)
+        if merkle_timestamp and self.signature_level == SignatureLevel.B_LTA:
+            self.signature_level = SignatureLevel.B_LT
+        self.validation_cache: Optional[ValidationDataCache] = None
+        # Stamp templates are rendered once per certificate for the batch
+        self.appearance: Optional[SignatureAppearance] = None
+        if stamp_pages:
+            self.appearance = SignatureAppearance(
+                StampPlacement(pages=parse_page_spec(stamp_pages))
+            )
+        self.cosigners = list(cosigners)
+        self._cosigning_signers: List[PDFSigner] = []
+        # Only failures are kept; every result goes to the report instead
+        self.errors: List[SigningResult] = []
+        self._phases = PhaseRecorder(PHASE_METRIC)
+        self.report_path = report_path
+        self._report: Optional[BatchReport] = None
+        self.failure_policy = FailurePolicy(failure_policy)
+        # Shared by every file of the run: an API outage pauses all of them
+        self.circuit_breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+        self._progress_count = 0
+        # Source digests taken for the signing cache, reused by prepare()
+        self._source_hashes: Dict[Path, str] = {}
 
     def run(self):
-        """Execute signing process."""
-        total = len(self.pdf_paths)
+        """Execute signing process.
+
+        The credit balance is checked once up front. Files whose earlier
+        signature can be reused are reported first, and the rest of the
+        batch is split into professional and free TSA partitions, which are
+        signed concurrently. In Merkle mode the whole batch shares one
+        timestamp.
+
+        requestInterruption() stops the batch cooperatively: no new file is
+        started, files already in the pipeline finish, and the report is
+        closed before finished is emitted.
+        """
+        self._progress_count = 0
+        self._source_hashes = {}
+        if self.signature_level != SignatureLevel.B_T:
+            # Chain and OCSP/CRL responses are fetched once for the batch
+            self.validation_cache = ValidationDataCache()
+
+        if self.cosigners:
+            # Co-signatures use the free TSA, so they cost no credits
+            cosign_tsa = None
+            if not self.merkle_timestamp:
+                cosign_tsa = self.tsa_client or TSAClient()
+            self._cosigning_signers = [
+                PDFSigner(
+                    cert,
+                    private_key,
+                    tsa_client=cosign_tsa,
+                    level=self.signature_level,
+                    validation_cache=self.validation_cache,
+                    appearance=self.appearance,
+                )
+                for cert, private_key in self.cosigners
+            ]
 
         # For professional TSA: create API client upfront
         api_client = None
+        balance = None
         if self.use_professional_tsa and self.api_key:
             api_client = SelladoMXAPIClient(api_key=self.api_key)
+            balance = self._fetch_balance(api_client)
 
-        for i, pdf_path in enumerate(self.pdf_paths, 1):
-            self.progress.emit(i, total)
+        cert_serial = ""
+        if self.signing_cache is not None:
+            # A co-signed file is only reused for the same set of signers
+            cert_serial = "+".join(
+                format(cert.serial_number, "x")
+                for cert in [self.cert, *(cert for cert, _ in self.cosigners)]
+            )
 
+        if self.report_path is not None:
             try:
-                # Calculate output_path if output directory was specified
-                if self.output_dir:
-                    output_path = (
-                        self.output_dir
-                        / f"{pdf_path.stem}{SIGNED_SUFFIX}{pdf_path.suffix}"
-                    )
-                else:
-                    output_path = None  # Use default (same folder as source)
-
-                # Create appropriate timestamper for this file
-                api_timestamper = None
-                if api_client and self.use_professional_tsa:
-                    api_timestamper = APITimeStamper(
-                        api_client=api_client,
-                        filename=pdf_path.name,
-                        size_bytes=pdf_path.stat().st_size,
-                        signer_cn=self.signer_cn,
-                        signer_serial=self.signer_serial,
+                self._report = open_report(self.report_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not create batch report: {e}")
+
+        # Phase timings are copied into each file's SigningResult
+        metrics.registry().add_listener(self._phases)
+        try:
+            pdf_paths = self.pdf_paths
+            if self.signing_cache is not None:
+                pdf_paths = self._reuse_signatures(
+                    pdf_paths, cert_serial, professional=api_client is not None
+                )
+            if self.merkle_timestamp:
+                self._run_merkle(pdf_paths, api_client, balance, cert_serial)
+            else:
+                self._run_partitions(pdf_paths, api_client, balance, cert_serial)
+        finally:
+            metrics.registry().remove_listener(self._phases)
+            if self._report is not None:
+                self._report.close()
+                self._report = None
+
+        if self.signing_cache is not None:
+            self.signing_cache.save()
+
+        self.finished.emit(self.errors)
+
+    def _run_partitions(
+        self,
+        pdf_paths: List[Path],
+        api_client: Optional[SelladoMXAPIClient],
+        balance: Optional[int],
+        cert_serial: str,
+    ):
+        """Plan the batch against the balance and sign each TSA partition.
+
+        Args:
+            pdf_paths: Files to sign (without the reused ones)
+            api_client: API client for professional TSA (None = free TSA)
+            balance: Credits available (None = unknown)
+            cert_serial: Signer certificate serial (hex) for the signing cache
+        """
+        plan = plan_batch(
+            pdf_paths,
+            use_professional_tsa=api_client is not None,
+            balance=balance,
+            policy=self.credit_policy,
+        )
+
+        # Files beyond the balance are reported now instead of failing midway
+        for pdf_path in plan.unfunded:
+            self._next_progress()
+            self._report_failure(
+                pdf_path, ErrorCode.INSUFFICIENT_CREDITS, INSUFFICIENT_CREDITS_MSG
+            )
+
+        if plan.free:
+            self._ensure_free_tsa()
+
+        partitions = [
+            (paths, client)
+            for paths, client in ((plan.professional, api_client), (plan.free, None))
+            if paths
+        ]
+        if len(partitions) > 1:
+            with ThreadPoolExecutor(
+                max_workers=len(partitions), thread_name_prefix="signing"
+            ) as executor:
+                futures = [
+                    executor.submit(self._sign_partition, paths, client, cert_serial)
+                    for paths, client in partitions
+                ]
+                for future in futures:
+                    future.result()
+        elif partitions:
+            paths, client = partitions[0]
+            self._sign_partition(paths, client, cert_serial)
+
+    def _run_merkle(
+        self,
+        pdf_paths: List[Path],
+        api_client: Optional[SelladoMXAPIClient],
+        balance: Optional[int],
+        cert_serial: str,
+    ):
+        """Sign the whole batch under a single Merkle-root timestamp.
+
+        One professional token covers every file, so a single credit is
+        enough; without it the credit policy decides between the free TSA
+        and failing the batch.
+        """
+        if api_client is not None and balance is not None and balance < 1:
+            if self.credit_policy is not CreditPolicy.FALLBACK_FREE:
+                for pdf_path in pdf_paths:
+                    self._next_progress()
+                    self._report_failure(
+                        pdf_path,
+                        ErrorCode.INSUFFICIENT_CREDITS,
+                        INSUFFICIENT_CREDITS_MSG,
                     )
+                return
+            api_client = None
+        if api_client is None:
+            self._ensure_free_tsa()
+        self._sign_merkle_batch(pdf_paths, api_client, cert_serial)
+
+    def _fetch_balance(self, api_client: SelladoMXAPIClient) -> Optional[int]:
+        """Query the credit balance once before signing.
+
+        Returns:
+            Credits available, or None if the balance could not be fetched
+        """
+        try:
+            response = api_client.get_balance()
+            return int(response.get("credits_remaining", 0))
+        except (APIError, TypeError, ValueError) as e:
+            logger.warning(f"Could not fetch credit balance before signing: {e}")
+            return None
+
+    def _cache_options(self, professional: bool) -> str:
+        """Signing options a cached signature must have been made with.
+
+        Args:
+            professional: Whether the file gets a professional timestamp
+
+        Returns:
+            The level, timestamp mode and stamp pages, as one string
+        """
+        pages = ""
+        if self.appearance is not None:
+            pages = ",".join(str(page) for page in self.appearance.placement.pages)
+        mode = "merkle" if self.merkle_timestamp else "per-file"
+        tsa = "professional" if professional else "free"
+        return f"{self.signature_level.value};{mode};{tsa};pages={pages}"
+
+    def _next_progress(self):
+        """Advance the shared progress counter (safe across partitions)."""
+        with self._lock:
+            self._progress_count += 1
+            current = self._progress_count
+        self.progress.emit(current, len(self.pdf_paths))
+
+    def _ensure_free_tsa(self):
+        """Create the free TSA client if the batch did not bring one."""
+        with self._lock:
+            if self.tsa_client is None:
+                self.tsa_client = TSAClient()
+
+    def _emit_result(self, result: SigningResult):
+        """Record a file's result and emit file_completed."""
+        result.phases = self._phases.pop(str(result.source))
+        if not result.success:
+            with self._lock:
+                self.errors.append(result)
+        if self._report is not None:
+            try:
+                self._report.write(result)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not write batch report row: {e}")
+        self.file_completed.emit(result)
+
+    def _report_failure(self, pdf_path: Path, error: ErrorCode, error_msg: str):
+        """Record and emit a failed file."""
+        self._emit_result(SigningResult(pdf_path, error=error, message=error_msg))
+
+    def _sign_partition(
+        self,
+        pdf_paths: List[Path],
+        api_client: Optional[SelladoMXAPIClient],
+        cert_serial: str,
+        deferred_pass: bool = False,
+    ):
+        """Sign a partition of the batch with a single TSA.
+
+        Files go through a SigningPipeline (prepare -> seal -> write) so the
+        next file is read and hashed while the current one waits on the TSA
+        and the previous one is written. A fatal TSA error stops the
+        partition: files not yet reported are dropped, as before. Service
+        errors are fatal only under the "abort" failure policy; with "defer"
+        the affected files are signed again in a second pass at the end.
+
+        With the professional TSA, the seal stage takes every prepared file
+        waiting in its queue (up to TSA_BATCH_MAX_REQUESTS, waiting at most
+        TSA_BATCH_MAX_WAIT for more) and seals them together, so their
+        timestamp requests share one API call (TimestampBatcher). Files
+        keep being prepared while a batch is at the API, so the next batch
+        is already queued when it returns.
+
+        Args:
+            pdf_paths: Files in this partition
+            api_client: API client for professional TSA (None = free TSA)
+            cert_serial: Signer certificate serial (hex) for the signing cache
+            deferred_pass: Whether these are deferred files (already counted
+                in the progress; they are retried instead of deferred again)
+        """
+        error_lock = threading.Lock()
+        deferred: List[Path] = []
+        batcher = None
+        if api_client is not None and TSA_BATCH_MAX_REQUESTS > 1:
+            batcher = TimestampBatcher(api_client)
+
+        def prepare(pdf_path: Path) -> Optional[_FileJob]:
+            if self.isInterruptionRequested():
+                pipeline.cancel()
+                return None
+            if not deferred_pass:
+                self._next_progress()
+            return self._prepare_file(pdf_path, api_client, cert_serial, batcher)
+
+        def seal(job: _FileJob) -> Optional[_FileJob]:
+            nonlocal api_client
+            try:
+                return self._seal(job, None if deferred_pass else deferred)
+            except InsufficientCreditsError:
+                if (
+                    job.api_client is None
+                    or self.credit_policy is not CreditPolicy.FALLBACK_FREE
+                ):
+                    raise
+                # Balance ran out mid-batch: finish with the free TSA
+                logger.warning(
+                    f"Credits exhausted at {job.pdf_path.name}, "
+                    "continuing with free TSA"
+                )
+                api_client = None
+                return self._seal_with_free_tsa(job)
+
+        def seal_batch(jobs: List[_FileJob]) -> List[Optional[_FileJob]]:
+            # One thread per file: each blocks in the batcher until the
+            # whole batch has asked for its timestamp
+            batcher.expect(len(jobs))
+            futures = [seal_pool.submit(seal, job) for job in jobs]
+            sealed = []
+            for job, future in zip(jobs, futures):
+                try:
+                    sealed.append(future.result())
+                except Exception as e:
+                    on_error(job, e)
+            return sealed
+
+        def write(job: _FileJob) -> None:
+            self._finish_file(job)
+
+        def on_error(item, error: Exception):
+            pdf_path = item.pdf_path if isinstance(item, _FileJob) else item
+            with error_lock:
+                if pipeline.cancelled:
+                    return  # Partition already stopped
+                if self._handle_sign_error(pdf_path, error):
+                    pipeline.cancel()
+
+        if batcher is None:
+            pipeline = SigningPipeline(
+                [
+                    Stage("prepare", prepare, PIPELINE_PREPARE_WORKERS),
+                    Stage("seal", seal, PIPELINE_SEAL_WORKERS),
+                    Stage("write", write, PIPELINE_WRITE_WORKERS),
+                ],
+                on_error=on_error,
+            )
+            pipeline.run(pdf_paths)
+        else:
+            # A full batch can queue up while the previous one is at the API
+            pipeline = SigningPipeline(
+                [
+                    Stage("prepare", prepare, TSA_BATCH_PREPARE_WORKERS),
+                    Stage(
+                        "seal",
+                        seal_batch,
+                        batch=TSA_BATCH_MAX_REQUESTS,
+                        batch_wait=TSA_BATCH_MAX_WAIT,
+                    ),
+                    Stage("write", write, PIPELINE_WRITE_WORKERS),
+                ],
+                on_error=on_error,
+                queue_size=TSA_BATCH_MAX_REQUESTS,
+            )
+            with ThreadPoolExecutor(
+                max_workers=TSA_BATCH_MAX_REQUESTS, thread_name_prefix="tsa-batch"
+            ) as seal_pool:
+                pipeline.run(pdf_paths)
+
+        if deferred and not pipeline.cancelled and not self.isInterruptionRequested():
+            logger.info(f"Retrying {len(deferred)} deferred file(s)")
+            self._sign_partition(deferred, api_client, cert_serial, deferred_pass=True)
+
+    def _seal(
+        self,
+        job: _FileJob,
+        deferred: Optional[List[Path]],
+    ) -> Optional[_FileJob]:
+        """Pipeline stage 2: seal a file, applying the failure policy.
+
+        Only transient errors of the professional TSA service (network, 429,
+        5xx) are handled here; anything else is raised as before. A prepared
+        document can only be sealed once, so each retry prepares the file
+        again (on its own, outside the timestamp batch).
+
+        Args:
+            job: File to seal
+            deferred: Where to put files deferred to the end of the
+                partition (None = the deferred pass, which retries instead)
+
+        Returns:
+            The job to write (a new one if the file was prepared again), or
+            None if the file was deferred
 
-                # Create signer with the appropriate timestamper
-                # Each file gets its own PDFSigner because the APITimeStamper
-                # is per-file (different filename/size metadata)
-                signer = PDFSigner(
-                    self.cert,
-                    self.private_key,
-                    tsa_client=self.tsa_client,
-                    timestamper=api_timestamper,
+        Raises:
+            APIError: If the service error is not handled by the policy
+        """
+        policy = self.failure_policy
+        if job.api_client is None or policy is FailurePolicy.ABORT:
+            job.signer.seal(job.prepared)
+            return job
+        if policy is FailurePolicy.FALLBACK_FREE and self.circuit_breaker.is_open:
+            logger.warning(f"TSA service down, using free TSA for {job.pdf_path.name}")
+            return self._seal_with_free_tsa(job)
+
+        retry = policy is FailurePolicy.RETRY or deferred is None
+        attempts = 1 + SERVICE_RETRY_ATTEMPTS if retry else 1
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(retry_delay(attempt))
+                job = self._prepare_file(job.pdf_path, job.api_client, job.cert_serial)
+            try:
+                with self.circuit_breaker.guard():
+                    job.signer.seal(job.prepared)
+                return job
+            except APIError as e:
+                if not is_transient(e):
+                    raise
+                error = e
+                logger.warning(
+                    f"TSA service error for {job.pdf_path.name} "
+                    f"(attempt {attempt + 1}/{attempts}): {e}"
                 )
 
-                # Sign — timestamp is now embedded during signing
-                output_path = signer.sign_pdf(pdf_path, output_path)
-
-                # After signing: update record with actual file hash
-                verification_url = ""
-                if api_timestamper and api_timestamper.record_id:
-                    file_hash = hashlib.sha256(output_path.read_bytes()).hexdigest()
-                    file_size = output_path.stat().st_size
-                    try:
-                        api_client.complete_timestamp(
-                            api_timestamper.record_id, file_hash, file_size
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to update record hash: {e}")
-                    verification_url = api_timestamper.verification_url or ""
-                    logger.info(f"Professional TSA embedded for {pdf_path.name}")
-
-                self.file_completed.emit(
-                    pdf_path.name,
-                    True,
-                    f"Signed successfully: {output_path.name}",
-                    verification_url,
+        if policy is FailurePolicy.FALLBACK_FREE:
+            logger.warning(f"TSA service down, using free TSA for {job.pdf_path.name}")
+            return self._seal_with_free_tsa(job)
+        if deferred is not None:
+            deferred.append(job.pdf_path)
+            return None
+        raise error
+
+    def _seal_with_free_tsa(self, job: _FileJob) -> _FileJob:
+        """Seal a professional file with the free TSA instead.
+
+        The prepared document is tied to its timestamper, so the file is
+        prepared again for the free TSA; the write stage writes it as usual.
+
+        Returns:
+            The new job to write
+        """
+        self._ensure_free_tsa()
+        job = self._prepare_file(job.pdf_path, None, job.cert_serial)
+        job.signer.seal(job.prepared)
+        return job
+
+    def _sign_merkle_batch(
+        self,
+        pdf_paths: List[Path],
+        api_client: Optional[SelladoMXAPIClient],
+        cert_serial: str,
+    ):
+        """Sign files without timestamps, then timestamp their Merkle root.
+
+        The files go through the usual pipeline but are only written; once
+        all are signed, a single token is requested over the Merkle root of
+        their signatures and each file gets its inclusion proof saved next to
+        it (signing/merkle.py). file_completed is emitted after that step.
+        A professional root token gets one API record for the whole batch,
+        completed with the root as its document hash; the proofs name it.
+
+        Args:
+            pdf_paths: Files to sign
+            api_client: API client for a professional root token (None = free)
+            cert_serial: Signer certificate serial (hex) for the signing cache
+        """
+        signed: List[_MerkleLeaf] = []
+        signed_lock = threading.Lock()
+
+        def prepare(pdf_path: Path) -> Optional[_FileJob]:
+            if self.isInterruptionRequested():
+                pipeline.cancel()
+                return None
+            self._next_progress()
+            return self._prepare_file(pdf_path, None, cert_serial)
+
+        def seal(job: _FileJob) -> _FileJob:
+            job.signer.seal(job.prepared)
+            return job
+
+        def write(job: _FileJob) -> None:
+            written = self._write_file(job)
+            leaf = _MerkleLeaf(
+                field_name=job.prepared.signature_meta.field_name,
+                sig_contents=job.prepared.post_signing.sig_contents,
+                result=self._signed_result(job, written, SigningResult(job.pdf_path)),
+                cert_serial=job.cert_serial,
+            )
+            with signed_lock:
+                signed.append(leaf)
+
+        def on_error(item, error: Exception):
+            pdf_path = item.pdf_path if isinstance(item, _FileJob) else item
+            self._handle_sign_error(pdf_path, error)
+
+        pipeline = SigningPipeline(
+            [
+                Stage("prepare", prepare, PIPELINE_PREPARE_WORKERS),
+                Stage("seal", seal, PIPELINE_SEAL_WORKERS),
+                Stage("write", write, PIPELINE_WRITE_WORKERS),
+            ],
+            on_error=on_error,
+        )
+        pipeline.run(pdf_paths)
+        if not signed:
+            return
+
+        root_timestamper = None
+        batch_size = sum(leaf.result.output_size for leaf in signed)
+        try:
+            if api_client is not None:
+                root_timestamper = APITimeStamper(
+                    api_client=api_client,
+                    filename=f"merkle-root ({len(signed)} documentos)",
+                    size_bytes=batch_size,
+                    signer_cn=self.signer_cn,
+                    signer_serial=self.signer_serial,
                 )
-            except InsufficientCreditsError:
-                error_msg = "No tienes créditos suficientes. Compra más en selladomx.com/precios"
-                self.errors.append(f"{pdf_path.name}: {error_msg}")
-                self.file_completed.emit(pdf_path.name, False, error_msg, "")
-                logger.error(f"Insufficient credits for {pdf_path.name}")
-                break
-            except AuthenticationError:
-                error_msg = "Token inválido o expirado. Reconfigura tu token."
-                self.errors.append(f"{pdf_path.name}: {error_msg}")
-                self.file_completed.emit(pdf_path.name, False, error_msg, "")
-                logger.error(f"Auth error for {pdf_path.name}")
-                break
-            except (NetworkError, APIError) as e:
-                error_msg = (
-                    e.message
-                    if hasattr(e, "message") and e.message
-                    else "Servicio no disponible. Intenta más tarde."
+                timestamper = root_timestamper
+            else:
+                timestamper = self.tsa_client.get_timestamper()
+            proofs = merkle.timestamp_signatures(
+                [(leaf.field_name, leaf.sig_contents) for leaf in signed],
+                timestamper,
+            )
+        except Exception as e:
+            # Without the root token the files would carry no timestamp at all
+            for leaf in signed:
+                leaf.result.output.unlink(missing_ok=True)
+                self._handle_sign_error(leaf.result.source, e)
+            return
+
+        verification_url = ""
+        record_id = ""
+        credits_remaining = None
+        if root_timestamper is not None and root_timestamper.record_id:
+            record_id = root_timestamper.record_id
+            verification_url = root_timestamper.verification_url or ""
+            try:
+                # The record covers the whole batch: its document hash is the
+                # root, and each file's proof names the record
+                api_client.complete_timestamp(
+                    record_id, proofs[0].root.hex(), batch_size
                 )
-                self.errors.append(f"{pdf_path.name}: {error_msg}")
-                self.file_completed.emit(pdf_path.name, False, error_msg, "")
-                logger.error(f"TSA service error for {pdf_path.name}: {error_msg}")
-                break
             except Exception as e:
-                error_msg = str(e)
-                self.errors.append(f"{pdf_path.name}: {error_msg}")
-                self.file_completed.emit(pdf_path.name, False, error_msg, "")
-                logger.error(f"Error signing {pdf_path.name}: {e}")
+                logger.warning(f"Failed to update Merkle root record: {e}")
+            if root_timestamper.credits_remaining is not None:
+                credits_remaining = int(root_timestamper.credits_remaining)
+                self.credits_updated.emit(credits_remaining)
 
-        self.finished.emit(self.errors)
+        for leaf, proof in zip(signed, proofs):
+            result = leaf.result
+            proof.record_id = record_id
+            proof.verification_url = verification_url
+            try:
+                with metrics.timer(
+                    PHASE_METRIC, document=str(result.source), phase="merkle_proof"
+                ):
+                    merkle.save_proof(result.output, proof)
+            except Exception as e:
+                result.output.unlink(missing_ok=True)
+                self._handle_sign_error(result.source, e)
+                continue
+            result.tsa_provider = getattr(timestamper, "provider", "")
+            result.record_id = record_id
+            result.verification_url = verification_url
+            result.credits_remaining = credits_remaining
+            self._record_success(
+                result,
+                leaf.cert_serial,
+                professional=root_timestamper is not None,
+            )
+
+    def _handle_sign_error(self, pdf_path: Path, error: Exception) -> bool:
+        """Report a failed file.
+
+        Returns:
+            True if the error means the rest of the partition cannot be signed
+        """
+        if isinstance(error, InsufficientCreditsError):
+            self._report_failure(
+                pdf_path, ErrorCode.INSUFFICIENT_CREDITS, INSUFFICIENT_CREDITS_MSG
+            )
+            logger.error(f"Insufficient credits for {pdf_path.name}")
+            return True
+        if isinstance(error, AuthenticationError):
+            error_msg = "Token inválido o expirado. Reconfigura tu token."
+            self._report_failure(pdf_path, ErrorCode.AUTHENTICATION, error_msg)
+            logger.error(f"Auth error for {pdf_path.name}")
+            return True
+        if isinstance(error, (NetworkError, APIError)):
+            error_msg = (
+                error.message
+                if hasattr(error, "message") and error.message
+                else SERVICE_DOWN_MSG
+            )
+            code = (
+                ErrorCode.NETWORK if isinstance(error, NetworkError) else ErrorCode.API
+            )
+            self._report_failure(pdf_path, code, error_msg)
+            logger.error(f"TSA service error for {pdf_path.name}: {error_msg}")
+            # Other policies already retried, deferred or fell back
+            return self.failure_policy is FailurePolicy.ABORT
+
+        if isinstance(error, (PDFError, OSError)):
+            code = ErrorCode.PDF
+        elif isinstance(error, SigningError):
+            code = ErrorCode.SIGNING
+        else:
+            code = ErrorCode.UNKNOWN
+        self._report_failure(pdf_path, code, str(error))
+        logger.error(f"Error signing {pdf_path.name}: {error}")
+        return False
+
+    def _output_path(self, pdf_path: Path) -> Path:
+        """Signed PDF path (output directory or same folder as source)."""
+        output_dir = self.output_dir or pdf_path.parent
+        return output_dir / f"{pdf_path.stem}{SIGNED_SUFFIX}{pdf_path.suffix}"
+
+    def _reuse_signatures(
+        self, pdf_paths: List[Path], cert_serial: str, professional: bool
+    ) -> List[Path]:
+        """Report the files whose earlier signature can be reused.
+
+        Runs before the batch is planned, so reused files take no credits.
+        Only files whose signed output exists are hashed; the digest is kept
+        for prepare(), so no file is hashed twice.
+
+        Args:
+            pdf_paths: Files of the batch, in order
+            cert_serial: Signer certificate serial (hex)
+            professional: Whether the batch uses the professional TSA
+
+        Returns:
+            The files that still have to be signed, in order
+        """
+
+        def digest(pdf_path: Path) -> Optional[str]:
+            try:
+                with metrics.timer(PHASE_METRIC, document=str(pdf_path), phase="hash"):
+                    return sha256_file(pdf_path)
+            except OSError:
+                return None  # Reported when the file is prepared
+
+        candidates = [path for path in pdf_paths if self._output_path(path).exists()]
+        with ThreadPoolExecutor(
+            max_workers=PREFLIGHT_MAX_WORKERS, thread_name_prefix="signing-cache"
+        ) as executor:
+            digests = dict(zip(candidates, executor.map(digest, candidates)))
+
+        options = self._cache_options(professional)
+        pending = []
+        for pdf_path in pdf_paths:
+            source_hash = digests.get(pdf_path)
+            output_path = self._output_path(pdf_path)
+            cached = None
+            if source_hash is not None:
+                cached = self.signing_cache.lookup(
+                    source_hash,
+                    cert_serial,
+                    output_path,
+                    professional=professional,
+                    options=options,
+                )
+            if cached is None:
+                if source_hash is not None:
+                    self._source_hashes[pdf_path] = source_hash
+                pending.append(pdf_path)
+                continue
+
+            logger.info(f"Reusing existing signature for {pdf_path.name}")
+            self._next_progress()
+            self._emit_result(
+                SigningResult(
+                    pdf_path,
+                    output=output_path,
+                    message=f"Ya estaba firmado, se reutilizó: {output_path.name}",
+                    source_sha256=source_hash,
+                    output_size=cached.output_size,
+                    record_id=cached.record_id,
+                    verification_url=cached.verification_url,
+                    reused=True,
+                )
+            )
+        return pending
+
+    def _prepare_file(
+        self,
+        pdf_path: Path,
+        api_client: Optional[SelladoMXAPIClient],
+        cert_serial: str,
+        batcher: Optional[TimestampBatcher] = None,
+    ) -> _FileJob:
+        """Pipeline stage 1: prepare the PDF for its timestamp.
+
+        Args:
+            pdf_path: PDF to sign
+            api_client: API client for professional TSA (None = free TSA)
+            cert_serial: Signer certificate serial (hex) for the signing cache
+            batcher: Groups professional timestamp requests across files
+
+        Returns:
+            The job to seal
+        """
+        output_path = self._output_path(pdf_path)
+
+        # Create appropriate timestamper for this file
+        api_timestamper = None
+        if api_client is not None:
+            api_timestamper = APITimeStamper(
+                api_client=api_client,
+                filename=pdf_path.name,
+                size_bytes=pdf_path.stat().st_size,
+                signer_cn=self.signer_cn,
+                signer_serial=self.signer_serial,
+                batcher=batcher,
+                document=str(pdf_path),
+            )
+
+        # Create signer with the appropriate timestamper
+        # Each file gets its own PDFSigner because the APITimeStamper
+        # is per-file (different filename/size metadata). In Merkle mode
+        # files are signed without a timestamp of their own.
+        signer = PDFSigner(
+            self.cert,
+            self.private_key,
+            tsa_client=None if self.merkle_timestamp else self.tsa_client,
+            timestamper=api_timestamper,
+            level=self.signature_level,
+            validation_cache=self.validation_cache,
+            appearance=self.appearance,
+        )
+
+        return _FileJob(
+            pdf_path=pdf_path,
+            output_path=output_path,
+            api_client=api_client,
+            cert_serial=cert_serial,
+            timestamper=api_timestamper,
+            signer=signer,
+            prepared=signer.prepare(
+                pdf_path,
+                output_path,
+                field_count=1 + len(self.cosigners),
+                source_sha256=self._source_hashes.get(pdf_path, ""),
+            ),
+        )
+
+    def _write_file(self, job: _FileJob) -> PreparedSignature:
+        """Add the co-signatures (if any) in memory and write the signed PDF.
+
+        Returns:
+            The signature that was written (the last co-signer's, if any),
+            which carries the output size and digest
+        """
+        if not self._cosigning_signers:
+            job.signer.write(job.prepared)
+            return job.prepared
+        signer, prepared = add_cosignatures(
+            job.signer, job.prepared, self._cosigning_signers
+        )
+        signer.write(prepared)
+        return prepared
+
+    def _finish_file(self, job: _FileJob):
+        """Pipeline stage 3: write the signed PDF and record the result."""
+        written = self._write_file(job)
+        api_timestamper = job.timestamper
+        result = SigningResult(job.pdf_path, tsa_provider=job.prepared.tsa_provider)
+
+        # After signing: update record with actual file hash (computed in
+        # memory by write(), so the signed file is not read back)
+        if api_timestamper and api_timestamper.record_id:
+            result.record_id = api_timestamper.record_id
+            try:
+                with metrics.timer(
+                    PHASE_METRIC,
+                    document=str(job.pdf_path),
+                    phase="complete_timestamp",
+                ):
+                    job.api_client.complete_timestamp(
+                        result.record_id, written.output_sha256, written.output_size
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to update record hash: {e}")
+            result.verification_url = api_timestamper.verification_url or ""
+            logger.info(f"Professional TSA embedded for {job.pdf_path.name}")
+
+        if api_timestamper and api_timestamper.credits_remaining is not None:
+            result.credits_remaining = int(api_timestamper.credits_remaining)
+            self.credits_updated.emit(result.credits_remaining)
+
+        self._record_success(
+            self._signed_result(job, written, result),
+            job.cert_serial,
+            professional=api_timestamper is not None,
+        )
+
+    @staticmethod
+    def _signed_result(
+        job: _FileJob, written: PreparedSignature, result: SigningResult
+    ) -> SigningResult:
+        """Fill in the paths, sizes and digests of a signed file.
+
+        Args:
+            job: The signed file
+            written: Signature returned by _write_file
+            result: Result to complete
+
+        Returns:
+            The same result
+        """
+        result.output = job.output_path
+        result.message = f"Signed successfully: {job.output_path.name}"
+        result.source_sha256 = job.prepared.source_sha256
+        result.source_size = job.prepared.source_size
+        result.output_sha256 = written.output_sha256
+        result.output_size = written.output_size
+        return result
+
+    def _record_success(
+        self,
+        result: SigningResult,
+        cert_serial: str,
+        professional: bool,
+    ):
+        """Store a signed file in the signing cache and emit file_completed.
+
+        Args:
+            result: Complete result of the signed file (see _signed_result)
+            cert_serial: Signer certificate serial (hex)
+            professional: Whether the file carries a professional timestamp
+        """
+        if self.signing_cache is not None and result.source_sha256:
+            self.signing_cache.store(
+                result.source_sha256,
+                cert_serial,
+                result.output,
+                verification_url=result.verification_url,
+                record_id=result.record_id,
+                professional=professional,
+                options=self._cache_options(professional),
+            )
+        self._emit_result(result)
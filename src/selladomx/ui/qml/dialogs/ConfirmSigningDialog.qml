@@ -11,6 +11,16 @@ Dialog {
     property int fileCount: 0
     property bool useProfessionalTSA: false
     property int creditBalance: 0
+    property var preflight: ({})  // Pre-flight summary from mainViewModel.preflightSummary
+
+    function formatDuration(seconds) {
+        if (seconds < 60)
+            return seconds + " s"
+        var minutes = Math.round(seconds / 60)
+        if (minutes < 60)
+            return minutes + " min"
+        return Math.floor(minutes / 60) + " h " + (minutes % 60) + " min"
+    }
 
     title: "Confirmar firma"
     modal: true
@@ -60,9 +70,28 @@ Dialog {
                     font.weight: DesignTokens.weightSemiBold
                     color: DesignTokens.textPrimary
                 }
+
+                Item { Layout.fillWidth: true }
+
+                Text {
+                    visible: confirmDialog.preflight.estimatedSeconds !== undefined
+                    text: "Tiempo estimado: ~" + confirmDialog.formatDuration(confirmDialog.preflight.estimatedSeconds || 0)
+                    font.pixelSize: DesignTokens.fontSm
+                    color: DesignTokens.textSecondary
+                }
             }
         }
 
+        // Files excluded by the pre-flight analysis
+        Text {
+            visible: (confirmDialog.preflight.skipped || 0) > 0
+            text: "⚠ Se omitirán " + confirmDialog.preflight.skipped + " archivo(s) que no se pueden firmar (ver detalle en el registro)"
+            font.pixelSize: DesignTokens.fontSm
+            color: DesignTokens.warning
+            Layout.fillWidth: true
+            wrapMode: Text.WordWrap
+        }
+
         // TSA Tier info
         Rectangle {
             Layout.fillWidth: true
@@ -26,17 +26,27 @@ Window {
         onboardingLoader.active = true
     }
 
+    // Instantiate a lazily loaded dialog on first use
+    function dialog(loader) {
+        loader.active = true
+        return loader.item
+    }
+
     // Global dialog functions (called from child components)
     function showBenefitsDialog() {
-        benefitsDialog.open()
+        dialog(benefitsDialogLoader).open()
     }
 
     function showTokenConfigDialog() {
-        tokenConfigDialog.open()
+        dialog(tokenConfigDialogLoader).open()
     }
 
     function showTokenManagementDialog() {
-        tokenManagementDialog.open()
+        dialog(tokenManagementDialogLoader).open()
+    }
+
+    function showHistoryDialog() {
+        dialog(historyDialogLoader).open()
     }
 
     // Main layout
@@ -178,31 +188,51 @@ Window {
         }
     }
 
-    // Centralized dialogs (shared across all components)
-    BenefitsDialog {
-        id: benefitsDialog
-        anchors.centerIn: parent
+    // Centralized dialogs (shared across all components), created on first use
+    Loader {
+        id: benefitsDialogLoader
+        active: false
+        anchors.fill: parent
+        sourceComponent: BenefitsDialog {
+            anchors.centerIn: parent
+        }
     }
 
-    TokenConfigDialog {
-        id: tokenConfigDialog
-        anchors.centerIn: parent
+    Loader {
+        id: tokenConfigDialogLoader
+        active: false
+        anchors.fill: parent
+        sourceComponent: TokenConfigDialog {
+            anchors.centerIn: parent
+        }
     }
 
-    TokenManagementDialog {
-        id: tokenManagementDialog
-        anchors.centerIn: parent
+    Loader {
+        id: tokenManagementDialogLoader
+        active: false
+        anchors.fill: parent
+        sourceComponent: TokenManagementDialog {
+            anchors.centerIn: parent
+        }
     }
 
-    HistoryDialog {
-        id: historyDialog
-        anchors.centerIn: parent
+    Loader {
+        id: historyDialogLoader
+        active: false
+        anchors.fill: parent
+        sourceComponent: HistoryDialog {
+            anchors.centerIn: parent
+        }
     }
 
     // Update available dialog
-    UpdateAvailableDialog {
-        id: updateDialog
-        anchors.centerIn: parent
+    Loader {
+        id: updateDialogLoader
+        active: false
+        anchors.fill: parent
+        sourceComponent: UpdateAvailableDialog {
+            anchors.centerIn: parent
+        }
     }
 
     // Check for updates shortly after startup
@@ -216,6 +246,7 @@ Window {
     Connections {
         target: updateChecker
         function onUpdateAvailable(latestVersion, downloadUrl) {
+            var updateDialog = dialog(updateDialogLoader)
             updateDialog.latestVersion = latestVersion
             updateDialog.downloadUrl = downloadUrl
             updateDialog.open()
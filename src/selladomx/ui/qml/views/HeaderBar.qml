@@ -192,7 +192,7 @@ Rectangle {
                 MenuItem {
                     text: "📋 Historial de documentos"
                     enabled: mainViewModel.hasProfessionalTSA
-                    onTriggered: historyDialog.open()
+                    onTriggered: mainWindow.showHistoryDialog()
                 }
 
                 MenuSeparator {}
@@ -65,16 +65,26 @@ StepIndicator {
                         // Filename
                         Text {
                             Layout.fillWidth: true
-                            text: {
-                                var path = modelData
-                                var lastSlash = Math.max(path.lastIndexOf("/"), path.lastIndexOf("\\"))
-                                return lastSlash >= 0 ? path.substring(lastSlash + 1) : path
-                            }
+                            text: model.fileName
                             color: DesignTokens.textPrimary
                             elide: Text.ElideMiddle
                             font.pixelSize: DesignTokens.fontBase
                         }
 
+                        // Size and page count (collected in the background)
+                        Text {
+                            text: {
+                                if (model.sizeBytes < 0)
+                                    return ""
+                                var size = model.sizeBytes >= 1048576
+                                    ? (model.sizeBytes / 1048576).toFixed(1) + " MB"
+                                    : Math.max(1, Math.round(model.sizeBytes / 1024)) + " KB"
+                                return model.pageCount > 0 ? size + " · " + model.pageCount + " pág." : size
+                            }
+                            color: DesignTokens.textTertiary
+                            font.pixelSize: DesignTokens.fontSm
+                        }
+
                         // Remove button
                         ToolButton {
                             text: "✕"
@@ -111,7 +121,7 @@ StepIndicator {
                         }
 
                         Text {
-                            text: "Arrastra PDFs aquí o haz clic en Agregar"
+                            text: "Arrastra PDFs o carpetas aquí o haz clic en Agregar"
                             color: DesignTokens.textSecondary
                             font.pixelSize: DesignTokens.fontBase
                             Layout.alignment: Qt.AlignHCenter
@@ -127,17 +137,12 @@ StepIndicator {
 
                 onDropped: {
                     if (drop.hasUrls) {
-                        // Filter for PDF files only
-                        var pdfUrls = []
+                        // Files and folders; folders are scanned for PDFs in the background
+                        var urls = []
                         for (var i = 0; i < drop.urls.length; i++) {
-                            var url = drop.urls[i].toString()
-                            if (url.toLowerCase().endsWith('.pdf')) {
-                                pdfUrls.push(url)
-                            }
-                        }
-                        if (pdfUrls.length > 0) {
-                            mainViewModel.addPdfFiles(pdfUrls)
+                            urls.push(drop.urls[i].toString())
                         }
+                        mainViewModel.addPdfFiles(urls)
                     }
                 }
 
@@ -205,17 +210,40 @@ StepIndicator {
                 onClicked: fileDialog.open()
             }
 
+            ModernButton {
+                text: "Agregar carpeta..."
+                variant: "secondary"
+                onClicked: folderDialog.open()
+            }
+
             ModernButton {
                 text: "Limpiar lista"
                 variant: "secondary"
                 enabled: mainViewModel.pdfCount > 0
                 onClicked: mainViewModel.clearPdfList()
             }
+
+            Item { Layout.fillWidth: true }
+
+            // Folder scan indicator
+            BusyIndicator {
+                visible: mainViewModel.isScanning
+                running: mainViewModel.isScanning
+                Layout.preferredWidth: 24
+                Layout.preferredHeight: 24
+            }
+
+            ModernButton {
+                visible: mainViewModel.isScanning
+                text: "Detener búsqueda"
+                variant: "secondary"
+                onClicked: mainViewModel.cancelScan()
+            }
         }
 
         // Info text
         Text {
-            text: "💡 Puedes seleccionar múltiples archivos o arrastrarlos a la lista"
+            text: "💡 Puedes seleccionar múltiples archivos o arrastrar carpetas completas a la lista"
             font.pixelSize: DesignTokens.fontSm
             color: DesignTokens.textTertiary
             wrapMode: Text.WordWrap
@@ -236,4 +264,15 @@ StepIndicator {
         }
     }
 
+    // Folder selection dialog (searched recursively for PDFs)
+    FolderDialog {
+        id: folderDialog
+        title: "Seleccionar carpeta con PDFs"
+        currentFolder: StandardPaths.writableLocation(StandardPaths.DocumentsLocation)
+
+        onAccepted: {
+            mainViewModel.addPdfFiles([selectedFolder])
+        }
+    }
+
 }
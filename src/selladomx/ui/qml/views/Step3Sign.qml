@@ -165,7 +165,7 @@ StepIndicator {
                 spacing: DesignTokens.md
 
                 Text {
-                    text: "Firmando documentos... " + mainViewModel.currentProgress + " / " + mainViewModel.pdfCount
+                    text: "Firmando documentos... " + mainViewModel.currentProgress + " / " + mainViewModel.signingProgress
                     font.pixelSize: DesignTokens.fontBase
                     font.weight: DesignTokens.weightSemiBold
                     color: DesignTokens.textPrimary
@@ -176,7 +176,7 @@ StepIndicator {
                     Layout.fillWidth: true
 
                     from: 0
-                    to: mainViewModel.pdfCount
+                    to: mainViewModel.signingProgress
                     value: mainViewModel.currentProgress
 
                     background: Rectangle {
@@ -253,10 +253,10 @@ StepIndicator {
         ModernButton {
             Layout.fillWidth: true
             Layout.preferredHeight: DesignTokens.buttonXl
-            text: mainViewModel.signingSuccessful ? "Firmado exitosamente ✓" : mainViewModel.isSigning ? "Firmando..." : ("Firmar " + mainViewModel.pdfCount + " PDF(s)")
+            text: mainViewModel.signingSuccessful ? "Firmado exitosamente ✓" : mainViewModel.isSigning ? "Firmando..." : mainViewModel.isAnalyzing ? "Analizando documentos..." : ("Firmar " + mainViewModel.pdfCount + " PDF(s)")
             variant: "success"
-            loading: mainViewModel.isSigning
-            enabled: !mainViewModel.isSigning && !mainViewModel.signingSuccessful && mainViewModel.step1Complete && mainViewModel.step2Complete
+            loading: mainViewModel.isSigning || mainViewModel.isAnalyzing
+            enabled: !mainViewModel.isSigning && !mainViewModel.isAnalyzing && !mainViewModel.signingSuccessful && mainViewModel.step1Complete && mainViewModel.step2Complete
             onClicked: mainViewModel.confirmSigning()
         }
 
@@ -285,36 +285,51 @@ StepIndicator {
         }
 
         function onShowConfirmSigningDialog(fileCount, useProfessionalTSA, creditBalance) {
-            confirmSigningDialog.fileCount = fileCount
-            confirmSigningDialog.useProfessionalTSA = useProfessionalTSA
-            confirmSigningDialog.creditBalance = creditBalance
-            confirmSigningDialog.open()
+            var dialog = step3.dialog(confirmSigningLoader)
+            dialog.fileCount = fileCount
+            dialog.useProfessionalTSA = useProfessionalTSA
+            dialog.creditBalance = creditBalance
+            dialog.preflight = mainViewModel.preflightSummary
+            dialog.open()
         }
 
         function onVerificationUrlsReady(urls) {
-            signingSuccessDialog.verificationUrls = urls
+            step3.dialog(signingSuccessLoader).verificationUrls = urls
         }
 
         function onSigningCompleted(successCount, totalCount, usedProfessionalTSA) {
-            signingSuccessDialog.signedCount = successCount
-            signingSuccessDialog.totalCount = totalCount
-            signingSuccessDialog.usedProfessionalTSA = usedProfessionalTSA
-            signingSuccessDialog.open()
+            var dialog = step3.dialog(signingSuccessLoader)
+            dialog.signedCount = successCount
+            dialog.totalCount = totalCount
+            dialog.usedProfessionalTSA = usedProfessionalTSA
+            dialog.open()
         }
     }
 
+    // Instantiate a lazily loaded dialog on first use
+    function dialog(loader) {
+        loader.active = true
+        return loader.item
+    }
+
     // Confirmation dialog (shown before signing starts)
-    ConfirmSigningDialog {
-        id: confirmSigningDialog
-        parent: Overlay.overlay
-        anchors.centerIn: parent
+    Loader {
+        id: confirmSigningLoader
+        active: false
+        sourceComponent: ConfirmSigningDialog {
+            parent: Overlay.overlay
+            anchors.centerIn: parent
+        }
     }
 
     // Signing success dialog (kept here since it needs signing-specific data)
-    SigningSuccessDialog {
-        id: signingSuccessDialog
-        parent: Overlay.overlay
-        anchors.centerIn: parent
+    Loader {
+        id: signingSuccessLoader
+        active: false
+        sourceComponent: SigningSuccessDialog {
+            parent: Overlay.overlay
+            anchors.centerIn: parent
+        }
     }
 
     // Folder selection dialog for output directory
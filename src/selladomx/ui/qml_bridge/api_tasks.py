@@ -0,0 +1,87 @@
+"""ApiTaskRunner - Runs blocking API calls off the GUI thread."""
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject
+
+from ...utils.task_executor import TaskExecutor, TaskHandle, TaskPriority
+
+logger = logging.getLogger(__name__)
+
+SuccessCallback = Callable[[Any], None]
+ErrorCallback = Callable[[Exception], None]
+# Arguments of a queued submit(): fn, on_success, on_error, rerun, name
+_Call = Tuple[Callable[[], Any], SuccessCallback, ErrorCallback, bool, Optional[str]]
+
+
+class ApiTaskRunner(QObject):
+    """Runs API calls on the shared TaskExecutor, one per key at a time.
+
+    Callbacks are invoked on the GUI thread. A call submitted while another
+    with the same key is in flight is coalesced: it is dropped, or with
+    rerun=True it replaces any queued call and runs once the current one
+    finishes (use this when the in-flight result may already be outdated).
+    """
+
+    def __init__(self, parent=None, executor: Optional[TaskExecutor] = None):
+        super().__init__(parent)
+        self._executor = executor or TaskExecutor.shared()
+        self._running: Dict[str, TaskHandle] = {}
+        self._queued: Dict[str, _Call] = {}
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        on_success: SuccessCallback,
+        on_error: ErrorCallback,
+        rerun: bool = False,
+        name: Optional[str] = None,
+    ) -> bool:
+        """Run fn in the background.
+
+        Args:
+            key: Identifies equivalent calls for coalescing
+            fn: Blocking call to run
+            on_success: Called with the result on the GUI thread
+            on_error: Called with the exception on the GUI thread
+            rerun: Run again after an in-flight call with the same key
+            name: Name for the executor stats (default: the key)
+
+        Returns:
+            True if the call started now, False if it was coalesced
+        """
+        if key in self._running:
+            if rerun:
+                self._queued[key] = (fn, on_success, on_error, False, name)
+            logger.debug(f"API task {key} already running, coalesced")
+            return False
+
+        handle = self._executor.submit(fn, name=name or key, priority=TaskPriority.HIGH)
+        handle.succeeded.connect(on_success)
+        handle.failed.connect(on_error)
+        handle.finished.connect(lambda: self._on_finished(key))
+        self._running[key] = handle
+        return True
+
+    def is_running(self, key: Optional[str] = None) -> bool:
+        """Check whether a call (with the given key, or any) is in flight."""
+        if key is None:
+            return bool(self._running)
+        return key in self._running
+
+    def cancel_all(self):
+        """Discard the results of every call in flight or queued."""
+        self._queued.clear()
+        for handle in self._running.values():
+            handle.cancel()
+
+    def _on_finished(self, key: str):
+        self._running.pop(key, None)
+        queued = self._queued.pop(key, None)
+        if queued is not None:
+            self.submit(key, *queued)
+
+    def wait(self, timeout_ms: int = 5000) -> bool:
+        """Block until the executor is idle (for shutdown and tests)."""
+        return self._executor.wait_for_done(timeout_ms)
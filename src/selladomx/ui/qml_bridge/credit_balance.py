@@ -0,0 +1,129 @@
+"""CreditBalanceCache - TTL cache of the professional TSA credit balance."""
+import logging
+import time
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from ...config import CREDIT_BALANCE_TTL
+from ...utils.task_executor import TaskExecutor, TaskHandle
+
+logger = logging.getLogger(__name__)
+
+
+def _fetch_balance(api_key: str) -> int:
+    """Fetch the credit balance from the API (blocking)."""
+    from ...api.client import SelladoMXAPIClient
+
+    response = SelladoMXAPIClient(api_key=api_key).get_balance()
+    return int(response.get("credits_remaining", 0))
+
+
+class CreditBalanceCache(QObject):
+    """Serves the credit balance without blocking the GUI thread.
+
+    The balance is considered fresh for `ttl` seconds after it was last
+    fetched or reported by the API. Every professional timestamp response
+    carries `credits_remaining`, so during a batch the balance stays fresh
+    via update() and no extra /balance call is needed. refresh() only hits
+    the API when the value is stale (or forced), on a background thread,
+    and concurrent refreshes are coalesced into one request.
+    """
+
+    balanceChanged = Signal(int)
+    refreshFailed = Signal(str)
+
+    def __init__(
+        self,
+        balance: int = 0,
+        ttl: float = CREDIT_BALANCE_TTL,
+        parent=None,
+        executor: Optional[TaskExecutor] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            balance: Last known balance (shown until the first refresh)
+            ttl: Seconds a fetched balance is considered fresh
+            parent: Parent QObject
+            executor: Executor for the API call (default: the shared one)
+        """
+        super().__init__(parent)
+        self.ttl = ttl
+        self._balance = balance
+        self._fetched_at: Optional[float] = None  # Seeded value is stale
+        self._executor = executor or TaskExecutor.shared()
+        self._task: Optional[TaskHandle] = None
+
+    @property
+    def balance(self) -> int:
+        """Last known balance."""
+        return self._balance
+
+    def is_stale(self) -> bool:
+        """Check whether the balance is older than the TTL."""
+        if self._fetched_at is None:
+            return True
+        return time.monotonic() - self._fetched_at >= self.ttl
+
+    def is_refreshing(self) -> bool:
+        """Check whether a background refresh has not been delivered yet."""
+        return self._task is not None
+
+    def update(self, balance: int):
+        """Store a balance reported by the API and restart the TTL."""
+        self._fetched_at = time.monotonic()
+        if balance != self._balance:
+            self._balance = balance
+            self.balanceChanged.emit(balance)
+
+    def invalidate(self):
+        """Mark the balance stale so the next refresh() fetches it."""
+        self._fetched_at = None
+
+    def clear(self):
+        """Forget the balance (e.g. when the API key is removed)."""
+        self.invalidate()
+        if self._balance != 0:
+            self._balance = 0
+            self.balanceChanged.emit(0)
+
+    def refresh(self, api_key: str, force: bool = False) -> bool:
+        """Fetch the balance in the background if it is stale.
+
+        Args:
+            api_key: API key for the SelladoMX API
+            force: Fetch even if the cached balance is still fresh
+
+        Returns:
+            True if a request is in flight after the call
+        """
+        if self.is_refreshing():
+            return True
+        if not force and not self.is_stale():
+            return False
+
+        self._task = self._executor.submit(
+            lambda: _fetch_balance(api_key), name="credits/balance"
+        )
+        self._task.succeeded.connect(self._on_loaded)
+        self._task.failed.connect(self._on_error)
+        self._task.finished.connect(self._cleanup)
+        return True
+
+    def _on_loaded(self, balance: int):
+        self.update(balance)
+        logger.info(f"Credit balance updated: {balance}")
+
+    def _on_error(self, error: Exception):
+        logger.error(f"Failed to refresh credit balance: {error}")
+        self.refreshFailed.emit(str(error))
+
+    def _cleanup(self):
+        self._task = None
+
+    def wait(self, timeout_ms: int = 5000) -> bool:
+        """Block until a running refresh finishes (for shutdown and tests)."""
+        if self._task is None:
+            return True
+        return self._executor.wait_for_done(timeout_ms)
@@ -1,13 +1,13 @@
 """MainViewModel - Central bridge between Python backend and QML UI."""
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from PySide6.QtCore import QObject, Signal, Slot, Property, QUrl
 
-from ...signing.certificate_validator import CertificateValidator
 from ...errors import CertificateError, CertificateExpiredError, CertificateRevokedError
 from ...utils.settings_manager import SettingsManager
+from ...utils.pdf_scanner import PdfScanWorker
 from ...config import (
     COLOR_SUCCESS,
     COLOR_ERROR,
@@ -17,12 +17,25 @@ from ...config import (
     COLOR_MUTED_LIGHT,
     IS_DEBUG,
 )
-from .signing_coordinator import SigningCoordinator
-from .history_view_model import HistoryViewModel
+from .api_tasks import ApiTaskRunner
+from .credit_balance import CreditBalanceCache
+from .pdf_file_model import PdfFileListModel
+
+if TYPE_CHECKING:
+    # The signing/crypto stack is imported on first use (or by the startup
+    # warm-up) so it does not delay the first frame
+    from ...signing.preflight import PreflightReport, PreflightWorker
+    from .history_view_model import HistoryViewModel
+    from .signing_coordinator import SigningCoordinator
 
 logger = logging.getLogger(__name__)
 
 
+def _api_message(error: Exception) -> str:
+    """User-facing message of an API error (or any exception)."""
+    return getattr(error, "message", None) or str(error)
+
+
 class MainViewModel(QObject):
     """ViewModel principal que expone toda la lógica a QML.
 
@@ -48,6 +61,9 @@ class MainViewModel(QObject):
     creditBalanceChanged = Signal()
     outputDirChanged = Signal()
     signingSuccessfulChanged = Signal()
+    isScanningChanged = Signal()
+    isAnalyzingChanged = Signal()
+    preflightSummaryChanged = Signal()
 
     # Signals for token management
     tokensLoaded = Signal(list)
@@ -72,7 +88,9 @@ class MainViewModel(QObject):
     formReset = Signal()
 
     def __init__(
-        self, settings_manager: SettingsManager, signing_coordinator: SigningCoordinator
+        self,
+        settings_manager: SettingsManager,
+        signing_coordinator: "SigningCoordinator",
     ):
         """Initialize the MainViewModel.
 
@@ -85,7 +103,12 @@ class MainViewModel(QObject):
         self.coordinator = signing_coordinator
 
         # Internal state
-        self._pdf_files: List[str] = []
+        self._file_model = PdfFileListModel(self)
+        self._scan_worker: Optional[PdfScanWorker] = None
+        self._pending_scan_roots: List[str] = []
+        self._scan_cancelled = False  # Drop batches still queued from the scan
+        self._preflight_worker: Optional["PreflightWorker"] = None
+        self._preflight_report: Optional["PreflightReport"] = None
         self._step1_complete = False
         self._step2_complete = False
         self._cert_path = ""
@@ -101,13 +124,16 @@ class MainViewModel(QObject):
         self._output_dir = ""
         self._signing_successful = False
 
-        # Token management state
+        # Token management state (API calls run in the background)
         self._tokens_list: list[dict] = []
+        self._tokens_generation = 0  # Bumped on every local change
+        self._token_mutations = 0  # Gives each derive its own task key
+        self._token_tasks = ApiTaskRunner(self)
         self._is_primary_token: bool = False
 
         # API client and history view model
         self._api_client: Optional["SelladoMXAPIClient"] = None
-        self._history_view_model: Optional[HistoryViewModel] = None
+        self._history_view_model: Optional["HistoryViewModel"] = None
 
         # Certificate objects
         self.cert = None
@@ -118,12 +144,22 @@ class MainViewModel(QObject):
         # Verification URLs collected during signing
         self._verification_urls: list[dict] = []
         self._success_count: int = 0
+        self._signing_total: int = 0
 
         # Connect coordinator signals
         self.coordinator.progressChanged.connect(self._on_signing_progress)
         self.coordinator.fileCompleted.connect(self._on_file_completed)
         self.coordinator.finished.connect(self._on_signing_finished)
 
+        # Credit balance: TTL cache kept fresh by the TSA responses of each
+        # signed file and refreshed off the GUI thread when stale
+        self._balance_cache = CreditBalanceCache(
+            self.settings.get_last_credit_balance(), parent=self
+        )
+        self._balance_cache.balanceChanged.connect(self._on_credit_balance_changed)
+        self.coordinator.creditsUpdated.connect(self._on_batch_credits_updated)
+        self._batch_credits: Optional[int] = None  # Last balance the batch reported
+
         # Load saved preferences
         self._load_saved_preferences()
 
@@ -169,33 +205,109 @@ class MainViewModel(QObject):
 
     @Slot(list)
     def addPdfFiles(self, file_urls: List[str]):
-        """Add PDF files from QML FileDialog.
+        """Add PDF files and/or folders from QML FileDialog or drag & drop.
+
+        Files with a .pdf extension are queued immediately. Folders (and any
+        other files) are handed to a background scanner that walks them and
+        streams real PDFs into the list as they are found.
 
         Args:
-            file_urls: List of file URLs from QML (file:///path/to.pdf)
+            file_urls: List of file or folder URLs from QML (file:///path/to.pdf)
         """
+        paths = []
+        scan_roots = []
         for url_str in file_urls:
-            url = QUrl(url_str)
-            path = url.toLocalFile()
-            if path and path not in self._pdf_files:
-                self._pdf_files.append(path)
-                logger.info(f"Added PDF: {path}")
+            path = QUrl(url_str).toLocalFile()
+            if not path:
+                continue
+            if path.lower().endswith(".pdf") and not Path(path).is_dir():
+                paths.append(path)
+            else:
+                scan_roots.append(path)
+
+        if paths:
+            added = self._file_model.add_paths(paths)
+            logger.info(f"Added {added} PDF(s)")
+            self._update_step1_complete()
+            self._append_status_log(f"✓ {added} archivo(s) agregado(s)", COLOR_SUCCESS)
+
+        if scan_roots:
+            self._start_scan(scan_roots)
 
-        self._step1_complete = len(self._pdf_files) > 0
-        self.pdfFilesChanged.emit()
-        self.step1CompleteChanged.emit()
+    @Slot()
+    def cancelScan(self):
+        """Cancel the running folder scan (callable from QML)."""
+        self._pending_scan_roots.clear()
+        if self._scan_worker and self._scan_worker.isRunning():
+            self._scan_cancelled = True
+            self._scan_worker.requestInterruption()
+
+    def _start_scan(self, roots: List[str]):
+        """Start a background PDF scan, or queue it behind the running one.
+
+        Args:
+            roots: Folders to walk and/or files to check by magic bytes
+        """
+        if self._scan_worker is not None:
+            self._pending_scan_roots.extend(roots)
+            return
+
+        self._scan_cancelled = False
+        self._scan_worker = PdfScanWorker(roots)
+        self._scan_worker.files_found.connect(self._on_scan_files_found)
+        self._scan_worker.scan_finished.connect(self._on_scan_finished)
+        self._scan_worker.finished.connect(self._on_scan_worker_done)
+        self._scan_worker.start()
+        self.isScanningChanged.emit()
+
+        self._append_status_log("Buscando PDFs en carpeta(s)...", COLOR_INFO)
 
+    def _on_scan_files_found(self, paths: List[str]):
+        """Add a batch of PDFs discovered by the scanner.
+
+        Args:
+            paths: Discovered PDF paths
+        """
+        if self._scan_cancelled:
+            return
+        if self._file_model.add_paths(paths):
+            self._update_step1_complete()
+
+    def _on_scan_finished(self, found_count: int):
+        """Handle scan completion.
+
+        Args:
+            found_count: Number of PDFs found by the scan
+        """
+        if self._scan_cancelled:
+            return
         self._append_status_log(
-            f"✓ {len(file_urls)} archivo(s) agregado(s)", COLOR_SUCCESS
+            f"✓ {found_count} PDF(s) encontrado(s) en carpeta(s)", COLOR_SUCCESS
         )
 
+    def _on_scan_worker_done(self):
+        """Clean up the scan thread and start any queued scan."""
+        if self._scan_worker:
+            self._scan_worker.deleteLater()
+            self._scan_worker = None
+
+        if self._pending_scan_roots:
+            roots, self._pending_scan_roots = self._pending_scan_roots, []
+            self._start_scan(roots)
+        else:
+            self.isScanningChanged.emit()
+
+    @Property(bool, notify=isScanningChanged)
+    def isScanning(self) -> bool:
+        """Whether a folder scan is in progress (property for QML)."""
+        return self._scan_worker is not None
+
     @Slot()
     def clearPdfList(self):
-        """Clear the PDF files list."""
-        self._pdf_files.clear()
-        self._step1_complete = False
-        self.pdfFilesChanged.emit()
-        self.step1CompleteChanged.emit()
+        """Clear the PDF files list (and stop a folder scan still adding to it)."""
+        self.cancelScan()
+        self._file_model.clear()
+        self._update_step1_complete()
 
         self._append_status_log("Lista de PDFs limpiada", COLOR_MUTED)
 
@@ -206,22 +318,27 @@ class MainViewModel(QObject):
         Args:
             index: Index of PDF to remove
         """
-        if 0 <= index < len(self._pdf_files):
-            removed = self._pdf_files.pop(index)
+        removed = self._file_model.remove_at(index)
+        if removed is not None:
             logger.info(f"Removed PDF: {removed}")
-            self._step1_complete = len(self._pdf_files) > 0
-            self.pdfFilesChanged.emit()
-            self.step1CompleteChanged.emit()
+            self._update_step1_complete()
 
-    @Property(list, notify=pdfFilesChanged)
-    def pdfFiles(self) -> List[str]:
-        """Get list of PDF files (property for QML)."""
-        return self._pdf_files
+    def _update_step1_complete(self):
+        """Recompute step 1 state after the file queue changed."""
+        self._step1_complete = len(self._file_model) > 0
+        self._preflight_report = None
+        self.pdfFilesChanged.emit()
+        self.step1CompleteChanged.emit()
+
+    @Property(QObject, constant=True)
+    def pdfFiles(self) -> PdfFileListModel:
+        """Get the PDF file queue model (property for QML)."""
+        return self._file_model
 
     @Property(int, notify=pdfFilesChanged)
     def pdfCount(self) -> int:
         """Get count of PDF files (property for QML)."""
-        return len(self._pdf_files)
+        return len(self._file_model)
 
     @Property(bool, notify=step1CompleteChanged)
     def step1Complete(self) -> bool:
@@ -318,6 +435,8 @@ class MainViewModel(QObject):
             key_path: Path to private key file
             password: Password for private key
         """
+        from ...signing.certificate_validator import CertificateValidator
+
         try:
             logger.info("Validating certificate...")
             validator = CertificateValidator(cert_path, key_path, password)
@@ -404,19 +523,109 @@ class MainViewModel(QObject):
 
     @Slot()
     def confirmSigning(self):
-        """Show confirmation dialog before signing starts."""
+        """Analyze queued PDFs, then show confirmation dialog before signing.
+
+        The pre-flight analysis runs in a background thread; the dialog is
+        shown from _on_preflight_ready once every file has been classified.
+        """
         if not self._step1_complete or not self._step2_complete:
             self._append_status_log(
                 "✗ Completa los pasos anteriores primero", COLOR_ERROR
             )
             return
 
+        if self._preflight_worker is not None:
+            logger.warning("Pre-flight analysis already in progress")
+            return
+
+        from ...signing.preflight import PreflightWorker
+
+        cert_der = None
+        if self.cert is not None:
+            from cryptography.hazmat.primitives import serialization
+
+            cert_der = self.cert.public_bytes(serialization.Encoding.DER)
+
+        self._preflight_worker = PreflightWorker(
+            [Path(p) for p in self._file_model.paths()],
+            signer_cert_der=cert_der,
+            use_professional_tsa=self._use_professional_tsa,
+        )
+        self._preflight_worker.report_ready.connect(self._on_preflight_ready)
+        self._preflight_worker.finished.connect(self._on_preflight_worker_done)
+        self._preflight_worker.start()
+        self.isAnalyzingChanged.emit()
+
+        self._append_status_log(
+            f"Analizando {len(self._file_model)} documento(s)...", COLOR_INFO
+        )
+
+    def _on_preflight_ready(self, report: "PreflightReport"):
+        """Store the pre-flight report and show the confirmation dialog.
+
+        Args:
+            report: Pre-flight analysis of the queued files
+        """
+        from ...signing.preflight import PreflightStatus
+
+        if not self._preflight_matches(report):
+            # The queue or the TSA mode changed while the analysis ran
+            logger.info("Discarding stale pre-flight report")
+            self._append_status_log(
+                "⚠ La lista cambió durante el análisis, confirma de nuevo",
+                COLOR_WARNING,
+            )
+            return
+
+        self._preflight_report = report
+        self.preflightSummaryChanged.emit()
+
+        skipped_messages = {
+            PreflightStatus.ENCRYPTED: "protegido con contraseña",
+            PreflightStatus.NEEDS_REPAIR: "dañado, requiere reparación",
+            PreflightStatus.ALREADY_SIGNED: "ya firmado con este certificado",
+            PreflightStatus.TOO_LARGE: "demasiado grande",
+            PreflightStatus.UNREADABLE: "no se pudo leer",
+        }
+        for result in report.skipped:
+            self._append_status_log(
+                f"⚠ Se omitirá {result.path.name}: {skipped_messages[result.status]}",
+                COLOR_WARNING,
+            )
+
+        if not report.signable:
+            self._append_status_log("✗ Ningún documento se puede firmar", COLOR_ERROR)
+            return
+
         self.showConfirmSigningDialog.emit(
-            len(self._pdf_files),
+            len(report.signable),
             self._use_professional_tsa,
             self._credit_balance,
         )
 
+    def _preflight_matches(self, report: "PreflightReport") -> bool:
+        """Whether a report still describes the current queue and TSA mode."""
+        return report.matches(self._file_model.paths(), self._use_professional_tsa)
+
+    def _on_preflight_worker_done(self):
+        """Clean up the pre-flight thread."""
+        if self._preflight_worker:
+            self._preflight_worker.deleteLater()
+            self._preflight_worker = None
+        self.isAnalyzingChanged.emit()
+
+    @Property(bool, notify=isAnalyzingChanged)
+    def isAnalyzing(self) -> bool:
+        """Whether the pre-flight analysis is running (property for QML)."""
+        return self._preflight_worker is not None
+
+    @Property("QVariantMap", notify=preflightSummaryChanged)
+    def preflightSummary(self) -> dict:
+        """Get the last pre-flight summary (property for QML)."""
+        if self._preflight_report is None:
+            return {}
+        return self._preflight_report.to_dict()
+
     @Slot()
     def startSigning(self):
         """Start the signing process."""
@@ -436,6 +645,7 @@ class MainViewModel(QObject):
         self._status_log = ""
         self._verification_urls = []
         self._success_count = 0
+        self._batch_credits = None
         self.isSigningChanged.emit()
         self.signingSuccessfulChanged.emit()
         self.currentProgressChanged.emit()
@@ -453,24 +663,47 @@ class MainViewModel(QObject):
                 self.isSigningChanged.emit()
                 return
 
-        # Convert paths to Path objects
-        pdf_paths = [Path(p) for p in self._pdf_files]
+        # Sign only files the pre-flight analysis found signable, as long as
+        # it analyzed this same queue and TSA mode
+        report = self._preflight_report
+        if report is not None and not self._preflight_matches(report):
+            logger.info("Pre-flight report is stale, signing the whole queue")
+            self._preflight_report = report = None
+            self.preflightSummaryChanged.emit()
+        if report is not None:
+            pdf_paths = report.signable_paths
+        else:
+            pdf_paths = [Path(p) for p in self._file_model.paths()]
 
+        self._signing_total = len(pdf_paths)
         self._append_status_log(
             f"Iniciando firma de {len(pdf_paths)} documento(s)...", COLOR_INFO
         )
 
         # Start signing
-        self.coordinator.start(
-            pdf_paths=pdf_paths,
-            cert=self.cert,
-            private_key=self.private_key,
-            use_professional_tsa=self._use_professional_tsa,
-            api_key=api_key,
-            signer_cn=self.signer_cn,
-            signer_serial=self.signer_serial,
-            output_dir=Path(self._output_dir) if self._output_dir else None,
-        )
+        try:
+            self.coordinator.start(
+                pdf_paths=pdf_paths,
+                cert=self.cert,
+                private_key=self.private_key,
+                use_professional_tsa=self._use_professional_tsa,
+                api_key=api_key,
+                signer_cn=self.signer_cn,
+                signer_serial=self.signer_serial,
+                output_dir=Path(self._output_dir) if self._output_dir else None,
+                credit_policy=self.settings.get_credit_policy(),
+                merkle_timestamp=self.settings.get_merkle_timestamp(),
+                signature_level=self.settings.get_signature_level(),
+                stamp_pages=self.settings.get_stamp_pages(),
+                report_format=self.settings.get_report_format(),
+                failure_policy=self.settings.get_failure_policy(),
+            )
+        except Exception as e:
+            # Nothing was started: leave the form ready to try again
+            logger.error(f"Could not start signing: {e}")
+            self._append_status_log(f"✗ No se pudo iniciar la firma: {e}", COLOR_ERROR)
+            self._is_signing = False
+            self.isSigningChanged.emit()
 
     def _on_signing_progress(self, current: int, total: int):
         """Handle signing progress update.
@@ -521,7 +754,7 @@ class MainViewModel(QObject):
         self._is_signing = False
         self.isSigningChanged.emit()
 
-        total_count = len(self._pdf_files)
+        total_count = self._signing_total
         success_count = self._success_count
 
         self._signing_successful = success_count > 0
@@ -536,6 +769,10 @@ class MainViewModel(QObject):
                 "✓ Todos los documentos firmados exitosamente", COLOR_SUCCESS
             )
 
+        report_path = self.coordinator.report_path
+        if report_path is not None and report_path.exists():
+            self._append_status_log(f"Reporte del lote: {report_path}", COLOR_INFO)
+
         # Emit verification URLs if any were collected
         if self._verification_urls:
             self.verificationUrlsReady.emit(self._verification_urls)
@@ -545,8 +782,9 @@ class MainViewModel(QObject):
             success_count, total_count, self._use_professional_tsa
         )
 
-        # Refresh credit balance if professional TSA was used
-        if self._use_professional_tsa:
+        # The balance was updated from each TSA response; only fetch it if
+        # no professional file was stamped in this batch
+        if self._use_professional_tsa and self._batch_credits is None:
             self._refresh_credit_balance()
 
     def _append_status_log(self, message: str, color: str):
@@ -599,8 +837,10 @@ class MainViewModel(QObject):
         """Reset the form after successful signing.
 
         Clears PDF files and signing state but preserves certificate (Step 2).
+        A folder scan still running is stopped so it cannot refill the list.
         """
-        self._pdf_files.clear()
+        self.cancelScan()
+        self._file_model.clear()
         self._step1_complete = False
         self._signing_successful = False
         self._current_progress = 0
@@ -638,32 +878,41 @@ class MainViewModel(QObject):
 
     @Slot()
     def refreshCreditBalance(self):
-        """Refresh credit balance from API."""
-        self._refresh_credit_balance()
+        """Refresh credit balance from API (in the background)."""
+        self._refresh_credit_balance(force=True)
 
-    def _refresh_credit_balance(self):
-        """Refresh credit balance from API (internal)."""
-        from ...api.client import SelladoMXAPIClient
-        from ...api.exceptions import APIError
+    def _refresh_credit_balance(self, force: bool = False):
+        """Refresh credit balance from API if the cached one is stale.
+
+        Never blocks: the request runs on a background thread and the
+        balance is updated through creditBalanceChanged when it arrives.
 
+        Args:
+            force: Fetch even if the cached balance is still fresh
+        """
         api_key = self.settings.get_token()
         if not api_key:
-            self._credit_balance = 0
-            self.creditBalanceChanged.emit()
+            self._balance_cache.clear()
             self.hasProfessionalTSAChanged.emit()
             return
 
-        try:
-            client = SelladoMXAPIClient(api_key=api_key)
-            response = client.get_balance()
-            self._credit_balance = response.get("credits_remaining", 0)
-            self.settings.set_last_credit_balance(self._credit_balance)
-            self.creditBalanceChanged.emit()
-            self.hasProfessionalTSAChanged.emit()
+        self._balance_cache.refresh(api_key, force=force)
 
-            logger.info(f"Credit balance updated: {self._credit_balance}")
-        except APIError as e:
-            logger.error(f"Failed to refresh credit balance: {e}")
+    def _update_credit_balance(self, balance: int):
+        """Store a balance reported by the API (restarts the cache TTL)."""
+        self._balance_cache.update(balance)
+
+    def _on_batch_credits_updated(self, balance: int):
+        """Store the credits_remaining reported by a professional stamp."""
+        self._batch_credits = balance
+        self._update_credit_balance(balance)
+
+    def _on_credit_balance_changed(self, balance: int):
+        """Persist and publish a new credit balance."""
+        self._credit_balance = balance
+        self.settings.set_last_credit_balance(balance)
+        self.creditBalanceChanged.emit()
+        self.hasProfessionalTSAChanged.emit()
 
     @Property(bool, notify=useProfessionalTSAChanged)
     def useProfessionalTSA(self) -> bool:
@@ -705,11 +954,9 @@ class MainViewModel(QObject):
                 self.settings.set_token_info(response["token_info"])
                 self._is_primary_token = response["token_info"].get("is_primary", False)
                 self.isPrimaryTokenChanged.emit()
-            self.settings.set_last_credit_balance(response["credits_remaining"])
 
-            # Update internal state
-            self._credit_balance = response["credits_remaining"]
-            self.creditBalanceChanged.emit()
+            # Update internal state (persists the balance)
+            self._update_credit_balance(response["credits_remaining"])
 
             # Reset history view model to force re-creation with new token
             self._api_client = None
@@ -756,10 +1003,11 @@ class MainViewModel(QObject):
         return self._is_primary_token
 
     @Property(QObject, constant=False, notify=hasProfessionalTSAChanged)
-    def historyViewModel(self) -> Optional[HistoryViewModel]:
+    def historyViewModel(self) -> Optional["HistoryViewModel"]:
         """Get history view model (lazy-loaded when API client is available)."""
         if self._history_view_model is None and self.settings.has_api_key():
             from ...api.client import SelladoMXAPIClient
+            from .history_view_model import HistoryViewModel
 
             api_key = self.settings.get_token()
             if api_key:
@@ -767,83 +1015,152 @@ class MainViewModel(QObject):
                 self._history_view_model = HistoryViewModel(self._api_client)
         return self._history_view_model
 
-    @Slot()
-    def listTokens(self):
-        """List all tokens for the current user."""
+    def _token_client(self) -> Optional["SelladoMXAPIClient"]:
+        """API client for token operations, or None (and tokenError) without token."""
         from ...api.client import SelladoMXAPIClient
-        from ...api.exceptions import APIError
 
         api_key = self.settings.get_token()
         if not api_key:
             self.tokenError.emit("No se encontró token configurado")
+            return None
+        return SelladoMXAPIClient(api_key=api_key)
+
+    def _set_tokens_list(self, tokens: list[dict]):
+        self._tokens_list = tokens
+        self._tokens_generation += 1
+        self.tokensListChanged.emit()
+
+    @Slot()
+    def listTokens(self):
+        """List all tokens for the current user (in the background)."""
+        self._list_tokens()
+
+    def _list_tokens(self, rerun: bool = False):
+        """Fetch the derived tokens in the background.
+
+        Args:
+            rerun: Fetch again after a request already in flight, whose
+                result may predate a local change
+        """
+        client = self._token_client()
+        if client is None:
             return
 
-        try:
-            client = SelladoMXAPIClient(api_key=api_key)
-            response = client.list_tokens()
-            self._tokens_list = response.get("derived", [])
-            self.tokensListChanged.emit()
+        generation = self._tokens_generation
+
+        def on_success(response: dict):
+            if self._tokens_generation != generation:
+                # Changed locally while in flight; a newer fetch is queued
+                return
+            self._set_tokens_list(response.get("derived", []))
             self.tokensLoaded.emit(self._tokens_list)
             logger.info(f"Loaded {len(self._tokens_list)} derived tokens")
-        except APIError as e:
+
+        def on_error(e: Exception):
             logger.error(f"Failed to list tokens: {e}")
-            self.tokenError.emit(f"Error al cargar subtokens: {e.message}")
+            self.tokenError.emit(f"Error al cargar subtokens: {_api_message(e)}")
+
+        self._token_tasks.submit(
+            "tokens/list", client.list_tokens, on_success, on_error, rerun=rerun
+        )
 
     @Slot(str, int)
     def deriveToken(self, alias: str, expires_in_days: int):
-        """Create a derived token.
+        """Create a derived token (in the background).
 
         Args:
             alias: User-friendly name for the token
             expires_in_days: Expiration in days (0 = no expiration)
         """
-        from ...api.client import SelladoMXAPIClient
-        from ...api.exceptions import APIError, PrimaryTokenRequiredError
+        from ...api.exceptions import PrimaryTokenRequiredError
 
-        api_key = self.settings.get_token()
-        if not api_key:
-            self.tokenError.emit("No se encontró token configurado")
+        client = self._token_client()
+        if client is None:
             return
 
-        try:
-            client = SelladoMXAPIClient(api_key=api_key)
-            expires = expires_in_days if expires_in_days > 0 else None
-            response = client.derive_token(alias, expires)
-            self.tokenDerived.emit(response)
+        expires = expires_in_days if expires_in_days > 0 else None
+        # Never coalesced: a second derive with the same alias is a new token
+        self._token_mutations += 1
+
+        def on_success(response: dict):
             logger.info(f"Derived token created: {alias}")
-            # Refresh the list
-            self.listTokens()
-        except PrimaryTokenRequiredError:
-            self.tokenError.emit("Se requiere el token primario para crear subtokens")
-        except APIError as e:
+            # Show it right away; the refresh below brings the server's view.
+            # The secret only goes to tokenDerived, never into the list.
+            self._set_tokens_list(
+                self._tokens_list
+                + [
+                    {
+                        "id": response.get("id", ""),
+                        "alias": response.get("alias", alias),
+                        "expires_at": response.get("expires_at"),
+                    }
+                ]
+            )
+            self.tokenDerived.emit(response)
+            self._list_tokens(rerun=True)
+
+        def on_error(e: Exception):
+            if isinstance(e, PrimaryTokenRequiredError):
+                self.tokenError.emit(
+                    "Se requiere el token primario para crear subtokens"
+                )
+                return
             logger.error(f"Failed to derive token: {e}")
-            self.tokenError.emit(f"Error al crear subtoken: {e.message}")
+            self.tokenError.emit(f"Error al crear subtoken: {_api_message(e)}")
+
+        self._token_tasks.submit(
+            f"tokens/derive/{self._token_mutations}",
+            lambda: client.derive_token(alias, expires),
+            on_success,
+            on_error,
+            name="tokens/derive",
+        )
 
     @Slot(str)
     def revokeToken(self, token_id: str):
-        """Revoke a token by ID.
+        """Revoke a token by ID (in the background).
+
+        The token disappears from tokensList immediately and is put back
+        (without undoing other changes made meanwhile) if the API rejects
+        the revocation.
 
         Args:
             token_id: UUID of the token to revoke
         """
-        from ...api.client import SelladoMXAPIClient
-        from ...api.exceptions import APIError
-
-        api_key = self.settings.get_token()
-        if not api_key:
-            self.tokenError.emit("No se encontró token configurado")
+        client = self._token_client()
+        if client is None:
             return
 
-        try:
-            client = SelladoMXAPIClient(api_key=api_key)
-            client.revoke_token(token_id)
+        previous = self._tokens_list
+        index = next(
+            (i for i, t in enumerate(previous) if t.get("id") == token_id), None
+        )
+        if index is not None:
+            revoked = previous[index]
+            self._set_tokens_list(previous[:index] + previous[index + 1 :])
+
+        def on_success(_response: dict):
             self.tokenRevoked.emit(token_id)
             logger.info(f"Token revoked: {token_id}")
-            # Refresh the list
-            self.listTokens()
-        except APIError as e:
+            self._list_tokens(rerun=True)
+
+        def on_error(e: Exception):
             logger.error(f"Failed to revoke token: {e}")
-            self.tokenError.emit(f"Error al revocar subtoken: {e.message}")
+            current = self._tokens_list
+            if index is not None and all(t.get("id") != token_id for t in current):
+                position = min(index, len(current))
+                self._set_tokens_list(
+                    current[:position] + [revoked] + current[position:]
+                )
+            self.tokenError.emit(f"Error al revocar subtoken: {_api_message(e)}")
+
+        self._token_tasks.submit(
+            f"tokens/revoke/{token_id}",
+            lambda: client.revoke_token(token_id),
+            on_success,
+            on_error,
+            name="tokens/revoke",
+        )
 
     # ========================================================================
     # DEEP LINK HANDLING
@@ -0,0 +1,261 @@
+"""PdfFileListModel - Queue of PDF files exposed to QML as a list model."""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QByteArray,
+    QModelIndex,
+    Qt,
+    Signal,
+)
+
+from ...utils.task_executor import (
+    TaskContext,
+    TaskExecutor,
+    TaskHandle,
+    TaskPriority,
+)
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for metadata that has not been collected yet (or could not be read)
+UNKNOWN = -1
+
+
+@dataclass(slots=True)
+class PdfFileEntry:
+    """A queued PDF file and its lazily collected metadata."""
+
+    path: str
+    file_name: str
+    size_bytes: int = UNKNOWN
+    page_count: int = UNKNOWN
+    metadata_requested: bool = False
+
+
+def read_pdf_metadata(path: str) -> tuple[int, int]:
+    """Read size and page count of a PDF without loading it into memory.
+
+    Args:
+        path: Path to the PDF file
+
+    Returns:
+        Tuple (size_bytes, page_count); either value is UNKNOWN if unreadable
+    """
+    from pyhanko.pdf_utils.reader import PdfFileReader
+
+    try:
+        size_bytes = os.stat(path).st_size
+    except OSError:
+        return UNKNOWN, UNKNOWN
+
+    try:
+        with open(path, "rb") as f:
+            reader = PdfFileReader(f, strict=False)
+            page_count = int(reader.root["/Pages"]["/Count"])
+    except Exception as e:
+        logger.debug(f"Could not read page count for {path}: {e}")
+        page_count = UNKNOWN
+
+    return size_bytes, page_count
+
+
+def _load_metadata(context: TaskContext, paths: List[str]):
+    """Task body: report (path, size_bytes, page_count) for each path."""
+    for path in paths:
+        if context.cancelled:
+            return
+        context.report((path, *read_pdf_metadata(path)))
+
+
+class PdfFileListModel(QAbstractListModel):
+    """List model backing the Step 1 file queue.
+
+    Paths are kept in insertion order with a dict index for O(1)
+    deduplication. Rows are inserted and removed incrementally so QML only
+    re-creates the affected delegates. File size and page count are collected
+    lazily on the shared TaskExecutor the first time a view asks for them, so
+    adding thousands of files never touches the disk on the GUI thread.
+    """
+
+    PathRole = Qt.UserRole + 1
+    FileNameRole = Qt.UserRole + 2
+    SizeBytesRole = Qt.UserRole + 3
+    PageCountRole = Qt.UserRole + 4
+
+    _ROLE_NAMES = {
+        PathRole: QByteArray(b"path"),
+        FileNameRole: QByteArray(b"fileName"),
+        SizeBytesRole: QByteArray(b"sizeBytes"),
+        PageCountRole: QByteArray(b"pageCount"),
+    }
+
+    countChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: List[PdfFileEntry] = []
+        # path -> row, reindexed from the removed row onwards
+        self._rows: dict[str, int] = {}
+        self._pending_metadata: List[str] = []
+        self._metadata_task: Optional[TaskHandle] = None
+
+    # ========================================================================
+    # QAbstractListModel INTERFACE
+    # ========================================================================
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+
+    def roleNames(self) -> dict:
+        return dict(self._ROLE_NAMES)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._entries):
+            return None
+
+        entry = self._entries[index.row()]
+        if role in (Qt.DisplayRole, self.FileNameRole):
+            return entry.file_name
+        if role == self.PathRole:
+            return entry.path
+        if role in (self.SizeBytesRole, self.PageCountRole):
+            if not entry.metadata_requested:
+                self._request_metadata(entry)
+            if role == self.SizeBytesRole:
+                return entry.size_bytes
+            return entry.page_count
+        return None
+
+    # ========================================================================
+    # QUEUE OPERATIONS
+    # ========================================================================
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._rows
+
+    def paths(self) -> List[str]:
+        """Get a snapshot of all queued paths in insertion order."""
+        return [entry.path for entry in self._entries]
+
+    def entry(self, path: str) -> Optional[PdfFileEntry]:
+        """Get the entry for a queued path, or None if not queued."""
+        row = self._rows.get(path)
+        return self._entries[row] if row is not None else None
+
+    def add_paths(self, paths: Iterable[str]) -> int:
+        """Append paths that are not already queued.
+
+        Args:
+            paths: Local file paths
+
+        Returns:
+            Number of paths actually added
+        """
+        new_entries = []
+        seen = set()
+        for path in paths:
+            if not path or path in self._rows or path in seen:
+                continue
+            seen.add(path)
+            new_entries.append(PdfFileEntry(path, os.path.basename(path)))
+
+        if not new_entries:
+            return 0
+
+        first = len(self._entries)
+        last = first + len(new_entries) - 1
+        self.beginInsertRows(QModelIndex(), first, last)
+        for row, entry in enumerate(new_entries, first):
+            self._entries.append(entry)
+            self._rows[entry.path] = row
+        self.endInsertRows()
+        self.countChanged.emit()
+        return len(new_entries)
+
+    def remove_at(self, row: int) -> Optional[str]:
+        """Remove the entry at a row.
+
+        Args:
+            row: Row index
+
+        Returns:
+            Removed path, or None if the row is out of range
+        """
+        if not 0 <= row < len(self._entries):
+            return None
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        entry = self._entries.pop(row)
+        del self._rows[entry.path]
+        for index in range(row, len(self._entries)):
+            self._rows[self._entries[index].path] = index
+        self.endRemoveRows()
+        self.countChanged.emit()
+        return entry.path
+
+    def clear(self):
+        """Remove all entries."""
+        if not self._entries:
+            return
+        self.beginResetModel()
+        self._entries.clear()
+        self._rows.clear()
+        self._pending_metadata.clear()
+        self.endResetModel()
+        self.countChanged.emit()
+
+    # ========================================================================
+    # LAZY METADATA
+    # ========================================================================
+
+    def _request_metadata(self, entry: PdfFileEntry):
+        """Queue an entry for background metadata collection."""
+        entry.metadata_requested = True
+        self._pending_metadata.append(entry.path)
+        if self._metadata_task is None:
+            self._start_metadata_task()
+
+    def _start_metadata_task(self):
+        """Start a low-priority task for all pending paths."""
+        paths, self._pending_metadata = self._pending_metadata, []
+        self._metadata_task = TaskExecutor.shared().submit(
+            lambda context: _load_metadata(context, paths),
+            name="files/metadata",
+            priority=TaskPriority.LOW,
+            with_context=True,
+        )
+        self._metadata_task.progress.connect(self._on_metadata_loaded)
+        self._metadata_task.finished.connect(self._on_metadata_task_finished)
+
+    def _on_metadata_loaded(self, metadata: tuple[str, int, int]):
+        """Store collected metadata and notify views of the changed row."""
+        path, size_bytes, page_count = metadata
+        row = self._rows.get(path)
+        if row is None:
+            return  # Removed while loading
+        entry = self._entries[row]
+        entry.size_bytes = size_bytes
+        entry.page_count = page_count
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.SizeBytesRole, self.PageCountRole])
+
+    def _on_metadata_task_finished(self):
+        """Start another task if work is pending."""
+        self._metadata_task = None
+        if self._pending_metadata:
+            self._start_metadata_task()
+
+    def stop(self):
+        """Stop background metadata collection."""
+        self._pending_metadata.clear()
+        if self._metadata_task is not None:
+            self._metadata_task.cancel()
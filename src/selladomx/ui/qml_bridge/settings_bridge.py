@@ -3,7 +3,7 @@ import logging
 
 from PySide6.QtCore import QObject, Signal, Slot, Property
 
-from ...utils.settings_manager import SettingsManager
+from ...utils.settings_manager import SettingsManager, SettingsSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +12,9 @@ class SettingsBridge(QObject):
     """Bridge to expose SettingsManager to QML.
 
     This provides QML-friendly access to application settings
-    with signals for property changes.
+    with signals for property changes. Properties read the cached settings
+    snapshot; change signals are emitted from snapshot updates, so they also
+    fire for changes made elsewhere (other managers or other processes).
     """
 
     # Signals
@@ -29,9 +31,23 @@ class SettingsBridge(QObject):
         """
         super().__init__()
         self.settings = settings_manager
+        self._snapshot = settings_manager.snapshot
+        settings_manager.add_listener(self._on_settings_changed)
 
         logger.info("SettingsBridge initialized")
 
+    def _on_settings_changed(self, snapshot: SettingsSnapshot):
+        """Emit change signals for the properties that differ."""
+        old, self._snapshot = self._snapshot, snapshot
+        if old.last_cert_path != snapshot.last_cert_path:
+            self.lastCertPathChanged.emit()
+        if old.last_key_path != snapshot.last_key_path:
+            self.lastKeyPathChanged.emit()
+        if old.has_api_key != snapshot.has_api_key:
+            self.hasApiKeyChanged.emit()
+        if old.onboarding_completed != snapshot.onboarding_completed:
+            self.onboardingCompletedChanged.emit()
+
     # ========================================================================
     # CERTIFICATE PATHS
     # ========================================================================
@@ -39,12 +55,12 @@ class SettingsBridge(QObject):
     @Property(str, notify=lastCertPathChanged)
     def lastCertPath(self) -> str:
         """Get last used certificate path (property for QML)."""
-        return self.settings.get_last_cert_path()
+        return self._snapshot.last_cert_path
 
     @Property(str, notify=lastKeyPathChanged)
     def lastKeyPath(self) -> str:
         """Get last used private key path (property for QML)."""
-        return self.settings.get_last_key_path()
+        return self._snapshot.last_key_path
 
     # ========================================================================
     # API KEY / TOKEN
@@ -53,7 +69,7 @@ class SettingsBridge(QObject):
     @Property(bool, notify=hasApiKeyChanged)
     def hasApiKey(self) -> bool:
         """Check if API key is configured (property for QML)."""
-        return self.settings.has_api_key()
+        return self._snapshot.has_api_key
 
     @Slot(result=str)
     def getToken(self) -> str:
@@ -73,14 +89,12 @@ class SettingsBridge(QObject):
             token: Token string to store
         """
         self.settings.set_token(token)
-        self.hasApiKeyChanged.emit()
         logger.info("Token saved via SettingsBridge")
 
     @Slot()
     def clearToken(self):
         """Clear the stored token (callable from QML)."""
         self.settings.clear_token()
-        self.hasApiKeyChanged.emit()
         logger.info("Token cleared via SettingsBridge")
 
     # ========================================================================
@@ -90,20 +104,18 @@ class SettingsBridge(QObject):
     @Property(bool, notify=onboardingCompletedChanged)
     def hasCompletedOnboarding(self) -> bool:
         """Check if onboarding was completed (property for QML)."""
-        return self.settings.has_completed_onboarding()
+        return self._snapshot.onboarding_completed
 
     @Slot()
     def markOnboardingCompleted(self):
         """Mark onboarding as completed (callable from QML)."""
         self.settings.mark_onboarding_completed()
-        self.onboardingCompletedChanged.emit()
         logger.info("Onboarding marked as completed")
 
     @Slot()
     def resetOnboarding(self):
         """Reset onboarding status (callable from QML)."""
         self.settings.reset_onboarding()
-        self.onboardingCompletedChanged.emit()
         logger.info("Onboarding reset")
 
     # ========================================================================
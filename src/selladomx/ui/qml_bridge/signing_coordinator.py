@@ -1,12 +1,24 @@
 """SigningCoordinator - Manages SigningWorker thread and emits signals to QML."""
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from PySide6.QtCore import QObject, Signal
 
-from ...signing.worker import SigningWorker
-from ...signing.tsa import TSAClient
+from ...config import (
+    CREDIT_POLICY_DEFAULT,
+    FAILURE_POLICY_DEFAULT,
+    REPORT_FORMAT_DEFAULT,
+    SIGNATURE_LEVEL_DEFAULT,
+    SIGNING_STOP_TIMEOUT,
+)
+from ...signing.signing_cache import SigningCache, default_cache_path
+
+if TYPE_CHECKING:
+    # pyhanko/requests are imported when the first batch starts
+    from ...signing.result import SigningResult
+    from ...signing.tsa import TSAClient
+    from ...signing.worker import SigningWorker
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +34,17 @@ class SigningCoordinator(QObject):
     progressChanged = Signal(int, int)  # current, total
     fileCompleted = Signal(str, bool, str, str)  # filename, success, message, url
     finished = Signal(list)  # List of error messages
+    creditsUpdated = Signal(int)  # credits_remaining after each professional file
 
     def __init__(self):
         """Initialize the signing coordinator."""
         super().__init__()
-        self.worker: Optional[SigningWorker] = None
-        self.tsa_client: Optional[TSAClient] = None
+        self.worker: Optional["SigningWorker"] = None
+        self.tsa_client: Optional["TSAClient"] = None
+        # Report of the last batch (None = reports disabled)
+        self.report_path: Optional[Path] = None
+        # Shared across runs so re-queued documents are not signed twice
+        self.signing_cache = SigningCache(default_cache_path())
 
         logger.info("SigningCoordinator initialized")
 
@@ -41,6 +58,12 @@ class SigningCoordinator(QObject):
         signer_cn: str = "",
         signer_serial: str = "",
         output_dir: Optional[Path] = None,
+        credit_policy: str = CREDIT_POLICY_DEFAULT,
+        merkle_timestamp: bool = False,
+        signature_level: str = SIGNATURE_LEVEL_DEFAULT,
+        stamp_pages: str = "",
+        report_format: str = REPORT_FORMAT_DEFAULT,
+        failure_policy: str = FAILURE_POLICY_DEFAULT,
     ):
         """Start signing process in background thread.
 
@@ -53,17 +76,38 @@ class SigningCoordinator(QObject):
             signer_cn: Signer common name
             signer_serial: Signer serial number
             output_dir: Output directory (None = same as source)
+            credit_policy: What to do with files beyond the credit balance
+            merkle_timestamp: Timestamp the batch with one Merkle-root token
+            signature_level: PAdES level (B-T, B-LT or B-LTA)
+            stamp_pages: Pages with a visible stamp ("" = invisible)
+            report_format: Batch report format ("csv", "jsonl", "parquet";
+                "" = no report)
+            failure_policy: What to do with a file when the professional
+                TSA fails (abort, retry, defer or fallback_free)
         """
         if self.worker and self.worker.isRunning():
             logger.warning("Signing already in progress")
             return
 
+        from ...signing.report import default_report_path
+        from ...signing.tsa import TSAClient
+        from ...signing.worker import SigningWorker
+
         # Create TSA client if not using professional TSA
         if not use_professional_tsa:
             self.tsa_client = TSAClient()
         else:
             self.tsa_client = None
 
+        # The report goes next to the signed files
+        self.report_path = None
+        if report_format and pdf_paths:
+            report_dir = output_dir or pdf_paths[0].parent
+            try:
+                self.report_path = default_report_path(report_dir, report_format)
+            except ValueError:
+                logger.warning(f"Unknown report format: {report_format}")
+
         # Create worker thread
         self.worker = SigningWorker(
             pdf_paths=pdf_paths,
@@ -75,12 +119,20 @@ class SigningCoordinator(QObject):
             api_key=api_key,
             signer_cn=signer_cn,
             signer_serial=signer_serial,
+            signing_cache=self.signing_cache,
+            credit_policy=credit_policy,
+            merkle_timestamp=merkle_timestamp,
+            signature_level=signature_level,
+            stamp_pages=stamp_pages,
+            report_path=self.report_path,
+            failure_policy=failure_policy,
         )
 
         # Connect worker signals to our signals (pass-through)
         self.worker.progress.connect(self._on_progress)
         self.worker.file_completed.connect(self._on_file_completed)
         self.worker.finished.connect(self._on_finished)
+        self.worker.credits_updated.connect(self.creditsUpdated)
 
         # Start the worker thread
         self.worker.start()
@@ -96,26 +148,26 @@ class SigningCoordinator(QObject):
         """
         self.progressChanged.emit(current, total)
 
-    def _on_file_completed(
-        self, filename: str, success: bool, message: str, verification_url: str
-    ):
+    def _on_file_completed(self, result: "SigningResult"):
         """Handle file completion signal from worker.
 
         Args:
-            filename: Name of the file
-            success: Whether signing was successful
-            message: Status message
-            verification_url: Verification URL (if professional TSA)
+            result: Result of the file (QML gets its name, status, message
+                and verification URL)
         """
-        self.fileCompleted.emit(filename, success, message, verification_url)
+        self.fileCompleted.emit(
+            result.source.name, result.success, result.message, result.verification_url
+        )
 
-    def _on_finished(self, errors: List[str]):
+    def _on_finished(self, errors: List["SigningResult"]):
         """Handle finished signal from worker.
 
         Args:
-            errors: List of error messages
+            errors: Results of the files that failed
         """
-        self.finished.emit(errors)
+        self.finished.emit(
+            [f"{error.source.name}: {error.message}" for error in errors]
+        )
 
         # Clean up worker
         if self.worker:
@@ -125,9 +177,16 @@ class SigningCoordinator(QObject):
         logger.info("Signing process finished")
 
     def stop(self):
-        """Stop the signing process if running."""
+        """Stop the signing process if running.
+
+        Files in flight finish and the batch report is closed; the thread is
+        only terminated if it does not stop within SIGNING_STOP_TIMEOUT.
+        """
         if self.worker and self.worker.isRunning():
             logger.info("Stopping signing process...")
-            self.worker.terminate()
-            self.worker.wait()
+            self.worker.requestInterruption()
+            if not self.worker.wait(int(SIGNING_STOP_TIMEOUT * 1000)):
+                logger.warning("Signing did not stop in time, terminating it")
+                self.worker.terminate()
+                self.worker.wait()
             self.worker = None
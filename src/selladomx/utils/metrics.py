@@ -0,0 +1,312 @@
+"""In-process metrics registry with histograms.
+
+Signing records per-document phase timings here (read, field append, digest,
+TSA request, write, ...). Observations stay in memory and can be exported:
+
+- SELLADOMX_METRICS_FILE: append every observation as a JSON line
+- SELLADOMX_METRICS_PORT: serve the Prometheus text format on /metrics
+
+Usage:
+    with metrics.timer("signing_phase_seconds", document="a.pdf", phase="read"):
+        ...
+    print(metrics.registry().render_prometheus())
+"""
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..config import METRICS_BUCKETS, METRICS_FILE, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+# name, labels, value, document (None if not tied to a document)
+Listener = Callable[[str, Dict[str, str], float, Optional[str]], None]
+
+# Help text of the metrics recorded by the app (Prometheus # HELP lines)
+METRIC_HELP: Dict[str, str] = {
+    "signing_phase_seconds": "Time spent per document in each signing phase",
+    "tsa_request_seconds": "Time to get a timestamp response, by TSA provider",
+}
+
+
+class Histogram:
+    """Cumulative histogram of observations (thread-safe)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)  # Per bucket, not cumulative
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self._counts):
+                self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations <= bound) per bucket, then +Inf."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self.count
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            result.append((bound, running))
+        result.append((float("inf"), total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which a fraction q of observations fall."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, running in self.cumulative_counts():
+            if running >= target:
+                return bound if bound != float("inf") else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and labels."""
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Get (or create) the histogram for a name and label set."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(
+        self, name: str, value: float, document: Optional[str] = None, **labels: str
+    ):
+        """Record an observation.
+
+        Args:
+            name: Metric name (e.g. "signing_phase_seconds")
+            value: Observed value (seconds for timings)
+            document: Document the value belongs to (exported to JSONL only)
+            **labels: Label values (keep their cardinality low)
+        """
+        self.histogram(name, **labels).observe(value)
+        for listener in self._listeners:
+            try:
+                listener(name, labels, value, document)
+            except Exception as e:
+                logger.debug(f"Metrics listener failed: {e}")
+
+    @contextmanager
+    def timer(
+        self, name: str, document: Optional[str] = None, **labels: str
+    ) -> Iterator[None]:
+        """Observe the time spent in the block, also if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, document, **labels)
+
+    def add_listener(self, listener: Listener):
+        """Call listener(name, labels, value, document) on every observation."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def snapshot(self) -> Dict[Tuple[str, Labels], Histogram]:
+        """Current histograms by (name, labels)."""
+        with self._lock:
+            return dict(self._histograms)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self, prefix: str = "selladomx_") -> str:
+        """Render every histogram in the Prometheus text exposition format."""
+        by_name: Dict[str, List[Tuple[Labels, Histogram]]] = {}
+        for (name, labels), histogram in sorted(self.snapshot().items()):
+            by_name.setdefault(name, []).append((labels, histogram))
+
+        lines = []
+        for name, series in by_name.items():
+            metric = prefix + name
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {metric} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in series:
+                for bound, count in histogram.cumulative_counts():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"{metric}_bucket{_format_labels(labels + (('le', le),))} "
+                        f"{count}"
+                    )
+                lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(
+                    f"{metric}_count{_format_labels(labels)} {histogram.count}"
+                )
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return (
+        "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+    )
+
+
+class JsonLinesExporter:
+    """Registry listener that appends each observation to a JSONL file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(
+        self,
+        name: str,
+        labels: Dict[str, str],
+        value: float,
+        document: Optional[str],
+    ):
+        record = {"timestamp": time.time(), "metric": name, "value": value}
+        if document is not None:
+            record["document"] = document
+        record.update(labels)
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusServer:
+    """Serves a registry on http://host:port/metrics from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "127.0.0.1"):
+        metrics_registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics_registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes are not worth a log line
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Serving metrics on http://127.0.0.1:{self.port}/metrics")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_registry = MetricsRegistry()
+
+
+def registry() -> MetricsRegistry:
+    """Get the process-wide registry."""
+    return _registry
+
+
+def timer(name: str, document: Optional[str] = None, **labels: str):
+    """Time a block in the process-wide registry (see MetricsRegistry.timer)."""
+    return _registry.timer(name, document, **labels)
+
+
+def observe(name: str, value: float, document: Optional[str] = None, **labels: str):
+    """Record a value in the process-wide registry."""
+    _registry.observe(name, value, document, **labels)
+
+
+def start_exporters(
+    metrics_file: str = METRICS_FILE, port: int = METRICS_PORT
+) -> List[object]:
+    """Start the exporters enabled through the environment.
+
+    Args:
+        metrics_file: JSONL file to append observations to ("" = disabled)
+        port: Port of the Prometheus endpoint (0 = disabled)
+
+    Returns:
+        The started exporters (pass them to stop_exporters() on shutdown)
+    """
+    exporters: List[object] = []
+    if metrics_file:
+        try:
+            exporter = JsonLinesExporter(metrics_file)
+            _registry.add_listener(exporter)
+            exporters.append(exporter)
+            logger.info(f"Writing metrics to {metrics_file}")
+        except OSError as e:
+            logger.warning(f"Could not open metrics file: {e}")
+    if port:
+        try:
+            server = PrometheusServer(_registry, port)
+            server.start()
+            exporters.append(server)
+        except OSError as e:
+            logger.warning(f"Could not start metrics endpoint: {e}")
+    return exporters
+
+
+def stop_exporters(exporters: List[object]):
+    """Detach and close the exporters returned by start_exporters()."""
+    for exporter in exporters:
+        if isinstance(exporter, JsonLinesExporter):
+            _registry.remove_listener(exporter)
+            exporter.close()
+        elif isinstance(exporter, PrometheusServer):
+            exporter.stop()
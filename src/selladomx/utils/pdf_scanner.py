@@ -0,0 +1,210 @@
+"""Background discovery of PDF files in directory trees."""
+import logging
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+from PySide6.QtCore import QThread, Signal
+
+from ..config import (
+    SCAN_BATCH_SIZE,
+    SCAN_EMIT_INTERVAL,
+    SCAN_MAX_WORKERS,
+    SIGNED_SUFFIX,
+)
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+# The PDF header may be preceded by junk; readers search the first 1024 bytes
+PDF_HEADER_SEARCH_BYTES = 1024
+
+
+def is_pdf_file(path: str) -> bool:
+    """Check whether a file is a PDF by its magic bytes (not its extension).
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        True if the %PDF- header appears in the first 1024 bytes
+    """
+    try:
+        with open(path, "rb") as f:
+            return PDF_MAGIC in f.read(PDF_HEADER_SEARCH_BYTES)
+    except OSError:
+        return False
+
+
+def is_signed_output(path: str) -> bool:
+    """Check whether a file name carries our signed-output suffix."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem.endswith(SIGNED_SUFFIX)
+
+
+def scan_directory(
+    directory: str, chunk_size: int = SCAN_BATCH_SIZE
+) -> Iterator[tuple[List[str], List[str]]]:
+    """List one directory level in chunks, as os.scandir reads it.
+
+    A huge flat folder is not listed whole before its files are checked:
+    each chunk can be checked for the PDF header (see _check_files) while the
+    rest is still being listed. Symlinked directories are not followed to
+    avoid cycles. Files that already carry SIGNED_SUFFIX are skipped.
+
+    Args:
+        directory: Directory to scan
+        chunk_size: Entries (files and subdirectories) per chunk
+
+    Yields:
+        Tuples (candidate files, subdirectories); the files are not yet
+        checked for the PDF header
+    """
+    files: List[str] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file() and not is_signed_output(entry.name):
+                        files.append(entry.path)
+                except OSError as e:
+                    logger.debug(f"Skipping {entry.path}: {e}")
+                if len(files) + len(subdirs) >= chunk_size:
+                    files.sort()
+                    yield files, subdirs
+                    files, subdirs = [], []
+    except OSError as e:
+        logger.warning(f"Could not scan directory {directory}: {e}")
+
+    if files or subdirs:
+        files.sort()
+        yield files, subdirs
+
+
+def _check_files(paths: List[str]) -> List[str]:
+    """Filter files down to real PDFs that are not signed outputs."""
+    return [path for path in paths if not is_signed_output(path) and is_pdf_file(path)]
+
+
+class PdfScanWorker(QThread):
+    """Worker thread that walks directory trees looking for PDFs.
+
+    Directories are listed concurrently in a thread pool, in chunks of
+    batch_size entries; each chunk of files is checked for the PDF header in
+    the same pool while the listing goes on. Discovered files are streamed
+    back in batches, so the file list starts populating immediately even for
+    very large (or slow network) trees and flat folders.
+    """
+
+    files_found = Signal(list)  # batch of PDF paths
+    scan_finished = Signal(int)  # total PDFs found
+
+    def __init__(
+        self,
+        roots: List[str],
+        max_workers: int = SCAN_MAX_WORKERS,
+        batch_size: int = SCAN_BATCH_SIZE,
+    ):
+        """Initialize scan worker.
+
+        Args:
+            roots: Directories to walk and/or files to check
+            max_workers: Directories listed and file chunks checked in parallel
+            batch_size: Maximum paths per files_found emission (and entries
+                per listed chunk)
+        """
+        super().__init__()
+        self.roots = roots
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.found_count = 0
+
+    def run(self):
+        """Walk all roots and emit discovered PDFs in batches."""
+        # Pool tasks report ("listed", (files, subdirs)), ("checked", pdfs)
+        # and finally ("done", None); only this thread submits new tasks
+        events: queue.Queue = queue.Queue()
+        batch: List[str] = []
+        last_emit = time.monotonic()
+        running = 0
+
+        def list_directory(directory: str):
+            try:
+                for chunk in scan_directory(directory, self.batch_size):
+                    if self.isInterruptionRequested():
+                        break
+                    events.put(("listed", chunk))
+            finally:
+                events.put(("done", None))
+
+        def check_files(paths: List[str]):
+            try:
+                events.put(("checked", _check_files(paths)))
+            finally:
+                events.put(("done", None))
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="pdf-scan"
+        ) as executor:
+
+            def start(task, argument):
+                nonlocal running
+                running += 1
+                executor.submit(task, argument)
+
+            files = [root for root in self.roots if not os.path.isdir(root)]
+            for begin in range(0, len(files), self.batch_size):
+                start(check_files, files[begin : begin + self.batch_size])
+            for root in self.roots:
+                if os.path.isdir(root):
+                    start(list_directory, root)
+
+            while running:
+                try:
+                    kind, payload = events.get(timeout=SCAN_EMIT_INTERVAL)
+                except queue.Empty:
+                    kind, payload = None, None
+
+                if self.isInterruptionRequested():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.info("PDF scan cancelled")
+                    batch = []
+                    break
+
+                if kind == "listed":
+                    chunk_files, subdirs = payload
+                    if chunk_files:
+                        start(check_files, chunk_files)
+                    for subdir in subdirs:
+                        start(list_directory, subdir)
+                elif kind == "checked":
+                    batch.extend(payload)
+                elif kind == "done":
+                    running -= 1
+
+                now = time.monotonic()
+                if batch and (
+                    len(batch) >= self.batch_size
+                    or now - last_emit >= SCAN_EMIT_INTERVAL
+                ):
+                    self._emit_batch(batch)
+                    batch = []
+                    last_emit = now
+
+        if batch:
+            self._emit_batch(batch)
+
+        logger.info(f"PDF scan finished: {self.found_count} file(s) found")
+        self.scan_finished.emit(self.found_count)
+
+    def _emit_batch(self, batch: List[str]):
+        """Emit a batch of discovered paths in chunks of batch_size."""
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start : start + self.batch_size]
+            self.found_count += len(chunk)
+            self.files_found.emit(chunk)
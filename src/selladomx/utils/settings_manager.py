@@ -1,18 +1,146 @@
-"""Settings manager for SelladoMX using QSettings."""
+"""Settings manager for SelladoMX backed by a write-behind QSettings store."""
 import logging
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Callable, List, Optional
 
-from PySide6.QtCore import QSettings
+from ..config import (
+    CREDIT_POLICY_DEFAULT,
+    FAILURE_POLICY_DEFAULT,
+    REPORT_FORMAT_DEFAULT,
+    SIGNATURE_LEVEL_DEFAULT,
+)
+from .settings_store import SettingsStore
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class SettingsSnapshot:
+    """Typed, immutable view of every setting the app reads."""
+
+    onboarding_completed: bool = False
+    onboarding_version: int = 0
+    token: Optional[str] = None
+    token_is_primary: bool = True
+    token_alias: Optional[str] = None
+    token_expires_at: Optional[str] = None
+    token_is_active: bool = True
+    use_professional_tsa: bool = True
+    credit_policy: str = CREDIT_POLICY_DEFAULT
+    failure_policy: str = FAILURE_POLICY_DEFAULT
+    merkle_timestamp: bool = False
+    signature_level: str = SIGNATURE_LEVEL_DEFAULT
+    stamp_pages: str = ""
+    report_format: str = REPORT_FORMAT_DEFAULT
+    last_balance: int = 0
+    url_scheme_registered: bool = False
+    last_cert_path: str = ""
+    last_key_path: str = ""
+    output_dir: str = ""
+
+    @property
+    def has_api_key(self) -> bool:
+        return bool(self.token)
+
+
+# Snapshot field -> settings key
+_SNAPSHOT_KEYS = {
+    "onboarding_completed": "onboarding/completed",
+    "onboarding_version": "onboarding/version",
+    "token": "api/token",
+    "token_is_primary": "api/token_is_primary",
+    "token_alias": "api/token_alias",
+    "token_expires_at": "api/token_expires_at",
+    "token_is_active": "api/token_is_active",
+    "use_professional_tsa": "tsa/use_professional",
+    "credit_policy": "tsa/credit_policy",
+    "failure_policy": "tsa/failure_policy",
+    "merkle_timestamp": "tsa/merkle_timestamp",
+    "signature_level": "tsa/signature_level",
+    "stamp_pages": "signing/stamp_pages",
+    "report_format": "signing/report_format",
+    "last_balance": "api/last_balance",
+    "url_scheme_registered": "system/url_scheme_registered",
+    "last_cert_path": "certificate/last_cert_path",
+    "last_key_path": "certificate/last_key_path",
+    "output_dir": "signing/output_dir",
+}
+
+
 class SettingsManager:
-    """Manage application settings and preferences."""
+    """Manage application settings and preferences.
+
+    Setters never touch disk: writes go to a shared SettingsStore and are
+    flushed in the background (call flush() to force it, e.g. on exit).
+
+    Getters read from an in-memory SettingsSnapshot, which is rebuilt only
+    when a setter (from any SettingsManager on the same store) or another
+    process changes the settings. Listeners get the new snapshot.
+    """
+
+    def __init__(self, store: Optional[SettingsStore] = None):
+        """Initialize settings manager.
+
+        Args:
+            store: Settings store (default: the shared SelladoMX store)
+        """
+        self.settings = store or SettingsStore.shared("SelladoMX", "SelladoMX")
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._listeners: List[Callable[[SettingsSnapshot], None]] = []
+        self.settings.add_listener(self._on_store_changed)
+
+    def flush(self):
+        """Write pending setting changes to disk now."""
+        self.settings.flush()
 
-    def __init__(self):
-        """Initialize settings manager."""
-        self.settings = QSettings("SelladoMX", "SelladoMX")
+    # ========================================================================
+    # SNAPSHOT
+    # ========================================================================
+
+    @property
+    def snapshot(self) -> SettingsSnapshot:
+        """Current settings (loaded on first access)."""
+        if self._snapshot is None:
+            self._snapshot = self._load_snapshot()
+        return self._snapshot
+
+    def _load_snapshot(self) -> SettingsSnapshot:
+        values = {}
+        for field in fields(SettingsSnapshot):
+            key = _SNAPSHOT_KEYS[field.name]
+            default = field.default
+            value_type = type(default) if default is not None else str
+            values[field.name] = self.settings.value(key, default, type=value_type)
+
+        # Fallback to old api/key for transition
+        if not values["token"]:
+            values["token"] = self.settings.value("api/key", None, type=str)
+        for name in ("token", "token_alias", "token_expires_at"):
+            values[name] = values[name] or None
+        return SettingsSnapshot(**values)
+
+    def add_listener(self, callback: Callable[[SettingsSnapshot], None]):
+        """Call callback with the new snapshot whenever settings change.
+
+        Args:
+            callback: Function receiving the new SettingsSnapshot
+        """
+        self._listeners.append(callback)
+
+    def _on_store_changed(self, keys: Optional[set]):
+        """Rebuild the snapshot after a write or an external file change."""
+        if self._snapshot is None:
+            return  # Nothing cached yet, next read loads fresh values
+        snapshot = self._load_snapshot()
+        if snapshot == self._snapshot:
+            return
+        self._snapshot = snapshot
+        for callback in list(self._listeners):
+            callback(snapshot)
+
+    def watch_external_changes(self):
+        """Pick up edits made to the settings file by other processes."""
+        self.settings.watch_file()
 
     # ========================================================================
     # ONBOARDING
@@ -24,20 +152,19 @@ class SettingsManager:
         Returns:
             True if onboarding was completed, False otherwise.
         """
-        return self.settings.value("onboarding/completed", False, type=bool)
+        return self.snapshot.onboarding_completed
 
     def mark_onboarding_completed(self):
         """Mark onboarding as completed."""
         from ..config import ONBOARDING_VERSION
 
-        self.settings.setValue("onboarding/completed", True)
-        self.settings.setValue("onboarding/version", ONBOARDING_VERSION)
-        self.settings.sync()
+        with self.settings.transaction():
+            self.settings.setValue("onboarding/completed", True)
+            self.settings.setValue("onboarding/version", ONBOARDING_VERSION)
 
     def reset_onboarding(self):
         """Reset onboarding status (for testing)."""
         self.settings.setValue("onboarding/completed", False)
-        self.settings.sync()
 
     def get_onboarding_version(self) -> int:
         """Get the version of onboarding that was completed.
@@ -45,7 +172,7 @@ class SettingsManager:
         Returns:
             Version number, or 0 if not completed.
         """
-        return self.settings.value("onboarding/version", 0, type=int)
+        return self.snapshot.onboarding_version
 
     def set_onboarding_version(self, version: int):
         """Set the onboarding version.
@@ -54,7 +181,6 @@ class SettingsManager:
             version: Version number to set.
         """
         self.settings.setValue("onboarding/version", version)
-        self.settings.sync()
 
     # ========================================================================
     # API KEY (for Professional TSA tier)
@@ -66,8 +192,7 @@ class SettingsManager:
         Returns:
             True if API key is configured, False otherwise.
         """
-        api_key = self.get_api_key()
-        return api_key is not None and len(api_key) > 0
+        return self.snapshot.has_api_key
 
     def get_api_key(self) -> Optional[str]:
         """Get the stored API key.
@@ -91,13 +216,7 @@ class SettingsManager:
         Note:
             Falls back to old api/key for backward compatibility.
         """
-        token = self.settings.value("api/token", None, type=str)
-        if not token:
-            # Fallback to old api/key for transition
-            token = self.settings.value("api/key", None, type=str)
-        if token:
-            logger.info("Token found in settings")
-        return token
+        return self.snapshot.token
 
     def set_api_key(self, api_key: str):
         """Store API key.
@@ -122,11 +241,11 @@ class SettingsManager:
             Token is stored encrypted on disk by QSettings.
             Never log or display the full token.
         """
-        self.settings.setValue("api/token", token)
-        # Clear old key if exists
-        if self.settings.contains("api/key"):
-            self.settings.remove("api/key")
-        self.settings.sync()
+        with self.settings.transaction():
+            self.settings.setValue("api/token", token)
+            # Clear old key if exists
+            if self.settings.contains("api/key"):
+                self.settings.remove("api/key")
         logger.info("Token saved")
 
     def get_token_info(self) -> dict:
@@ -140,11 +259,12 @@ class SettingsManager:
                 "is_active": bool
             }
         """
+        snapshot = self.snapshot
         return {
-            "is_primary": self.settings.value("api/token_is_primary", True, type=bool),
-            "alias": self.settings.value("api/token_alias", None, type=str),
-            "expires_at": self.settings.value("api/token_expires_at", None, type=str),
-            "is_active": self.settings.value("api/token_is_active", True, type=bool),
+            "is_primary": snapshot.token_is_primary,
+            "alias": snapshot.token_alias,
+            "expires_at": snapshot.token_expires_at,
+            "is_active": snapshot.token_is_active,
         }
 
     def set_token_info(self, token_info: dict):
@@ -153,13 +273,15 @@ class SettingsManager:
         Args:
             token_info: Token info dict from /api/v1/balance response
         """
-        self.settings.setValue(
-            "api/token_is_primary", token_info.get("is_primary", True)
-        )
-        self.settings.setValue("api/token_alias", token_info.get("alias"))
-        self.settings.setValue("api/token_expires_at", token_info.get("expires_at"))
-        self.settings.setValue("api/token_is_active", token_info.get("is_active", True))
-        self.settings.sync()
+        with self.settings.transaction():
+            self.settings.setValue(
+                "api/token_is_primary", token_info.get("is_primary", True)
+            )
+            self.settings.setValue("api/token_alias", token_info.get("alias"))
+            self.settings.setValue("api/token_expires_at", token_info.get("expires_at"))
+            self.settings.setValue(
+                "api/token_is_active", token_info.get("is_active", True)
+            )
 
     def is_token_expired(self) -> bool:
         """Check if stored token has expired.
@@ -167,7 +289,7 @@ class SettingsManager:
         Returns:
             bool: True if token is expired
         """
-        expires_at_str = self.settings.value("api/token_expires_at", None, type=str)
+        expires_at_str = self.snapshot.token_expires_at
         if not expires_at_str:
             return False  # No expiration set
 
@@ -182,13 +304,13 @@ class SettingsManager:
 
     def clear_token(self):
         """Clear stored token and all metadata."""
-        self.settings.remove("api/token")
-        self.settings.remove("api/token_is_primary")
-        self.settings.remove("api/token_alias")
-        self.settings.remove("api/token_expires_at")
-        self.settings.remove("api/token_is_active")
-        self.settings.remove("api/last_balance")
-        self.settings.sync()
+        with self.settings.transaction():
+            self.settings.remove("api/token")
+            self.settings.remove("api/token_is_primary")
+            self.settings.remove("api/token_alias")
+            self.settings.remove("api/token_expires_at")
+            self.settings.remove("api/token_is_active")
+            self.settings.remove("api/last_balance")
         logger.info("Token and metadata cleared")
 
     def clear_api_key(self):
@@ -213,7 +335,7 @@ class SettingsManager:
         if not self.has_api_key():
             return False
 
-        return self.settings.value("tsa/use_professional", True, type=bool)
+        return self.snapshot.use_professional_tsa
 
     def set_use_professional_tsa(self, enabled: bool):
         """Set preference for professional TSA.
@@ -222,16 +344,172 @@ class SettingsManager:
             enabled: True to use professional TSA, False for free TSA.
         """
         self.settings.setValue("tsa/use_professional", enabled)
-        self.settings.sync()
         logger.info(f"Professional TSA preference: {enabled}")
 
+    @staticmethod
+    def _validated(name: str, value: str, parse: Callable, default: str) -> str:
+        """Return a stored value if parse accepts it, else the default.
+
+        Old or hand-edited settings must not break signing later on.
+
+        Args:
+            name: Setting name, for the log
+            value: Stored value
+            parse: Enum or parser that raises ValueError on a bad value
+            default: Value used instead of a bad one
+        """
+        try:
+            parse(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid {name} setting {value!r}")
+            return default
+        return value
+
+    def get_credit_policy(self) -> str:
+        """Get what to do with files beyond the credit balance.
+
+        Returns:
+            A CreditPolicy value ("professional_only" or "fallback_free").
+        """
+        from ..signing.batch_planner import CreditPolicy
+
+        return self._validated(
+            "credit policy",
+            self.snapshot.credit_policy,
+            CreditPolicy,
+            CREDIT_POLICY_DEFAULT,
+        )
+
+    def set_credit_policy(self, policy: str):
+        """Set what to do with files beyond the credit balance.
+
+        Args:
+            policy: A CreditPolicy value.
+        """
+        self.settings.setValue("tsa/credit_policy", policy)
+        logger.info(f"Credit policy: {policy}")
+
+    def get_failure_policy(self) -> str:
+        """Get what to do with a file when the professional TSA fails.
+
+        Returns:
+            A FailurePolicy value ("abort", "retry", "defer" or
+            "fallback_free").
+        """
+        from ..signing.failure_policy import FailurePolicy
+
+        return self._validated(
+            "failure policy",
+            self.snapshot.failure_policy,
+            FailurePolicy,
+            FAILURE_POLICY_DEFAULT,
+        )
+
+    def set_failure_policy(self, policy: str):
+        """Set what to do with a file when the professional TSA fails.
+
+        Args:
+            policy: A FailurePolicy value.
+        """
+        self.settings.setValue("tsa/failure_policy", policy)
+        logger.info(f"Failure policy: {policy}")
+
+    def get_merkle_timestamp(self) -> bool:
+        """Get whether batches share one Merkle-root timestamp.
+
+        Returns:
+            True to timestamp a whole batch with a single token.
+        """
+        return self.snapshot.merkle_timestamp
+
+    def set_merkle_timestamp(self, enabled: bool):
+        """Set whether batches share one Merkle-root timestamp.
+
+        Args:
+            enabled: True to timestamp a whole batch with a single token.
+        """
+        self.settings.setValue("tsa/merkle_timestamp", enabled)
+        logger.info(f"Merkle timestamp: {enabled}")
+
+    def get_signature_level(self) -> str:
+        """Get the PAdES level of new signatures.
+
+        Returns:
+            A SignatureLevel value ("B-T", "B-LT" or "B-LTA").
+        """
+        from ..signing.pdf_signer import SignatureLevel
+
+        return self._validated(
+            "signature level",
+            self.snapshot.signature_level,
+            SignatureLevel,
+            SIGNATURE_LEVEL_DEFAULT,
+        )
+
+    def set_signature_level(self, level: str):
+        """Set the PAdES level of new signatures.
+
+        Args:
+            level: A SignatureLevel value.
+        """
+        self.settings.setValue("tsa/signature_level", level)
+        logger.info(f"Signature level: {level}")
+
+    def get_stamp_pages(self) -> str:
+        """Get the pages that show a visible signature stamp.
+
+        Returns:
+            Comma-separated page numbers ("1,-1"), or "" for invisible
+            signatures.
+        """
+        pages = self.snapshot.stamp_pages
+        if not pages:
+            return ""
+        from ..signing.appearance import parse_page_spec
+
+        return self._validated("stamp pages", pages, parse_page_spec, "")
+
+    def set_stamp_pages(self, pages: str):
+        """Set the pages that show a visible signature stamp.
+
+        Args:
+            pages: Comma-separated page numbers, 1-based; negative numbers
+                count from the end. Empty for invisible signatures.
+        """
+        self.settings.setValue("signing/stamp_pages", pages)
+        logger.info(f"Signature stamp pages: {pages or 'none'}")
+
+    def get_report_format(self) -> str:
+        """Get the format of the report written for each batch.
+
+        Returns:
+            "csv", "jsonl", "parquet", or "" for no report.
+        """
+        report_format = self.snapshot.report_format
+        if not report_format:
+            return ""
+        from ..signing.report import ReportFormat
+
+        return self._validated(
+            "report format", report_format, ReportFormat, REPORT_FORMAT_DEFAULT
+        )
+
+    def set_report_format(self, report_format: str):
+        """Set the format of the report written for each batch.
+
+        Args:
+            report_format: A ReportFormat value, or "" to disable reports.
+        """
+        self.settings.setValue("signing/report_format", report_format)
+        logger.info(f"Batch report format: {report_format or 'none'}")
+
     def get_last_credit_balance(self) -> int:
         """Get last known credit balance (cached).
 
         Returns:
             Last known balance, or 0 if not cached.
         """
-        return self.settings.value("api/last_balance", 0, type=int)
+        return self.snapshot.last_balance
 
     def set_last_credit_balance(self, balance: int):
         """Cache credit balance.
@@ -240,7 +518,6 @@ class SettingsManager:
             balance: Credit balance to cache.
         """
         self.settings.setValue("api/last_balance", balance)
-        self.settings.sync()
 
     # ========================================================================
     # URL SCHEME REGISTRATION
@@ -252,12 +529,11 @@ class SettingsManager:
         Returns:
             True if registration was attempted, False otherwise.
         """
-        return self.settings.value("system/url_scheme_registered", False, type=bool)
+        return self.snapshot.url_scheme_registered
 
     def mark_url_scheme_registration_attempted(self):
         """Mark that URL scheme registration has been attempted."""
         self.settings.setValue("system/url_scheme_registered", True)
-        self.settings.sync()
 
     # ========================================================================
     # CERTIFICATE PATH PERSISTENCE
@@ -269,7 +545,7 @@ class SettingsManager:
         Returns:
             Last used certificate path, or empty string if not set.
         """
-        return self.settings.value("certificate/last_cert_path", "", type=str)
+        return self.snapshot.last_cert_path
 
     def set_last_cert_path(self, path: str):
         """Save last used certificate path.
@@ -278,7 +554,6 @@ class SettingsManager:
             path: Path to certificate (.cer) file.
         """
         self.settings.setValue("certificate/last_cert_path", path)
-        self.settings.sync()
         logger.debug(f"Saved certificate path: {path}")
 
     def get_last_key_path(self) -> str:
@@ -287,7 +562,7 @@ class SettingsManager:
         Returns:
             Last used private key path, or empty string if not set.
         """
-        return self.settings.value("certificate/last_key_path", "", type=str)
+        return self.snapshot.last_key_path
 
     def set_last_key_path(self, path: str):
         """Save last used private key path.
@@ -296,14 +571,13 @@ class SettingsManager:
             path: Path to private key (.key) file.
         """
         self.settings.setValue("certificate/last_key_path", path)
-        self.settings.sync()
         logger.debug(f"Saved private key path: {path}")
 
     def clear_certificate_paths(self):
         """Clear saved certificate paths."""
-        self.settings.remove("certificate/last_cert_path")
-        self.settings.remove("certificate/last_key_path")
-        self.settings.sync()
+        with self.settings.transaction():
+            self.settings.remove("certificate/last_cert_path")
+            self.settings.remove("certificate/last_key_path")
         logger.info("Cleared certificate paths")
 
     # ========================================================================
@@ -316,7 +590,7 @@ class SettingsManager:
         Returns:
             Output directory path, or empty string if not set.
         """
-        return self.settings.value("signing/output_dir", "", type=str)
+        return self.snapshot.output_dir
 
     def set_output_dir(self, path: str):
         """Save output directory for signed files.
@@ -325,11 +599,9 @@ class SettingsManager:
             path: Path to output directory.
         """
         self.settings.setValue("signing/output_dir", path)
-        self.settings.sync()
         logger.debug(f"Saved output directory: {path}")
 
     def clear_output_dir(self):
         """Clear saved output directory."""
         self.settings.remove("signing/output_dir")
-        self.settings.sync()
         logger.info("Cleared output directory")
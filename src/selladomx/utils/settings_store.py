@@ -0,0 +1,308 @@
+"""Write-behind QSettings store with coalesced background flushes."""
+import atexit
+import logging
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from PySide6.QtCore import QCoreApplication, QFileSystemWatcher, QSettings
+
+from ..config import SETTINGS_FLUSH_DELAY
+
+logger = logging.getLogger(__name__)
+
+# Marks a key removed in the write-behind cache until the next flush
+_REMOVED = object()
+
+
+def _coerce(value: Any, value_type: Optional[type]) -> Any:
+    """Convert a cached value the way QSettings.value(type=...) would."""
+    if value_type is None or value is None or isinstance(value, value_type):
+        return value
+    if value_type is bool and isinstance(value, str):
+        return value.lower() in ("true", "1")
+    try:
+        return value_type(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class SettingsStore:
+    """QSettings facade that keeps writes in memory and flushes them later.
+
+    Setters only update an in-memory cache and schedule a flush; writes made
+    within SETTINGS_FLUSH_DELAY of each other are coalesced into a single
+    QSettings.sync() that runs on a timer thread (with its own QSettings
+    instance, as QSettings is reentrant but not thread-safe). Pending writes
+    are flushed at interpreter exit and whenever flush() is called.
+
+    Use shared() so every SettingsManager in the process sees the same
+    pending writes. Listeners are told which keys changed after every write
+    and, with watch_file(), when another process modifies the settings file.
+    """
+
+    _shared: Dict[tuple, "SettingsStore"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        organization: str = "",
+        application: str = "",
+        file_path: Optional[str] = None,
+        flush_delay: float = SETTINGS_FLUSH_DELAY,
+    ):
+        """Initialize the store.
+
+        Args:
+            organization: QSettings organization name
+            application: QSettings application name
+            file_path: INI file to use instead of the native location
+            flush_delay: Seconds to wait for more writes before flushing
+        """
+        self.organization = organization
+        self.application = application
+        self.file_path = file_path
+        self.flush_delay = flush_delay
+        self._settings = self._open()
+        self._pending: Dict[str, Any] = {}
+        self._inflight: Dict[str, Any] = {}
+        self._local = threading.local()  # Per-thread transaction staging
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._listeners: List[weakref.WeakMethod] = []
+        self._watcher: Optional[QFileSystemWatcher] = None
+        self._own_mtime_ns: Optional[int] = None
+
+    @classmethod
+    def shared(cls, organization: str, application: str) -> "SettingsStore":
+        """Get the process-wide store for a settings scope."""
+        key = (organization, application)
+        with cls._shared_lock:
+            store = cls._shared.get(key)
+            if store is None:
+                store = cls(organization, application)
+                cls._shared[key] = store
+                atexit.register(store.flush)
+            return store
+
+    def _open(self) -> QSettings:
+        """Create a QSettings instance for this scope."""
+        if self.file_path:
+            return QSettings(self.file_path, QSettings.IniFormat)
+        return QSettings(self.organization, self.application)
+
+    def fileName(self) -> str:
+        """Path of the settings file on disk."""
+        return self._settings.fileName()
+
+    # ========================================================================
+    # READ / WRITE
+    # ========================================================================
+
+    @property
+    def _staged(self) -> Optional[Dict[str, Any]]:
+        """Writes staged by an open transaction on the calling thread."""
+        return getattr(self._local, "staged", None)
+
+    def _cached(self, key: str) -> Any:
+        """Look up a key in staged, pending and in-flight writes."""
+        for layer in (self._staged, self._pending, self._inflight):
+            if layer is not None and key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def value(self, key: str, default: Any = None, type: Optional[type] = None):
+        """Read a setting, preferring writes not yet flushed to disk.
+
+        Args:
+            key: Settings key
+            default: Value returned when the key is not set
+            type: Optional type to convert the value to
+
+        Returns:
+            The setting value
+        """
+        with self._lock:
+            try:
+                cached = self._cached(key)
+            except KeyError:
+                pass
+            else:
+                if cached is _REMOVED or cached is None:
+                    return default
+                return _coerce(cached, type)
+
+        if type is None:
+            return self._settings.value(key, default)
+        return self._settings.value(key, default, type=type)
+
+    def contains(self, key: str) -> bool:
+        """Check whether a key is set."""
+        with self._lock:
+            try:
+                return self._cached(key) is not _REMOVED
+            except KeyError:
+                pass
+        return self._settings.contains(key)
+
+    def setValue(self, key: str, value: Any):
+        """Set a key; it is written to disk on the next flush."""
+        self._write(key, value)
+
+    def remove(self, key: str):
+        """Remove a key; it is removed from disk on the next flush."""
+        self._write(key, _REMOVED)
+
+    def _write(self, key: str, value: Any):
+        staged = self._staged
+        if staged is not None:
+            staged[key] = value
+            return
+        with self._lock:
+            self._pending[key] = value
+        self._schedule_flush()
+        self._notify({key})
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes so they are flushed together or not at all.
+
+        Writes inside the block are visible to reads on the same thread
+        immediately but only reach the flush queue (and other threads) when
+        the block exits cleanly; an exception discards them. Each thread
+        stages its own writes; nested transactions join the outermost one
+        of their thread.
+        """
+        if self._staged is not None:
+            yield self
+            return
+
+        self._local.staged = {}
+        try:
+            yield self
+        except BaseException:
+            self._local.staged = None
+            raise
+
+        staged, self._local.staged = self._local.staged, None
+        with self._lock:
+            self._pending.update(staged)
+        if staged:
+            self._schedule_flush()
+            self._notify(staged.keys())
+
+    # ========================================================================
+    # CHANGE NOTIFICATIONS
+    # ========================================================================
+
+    def add_listener(self, callback: Callable[[Optional[set]], None]):
+        """Register a bound method called with the changed keys.
+
+        The callback receives None when the file changed externally and any
+        key may differ. Listeners are held weakly.
+        """
+        self._listeners.append(weakref.WeakMethod(callback))
+
+    def _notify(self, keys: Optional[Iterable[str]]):
+        changed = set(keys) if keys is not None else None
+        alive = []
+        for ref in self._listeners:
+            callback = ref()
+            if callback is not None:
+                alive.append(ref)
+                callback(changed)
+        self._listeners = alive
+
+    def watch_file(self):
+        """Reload and notify listeners when another process edits the file.
+
+        Requires a running Qt application; does nothing without one.
+        """
+        if self._watcher is not None or QCoreApplication.instance() is None:
+            return
+        self._watcher = QFileSystemWatcher()
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        # The directory tells us when the file is (re)created
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        directory = os.path.dirname(self.fileName())
+        if os.path.isdir(directory):
+            self._watcher.addPath(directory)
+        self._watch_path()
+
+    def _watch_path(self) -> bool:
+        """Watch the settings file; True if it was not watched before."""
+        path = self.fileName()
+        if path and os.path.exists(path) and path not in self._watcher.files():
+            return self._watcher.addPath(path)
+        return False
+
+    def _on_directory_changed(self, directory: str):
+        if self._watch_path():
+            self._on_file_changed(self.fileName())
+
+    def _on_file_changed(self, path: str):
+        # Atomic saves replace the file, which drops it from the watcher
+        if path not in self._watcher.files():
+            self._watch_path()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._own_mtime_ns:
+            return  # Our own flush
+
+        logger.info("Settings file changed externally, reloading")
+        self._settings.sync()
+        self._notify(None)
+
+    # ========================================================================
+    # FLUSHING
+    # ========================================================================
+
+    def _schedule_flush(self):
+        """Start the flush timer unless one is already waiting."""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def has_pending_writes(self) -> bool:
+        """Check whether there are writes not yet on disk."""
+        with self._lock:
+            return bool(self._pending or self._inflight)
+
+    def flush(self):
+        """Write pending changes to disk now (blocking)."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return
+                self._inflight, self._pending = self._pending, {}
+                batch = dict(self._inflight)
+
+            settings = self._open()
+            for key, value in batch.items():
+                if value is _REMOVED:
+                    settings.remove(key)
+                else:
+                    settings.setValue(key, value)
+            settings.sync()
+            if settings.status() != QSettings.NoError:
+                logger.warning(f"Settings flush failed: {settings.status()}")
+
+            try:
+                self._own_mtime_ns = os.stat(settings.fileName()).st_mtime_ns
+            except OSError:
+                pass
+
+            with self._lock:
+                self._inflight = {}
+            logger.debug(f"Flushed {len(batch)} setting(s)")
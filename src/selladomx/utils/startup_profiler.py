@@ -0,0 +1,176 @@
+"""Startup import profiler based on ``python -X importtime``.
+
+Also records launch latency (time to first frame) per release when
+SELLADOMX_STARTUP_METRICS points to a JSONL file.
+
+Usage:
+    python -m selladomx.utils.startup_profiler [module] [--top N]
+
+Exits with status 1 if importing the module exceeds STARTUP_IMPORT_BUDGET_MS
+or pulls in one of HEAVY_MODULES, so it can run as a CI regression check.
+"""
+import argparse
+import json
+import logging
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ..config import STARTUP_IMPORT_BUDGET_MS
+
+logger = logging.getLogger(__name__)
+
+# Packages that must not load before the first frame
+HEAVY_MODULES = (
+    "pyhanko",
+    "pyhanko_certvalidator",
+    "cryptography",
+    "asn1crypto",
+    "requests",
+)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+@dataclass(slots=True)
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def top_level_package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` stderr output.
+
+    Args:
+        output: Text written to stderr by the interpreter
+
+    Returns:
+        Records in the order the interpreter reported them
+    """
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return records
+
+
+def profile_imports(
+    module: str = "selladomx.main", python: Optional[str] = None
+) -> List[ImportRecord]:
+    """Import a module in a fresh interpreter and collect import times.
+
+    Args:
+        module: Module to import
+        python: Interpreter to use (default: the current one)
+
+    Returns:
+        Parsed import records
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: List[ImportRecord], module: str) -> float:
+    """Cumulative import time of a module in milliseconds (0 if absent)."""
+    for record in records:
+        if record.module == module:
+            return record.cumulative_us / 1000
+    return 0.0
+
+
+def heavy_modules_loaded(records: List[ImportRecord]) -> List[str]:
+    """HEAVY_MODULES packages that were imported."""
+    loaded = {record.top_level_package for record in records}
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def format_report(records: List[ImportRecord], top: int = 20) -> str:
+    """Human readable report of the slowest imports.
+
+    Args:
+        records: Parsed import records
+        top: Number of modules and packages to list
+
+    Returns:
+        Multi-line report
+    """
+    packages: Dict[str, int] = {}
+    for record in records:
+        package = record.top_level_package
+        packages[package] = packages.get(package, 0) + record.self_us
+
+    lines = [f"{'cumulative ms':>14} {'self ms':>9}  module"]
+    slowest = sorted(records, key=lambda record: record.cumulative_us, reverse=True)
+    for record in slowest[:top]:
+        lines.append(
+            f"{record.cumulative_us / 1000:14.1f} {record.self_us / 1000:9.1f}  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+
+    lines.append("")
+    lines.append(f"{'total ms':>14}  package")
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in ranked[:top]:
+        lines.append(f"{self_us / 1000:14.1f}  {package}")
+    return "\n".join(lines)
+
+
+def record_startup_metrics(path: str, **metrics):
+    """Append one launch measurement to a JSONL file.
+
+    Args:
+        path: JSONL file to append to
+        **metrics: Values to record (version, first_frame_ms, ...)
+    """
+    record = {"timestamp": time.time(), **metrics}
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not record startup metrics: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="selladomx.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    records = profile_imports(args.module)
+    print(format_report(records, args.top))
+
+    elapsed = total_ms(records, args.module)
+    heavy = heavy_modules_loaded(records)
+    print(f"\n{args.module}: {elapsed:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+    return 1 if heavy or elapsed > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
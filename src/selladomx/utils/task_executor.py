@@ -0,0 +1,287 @@
+"""Shared background task executor for the QML bridge layer."""
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from ..config import TASK_EXECUTOR_MAX_THREADS
+
+logger = logging.getLogger(__name__)
+
+
+class TaskPriority(IntEnum):
+    """Order in which queued tasks start (higher first)."""
+
+    LOW = 0
+    NORMAL = 50
+    HIGH = 100
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task to stop it after its token was cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe flag a task polls to stop early."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Raise TaskCancelled if the task was cancelled."""
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+class TaskContext:
+    """Passed to tasks submitted with with_context=True."""
+
+    def __init__(
+        self, executor: "TaskExecutor", task_id: int, token: CancellationToken
+    ):
+        self._executor = executor
+        self._task_id = task_id
+        self.token = token
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def report(self, value: Any):
+        """Deliver an intermediate result through TaskHandle.progress."""
+        self._executor._task_progress.emit(self._task_id, value)
+
+
+class TaskHandle(QObject):
+    """A submitted task. Its signals are emitted on the GUI thread."""
+
+    succeeded = Signal(object)  # result
+    failed = Signal(object)  # exception
+    cancelled = Signal()
+    progress = Signal(object)  # value passed to TaskContext.report()
+    finished = Signal()  # After any of the above
+
+    def __init__(self, name: str, token: CancellationToken):
+        super().__init__()
+        self.name = name
+        self.token = token
+        self._done = False
+
+    def cancel(self):
+        """Cancel the task: it will not start, or its result is discarded."""
+        self.token.cancel()
+
+    def is_done(self) -> bool:
+        return self._done
+
+
+@dataclass(slots=True)
+class TaskStats:
+    """Queue wait and run time of every task with the same name."""
+
+    count: int = 0
+    failures: int = 0
+    cancellations: int = 0
+    total_wait: float = 0.0
+    total_run: float = 0.0
+    max_wait: float = 0.0
+    max_run: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.count if self.count else 0.0
+
+    @property
+    def mean_run(self) -> float:
+        return self.total_run / self.count if self.count else 0.0
+
+
+# Outcome of a task, as passed from the pool thread to the GUI thread
+_SUCCEEDED = "succeeded"
+_FAILED = "failed"
+_CANCELLED = "cancelled"
+
+
+class _Task(QRunnable):
+    """Runs one task on a pool thread and reports its outcome."""
+
+    def __init__(self, executor, task_id, fn, token, context, submitted_at):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._executor = executor
+        self._task_id = task_id
+        self._fn = fn
+        self._token = token
+        self._context = context
+        self._submitted_at = submitted_at
+
+    def run(self):
+        started_at = time.perf_counter()
+        wait = started_at - self._submitted_at
+        if self._token.cancelled:
+            self._executor._task_done.emit(self._task_id, _CANCELLED, None, wait, 0.0)
+            return
+
+        try:
+            result = self._fn(self._context) if self._context else self._fn()
+            outcome = _CANCELLED if self._token.cancelled else _SUCCEEDED
+        except TaskCancelled:
+            outcome, result = _CANCELLED, None
+        except Exception as e:
+            outcome, result = _FAILED, e
+        run_time = time.perf_counter() - started_at
+        self._executor._task_done.emit(self._task_id, outcome, result, wait, run_time)
+
+
+class TaskExecutor(QObject):
+    """Bounded thread pool for background work of the bridge objects.
+
+    Tasks run on a QThreadPool limited to TASK_EXECUTOR_MAX_THREADS, start
+    in priority order and can be cancelled through their handle. Results
+    are delivered on the GUI thread via TaskHandle signals, so handlers
+    may touch QObjects directly. Queue wait and run time are recorded per
+    task name (see stats()) and announced through taskCompleted.
+
+    submit() must be called from the GUI thread. Use shared() to get the
+    process-wide instance.
+    """
+
+    # name, outcome, queue wait (s), run time (s)
+    taskCompleted = Signal(str, str, float, float)
+
+    # Internal: pool thread -> GUI thread
+    _task_done = Signal(int, str, object, float, float)
+    _task_progress = Signal(int, object)
+
+    _shared: Optional["TaskExecutor"] = None
+
+    def __init__(self, max_threads: int = TASK_EXECUTOR_MAX_THREADS, parent=None):
+        """Initialize the executor.
+
+        Args:
+            max_threads: Tasks that may run at the same time
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._ids = itertools.count(1)
+        self._handles: Dict[int, TaskHandle] = {}
+        self._stats: Dict[str, TaskStats] = {}
+        self._task_done.connect(self._on_task_done)
+        self._task_progress.connect(self._on_task_progress)
+
+    @classmethod
+    def shared(cls) -> "TaskExecutor":
+        """Get the process-wide executor."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def max_threads(self) -> int:
+        return self._pool.maxThreadCount()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        name: str,
+        priority: TaskPriority = TaskPriority.NORMAL,
+        with_context: bool = False,
+    ) -> TaskHandle:
+        """Queue a task.
+
+        Args:
+            fn: Callable to run; called with a TaskContext if with_context
+            name: Name used for logging and stats (e.g. "tokens/list")
+            priority: Start order relative to other queued tasks
+            with_context: Pass a TaskContext (cancellation, progress)
+
+        Returns:
+            Handle whose signals report the outcome
+        """
+        task_id = next(self._ids)
+        token = CancellationToken()
+        handle = TaskHandle(name, token)
+        self._handles[task_id] = handle
+        context = TaskContext(self, task_id, token) if with_context else None
+        task = _Task(self, task_id, fn, token, context, time.perf_counter())
+        self._pool.start(task, int(priority))
+        return handle
+
+    def pending_count(self) -> int:
+        """Tasks submitted whose outcome was not delivered yet."""
+        return len(self._handles)
+
+    def cancel_all(self):
+        """Cancel every pending task."""
+        for handle in self._handles.values():
+            handle.cancel()
+
+    def wait_for_done(self, timeout_ms: int = -1) -> bool:
+        """Block until the pool is idle (for shutdown and tests).
+
+        Outcomes are delivered once the event loop runs again.
+        """
+        return self._pool.waitForDone(timeout_ms)
+
+    def shutdown(self, timeout_ms: int = 2000):
+        """Cancel pending tasks and wait for running ones."""
+        self.cancel_all()
+        self.wait_for_done(timeout_ms)
+
+    def stats(self) -> Dict[str, TaskStats]:
+        """Timing stats per task name."""
+        return dict(self._stats)
+
+    def _on_task_progress(self, task_id: int, value: Any):
+        handle = self._handles.get(task_id)
+        if handle is not None and not handle.token.cancelled:
+            handle.progress.emit(value)
+
+    def _on_task_done(
+        self, task_id: int, outcome: str, result: Any, wait: float, run_time: float
+    ):
+        handle = self._handles.pop(task_id, None)
+        if handle is None:
+            return
+        handle._done = True
+        if handle.token.cancelled:
+            outcome = _CANCELLED
+        self._record(handle.name, outcome, wait, run_time)
+
+        if outcome == _SUCCEEDED:
+            handle.succeeded.emit(result)
+        elif outcome == _FAILED:
+            logger.debug(f"Task {handle.name} failed: {result}")
+            handle.failed.emit(result)
+        else:
+            handle.cancelled.emit()
+        handle.finished.emit()
+
+    def _record(self, name: str, outcome: str, wait: float, run_time: float):
+        stats = self._stats.setdefault(name, TaskStats())
+        stats.count += 1
+        stats.failures += outcome == _FAILED
+        stats.cancellations += outcome == _CANCELLED
+        stats.total_wait += wait
+        stats.total_run += run_time
+        stats.max_wait = max(stats.max_wait, wait)
+        stats.max_run = max(stats.max_run, run_time)
+        logger.debug(
+            f"Task {name} {outcome}: waited {wait * 1000:.1f} ms, "
+            f"ran {run_time * 1000:.1f} ms"
+        )
+        self.taskCompleted.emit(name, outcome, wait, run_time)
@@ -1,10 +1,11 @@
 """Update checker for SelladoMX using GitHub releases API."""
 import logging
 from urllib.request import urlopen, Request
-from urllib.error import URLError
 import json
 
-from PySide6.QtCore import QObject, Signal, Slot, QThread
+from PySide6.QtCore import QObject, Signal, Slot
+
+from .task_executor import TaskExecutor, TaskPriority
 
 logger = logging.getLogger(__name__)
 
@@ -18,32 +19,30 @@ def _parse_version(version_str: str) -> tuple[int, ...]:
     return tuple(int(x) for x in clean.split("."))
 
 
-class _CheckWorker(QThread):
-    """Background thread that fetches the latest release from GitHub."""
+def _fetch_latest_version() -> str:
+    """Fetch the latest release tag from GitHub (blocking).
 
-    result = Signal(str)  # latest version tag (e.g. "0.3.1")
-    error = Signal(str)
+    Returns:
+        Latest version without the "v" prefix (e.g. "0.3.1")
 
-    def run(self):
-        try:
-            url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-            req = Request(url, headers={"Accept": "application/vnd.github+json"})
-            with urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-            tag = data.get("tag_name", "")
-            if tag:
-                self.result.emit(tag.lstrip("v"))
-            else:
-                self.error.emit("No tag found in latest release")
-        except (URLError, json.JSONDecodeError, OSError) as e:
-            self.error.emit(str(e))
+    Raises:
+        URLError, OSError, ValueError: If the release cannot be read
+    """
+    url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+    req = Request(url, headers={"Accept": "application/vnd.github+json"})
+    with urlopen(req, timeout=10) as resp:
+        data = json.loads(resp.read().decode("utf-8"))
+    tag = data.get("tag_name", "")
+    if not tag:
+        raise ValueError("No tag found in latest release")
+    return tag.lstrip("v")
 
 
 class UpdateChecker(QObject):
     """Checks for app updates against the latest GitHub release.
 
     Emits updateAvailable with (latest_version, download_url) if a newer
-    version is found. Runs the network request in a background thread.
+    version is found. Runs the network request on the shared TaskExecutor.
     """
 
     updateAvailable = Signal(str, str)  # latest_version, download_url
@@ -51,19 +50,20 @@ class UpdateChecker(QObject):
     def __init__(self, current_version: str):
         super().__init__()
         self._current_version = current_version
-        self._worker = None
+        self._task = None
 
     @Slot()
     def check(self):
         """Start an async check for updates."""
-        if self._worker and self._worker.isRunning():
+        if self._task is not None:
             return
 
-        self._worker = _CheckWorker(self)
-        self._worker.result.connect(self._on_result)
-        self._worker.error.connect(self._on_error)
-        self._worker.finished.connect(self._cleanup)
-        self._worker.start()
+        self._task = TaskExecutor.shared().submit(
+            _fetch_latest_version, name="updates/check", priority=TaskPriority.LOW
+        )
+        self._task.succeeded.connect(self._on_result)
+        self._task.failed.connect(self._on_error)
+        self._task.finished.connect(self._cleanup)
 
         logger.info(f"Checking for updates (current: {self._current_version})")
 
@@ -83,10 +83,8 @@ class UpdateChecker(QObject):
         else:
             logger.info(f"App is up to date ({self._current_version})")
 
-    def _on_error(self, message: str):
-        logger.warning(f"Update check failed: {message}")
+    def _on_error(self, error: Exception):
+        logger.warning(f"Update check failed: {error}")
 
     def _cleanup(self):
-        if self._worker:
-            self._worker.deleteLater()
-            self._worker = None
+        self._task = None
@@ -0,0 +1,193 @@
+"""Shared pytest fixtures."""
+from dataclasses import dataclass
+
+import pytest
+
+
+def build_pdf(page_count: int = 1) -> bytes:
+    """Build a minimal valid PDF with the given number of blank pages."""
+    page_ids = range(3, 3 + page_count)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % i for i in page_ids)
+        + b"] /Count %d >>" % page_count,
+    ]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * page_count
+
+    out = bytearray(b"%PDF-1.7\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Factory fixture that writes a minimal PDF and returns its path."""
+
+    def _make_pdf(name: str = "doc.pdf", page_count: int = 1):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(build_pdf(page_count))
+        return path
+
+    return _make_pdf
+
+
+@pytest.fixture
+def run_worker(qtbot):
+    """Run a SigningWorker in the test thread and deliver its signals.
+
+    Pipeline stages and concurrent partitions emit from their own threads,
+    so their signals are queued until the event loop runs.
+    """
+    from PySide6.QtCore import QCoreApplication
+
+    def _run_worker(worker):
+        worker.run()
+        QCoreApplication.processEvents()
+        return worker
+
+    return _run_worker
+
+
+@pytest.fixture(scope="session")
+def signing_identity():
+    """Self-signed certificate and RSA key for signing tests."""
+    from datetime import datetime, timedelta, timezone
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name(
+        [
+            x509.NameAttribute(NameOID.COMMON_NAME, "Firmante de Prueba"),
+            x509.NameAttribute(NameOID.SERIAL_NUMBER, "PRUE800101HDFXXX01"),
+        ]
+    )
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=365))
+        .sign(key, hashes.SHA256())
+    )
+    return cert, key
+
+
+@dataclass
+class CAIdentity:
+    """Test CA with a signer and a TSA certificate (cryptography objects)."""
+
+    ca_cert: object
+    ca_key: object
+    signer_cert: object
+    signer_key: object
+    tsa_cert: object
+    tsa_key: object
+
+    def tsa_asn1(self):
+        """TSA certificate and key as asn1crypto objects (for pyhanko)."""
+        from asn1crypto import keys, x509 as asn1_x509
+        from cryptography.hazmat.primitives import serialization
+
+        cert = asn1_x509.Certificate.load(
+            self.tsa_cert.public_bytes(serialization.Encoding.DER)
+        )
+        key = keys.PrivateKeyInfo.load(
+            self.tsa_key.private_bytes(
+                serialization.Encoding.DER,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        return cert, key
+
+
+@pytest.fixture(scope="session")
+def ca_identity():
+    """A CA issuing a signer certificate and a TSA certificate."""
+    from datetime import datetime, timedelta, timezone
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+    now = datetime.now(timezone.utc)
+
+    def issue(common_name, issuer, issuer_key, extension):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        subject = x509.Name(
+            [
+                x509.NameAttribute(NameOID.COMMON_NAME, common_name),
+                x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SelladoMX Pruebas"),
+            ]
+        )
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(subject)
+            .issuer_name(issuer or subject)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1))
+            .not_valid_after(now + timedelta(days=365))
+            .add_extension(extension, critical=True)
+            .sign(issuer_key or key, hashes.SHA256())
+        )
+        return cert, key
+
+    ca_cert, ca_key = issue(
+        "SelladoMX CA de Prueba",
+        None,
+        None,
+        x509.BasicConstraints(ca=True, path_length=None),
+    )
+    signer_cert, signer_key = issue(
+        "Firmante de Prueba",
+        ca_cert.subject,
+        ca_key,
+        x509.KeyUsage(
+            digital_signature=True,
+            content_commitment=True,
+            key_encipherment=False,
+            data_encipherment=False,
+            key_agreement=False,
+            key_cert_sign=False,
+            crl_sign=False,
+            encipher_only=False,
+            decipher_only=False,
+        ),
+    )
+    tsa_cert, tsa_key = issue(
+        "SelladoMX TSA de Prueba",
+        ca_cert.subject,
+        ca_key,
+        x509.ExtendedKeyUsage([ExtendedKeyUsageOID.TIME_STAMPING]),
+    )
+    return CAIdentity(ca_cert, ca_key, signer_cert, signer_key, tsa_cert, tsa_key)
+
+
+@pytest.fixture(scope="session")
+def dummy_timestamper(ca_identity):
+    """Local RFC 3161 timestamper using the test TSA certificate."""
+    from pyhanko.sign.timestamps import DummyTimeStamper
+
+    tsa_cert, tsa_key = ca_identity.tsa_asn1()
+    return DummyTimeStamper(tsa_cert=tsa_cert, tsa_key=tsa_key)
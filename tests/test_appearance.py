@@ -0,0 +1,90 @@
+"""Tests para el sello visible de la firma"""
+import pytest
+from pyhanko.pdf_utils.reader import PdfFileReader
+
+from selladomx.signing.appearance import (
+    SignatureAppearance,
+    StampPlacement,
+    parse_page_spec,
+)
+from selladomx.signing.pdf_signer import PDFSigner
+
+
+def _annotations(pdf_path):
+    """Subtipos de anotación por página y flujo del sello del campo"""
+    with open(pdf_path, "rb") as f:
+        reader = PdfFileReader(f)
+        pages = [
+            [annot.get_object()["/Subtype"] for annot in page.get("/Annots", [])]
+            for page in (kid.get_object() for kid in reader.root["/Pages"]["/Kids"])
+        ]
+        field = reader.embedded_signatures[0].sig_field
+        widget = field["/Kids"][0].get_object() if "/Kids" in field else field
+        appearance = widget["/AP"]["/N"].get_object()
+        static = appearance["/Resources"]["/XObject"]["/Static"].get_object()
+        return pages, appearance.data, static.data
+
+
+class TestPageSpec:
+    """Tests para la elección de páginas"""
+
+    def test_parse(self):
+        assert parse_page_spec("1") == (0,)
+        assert parse_page_spec("1, -1") == (0, -1)
+
+    @pytest.mark.parametrize("spec", ["", "0", "uno"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_page_spec(spec)
+
+    def test_resolve_skips_duplicates_and_out_of_range(self):
+        placement = StampPlacement(pages=(0, -1, 7))
+        assert placement.resolve(3) == [0, 2]
+        assert placement.resolve(1) == [0]
+        assert StampPlacement(pages=(9,)).resolve(2) == [1]
+
+
+class TestVisibleStamp:
+    """Tests para la firma con sello visible"""
+
+    def test_invisible_by_default(self, make_pdf, signing_identity):
+        cert, key = signing_identity
+        output = PDFSigner(cert, key).sign_pdf(make_pdf())
+
+        with open(output, "rb") as f:
+            field = PdfFileReader(f).embedded_signatures[0].sig_field
+            widget = field["/Kids"][0].get_object() if "/Kids" in field else field
+            assert [float(v) for v in widget["/Rect"]] == [0, 0, 0, 0]
+
+    def test_stamp_on_chosen_pages(self, make_pdf, signing_identity):
+        """El campo va en la primera página elegida y hay copia en las demás"""
+        cert, key = signing_identity
+        appearance = SignatureAppearance(
+            StampPlacement(pages=(0, -1)), verification_url="https://example.mx/v"
+        )
+        output = PDFSigner(cert, key, appearance=appearance).sign_pdf(
+            make_pdf(page_count=3)
+        )
+
+        pages, stream, static = _annotations(output)
+        assert pages == [["/Widget"], [], ["/Stamp"]]
+        assert b"/Static Do" in stream and b"/QR Do" in stream
+        assert b"(Fecha: " in stream
+        assert b"(Firmante de Prueba)" in static
+        assert b"(Serie: PRUE800101HDFXXX01)" in static
+        assert PDFSigner.verify_signature(output) is True
+
+    def test_template_rendered_once_per_certificate(self, make_pdf, signing_identity):
+        """Los documentos del lote reutilizan la parte estática"""
+        cert, key = signing_identity
+        appearance = SignatureAppearance()
+        outputs = [
+            PDFSigner(cert, key, appearance=appearance).sign_pdf(
+                make_pdf(f"doc{i}.pdf")
+            )
+            for i in range(3)
+        ]
+
+        assert (appearance.misses, appearance.hits) == (1, 2)
+        statics = {_annotations(output)[2] for output in outputs}
+        assert len(statics) == 1
@@ -0,0 +1,53 @@
+"""Tests for credit-aware batch planning."""
+from pathlib import Path
+
+from selladomx.signing.batch_planner import CreditPolicy, plan_batch
+
+PATHS = [Path(f"/tmp/{name}.pdf") for name in "abcde"]
+
+
+class TestPlanBatch:
+    """Tests for splitting a batch by credit balance and policy."""
+
+    def test_free_tsa_batch(self):
+        """Without professional TSA everything goes to the free partition."""
+        plan = plan_batch(PATHS, use_professional_tsa=False, balance=0)
+
+        assert plan.free == PATHS
+        assert plan.professional == [] and plan.unfunded == []
+
+    def test_enough_credits(self):
+        """A funded batch is entirely professional."""
+        plan = plan_batch(PATHS, use_professional_tsa=True, balance=100)
+
+        assert plan.professional == PATHS
+        assert plan.total == 5
+
+    def test_professional_only_marks_overflow_unfunded(self):
+        """Files beyond the balance are not signed under professional_only."""
+        plan = plan_batch(PATHS, use_professional_tsa=True, balance=2)
+
+        assert plan.professional == PATHS[:2]
+        assert plan.unfunded == PATHS[2:]
+        assert plan.free == []
+        assert plan.total == 5
+
+    def test_fallback_free_moves_overflow_to_free(self):
+        """Files beyond the balance go to the free TSA under fallback_free."""
+        plan = plan_batch(
+            PATHS,
+            use_professional_tsa=True,
+            balance=3,
+            policy=CreditPolicy.FALLBACK_FREE,
+        )
+
+        assert plan.professional == PATHS[:3]
+        assert plan.free == PATHS[3:]
+        assert plan.unfunded == []
+
+    def test_unknown_balance_is_optimistic(self):
+        """An unknown balance sends the whole batch to professional TSA."""
+        plan = plan_batch(PATHS, use_professional_tsa=True, balance=None)
+
+        assert plan.professional == PATHS
+        assert plan.balance is None
@@ -0,0 +1,150 @@
+"""Tests for the benchmark corpus, the local TSA and result comparison."""
+import base64
+import hashlib
+import json
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate
+from benchmarks.identity import make_identity
+from benchmarks.run import compare, percentile
+from benchmarks.tsa_server import FaultProfile, LocalTSAServer, timestamp_request
+
+
+@pytest.fixture(scope="module")
+def identity():
+    return make_identity()
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        CorpusSpec("plain", pages=3, size_bytes=64 * 1024),
+        CorpusSpec("many_xref", pages=2, layout="many_xref", updates=20),
+        CorpusSpec("objstm", pages=5, layout="object_streams"),
+    ],
+    ids=lambda spec: spec.layout,
+)
+def test_corpus_layouts_are_valid_pdfs(tmp_path, spec):
+    from pyhanko.pdf_utils.reader import PdfFileReader
+
+    path = generate(spec, tmp_path / spec.filename)
+
+    with open(path, "rb") as f:
+        reader = PdfFileReader(f, strict=True)
+        assert reader.root["/Pages"]["/Count"] == spec.pages
+    assert path.stat().st_size >= spec.size_bytes * 0.8
+
+
+def test_corpus_is_deterministic(tmp_path):
+    spec = CorpusSpec("same", pages=1, size_bytes=20 * 1024)
+    first = generate(spec, tmp_path / "a.pdf").read_bytes()
+    second = generate(spec, tmp_path / "b.pdf").read_bytes()
+    assert first == second
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = [{"scenario": "sign_free", "docs_per_sec": 10.0, "p99_ms": 100.0}]
+    current = [{"scenario": "sign_free", "docs_per_sec": 9.5, "p99_ms": 130.0}]
+
+    regressions = compare(current, baseline, threshold=0.10)
+
+    assert len(regressions) == 1
+    assert "p99_ms" in regressions[0]
+
+
+def test_local_tsa_issues_signed_tokens(identity):
+    from asn1crypto import tsp
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+
+    digest = hashlib.sha256(b"documento").digest()
+    request = tsp.TimeStampReq.load(timestamp_request(digest))
+    server = LocalTSAServer(identity)
+
+    status, _, body = server.handle_tsr(request.dump())
+
+    assert status == 200
+    response = tsp.TimeStampResp.load(body)
+    assert response["status"]["status"].native == "granted"
+    signed_data = response["time_stamp_token"]["content"]
+    tst_info = signed_data["encap_content_info"]["content"].parsed
+    assert tst_info["message_imprint"]["hashed_message"].native == digest
+    assert tst_info["nonce"].native == request["nonce"].native
+    signer_info = signed_data["signer_infos"][0]
+    identity.tsa_cert.public_key().verify(
+        signer_info["signature"].native,
+        b"\x31" + signer_info["signed_attrs"].dump()[1:],  # Signed as a SET
+        PKCS1v15(),
+        hashes.SHA256(),
+    )
+
+
+def test_local_tsa_serves_over_http(identity):
+    import requests
+
+    with LocalTSAServer(identity, credits=5) as server:
+        tsr = requests.post(f"{server.url}/tsr", data=timestamp_request(), timeout=10)
+        sign = requests.post(
+            f"{server.url}/api/v1/timestamp/sign",
+            json={"tsa_req_b64": base64.b64encode(timestamp_request()).decode()},
+            timeout=10,
+        )
+        balance = requests.get(f"{server.url}/api/v1/balance", timeout=10)
+
+    assert tsr.status_code == 200
+    assert tsr.headers["Content-Type"] == "application/timestamp-reply"
+    assert sign.status_code == 200
+    assert sign.json()["credits_remaining"] == 4
+    assert balance.json() == {"credits_remaining": 4}
+
+
+def test_local_tsa_injects_errors(identity):
+    server = LocalTSAServer(identity, faults=FaultProfile(error_rate=1.0))
+
+    assert server.handle_tsr(timestamp_request())[0] == 500
+    assert server.handle_api_sign(b"{}")[0] == 500
+    assert server.counters.snapshot()["errors"] == 2
+
+
+def test_local_tsa_throttles_beyond_rate_limit(identity):
+    server = LocalTSAServer(identity, faults=FaultProfile(rate_limit=1, burst=1))
+
+    assert server.handle_tsr(timestamp_request())[0] == 200
+    assert server.handle_tsr(timestamp_request())[0] == 503
+    assert server.handle_api_sign(b"{}")[0] == 429
+    assert server.counters.snapshot()["throttled"] == 2
+
+
+def test_local_tsa_api_runs_out_of_credits(identity):
+    server = LocalTSAServer(identity, credits=1)
+    body = json.dumps(
+        {"tsa_req_b64": base64.b64encode(timestamp_request()).decode()}
+    ).encode()
+
+    assert server.handle_api_sign(body)[0] == 200
+    status, payload = server.handle_api_sign(body)
+
+    assert status == 403
+    assert payload["error"] == "insufficient_credits"
+
+
+def test_local_tsa_batch_endpoint_grants_partially(identity):
+    server = LocalTSAServer(identity, credits=2)
+    request = {"tsa_req_b64": base64.b64encode(timestamp_request()).decode()}
+    body = json.dumps({"requests": [request] * 3}).encode()
+
+    status, payload = server.handle_api_sign_batch(body)
+
+    assert status == 200
+    errors = [result.get("error") for result in payload["results"]]
+    assert errors == [None, None, "insufficient_credits"]
+    assert payload["results"][2]["status_code"] == 403
+    assert payload["credits_remaining"] == 0
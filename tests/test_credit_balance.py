@@ -0,0 +1,93 @@
+"""Tests for CreditBalanceCache - TTL and background refresh."""
+from unittest.mock import patch
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from selladomx.api.exceptions import NetworkError
+from selladomx.ui.qml_bridge.credit_balance import CreditBalanceCache
+
+
+@pytest.fixture
+def mock_client():
+    with patch("selladomx.api.client.SelladoMXAPIClient") as mock_cls:
+        mock_cls.return_value.get_balance.return_value = {"credits_remaining": 42}
+        yield mock_cls.return_value
+
+
+def _finish(cache):
+    """Wait for the background refresh and deliver its queued signals."""
+    assert cache.wait()
+    QCoreApplication.processEvents()
+
+
+class TestCreditBalanceCache:
+    def test_seeded_balance_is_stale(self, qtbot):
+        cache = CreditBalanceCache(7)
+        assert cache.balance == 7
+        assert cache.is_stale()
+
+    def test_update_restarts_ttl(self, qtbot):
+        cache = CreditBalanceCache(7, ttl=60)
+        changes = []
+        cache.balanceChanged.connect(changes.append)
+
+        cache.update(5)
+        cache.update(5)
+
+        assert cache.balance == 5
+        assert not cache.is_stale()
+        assert changes == [5]
+
+    def test_refresh_fetches_in_background(self, mock_client, qtbot):
+        cache = CreditBalanceCache(0)
+        changes = []
+        cache.balanceChanged.connect(changes.append)
+
+        assert cache.refresh("key") is True
+        _finish(cache)
+
+        assert changes == [42]
+        assert not cache.is_stale()
+        mock_client.get_balance.assert_called_once()
+
+    def test_fresh_balance_is_not_refetched(self, mock_client, qtbot):
+        cache = CreditBalanceCache(0, ttl=60)
+        cache.update(3)
+
+        assert cache.refresh("key") is False
+        assert mock_client.get_balance.call_count == 0
+
+        assert cache.refresh("key", force=True) is True
+        _finish(cache)
+        assert cache.balance == 42
+
+    def test_expired_balance_is_refetched(self, mock_client, qtbot):
+        cache = CreditBalanceCache(0, ttl=0)
+        cache.update(3)
+
+        assert cache.is_stale()
+        assert cache.refresh("key") is True
+        _finish(cache)
+        assert cache.balance == 42
+
+    def test_concurrent_refreshes_are_coalesced(self, mock_client, qtbot):
+        cache = CreditBalanceCache(0)
+        cache.refresh("key")
+        cache.refresh("key", force=True)
+        _finish(cache)
+
+        assert mock_client.get_balance.call_count == 1
+
+    def test_refresh_error_keeps_balance(self, mock_client, qtbot):
+        mock_client.get_balance.side_effect = NetworkError("offline")
+        cache = CreditBalanceCache(7)
+        errors = []
+        cache.refreshFailed.connect(errors.append)
+
+        cache.refresh("key")
+        _finish(cache)
+
+        assert cache.balance == 7
+        assert cache.is_stale()
+        assert len(errors) == 1
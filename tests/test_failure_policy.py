@@ -0,0 +1,324 @@
+"""Tests for service failure policies and the TSA circuit breaker."""
+import asyncio
+import base64
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from asn1crypto import tsp
+
+from selladomx.api.exceptions import (
+    APIError,
+    AuthenticationError,
+    InsufficientCreditsError,
+    NetworkError,
+)
+from selladomx.signing.failure_policy import CircuitBreaker, is_transient
+from selladomx.signing.result import ErrorCode
+from selladomx.signing.worker import SigningWorker
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (NetworkError("timeout"), True),
+        (APIError("Bad gateway", 502), True),
+        (APIError("Too many requests", 429), True),
+        (APIError("Bad request", 400), False),
+        (AuthenticationError("Invalid token", 401), False),
+        (InsufficientCreditsError(), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+class TestCircuitBreaker:
+    """Tests for pausing and resuming calls to a failing service."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+        breaker.record_failure()
+        assert breaker.is_open
+        assert breaker.trips == 1
+
+    def test_single_probe_then_resume(self):
+        """After the cooldown one caller probes; the rest wait for it."""
+        breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+        breaker.record_failure()
+        breaker.wait()  # Blocks for the cooldown, then becomes the probe
+
+        resumed = threading.Event()
+
+        def waiter():
+            breaker.wait()
+            resumed.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        assert not resumed.wait(0.15)  # Held back while the probe runs
+
+        breaker.record_success()
+        assert resumed.wait(1)
+        thread.join()
+        assert not breaker.is_open
+
+    def test_guard_records_outcome(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        with pytest.raises(APIError):
+            with breaker.guard():
+                raise APIError("Bad request", 400)  # The service answered
+        assert not breaker.is_open
+
+        with pytest.raises(NetworkError):
+            with breaker.guard():
+                raise NetworkError("down")
+        assert breaker.is_open
+
+    def test_gives_up_after_max_open(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60, max_open=0.05)
+        breaker.record_failure()
+        start = time.monotonic()
+        with pytest.raises(NetworkError):
+            breaker.wait()
+        assert time.monotonic() - start < 1
+
+    def test_keeps_probing_after_max_open(self):
+        """A service that returns after max_open still closes the circuit."""
+        now = [0.0]
+        breaker = CircuitBreaker(
+            threshold=1, cooldown=10, max_open=30, clock=lambda: now[0]
+        )
+        breaker.record_failure()
+
+        now[0] = 31.0
+        with pytest.raises(NetworkError):
+            with breaker.guard():  # Probe while the service is still down
+                raise NetworkError("down")
+        now[0] = 35.0
+        with pytest.raises(NetworkError):
+            breaker.wait()  # Waiting callers fail fast between probes
+        assert breaker.is_open
+
+        now[0] = 41.0
+        with breaker.guard():  # Next probe: the service is back
+            pass
+        assert not breaker.is_open
+        with breaker.guard():
+            pass
+
+
+class TestWorkerFailurePolicies:
+    """Tests that service errors no longer have to abort the batch."""
+
+    PATHS = ["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/c.pdf"]
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(
+            "selladomx.signing.failure_policy.SERVICE_RETRY_BACKOFF", 0.0
+        )
+
+    @pytest.fixture(autouse=True)
+    def _worker_runner(self, run_worker):
+        self.run_worker = run_worker
+
+    def _run(self, policy, failures, mock_signer_cls, mock_api_cls):
+        """Sign PATHS; failures maps a file name to errors its seals raise."""
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 10}
+        failures = {name: list(errors) for name, errors in failures.items()}
+        seals = Counter()
+        lock = threading.Lock()
+
+        def make_signer(*args, **kwargs):
+            signer = MagicMock()
+            professional = kwargs["timestamper"] is not None
+            signer.prepare.side_effect = lambda pdf_path, *a, **k: MagicMock(
+                pdf_path=pdf_path
+            )
+
+            def seal(prepared):
+                name = prepared.pdf_path.name
+                with lock:
+                    seals[name, professional] += 1
+                    pending = failures.get(name) if professional else None
+                    error = pending.pop(0) if pending else None
+                if error is not None:
+                    raise error
+
+            signer.seal.side_effect = seal
+            signer.write.return_value = Path("/tmp/x_firmado.pdf")
+            return signer
+
+        mock_signer_cls.side_effect = make_signer
+        worker = SigningWorker(
+            pdf_paths=[Path(p) for p in self.PATHS],
+            cert=MagicMock(),
+            private_key=MagicMock(),
+            tsa_client=MagicMock(),
+            use_professional_tsa=True,
+            api_key="test-key",
+            failure_policy=policy,
+        )
+        completed = []
+        progress = []
+        worker.file_completed.connect(completed.append)
+        worker.progress.connect(lambda current, total: progress.append(current))
+        with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
+            self.run_worker(worker)
+        return worker, completed, progress, seals
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_abort_stops_batch(self, mock_signer_cls, mock_api_cls, _ts, qtbot):
+        worker, completed, _, _ = self._run(
+            "abort",
+            {
+                name: [APIError("Bad gateway", 502)]
+                for name in ("a.pdf", "b.pdf", "c.pdf")
+            },
+            mock_signer_cls,
+            mock_api_cls,
+        )
+        assert [result.success for result in completed] == [False]
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_retry_recovers_transient_errors(
+        self, mock_signer_cls, mock_api_cls, _ts, qtbot
+    ):
+        worker, completed, _, seals = self._run(
+            "retry",
+            {"a.pdf": [APIError("Bad gateway", 502), NetworkError("reset")]},
+            mock_signer_cls,
+            mock_api_cls,
+        )
+        assert sorted(r.source.name for r in completed if r.success) == [
+            "a.pdf",
+            "b.pdf",
+            "c.pdf",
+        ]
+        assert seals["a.pdf", True] == 3
+        assert worker.errors == []
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_permanent_error_fails_only_that_file(
+        self, mock_signer_cls, mock_api_cls, _ts, qtbot
+    ):
+        worker, completed, _, seals = self._run(
+            "retry",
+            {"b.pdf": [APIError("Bad request", 400)]},
+            mock_signer_cls,
+            mock_api_cls,
+        )
+        results = {r.source.name: r.error for r in completed}
+        assert results == {"a.pdf": None, "b.pdf": ErrorCode.API, "c.pdf": None}
+        assert seals["b.pdf", True] == 1
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_defer_signs_failed_files_at_the_end(
+        self, mock_signer_cls, mock_api_cls, _ts, qtbot
+    ):
+        worker, completed, progress, _ = self._run(
+            "defer",
+            {"a.pdf": [NetworkError("down")]},
+            mock_signer_cls,
+            mock_api_cls,
+        )
+        assert [r.success for r in completed] == [True, True, True]
+        assert completed[-1].source.name == "a.pdf"
+        assert sorted(progress) == [1, 2, 3]
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_fallback_free_when_service_down(
+        self, mock_signer_cls, mock_api_cls, _ts, qtbot
+    ):
+        worker, completed, _, seals = self._run(
+            "fallback_free",
+            {name: [NetworkError("down")] * 10 for name in ("a.pdf", "b.pdf", "c.pdf")},
+            mock_signer_cls,
+            mock_api_cls,
+        )
+        assert [r.success for r in completed] == [True, True, True]
+        assert sum(count for (_, pro), count in seals.items() if not pro) == 3
+
+
+class _FlakyTSAAPI:
+    """Fake SelladoMX API backed by a local TSA; the first request fails."""
+
+    def __init__(self, timestamper):
+        self.timestamper = timestamper
+        self.failures = 1
+
+    def get_balance(self):
+        return {"credits_remaining": 10}
+
+    def request_tsa_sign(self, tsa_req_b64, filename, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise APIError("Bad gateway", 502)
+        request = tsp.TimeStampReq.load(base64.b64decode(tsa_req_b64))
+        response = self.timestamper.request_tsa_response(request)
+        return {
+            "record_id": filename,
+            "tsa_resp_b64": base64.b64encode(response.dump()).decode("ascii"),
+        }
+
+    def request_tsa_sign_batch(self, tsa_requests, chunk_size):
+        return [self.request_tsa_sign(**payload) for payload in tsa_requests]
+
+    def complete_timestamp(self, *args):
+        pass
+
+
+def test_retried_seal_produces_valid_signature(
+    make_pdf, signing_identity, dummy_timestamper, monkeypatch, run_worker
+):
+    """A file sealed again after a service error carries an intact signature."""
+    from selladomx.signing.pdf_signer import PDFSigner
+    from selladomx.signing.tsa import APITimeStamper
+
+    monkeypatch.setattr("selladomx.signing.failure_policy.SERVICE_RETRY_BACKOFF", 0.0)
+    # Size estimation token, so no free TSA is contacted
+    monkeypatch.setattr(
+        APITimeStamper,
+        "_shared_dummies",
+        {"sha256": asyncio.run(dummy_timestamper.async_dummy_response("sha256"))},
+    )
+    api = _FlakyTSAAPI(dummy_timestamper)
+    worker = SigningWorker(
+        [make_pdf()],
+        *signing_identity,
+        use_professional_tsa=True,
+        api_key="test-key",
+        failure_policy="retry",
+    )
+    completed = []
+    worker.file_completed.connect(completed.append)
+    prepare = PDFSigner.prepare
+    with patch("selladomx.signing.worker.SelladoMXAPIClient", return_value=api):
+        with patch.object(
+            PDFSigner, "prepare", autospec=True, side_effect=prepare
+        ) as prepares:
+            run_worker(worker)
+
+    assert api.failures == 0
+    assert prepares.call_count == 2  # The retry seals a fresh document
+    assert [result.success for result in completed] == [True]
+    assert PDFSigner.verify_signature(completed[0].output) is True
@@ -2,6 +2,7 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+from PySide6.QtCore import QCoreApplication
 
 from selladomx.ui.qml_bridge.main_view_model import MainViewModel
 
@@ -20,30 +21,79 @@ def view_model():
     coordinator = MagicMock()
 
     vm = MainViewModel(settings, coordinator)
+    # Keep the cached balance fresh so no test fetches it from the API
+    vm._balance_cache.update(10)
     return vm
 
 
 class TestConfirmSigning:
     """Tests for the confirmSigning flow."""
 
-    def test_confirm_signing_emits_signal_when_ready(self, view_model):
-        """confirmSigning should emit showConfirmSigningDialog with correct data."""
+    def test_confirm_signing_emits_signal_when_ready(self, view_model, make_pdf, qtbot):
+        """confirmSigning should emit showConfirmSigningDialog after pre-flight."""
+        view_model._file_model.add_paths(
+            [str(make_pdf("a.pdf")), str(make_pdf("b.pdf"))]
+        )
         view_model._step1_complete = True
         view_model._step2_complete = True
-        view_model._pdf_files = ["/tmp/a.pdf", "/tmp/b.pdf"]
         view_model._use_professional_tsa = True
         view_model._credit_balance = 5
 
         signals = []
         view_model.showConfirmSigningDialog.connect(lambda *args: signals.append(args))
 
-        view_model.confirmSigning()
+        with qtbot.waitSignal(view_model.showConfirmSigningDialog, timeout=5000):
+            view_model.confirmSigning()
+        qtbot.waitUntil(lambda: not view_model.isAnalyzing)
 
         assert len(signals) == 1
         file_count, use_pro, balance = signals[0]
         assert file_count == 2
         assert use_pro is True
         assert balance == 5
+        assert view_model.preflightSummary["estimatedCredits"] == 2
+
+    def test_confirm_signing_skips_unsignable_files(
+        self, view_model, make_pdf, tmp_path, qtbot
+    ):
+        """Files rejected by pre-flight are excluded from the count and the batch."""
+        good = make_pdf("good.pdf")
+        view_model._file_model.add_paths([str(good), str(tmp_path / "missing.pdf")])
+        view_model._step1_complete = True
+        view_model._step2_complete = True
+
+        with qtbot.waitSignal(view_model.showConfirmSigningDialog) as blocker:
+            view_model.confirmSigning()
+        qtbot.waitUntil(lambda: not view_model.isAnalyzing)
+
+        assert blocker.args[0] == 1
+
+        view_model.startSigning()
+        pdf_paths = view_model.coordinator.start.call_args.kwargs["pdf_paths"]
+        assert pdf_paths == [good]
+
+    def test_stale_preflight_report_is_dropped(self, view_model, make_pdf):
+        """A report for an older queue or TSA mode is never used to sign."""
+        from selladomx.signing.preflight import run_preflight
+
+        first, second = make_pdf("a.pdf"), make_pdf("b.pdf")
+        view_model._file_model.add_paths([str(first)])
+        view_model._step1_complete = True
+        view_model._step2_complete = True
+        report = run_preflight([first])
+
+        # Files added while the analysis ran
+        view_model._file_model.add_paths([str(second)])
+        view_model._on_preflight_ready(report)
+        assert view_model._preflight_report is None
+
+        # TSA toggled after the analysis
+        view_model._preflight_report = run_preflight([first, second])
+        view_model._use_professional_tsa = True
+        view_model.startSigning()
+        pdf_paths = view_model.coordinator.start.call_args.kwargs["pdf_paths"]
+        assert pdf_paths == [first, second]
+        assert view_model._preflight_report is None
 
     def test_confirm_signing_blocked_when_steps_incomplete(self, view_model):
         """confirmSigning should not emit when steps are incomplete."""
@@ -84,19 +134,32 @@ class TestVerificationUrlCollection:
         view_model._verification_urls = [{"filename": "old.pdf", "url": "https://old"}]
         view_model._step1_complete = True
         view_model._step2_complete = True
-        view_model._pdf_files = ["/tmp/test.pdf"]
+        view_model._file_model.add_paths(["/tmp/test.pdf"])
         view_model._use_professional_tsa = False
 
         view_model.startSigning()
 
         assert view_model._verification_urls == []
 
+    def test_failed_start_resets_signing_state(self, view_model):
+        """If the coordinator cannot start, the form is not left signing."""
+        view_model._step1_complete = True
+        view_model._step2_complete = True
+        view_model._file_model.add_paths(["/tmp/test.pdf"])
+        view_model._use_professional_tsa = False
+        view_model.coordinator.start.side_effect = ValueError("'B-B' is not valid")
+
+        view_model.startSigning()
+
+        assert view_model.isSigning is False
+        assert "No se pudo iniciar la firma" in view_model._status_log
+
     def test_urls_emitted_on_signing_finished(self, view_model):
         """verificationUrlsReady should be emitted when signing finishes with URLs."""
         view_model._verification_urls = [
             {"filename": "a.pdf", "url": "https://example.com/v/a"},
         ]
-        view_model._pdf_files = ["/tmp/a.pdf"]
+        view_model._file_model.add_paths(["/tmp/a.pdf"])
         view_model._use_professional_tsa = True
         view_model._is_signing = True
 
@@ -111,7 +174,7 @@ class TestVerificationUrlCollection:
     def test_urls_not_emitted_when_empty(self, view_model):
         """verificationUrlsReady should NOT be emitted when no URLs collected."""
         view_model._verification_urls = []
-        view_model._pdf_files = ["/tmp/a.pdf"]
+        view_model._file_model.add_paths(["/tmp/a.pdf"])
         view_model._is_signing = True
 
         emitted = []
@@ -132,3 +195,226 @@ class TestTokenConfiguredViaDeepLink:
         view_model.tokenConfiguredViaDeepLink.connect(lambda: emitted.append(True))
         view_model.tokenConfiguredViaDeepLink.emit()
         assert len(emitted) == 1
+
+
+class TestCreditBalance:
+    """Tests for the cached credit balance."""
+
+    def test_balance_from_tsa_response_is_persisted(self, view_model):
+        """credits_remaining reported while signing updates and persists the balance."""
+        emitted = []
+        view_model.creditBalanceChanged.connect(lambda: emitted.append(True))
+
+        view_model._update_credit_balance(7)
+
+        assert view_model.creditBalance == 7
+        assert emitted == [True]
+        view_model.settings.set_last_credit_balance.assert_called_with(7)
+
+    def test_signing_finished_does_not_refetch_fresh_balance(self, view_model):
+        """A balance updated during the batch is not fetched again."""
+        view_model._file_model.add_paths(["/tmp/a.pdf"])
+        view_model._use_professional_tsa = True
+        view_model._is_signing = True
+
+        with patch("selladomx.api.client.SelladoMXAPIClient") as mock_client_cls:
+            view_model._update_credit_balance(9)
+            view_model._on_signing_finished([])
+
+        assert not view_model._balance_cache.is_refreshing()
+        mock_client_cls.assert_not_called()
+
+    def test_signing_finished_uses_reported_balance(self, view_model):
+        """The balance reported by the batch is final; no fetch even if stale."""
+        view_model._use_professional_tsa = True
+        view_model._is_signing = True
+
+        with patch.object(view_model, "_refresh_credit_balance") as refresh:
+            view_model._on_batch_credits_updated(9)
+            view_model._on_signing_finished([])
+
+        refresh.assert_not_called()
+        assert view_model.creditBalance == 9
+
+    def test_signing_finished_fetches_unreported_balance(self, view_model):
+        """Without a professional stamp in the batch the balance is fetched."""
+        view_model._use_professional_tsa = True
+        view_model._is_signing = True
+
+        with patch.object(view_model, "_refresh_credit_balance") as refresh:
+            view_model._on_signing_finished([])
+
+        refresh.assert_called_once_with()
+
+    def test_refresh_without_token_clears_balance(self, view_model):
+        """Without an API key the balance is reset without calling the API."""
+        view_model.settings.get_token.return_value = ""
+
+        view_model.refreshCreditBalance()
+
+        assert view_model.creditBalance == 0
+        assert not view_model._balance_cache.is_refreshing()
+
+
+class TestTokenManagement:
+    """Tests for token operations running in the background."""
+
+    @pytest.fixture
+    def mock_client(self):
+        with patch("selladomx.api.client.SelladoMXAPIClient") as mock_cls:
+            client = mock_cls.return_value
+            client.list_tokens.return_value = {
+                "derived": [{"id": "t1", "alias": "Laptop"}]
+            }
+            yield client
+
+    @staticmethod
+    def _finish(view_model):
+        """Wait for background calls, including follow-up refreshes."""
+        while view_model._token_tasks.is_running():
+            assert view_model._token_tasks.wait()
+            QCoreApplication.processEvents()
+
+    def test_list_tokens_runs_in_background(self, view_model, mock_client, qtbot):
+        """listTokens returns immediately and loads the list asynchronously."""
+        loaded = []
+        view_model.tokensLoaded.connect(loaded.append)
+
+        view_model.listTokens()
+        view_model.listTokens()  # Coalesced with the call in flight
+        self._finish(view_model)
+
+        assert mock_client.list_tokens.call_count == 1
+        assert loaded == [[{"id": "t1", "alias": "Laptop"}]]
+        assert view_model.tokensList == [{"id": "t1", "alias": "Laptop"}]
+
+    def test_revoke_removes_token_optimistically(self, view_model, mock_client, qtbot):
+        """The revoked token disappears before the API answers."""
+        view_model._set_tokens_list([{"id": "t1"}, {"id": "t2"}])
+        mock_client.list_tokens.return_value = {"derived": [{"id": "t2"}]}
+        revoked = []
+        view_model.tokenRevoked.connect(revoked.append)
+
+        view_model.revokeToken("t1")
+        assert view_model.tokensList == [{"id": "t2"}]
+
+        self._finish(view_model)
+        assert revoked == ["t1"]
+        mock_client.revoke_token.assert_called_once_with("t1")
+        mock_client.list_tokens.assert_called_once()
+
+    def test_failed_revoke_restores_list(self, view_model, mock_client, qtbot):
+        """A rejected revocation puts the token back and reports the error."""
+        from selladomx.api.exceptions import APIError
+
+        view_model._set_tokens_list([{"id": "t1"}])
+        mock_client.revoke_token.side_effect = APIError("No se puede revocar")
+        errors = []
+        view_model.tokenError.connect(errors.append)
+
+        view_model.revokeToken("t1")
+        self._finish(view_model)
+
+        assert view_model.tokensList == [{"id": "t1"}]
+        assert errors == ["Error al revocar subtoken: No se puede revocar"]
+        mock_client.list_tokens.assert_not_called()
+
+    def test_derive_appends_token_then_refreshes(self, view_model, mock_client, qtbot):
+        """A new token is shown right away and the list is refreshed after."""
+        mock_client.derive_token.return_value = {
+            "id": "t2",
+            "token": "smx_new",
+            "alias": "Oficina",
+            "expires_at": None,
+        }
+        derived = []
+        view_model.tokenDerived.connect(derived.append)
+        changes = []
+        view_model.tokensListChanged.connect(
+            lambda: changes.append(list(view_model.tokensList))
+        )
+
+        view_model.deriveToken("Oficina", 0)
+        self._finish(view_model)
+
+        mock_client.derive_token.assert_called_once_with("Oficina", None)
+        assert derived[0]["token"] == "smx_new"
+        assert changes[0][-1]["id"] == "t2"
+        assert "token" not in changes[0][-1]
+        assert view_model.tokensList == [{"id": "t1", "alias": "Laptop"}]
+
+    def test_failed_revoke_keeps_other_changes(self, view_model, mock_client, qtbot):
+        """Only the revoked token comes back; tokens added meanwhile stay."""
+        import threading
+
+        from selladomx.api.exceptions import APIError
+
+        answer = threading.Event()
+
+        def revoke_token(token_id):
+            assert answer.wait(5)
+            raise APIError("No se puede revocar")
+
+        view_model._set_tokens_list([{"id": "t1"}, {"id": "t2"}])
+        mock_client.revoke_token.side_effect = revoke_token
+
+        view_model.revokeToken("t1")
+        view_model._set_tokens_list(view_model.tokensList + [{"id": "t3"}])
+        answer.set()
+        self._finish(view_model)
+
+        assert view_model.tokensList == [{"id": "t1"}, {"id": "t2"}, {"id": "t3"}]
+
+    def test_repeated_derive_is_not_dropped(self, view_model, mock_client, qtbot):
+        """Two derives with the same alias both reach the API."""
+        mock_client.derive_token.side_effect = [
+            {"id": "t2", "alias": "Oficina"},
+            {"id": "t3", "alias": "Oficina"},
+        ]
+        derived = []
+        view_model.tokenDerived.connect(derived.append)
+
+        view_model.deriveToken("Oficina", 0)
+        view_model.deriveToken("Oficina", 0)
+        self._finish(view_model)
+
+        assert mock_client.derive_token.call_count == 2
+        assert [response["id"] for response in derived] == ["t2", "t3"]
+
+    def test_stale_list_result_is_ignored(self, view_model, mock_client, qtbot):
+        """A list fetched before a local change does not overwrite it."""
+        view_model.listTokens()
+        view_model._set_tokens_list([])  # Local change while in flight
+        self._finish(view_model)
+
+        assert view_model.tokensList == []
+
+
+def test_clear_list_cancels_running_scan(view_model, qtbot):
+    """Clearing the list stops the scan and drops its queued results."""
+    scan = MagicMock()
+    scan.isRunning.return_value = True
+    view_model._scan_worker = scan
+    view_model._pending_scan_roots = ["/otra/carpeta"]
+
+    view_model.clearPdfList()
+    view_model._on_scan_files_found(["/docs/a.pdf"])  # Queued before the cancel
+
+    scan.requestInterruption.assert_called_once()
+    assert view_model._pending_scan_roots == []
+    assert len(view_model._file_model) == 0
+
+
+def test_reset_form_cancels_running_scan(view_model, qtbot):
+    """Starting over stops the scan so it cannot refill the list."""
+    scan = MagicMock()
+    scan.isRunning.return_value = True
+    view_model._scan_worker = scan
+    view_model._pending_scan_roots = ["/otra/carpeta"]
+
+    view_model.resetForm()
+    view_model._on_scan_files_found(["/docs/a.pdf"])  # Queued before the cancel
+
+    scan.requestInterruption.assert_called_once()
+    assert view_model._pending_scan_roots == []
+    assert len(view_model._file_model) == 0
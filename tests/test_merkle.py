@@ -0,0 +1,187 @@
+"""Tests para el sello de tiempo agregado con árbol de Merkle"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from selladomx.signing import merkle
+from selladomx.signing.merkle import MerkleTree, verify_inclusion
+from selladomx.signing.pdf_signer import PDFSigner
+from selladomx.signing.worker import SigningWorker
+
+
+class TestMerkleTree:
+    """Tests para el árbol y las pruebas de inclusión"""
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13])
+    def test_every_leaf_proves_inclusion(self, count):
+        """Cada hoja lleva a la raíz, también con niveles impares"""
+        values = [b"firma-%d" % i for i in range(count)]
+        tree = MerkleTree(values)
+
+        for index, value in enumerate(values):
+            assert verify_inclusion(value, index, count, tree.proof(index), tree.root)
+
+    def test_wrong_leaf_or_index_fails(self):
+        """Una hoja ajena o en otra posición no se verifica"""
+        values = [b"a", b"b", b"c", b"d", b"e"]
+        tree = MerkleTree(values)
+
+        assert not verify_inclusion(b"x", 0, 5, tree.proof(0), tree.root)
+        assert not verify_inclusion(b"a", 1, 5, tree.proof(0), tree.root)
+        assert not verify_inclusion(b"a", 0, 5, tree.proof(0)[:-1], tree.root)
+
+    def test_empty_tree_rejected(self):
+        with pytest.raises(ValueError):
+            MerkleTree([])
+
+
+class TestMerkleTimestamp:
+    """Tests para el sello sobre la raíz y su verificación en el PDF"""
+
+    def _sign(self, signing_identity, paths):
+        cert, key = signing_identity
+        signer = PDFSigner(cert, key)
+        prepared = []
+        for path in paths:
+            job = signer.prepare(path)
+            signer.seal(job)
+            signer.write(job)
+            prepared.append(job)
+        return prepared
+
+    def test_proofs_verify_without_modifying_pdf(
+        self, make_pdf, signing_identity, dummy_timestamper
+    ):
+        """Cada PDF verifica su prueba y queda igual que al firmarlo"""
+        paths = [make_pdf(f"doc{i}.pdf") for i in range(3)]
+        prepared = self._sign(signing_identity, paths)
+
+        proofs = merkle.timestamp_signatures(
+            [
+                (job.signature_meta.field_name, job.post_signing.sig_contents)
+                for job in prepared
+            ],
+            dummy_timestamper,
+        )
+        signed_bytes = [job.output_path.read_bytes() for job in prepared]
+        for job, proof in zip(prepared, proofs):
+            merkle.save_proof(job.output_path, proof)
+
+        for job in prepared:
+            statuses = merkle.verify_merkle_timestamp(job.output_path)
+            assert len(statuses) == 1
+            assert statuses[0].valid
+            assert statuses[0].timestamp is not None
+            assert PDFSigner.verify_signature(job.output_path) is True
+        assert [job.output_path.read_bytes() for job in prepared] == signed_bytes
+
+    def test_proof_of_another_document_fails(
+        self, make_pdf, signing_identity, dummy_timestamper
+    ):
+        """Una prueba copiada a otro documento no se verifica"""
+        paths = [make_pdf("a.pdf"), make_pdf("b.pdf")]
+        prepared = self._sign(signing_identity, paths)
+        proofs = merkle.timestamp_signatures(
+            [
+                (job.signature_meta.field_name, job.post_signing.sig_contents)
+                for job in prepared
+            ],
+            dummy_timestamper,
+        )
+
+        merkle.save_proof(prepared[0].output_path, proofs[1])
+
+        statuses = merkle.verify_merkle_timestamp(prepared[0].output_path)
+        assert [s.reason for s in statuses] == ["bad_proof"]
+        assert PDFSigner.verify_signature(prepared[0].output_path) is False
+
+    def test_unsigned_batch_has_no_proofs(self, make_pdf, signing_identity):
+        """Un PDF firmado normalmente no tiene pruebas que verificar"""
+        (job,) = self._sign(signing_identity, [make_pdf()])
+        assert merkle.verify_merkle_timestamp(job.output_path) == []
+
+
+def test_worker_merkle_mode_timestamps_batch_once(
+    make_pdf, signing_identity, dummy_timestamper, tmp_path, run_worker
+):
+    """En modo Merkle el lote entero usa un solo sello"""
+    cert, key = signing_identity
+    paths = [make_pdf(f"doc{i}.pdf") for i in range(4)]
+    tsa_client = MagicMock()
+    tsa_client.get_timestamper.return_value = dummy_timestamper
+    worker = SigningWorker(
+        paths,
+        cert,
+        key,
+        tsa_client=tsa_client,
+        output_dir=tmp_path / "out",
+        merkle_timestamp=True,
+    )
+    (tmp_path / "out").mkdir()
+    completed = []
+    worker.file_completed.connect(completed.append)
+
+    with patch.object(
+        dummy_timestamper,
+        "async_timestamp",
+        wraps=dummy_timestamper.async_timestamp,
+    ) as timestamp:
+        run_worker(worker)
+
+    assert worker.errors == []
+    assert timestamp.call_count == 1
+    assert sorted(result.source.name for result in completed if result.success) == (
+        sorted(path.name for path in paths)
+    )
+    for output in (tmp_path / "out").glob("*.pdf"):
+        statuses = merkle.verify_merkle_timestamp(output)
+        assert [status.valid for status in statuses] == [True]
+
+
+def test_professional_root_record_describes_the_batch(
+    make_pdf, signing_identity, dummy_timestamper, tmp_path, run_worker
+):
+    """El registro de la API guarda la raíz y cada prueba apunta al registro"""
+    import base64
+
+    from asn1crypto import tsp
+
+    def request_tsa_sign(tsa_req_b64, **payload):
+        request = tsp.TimeStampReq.load(base64.b64decode(tsa_req_b64))
+        response = dummy_timestamper.request_tsa_response(request)
+        return {
+            "record_id": "rec-1",
+            "verification_url": "https://selladomx.com/verificar/rec-1",
+            "credits_remaining": 9,
+            "tsa_resp_b64": base64.b64encode(response.dump()).decode("ascii"),
+        }
+
+    api = MagicMock()
+    api.get_balance.return_value = {"credits_remaining": 10}
+    api.request_tsa_sign.side_effect = request_tsa_sign
+    paths = [make_pdf(f"doc{i}.pdf") for i in range(3)]
+    worker = SigningWorker(
+        paths,
+        *signing_identity,
+        use_professional_tsa=True,
+        api_key="test-key",
+        merkle_timestamp=True,
+    )
+    completed = []
+    worker.file_completed.connect(completed.append)
+    with patch("selladomx.signing.worker.SelladoMXAPIClient", return_value=api):
+        run_worker(worker)
+
+    assert worker.errors == []
+    api.complete_timestamp.assert_called_once()
+    record_id, document_hash, file_size = api.complete_timestamp.call_args.args
+    assert record_id == "rec-1"
+    assert file_size == sum(result.output_size for result in completed)
+    for result in completed:
+        (proof,) = merkle.read_proofs(result.output)
+        assert proof.root.hex() == document_hash
+        assert proof.record_id == "rec-1"
+        assert proof.verification_url == result.verification_url
+        assert [
+            status.valid for status in merkle.verify_merkle_timestamp(result.output)
+        ] == [True]
@@ -0,0 +1,155 @@
+"""Tests for the metrics registry and its exporters."""
+import json
+import urllib.request
+
+import pytest
+
+from selladomx.utils import metrics
+from selladomx.utils.metrics import (
+    Histogram,
+    JsonLinesExporter,
+    MetricsRegistry,
+    PrometheusServer,
+)
+
+
+class TestHistogram:
+    def test_counts_are_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative_counts() == [
+            (0.1, 1),
+            (1.0, 3),
+            (float("inf"), 4),
+        ]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(6.25)
+        assert histogram.max == 5.0
+
+    def test_quantile_uses_bucket_bounds(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 0.1
+        assert histogram.quantile(0.75) == 1.0
+        assert histogram.quantile(1.0) == 3.0
+
+
+class TestMetricsRegistry:
+    def test_labels_select_histogram(self):
+        registry = MetricsRegistry()
+        registry.observe("phase", 0.2, phase="read")
+        registry.observe("phase", 0.4, phase="read")
+        registry.observe("phase", 1.0, phase="write")
+
+        assert registry.histogram("phase", phase="read").count == 2
+        assert registry.histogram("phase", phase="write").count == 1
+
+    def test_timer_records_when_block_raises(self):
+        registry = MetricsRegistry()
+        with pytest.raises(ValueError):
+            with registry.timer("phase", phase="seal"):
+                raise ValueError("tsa down")
+
+        assert registry.histogram("phase", phase="seal").count == 1
+
+    def test_render_prometheus(self):
+        registry = MetricsRegistry(buckets=(1.0,))
+        registry.observe("signing_phase_seconds", 0.5, phase="read")
+
+        text = registry.render_prometheus()
+
+        assert "# TYPE selladomx_signing_phase_seconds histogram" in text
+        assert 'selladomx_signing_phase_seconds_bucket{phase="read",le="1.0"} 1' in text
+        assert (
+            'selladomx_signing_phase_seconds_bucket{phase="read",le="+Inf"} 1' in text
+        )
+        assert 'selladomx_signing_phase_seconds_count{phase="read"} 1' in text
+
+    def test_failing_listener_does_not_break_observe(self):
+        registry = MetricsRegistry()
+
+        def broken(*args):
+            raise RuntimeError("disk full")
+
+        registry.add_listener(broken)
+        registry.observe("phase", 0.1)
+
+        assert registry.histogram("phase").count == 1
+
+
+class TestExporters:
+    def test_json_lines_exporter(self, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        registry = MetricsRegistry()
+        exporter = JsonLinesExporter(str(path))
+        registry.add_listener(exporter)
+
+        registry.observe("signing_phase_seconds", 0.25, document="a.pdf", phase="read")
+        exporter.close()
+
+        record = json.loads(path.read_text().strip())
+        assert record["metric"] == "signing_phase_seconds"
+        assert record["document"] == "a.pdf"
+        assert record["phase"] == "read"
+        assert record["value"] == 0.25
+
+    def test_stop_exporters_detaches_and_closes(self, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        exporters = metrics.start_exporters(str(path), port=0)
+
+        metrics.observe("signing_phase_seconds", 0.1, phase="read")
+        metrics.stop_exporters(exporters)
+        metrics.observe("signing_phase_seconds", 0.2, phase="read")
+
+        assert exporters[0]._file.closed
+        assert len(path.read_text().splitlines()) == 1
+
+    @pytest.mark.parametrize(
+        "value, port", [("9464", 9464), ("", 0), ("abc", 0), ("70000", 0)]
+    )
+    def test_metrics_port_from_environment(self, monkeypatch, value, port):
+        from selladomx.config import _env_port
+
+        monkeypatch.setenv("SELLADOMX_METRICS_PORT", value)
+        assert _env_port("SELLADOMX_METRICS_PORT") == port
+
+    def test_prometheus_endpoint(self):
+        registry = MetricsRegistry()
+        registry.observe("tsa_request_seconds", 0.3, provider="certum")
+        server = PrometheusServer(registry, port=0)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.stop()
+
+        assert 'selladomx_tsa_request_seconds_count{provider="certum"} 1' in body
+
+
+class TestSigningInstrumentation:
+    def test_pdf_signer_records_phases(self, make_pdf, signing_identity):
+        from selladomx.signing.pdf_signer import PHASE_METRIC, PDFSigner
+
+        cert, key = signing_identity
+        observed = []
+
+        def listener(name, labels, value, document):
+            if name == PHASE_METRIC:
+                observed.append((labels["phase"], document))
+
+        metrics.registry().add_listener(listener)
+        try:
+            pdf_path = make_pdf("timed.pdf")
+            PDFSigner(cert, key).sign_pdf(pdf_path)
+        finally:
+            metrics.registry().remove_listener(listener)
+
+        phases = [phase for phase, _ in observed]
+        assert phases == ["read", "field", "prepare", "digest", "embed", "write"]
+        assert {document for _, document in observed} == {str(pdf_path)}
@@ -0,0 +1,90 @@
+"""Tests for PdfFileListModel - deduplication, incremental updates and lazy metadata."""
+import pytest
+
+from selladomx.ui.qml_bridge.pdf_file_model import (
+    UNKNOWN,
+    PdfFileListModel,
+    read_pdf_metadata,
+)
+
+
+
+@pytest.fixture
+def model():
+    """Create an empty file model."""
+    model = PdfFileListModel()
+    yield model
+    model.stop()
+
+
+class TestQueueOperations:
+    """Tests for adding, removing and clearing entries."""
+
+    def test_add_deduplicates(self, model):
+        """Paths already queued (or repeated in the same call) are skipped."""
+        assert model.add_paths(["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/a.pdf"]) == 2
+        assert model.add_paths(["/tmp/b.pdf", "/tmp/c.pdf"]) == 1
+        assert model.paths() == ["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/c.pdf"]
+        assert "/tmp/c.pdf" in model
+
+    def test_add_inserts_rows_incrementally(self, model):
+        """Each add emits a single rowsInserted for the new block only."""
+        model.add_paths(["/tmp/a.pdf"])
+
+        inserted = []
+        model.rowsInserted.connect(
+            lambda parent, first, last: inserted.append((first, last))
+        )
+        model.add_paths(["/tmp/b.pdf", "/tmp/c.pdf"])
+
+        assert inserted == [(1, 2)]
+
+    def test_remove_reindexes_following_rows(self, model):
+        """Removing a row keeps deduplication correct for later rows."""
+        model.add_paths(["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/c.pdf"])
+
+        assert model.remove_at(0) == "/tmp/a.pdf"
+        assert model.remove_at(5) is None
+        assert model.entry("/tmp/c.pdf").path == "/tmp/c.pdf"
+        assert model.remove_at(1) == "/tmp/c.pdf"
+        assert model.paths() == ["/tmp/b.pdf"]
+        # Removed paths can be queued again
+        assert model.add_paths(["/tmp/a.pdf"]) == 1
+
+    def test_clear(self, model):
+        """clear empties the queue and emits countChanged."""
+        model.add_paths(["/tmp/a.pdf", "/tmp/b.pdf"])
+
+        emitted = []
+        model.countChanged.connect(lambda: emitted.append(True))
+        model.clear()
+
+        assert len(model) == 0
+        assert model.rowCount() == 0
+        assert emitted == [True]
+
+
+class TestMetadata:
+    """Tests for lazy size/page count collection."""
+
+    def test_read_pdf_metadata(self, make_pdf):
+        """Size and page count are read from the file."""
+        pdf = make_pdf(page_count=2)
+
+        assert read_pdf_metadata(str(pdf)) == (pdf.stat().st_size, 2)
+
+    def test_read_pdf_metadata_missing_file(self, tmp_path):
+        """Unreadable files report UNKNOWN instead of raising."""
+        assert read_pdf_metadata(str(tmp_path / "missing.pdf")) == (UNKNOWN, UNKNOWN)
+
+    def test_metadata_loaded_on_first_access(self, model, make_pdf, qtbot):
+        """Asking for size starts a background load that updates the row."""
+        pdf = make_pdf(page_count=2)
+        model.add_paths([str(pdf)])
+        index = model.index(0)
+
+        with qtbot.waitSignal(model.dataChanged, timeout=5000):
+            assert model.data(index, PdfFileListModel.SizeBytesRole) == UNKNOWN
+
+        assert model.data(index, PdfFileListModel.SizeBytesRole) == pdf.stat().st_size
+        assert model.data(index, PdfFileListModel.PageCountRole) == 2
@@ -0,0 +1,127 @@
+"""Tests for background PDF discovery."""
+from unittest.mock import patch
+
+import pytest
+
+from selladomx.utils import pdf_scanner
+from selladomx.utils.pdf_scanner import (
+    PdfScanWorker,
+    is_pdf_file,
+    is_signed_output,
+    scan_directory,
+)
+
+
+@pytest.fixture
+def pdf_tree(make_pdf, tmp_path):
+    """Create a small directory tree with PDFs, impostors and signed outputs."""
+    make_pdf("root.pdf")
+    make_pdf("nested/deep/inner.PDF")
+    make_pdf("nested/renamed.bin")  # Real PDF without extension
+    make_pdf("nested/contract_firmado.pdf")  # Already signed output
+    (tmp_path / "nested" / "fake.pdf").write_bytes(b"not a pdf")
+    return tmp_path
+
+
+class TestPdfDetection:
+    """Tests for magic-byte detection and suffix filtering."""
+
+    def test_is_pdf_file_uses_magic_bytes(self, pdf_tree):
+        """Detection ignores extensions and looks at file contents."""
+        assert is_pdf_file(str(pdf_tree / "nested" / "renamed.bin"))
+        assert not is_pdf_file(str(pdf_tree / "nested" / "fake.pdf"))
+        assert not is_pdf_file(str(pdf_tree / "missing.pdf"))
+
+    def test_header_after_leading_junk(self, tmp_path):
+        """A %PDF- header within the first 1024 bytes is accepted."""
+        path = tmp_path / "junk.pdf"
+        path.write_bytes(b"\x00" * 100 + b"%PDF-1.7\n")
+        assert is_pdf_file(str(path))
+
+    def test_is_signed_output(self):
+        """Files carrying SIGNED_SUFFIX are recognised."""
+        assert is_signed_output("/docs/contract_firmado.pdf")
+        assert not is_signed_output("/docs/contract.pdf")
+
+    def test_scan_directory_single_level(self, pdf_tree):
+        """scan_directory lists the files of one level plus its subdirectories."""
+        assert list(scan_directory(str(pdf_tree))) == [
+            ([str(pdf_tree / "root.pdf")], [str(pdf_tree / "nested")])
+        ]
+
+    def test_scan_directory_yields_chunks(self, tmp_path):
+        """A flat folder is listed in chunks instead of all at once."""
+        for index in range(5):
+            (tmp_path / f"doc{index}.pdf").write_bytes(b"%PDF-1.7\n")
+        (tmp_path / "doc0_firmado.pdf").write_bytes(b"%PDF-1.7\n")
+
+        chunks = list(scan_directory(str(tmp_path), chunk_size=2))
+
+        assert [len(files) for files, _ in chunks] == [2, 2, 1]
+        assert sorted(path for files, _ in chunks for path in files) == [
+            str(tmp_path / f"doc{index}.pdf") for index in range(5)
+        ]
+
+
+class TestPdfScanWorker:
+    """Tests for the recursive scan worker."""
+
+    def test_scan_finds_nested_pdfs(self, pdf_tree, qtbot):
+        """The worker walks the whole tree and streams real PDFs."""
+        worker = PdfScanWorker([str(pdf_tree)], batch_size=1)
+        found = []
+        worker.files_found.connect(found.extend)
+
+        with qtbot.waitSignal(worker.scan_finished, timeout=5000) as blocker:
+            worker.start()
+        worker.wait()
+
+        assert sorted(found) == sorted(
+            [
+                str(pdf_tree / "root.pdf"),
+                str(pdf_tree / "nested" / "deep" / "inner.PDF"),
+                str(pdf_tree / "nested" / "renamed.bin"),
+            ]
+        )
+        assert blocker.args == [3]
+
+    def test_scan_checks_explicit_files(self, pdf_tree, qtbot):
+        """Explicit file roots are filtered by magic bytes too."""
+        worker = PdfScanWorker(
+            [
+                str(pdf_tree / "nested" / "renamed.bin"),
+                str(pdf_tree / "nested" / "fake.pdf"),
+            ]
+        )
+        found = []
+        worker.files_found.connect(found.extend)
+
+        with qtbot.waitSignal(worker.scan_finished, timeout=5000):
+            worker.start()
+        worker.wait()
+
+        assert found == [str(pdf_tree / "nested" / "renamed.bin")]
+
+    def test_flat_folder_checked_in_chunks(self, tmp_path, qtbot):
+        """The header checks of a big folder are spread over the pool."""
+        for index in range(7):
+            (tmp_path / f"doc{index}.pdf").write_bytes(b"%PDF-1.7\n")
+        worker = PdfScanWorker([str(tmp_path)], batch_size=2)
+        found = []
+        worker.files_found.connect(found.extend)
+
+        with patch.object(
+            pdf_scanner, "_check_files", wraps=pdf_scanner._check_files
+        ) as check:
+            with qtbot.waitSignal(worker.scan_finished, timeout=5000) as blocker:
+                worker.start()
+            worker.wait()
+
+        assert sorted(len(call.args[0]) for call in check.call_args_list) == [
+            1,
+            2,
+            2,
+            2,
+        ]
+        assert sorted(found) == sorted(str(path) for path in tmp_path.iterdir())
+        assert blocker.args == [7]
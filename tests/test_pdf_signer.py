@@ -1,8 +1,10 @@
 """Tests para PDFSigner"""
+import hashlib
 import pytest
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-from selladomx.signing.pdf_signer import PDFSigner
+from selladomx.signing.pdf_signer import PDFSigner, cosign_pdf, next_field_names
 from selladomx.errors import PDFError, SigningError
 
 
@@ -27,3 +29,190 @@ class TestPDFSigner:
 # 1. Certificados de prueba válidos
 # 2. PDFs de prueba en tests/fixtures/
 # 3. Mock del TSA para no depender de servicios externos
+
+
+class TestStagedSigning:
+    """Tests para la firma por etapas (preparar → sellar → escribir)"""
+
+    def _validate(self, path: Path):
+        from pyhanko.pdf_utils.reader import PdfFileReader
+        from pyhanko.sign.validation import validate_pdf_signature
+
+        with open(path, "rb") as f:
+            reader = PdfFileReader(f)
+            assert len(reader.embedded_signatures) == 1
+            return validate_pdf_signature(reader.embedded_signatures[0])
+
+    def test_stages_produce_intact_signature(self, make_pdf, signing_identity):
+        """Las tres etapas producen una firma íntegra"""
+        cert, key = signing_identity
+        signer = PDFSigner(cert, key)
+        prepared = signer.prepare(make_pdf())
+
+        assert not prepared.output_path.exists()
+        signer.seal(prepared)
+        output = signer.write(prepared)
+
+        assert output == prepared.output_path
+        status = self._validate(output)
+        assert status.intact and status.valid
+
+    def test_documents_can_be_interleaved(self, make_pdf, signing_identity):
+        """Se puede preparar el siguiente documento antes de sellar el anterior"""
+        cert, key = signing_identity
+        signer = PDFSigner(cert, key)
+        first = signer.prepare(make_pdf("a.pdf"))
+        second = signer.prepare(make_pdf("b.pdf", page_count=2))
+
+        signer.seal(second)
+        signer.seal(first)
+
+        for prepared in (first, second):
+            status = self._validate(signer.write(prepared))
+            assert status.intact and status.valid
+
+    def test_prepare_reuses_known_source_hash(self, make_pdf, signing_identity):
+        """Un hash del original ya calculado no se vuelve a calcular"""
+        cert, key = signing_identity
+        pdf_path = make_pdf()
+        digest = hashlib.sha256(pdf_path.read_bytes()).hexdigest()
+
+        with patch("selladomx.signing.pdf_signer.hashlib") as pdf_hashlib:
+            prepared = PDFSigner(cert, key).prepare(pdf_path, source_sha256=digest)
+
+        pdf_hashlib.sha256.assert_not_called()
+        assert prepared.source_sha256 == digest
+        assert prepared.source_size == pdf_path.stat().st_size
+
+    def test_prepare_missing_pdf(self, tmp_path, signing_identity):
+        """Un PDF inexistente falla al preparar"""
+        cert, key = signing_identity
+        with pytest.raises((PDFError, SigningError)):
+            PDFSigner(cert, key).prepare(tmp_path / "no_existe.pdf")
+
+    def test_verify_signature_of_signed_pdf(self, make_pdf, signing_identity):
+        """verify_signature acepta un PDF recién firmado"""
+        cert, key = signing_identity
+        signed = PDFSigner(cert, key).sign_pdf(make_pdf())
+
+        assert PDFSigner.verify_signature(signed) is True
+
+    def test_verify_rejects_changes_after_signing(self, make_pdf, signing_identity):
+        """Una firma íntegra no basta si el catálogo cambió después de firmar"""
+        from pyhanko.pdf_utils import generic
+        from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+
+        cert, key = signing_identity
+        signed = PDFSigner(cert, key).sign_pdf(make_pdf())
+        with open(signed, "r+b") as f:
+            writer = IncrementalPdfFileWriter(f)
+            writer.root[generic.NameObject("/Extra")] = generic.NumberObject(1)
+            writer.update_root()
+            writer.write_in_place()
+
+        assert PDFSigner.verify_signature(signed) is False
+
+
+@pytest.fixture(scope="module")
+def second_identity(ca_identity):
+    """Otro firmante (de la CA de prueba) para co-firmas"""
+    return ca_identity.signer_cert, ca_identity.signer_key
+
+
+class TestMultipleSignatures:
+    """Tests para firmas sucesivas y co-firma"""
+
+    def _signatures(self, path: Path):
+        from pyhanko.pdf_utils.reader import PdfFileReader
+
+        with open(path, "rb") as f:
+            reader = PdfFileReader(f)
+            return [
+                sig.field_name for sig in reader.embedded_signatures
+            ], reader.xrefs.total_revisions
+
+    def test_next_field_names(self):
+        assert next_field_names([]) == ["Signature1"]
+        assert next_field_names(["Signature1", "Firma"], 2) == [
+            "Signature2",
+            "Signature3",
+        ]
+        assert next_field_names(["Signature4"]) == ["Signature5"]
+
+    def test_signed_pdf_can_be_signed_again(
+        self, make_pdf, signing_identity, second_identity
+    ):
+        """Una segunda firma usa el siguiente campo y no invalida la primera"""
+        signed = PDFSigner(*signing_identity).sign_pdf(make_pdf())
+        resigned = PDFSigner(*second_identity).sign_pdf(
+            signed, signed.with_name("doble.pdf")
+        )
+
+        names, _ = self._signatures(resigned)
+        assert names == ["Signature1", "Signature2"]
+        assert PDFSigner.verify_signature(resigned) is True
+
+    def test_cosign_one_update_per_signer(
+        self, make_pdf, signing_identity, second_identity
+    ):
+        """La co-firma agrega una actualización por firmante y escribe una vez"""
+        source = make_pdf()
+        output = cosign_pdf(
+            source,
+            [PDFSigner(*signing_identity), PDFSigner(*second_identity)],
+            source.with_name("cofirmado.pdf"),
+        )
+
+        names, revisions = self._signatures(output)
+        assert names == ["Signature1", "Signature2"]
+        assert revisions == 3  # Original + una por firma
+        assert PDFSigner.verify_signature(output) is True
+
+    def test_certified_pdf_rejected_before_signing(self, make_pdf, signing_identity):
+        """Un documento certificado sin cambios permitidos falla al preparar"""
+        from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+        from pyhanko.sign import signers
+        from pyhanko.sign.fields import MDPPerm
+
+        source = make_pdf()
+        signer = PDFSigner(*signing_identity)
+        with open(source, "rb") as f:
+            certified = signers.sign_pdf(
+                IncrementalPdfFileWriter(f),
+                signers.PdfSignatureMetadata(
+                    field_name="Certificacion",
+                    certify=True,
+                    docmdp_permissions=MDPPerm.NO_CHANGES,
+                ),
+                signer=signer._get_cms_signer(),
+            )
+        source.write_bytes(certified.getvalue())
+
+        with pytest.raises(SigningError, match="certificado"):
+            signer.prepare(source)
+
+
+def test_worker_cosigns_every_file(
+    make_pdf, signing_identity, second_identity, dummy_timestamper, tmp_path, qtbot
+):
+    """El worker agrega las co-firmas a cada archivo del lote"""
+    from selladomx.signing.worker import SigningWorker
+
+    tsa_client = MagicMock()
+    tsa_client.get_timestamper.return_value = dummy_timestamper
+    paths = [make_pdf(f"doc{i}.pdf") for i in range(2)]
+    (tmp_path / "out").mkdir()
+    worker = SigningWorker(
+        paths,
+        *signing_identity,
+        tsa_client=tsa_client,
+        output_dir=tmp_path / "out",
+        cosigners=[second_identity],
+    )
+    worker.run()
+
+    assert worker.errors == []
+    for output in (tmp_path / "out").iterdir():
+        names, _ = TestMultipleSignatures()._signatures(output)
+        assert names == ["Signature1", "Signature2"]
+        assert PDFSigner.verify_signature(output) is True
@@ -0,0 +1,107 @@
+"""Tests for the pre-flight PDF analysis stage."""
+import io
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.pdf_utils.writer import copy_into_new_writer
+
+from selladomx.signing.pdf_signer import PDFSigner
+from selladomx.signing.preflight import (
+    PreflightStatus,
+    analyze_pdf,
+    run_preflight,
+)
+from tests.conftest import build_pdf
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+class TestAnalyzePdf:
+    """Tests for single-file classification."""
+
+    def test_signable(self, make_pdf):
+        """A well-formed unsigned PDF is signable."""
+        result = analyze_pdf(make_pdf(page_count=3))
+
+        assert result.status is PreflightStatus.SIGNABLE
+        assert result.page_count == 3
+        assert result.signature_count == 0
+
+    def test_encrypted(self, tmp_path):
+        """Password-protected PDFs are reported as encrypted."""
+        writer = copy_into_new_writer(PdfFileReader(io.BytesIO(build_pdf())))
+        writer.encrypt("owner", "user")
+        out = io.BytesIO()
+        writer.write(out)
+
+        result = analyze_pdf(_write(tmp_path / "locked.pdf", out.getvalue()))
+
+        assert result.status is PreflightStatus.ENCRYPTED
+
+    def test_needs_repair(self, tmp_path):
+        """PDFs that only open in lenient mode need repair."""
+        data = build_pdf().replace(b"/Size 4", b"/Size 4 /Size 5")
+
+        result = analyze_pdf(_write(tmp_path / "broken.pdf", data))
+
+        assert result.status is PreflightStatus.NEEDS_REPAIR
+
+    def test_unreadable(self, tmp_path):
+        """Garbage and missing files are unreadable."""
+        garbage = _write(tmp_path / "garbage.pdf", b"%PDF-1.7\ngarbage")
+
+        assert analyze_pdf(garbage).status is PreflightStatus.UNREADABLE
+        assert analyze_pdf(tmp_path / "missing.pdf").status is (
+            PreflightStatus.UNREADABLE
+        )
+
+    def test_too_large(self, make_pdf):
+        """Files above the size limit are rejected before parsing."""
+        result = analyze_pdf(make_pdf(), max_size=10)
+
+        assert result.status is PreflightStatus.TOO_LARGE
+
+    def test_already_signed_by_this_cert(self, make_pdf, signing_identity):
+        """A PDF carrying a signature from the same certificate is detected."""
+        cert, key = signing_identity
+        signed = PDFSigner(cert, key).sign_pdf(make_pdf())
+        cert_der = cert.public_bytes(serialization.Encoding.DER)
+
+        result = analyze_pdf(signed, signer_cert_der=cert_der)
+
+        assert result.status is PreflightStatus.ALREADY_SIGNED
+        assert result.signature_count == 1
+        # Without our certificate the same file is still signable
+        assert analyze_pdf(signed).status is PreflightStatus.SIGNABLE
+
+
+class TestRunPreflight:
+    """Tests for batch analysis and estimates."""
+
+    def test_report_estimates(self, make_pdf, tmp_path):
+        """The report keeps order and estimates credits for signable files."""
+        paths = [
+            make_pdf("a.pdf"),
+            _write(tmp_path / "bad.pdf", b"nope"),
+            make_pdf("b.pdf"),
+        ]
+
+        report = run_preflight(paths, use_professional_tsa=True)
+
+        assert [r.path for r in report.results] == paths
+        assert report.signable_paths == [paths[0], paths[2]]
+        assert report.estimated_credits == 2
+        assert report.estimated_seconds > 0
+        summary = report.to_dict()
+        assert summary["signable"] == 2
+        assert summary["counts"] == {"signable": 2, "unreadable": 1}
+
+    def test_free_tsa_costs_no_credits(self, make_pdf):
+        """Free TSA batches never estimate credits."""
+        report = run_preflight([make_pdf()], use_professional_tsa=False)
+
+        assert report.estimated_credits == 0
@@ -0,0 +1,100 @@
+"""Tests para el reporte del lote"""
+import csv
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from selladomx.signing.report import BatchReport, default_report_path, open_report
+from selladomx.signing.result import ErrorCode, SigningResult
+
+
+def _results():
+    return [
+        SigningResult(
+            Path("/docs/a.pdf"),
+            output=Path("/docs/a_firmado.pdf"),
+            output_sha256="ab" * 32,
+            output_size=2048,
+            phases={"read": 0.25, "write": 0.5},
+            tsa_provider="freetsa.org",
+        ),
+        SigningResult(Path("/docs/b.pdf"), error=ErrorCode.PDF, message="No existe"),
+    ]
+
+
+class TestBatchReport:
+    """Tests para los formatos del reporte"""
+
+    def test_jsonl(self, tmp_path):
+        with open_report(tmp_path / "r.jsonl") as report:
+            for result in _results():
+                report.write(result)
+
+        rows = [json.loads(line) for line in (tmp_path / "r.jsonl").open()]
+        assert [row["source"] for row in rows] == ["/docs/a.pdf", "/docs/b.pdf"]
+        assert rows[0]["seconds"] == 0.75
+        assert rows[0]["phases"] == {"read": 0.25, "write": 0.5}
+        assert rows[1]["error"] == "pdf"
+        assert report.rows == 2
+
+    def test_csv(self, tmp_path):
+        with open_report(tmp_path / "r.csv") as report:
+            for result in _results():
+                report.write(result)
+
+        with open(tmp_path / "r.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["output_size"] == "2048"
+        assert rows[0]["tsa_provider"] == "freetsa.org"
+        assert json.loads(rows[0]["phases"]) == {"read": 0.25, "write": 0.5}
+        assert (rows[1]["success"], rows[1]["error"]) == ("False", "pdf")
+
+    def test_parquet(self, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        with open_report(tmp_path / "r.parquet") as report:
+            for result in _results():
+                report.write(result)
+
+        table = pq.read_table(tmp_path / "r.parquet")
+        assert table.column("error").to_pylist() == [None, "pdf"]
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_report(tmp_path / "r.xlsx")
+        with pytest.raises(ValueError):
+            default_report_path(tmp_path, "xlsx")
+
+    def test_default_path(self, tmp_path):
+        path = default_report_path(tmp_path, "csv")
+        assert path.parent == tmp_path
+        assert path.name.startswith("selladomx-reporte-")
+        assert path.suffix == ".csv"
+
+
+def test_worker_streams_report(
+    make_pdf, signing_identity, dummy_timestamper, tmp_path, qtbot
+):
+    """El worker agrega una fila por archivo mientras firma"""
+    from selladomx.signing.worker import SigningWorker
+
+    tsa_client = MagicMock()
+    tsa_client.get_timestamper.return_value = dummy_timestamper
+    paths = [make_pdf(f"doc{i}.pdf") for i in range(3)] + [tmp_path / "falta.pdf"]
+    report_path = tmp_path / "reporte.jsonl"
+    worker = SigningWorker(
+        paths, *signing_identity, tsa_client=tsa_client, report_path=report_path
+    )
+    worker.run()
+
+    rows = [json.loads(line) for line in report_path.open()]
+    assert sorted(row["source"] for row in rows) == sorted(str(p) for p in paths)
+    assert sum(row["success"] for row in rows) == 3
+    assert all(row["output_sha256"] for row in rows if row["success"])
+
+
+def test_batch_report_requires_a_format(tmp_path):
+    """BatchReport solo define lo común a los formatos"""
+    with pytest.raises(TypeError):
+        BatchReport(tmp_path / "r.txt")
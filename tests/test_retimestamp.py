@@ -0,0 +1,223 @@
+"""Tests para el resellado masivo de archivos firmados"""
+import pytest
+from asn1crypto import x509 as asn1_x509
+from cryptography.hazmat.primitives import serialization
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.sign.timestamps import DummyTimeStamper
+
+from selladomx.errors import SigningError
+from selladomx.signing.pdf_signer import PDFSigner
+from selladomx.signing.retimestamp import (
+    RetimestampJournal,
+    retimestamp_archive,
+    retimestamp_pdf,
+)
+from selladomx.signing.validation_data import ValidationDataCache
+
+
+@pytest.fixture
+def timestamper(ca_identity):
+    tsa_cert, tsa_key = ca_identity.tsa_asn1()
+    return DummyTimeStamper(tsa_cert=tsa_cert, tsa_key=tsa_key)
+
+
+@pytest.fixture
+def new_cache(ca_identity):
+    """Crea cachés sin descargas, con la CA de prueba como raíz de confianza"""
+    ca = asn1_x509.Certificate.load(
+        ca_identity.ca_cert.public_bytes(serialization.Encoding.DER)
+    )
+    return lambda: ValidationDataCache(trust_roots=[ca], allow_fetching=False)
+
+
+@pytest.fixture
+def make_signed(make_pdf, ca_identity):
+    """Escribe un PDF firmado con el firmante de prueba"""
+
+    def _make_signed(name: str = "doc.pdf"):
+        pdf_path = make_pdf(name)
+        return PDFSigner(ca_identity.signer_cert, ca_identity.signer_key).sign_pdf(
+            pdf_path, pdf_path
+        )
+
+    return _make_signed
+
+
+def _signature_types(pdf_path):
+    with open(pdf_path, "rb") as f:
+        return [sig.sig_object_type for sig in PdfFileReader(f).embedded_signatures]
+
+
+def _stamps_covering_dss(pdf_path):
+    """Por cada sello de documento, si su revisión ya incluye la DSS"""
+    with open(pdf_path, "rb") as f:
+        reader = PdfFileReader(f)
+        return [
+            "/DSS" in reader.get_historical_root(sig.signed_revision)
+            for sig in reader.embedded_signatures
+            if sig.sig_object_type == "/DocTimeStamp"
+        ]
+
+
+class _FailingTimeStamper(DummyTimeStamper):
+    async def async_timestamp(self, message_digest, md_algorithm):
+        raise RuntimeError("TSA caída")
+
+
+class TestRetimestampPdf:
+    """Tests para el sello de documento de un PDF"""
+
+    def test_appends_document_timestamp(self, make_signed, timestamper, new_cache):
+        signed = make_signed()
+        original = signed.read_bytes()
+
+        assert (
+            retimestamp_pdf(signed, timestamper, validation_cache=new_cache()) is True
+        )
+
+        # Revisión incremental: el documento original queda intacto al inicio
+        assert signed.read_bytes().startswith(original)
+        assert _signature_types(signed) == ["/Sig", "/DocTimeStamp"]
+        assert PDFSigner.verify_signature(signed) is True
+
+    def test_output_copy_leaves_source(self, make_signed, timestamper, new_cache):
+        signed = make_signed()
+        original = signed.read_bytes()
+        output = signed.with_name("copia.pdf")
+
+        assert retimestamp_pdf(signed, timestamper, output, new_cache()) is True
+        assert signed.read_bytes() == original
+        assert _signature_types(output) == ["/Sig", "/DocTimeStamp"]
+
+    def test_unsigned_document_untouched(self, make_pdf, timestamper):
+        pdf_path = make_pdf()
+        original = pdf_path.read_bytes()
+
+        assert retimestamp_pdf(pdf_path, timestamper) is False
+        assert pdf_path.read_bytes() == original
+
+    def test_second_stamp_adds_validation_data_first(
+        self, make_signed, timestamper, new_cache
+    ):
+        """El sello nuevo cubre la cadena del sello anterior, guardada en la DSS"""
+        signed = make_signed()
+        cache = new_cache()
+        retimestamp_pdf(signed, timestamper, validation_cache=cache)
+
+        assert retimestamp_pdf(signed, timestamper, validation_cache=cache) is True
+
+        assert _signature_types(signed) == ["/Sig", "/DocTimeStamp", "/DocTimeStamp"]
+        assert _stamps_covering_dss(signed) == [False, True]
+        assert cache.misses == 1  # Un solo contexto para el emisor de la TSA
+        assert PDFSigner.verify_signature(signed) is True
+
+    def test_failure_truncates_to_original(self, make_signed, ca_identity, new_cache):
+        signed = make_signed()
+        original = signed.read_bytes()
+        tsa_cert, tsa_key = ca_identity.tsa_asn1()
+
+        with pytest.raises(SigningError):
+            retimestamp_pdf(
+                signed,
+                _FailingTimeStamper(tsa_cert, tsa_key),
+                validation_cache=new_cache(),
+            )
+        assert signed.read_bytes() == original
+
+    def test_failure_removes_output_copy(self, make_signed, ca_identity, new_cache):
+        signed = make_signed()
+        original = signed.read_bytes()
+        output = signed.with_name("copia.pdf")
+        tsa_cert, tsa_key = ca_identity.tsa_asn1()
+
+        with pytest.raises(SigningError):
+            retimestamp_pdf(
+                signed, _FailingTimeStamper(tsa_cert, tsa_key), output, new_cache()
+            )
+        assert not output.exists()
+        assert signed.read_bytes() == original
+
+
+class TestRetimestampArchive:
+    """Tests para el resellado de carpetas con diario de progreso"""
+
+    def test_stamps_tree_and_resumes(
+        self, make_signed, make_pdf, timestamper, new_cache, tmp_path
+    ):
+        make_signed("archivo/a.pdf")
+        make_signed("archivo/sub/b.pdf")
+        make_pdf("archivo/sin_firma.pdf")
+        journal_path = tmp_path / "diario.jsonl"
+
+        summary = retimestamp_archive(
+            [tmp_path / "archivo"],
+            timestamper,
+            RetimestampJournal(journal_path),
+            new_validation_cache=new_cache,
+        )
+        assert (summary.stamped, summary.unsigned, summary.failed) == (2, 1, 0)
+
+        # Al reanudar no se vuelve a sellar nada
+        make_signed("archivo/c.pdf")
+        summary = retimestamp_archive(
+            [tmp_path / "archivo"],
+            timestamper,
+            RetimestampJournal(journal_path),
+            new_validation_cache=new_cache,
+        )
+        assert (summary.stamped, summary.resumed) == (1, 3)
+        assert _signature_types(tmp_path / "archivo" / "a.pdf") == [
+            "/Sig",
+            "/DocTimeStamp",
+        ]
+
+    def test_failures_are_retried(
+        self, make_signed, ca_identity, timestamper, new_cache, tmp_path
+    ):
+        make_signed("archivo/a.pdf")
+        journal_path = tmp_path / "diario.jsonl"
+        tsa_cert, tsa_key = ca_identity.tsa_asn1()
+
+        summary = retimestamp_archive(
+            [tmp_path / "archivo"],
+            _FailingTimeStamper(tsa_cert, tsa_key),
+            RetimestampJournal(journal_path),
+            new_validation_cache=new_cache,
+        )
+        assert summary.failed == 1
+
+        summary = retimestamp_archive(
+            [tmp_path / "archivo"],
+            timestamper,
+            RetimestampJournal(journal_path),
+            new_validation_cache=new_cache,
+        )
+        assert (summary.stamped, summary.resumed) == (1, 0)
+        assert RetimestampJournal(journal_path).completed() == {
+            str(tmp_path / "archivo" / "a.pdf")
+        }
+
+    def test_shared_session_against_local_tsa(
+        self, make_signed, ca_identity, new_cache, tmp_path
+    ):
+        """Los hilos comparten un timestamper y su pool de conexiones"""
+        from benchmarks.tsa_server import LocalTSAServer
+
+        from selladomx.signing.tsa import TSAClient, shared_session
+
+        for i in range(4):
+            make_signed(f"archivo/{i}.pdf")
+
+        with LocalTSAServer(ca_identity) as server:
+            client = TSAClient(tsa_url=f"{server.url}/tsr", enable_fallback=False)
+            timestamper = client.get_timestamper(session=shared_session(2))
+            summary = retimestamp_archive(
+                [tmp_path / "archivo"],
+                timestamper,
+                RetimestampJournal(tmp_path / "diario.jsonl"),
+                workers=2,
+                new_validation_cache=new_cache,
+            )
+
+        assert (summary.stamped, summary.failed) == (4, 0)
+        assert PDFSigner.verify_signature(tmp_path / "archivo" / "0.pdf") is True
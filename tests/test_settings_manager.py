@@ -2,6 +2,7 @@
 import pytest
 from PySide6.QtCore import QSettings
 from selladomx.utils.settings_manager import SettingsManager
+from selladomx.utils.settings_store import SettingsStore
 
 
 @pytest.fixture
@@ -61,3 +62,87 @@ def test_persistence(settings_manager):
 
     # Cleanup
     new_manager.reset_onboarding()
+
+
+@pytest.fixture
+def isolated_manager(tmp_path):
+    """SettingsManager on a private INI file."""
+    store = SettingsStore(file_path=str(tmp_path / "settings.ini"), flush_delay=60)
+    return SettingsManager(store)
+
+
+def test_snapshot_updated_by_setters(isolated_manager):
+    """Setters refresh the cached snapshot and notify listeners once."""
+    snapshots = []
+    assert isolated_manager.has_api_key() is False
+    isolated_manager.add_listener(snapshots.append)
+
+    isolated_manager.set_token("smx_abcdef")
+    isolated_manager.set_token_info({"alias": "laptop", "is_primary": False})
+
+    assert isolated_manager.has_api_key() is True
+    assert isolated_manager.get_token_info()["alias"] == "laptop"
+    assert [snapshot.token for snapshot in snapshots] == ["smx_abcdef"] * 2
+    assert snapshots[-1].token_is_primary is False
+
+
+def test_snapshot_shared_between_managers(isolated_manager):
+    """A setter on one manager is seen by other managers on the same store."""
+    other = SettingsManager(isolated_manager.settings)
+    assert other.get_output_dir() == ""
+
+    isolated_manager.set_output_dir("/tmp/out")
+
+    assert other.get_output_dir() == "/tmp/out"
+
+
+def test_hot_getters_do_not_hit_the_store(isolated_manager, monkeypatch):
+    """Once loaded, getters are attribute reads on the snapshot."""
+    isolated_manager.set_token("smx_abcdef")
+    isolated_manager.has_api_key()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("store read")
+
+    monkeypatch.setattr(isolated_manager.settings, "value", fail)
+    assert isolated_manager.has_api_key() is True
+    assert isolated_manager.get_token() == "smx_abcdef"
+    assert isolated_manager.use_professional_tsa() is True
+
+
+def test_external_change_reloads_snapshot(tmp_path, qtbot):
+    """Edits from another process invalidate the snapshot."""
+    path = str(tmp_path / "settings.ini")
+    QSettings(path, QSettings.IniFormat).sync()
+    store = SettingsStore(file_path=path, flush_delay=60)
+    manager = SettingsManager(store)
+    manager.watch_external_changes()
+    assert manager.get_last_cert_path() == ""
+
+    external = QSettings(path, QSettings.IniFormat)
+    external.setValue("certificate/last_cert_path", "/tmp/a.cer")
+    external.sync()
+
+    qtbot.waitUntil(lambda: manager.get_last_cert_path() == "/tmp/a.cer", timeout=3000)
+
+
+def test_invalid_signing_settings_fall_back_to_defaults(isolated_manager):
+    """Old or hand-edited values never reach the signing worker."""
+    isolated_manager.set_credit_policy("spend_everything")
+    isolated_manager.set_failure_policy("panic")
+    isolated_manager.set_signature_level("B-B")
+    isolated_manager.set_stamp_pages("first,0")
+    isolated_manager.set_report_format("xlsx")
+
+    assert isolated_manager.get_credit_policy() == "professional_only"
+    assert isolated_manager.get_failure_policy() == "abort"
+    assert isolated_manager.get_signature_level() == "B-T"
+    assert isolated_manager.get_stamp_pages() == ""
+    assert isolated_manager.get_report_format() == ""
+
+    isolated_manager.set_signature_level("B-LTA")
+    isolated_manager.set_stamp_pages("1,-1")
+    isolated_manager.set_report_format("jsonl")
+    assert isolated_manager.get_signature_level() == "B-LTA"
+    assert isolated_manager.get_stamp_pages() == "1,-1"
+    assert isolated_manager.get_report_format() == "jsonl"
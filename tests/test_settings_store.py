@@ -0,0 +1,147 @@
+"""Tests for the write-behind SettingsStore."""
+import threading
+
+import pytest
+from PySide6.QtCore import QSettings
+
+from selladomx.utils.settings_store import SettingsStore
+
+
+@pytest.fixture
+def ini_path(tmp_path):
+    return str(tmp_path / "settings.ini")
+
+
+@pytest.fixture
+def store(ini_path):
+    """Store with a long delay so flushes only happen when requested."""
+    store = SettingsStore(file_path=ini_path, flush_delay=60)
+    yield store
+    store.flush()
+
+
+def _on_disk(ini_path, key, type=str):
+    return QSettings(ini_path, QSettings.IniFormat).value(key, None, type=type)
+
+
+class TestWriteBehind:
+    """Tests for in-memory writes and deferred flushing."""
+
+    def test_writes_are_visible_before_flush(self, store, ini_path):
+        """Setters update the cache immediately without touching disk."""
+        store.setValue("signing/output_dir", "/tmp/out")
+        store.setValue("api/last_balance", 5)
+
+        assert store.value("signing/output_dir", "", type=str) == "/tmp/out"
+        assert store.value("api/last_balance", 0, type=int) == 5
+        assert store.has_pending_writes()
+        assert _on_disk(ini_path, "signing/output_dir") == ""
+
+    def test_flush_writes_to_disk(self, store, ini_path):
+        """flush() persists all pending writes in one go."""
+        store.setValue("onboarding/completed", True)
+        store.setValue("signing/output_dir", "/tmp/out")
+        store.flush()
+
+        assert not store.has_pending_writes()
+        assert _on_disk(ini_path, "onboarding/completed", type=bool) is True
+        assert store.value("signing/output_dir", "", type=str) == "/tmp/out"
+
+    def test_remove_hides_key_until_flushed(self, store, ini_path):
+        """Removed keys read as default and disappear from disk on flush."""
+        store.setValue("certificate/last_cert_path", "/tmp/a.cer")
+        store.flush()
+
+        store.remove("certificate/last_cert_path")
+        assert not store.contains("certificate/last_cert_path")
+        assert store.value("certificate/last_cert_path", "", type=str) == ""
+
+        store.flush()
+        assert not QSettings(ini_path, QSettings.IniFormat).contains(
+            "certificate/last_cert_path"
+        )
+
+    def test_timer_coalesces_writes(self, ini_path, qtbot):
+        """Writes in quick succession are flushed together by the timer."""
+        store = SettingsStore(file_path=ini_path, flush_delay=0.05)
+        store.setValue("a", "1")
+        store.setValue("b", "2")
+
+        qtbot.waitUntil(lambda: not store.has_pending_writes(), timeout=2000)
+        assert _on_disk(ini_path, "a") == "1"
+        assert _on_disk(ini_path, "b") == "2"
+
+
+class TestTransactions:
+    """Tests for grouped multi-key updates."""
+
+    def test_transaction_commits_together(self, store):
+        """Writes inside a transaction are queued only when it completes."""
+        with store.transaction():
+            store.setValue("api/token_alias", "laptop")
+            store.setValue("api/token_is_active", False)
+            assert store.value("api/token_alias", type=str) == "laptop"
+            assert not store._pending
+
+        assert store.value("api/token_is_active", True, type=bool) is False
+        assert set(store._pending) == {"api/token_alias", "api/token_is_active"}
+
+    def test_transaction_rolls_back_on_error(self, store):
+        """An exception discards every write made in the transaction."""
+        store.setValue("api/token_alias", "old")
+
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.setValue("api/token_alias", "new")
+                store.setValue("api/token_expires_at", "2030-01-01")
+                raise RuntimeError("boom")
+
+        assert store.value("api/token_alias", type=str) == "old"
+        assert store.value("api/token_expires_at") is None
+
+    def test_concurrent_transactions_are_isolated(self, store):
+        """A rollback on one thread keeps another thread's transaction."""
+        staged = threading.Barrier(2)
+        errors = []
+
+        def commit():
+            with store.transaction():
+                store.setValue("api/token_alias", "laptop")
+                staged.wait(5)
+                staged.wait(5)  # The other thread rolled back in between
+
+        def roll_back():
+            try:
+                with store.transaction():
+                    store.setValue("api/token_expires_at", "2030-01-01")
+                    staged.wait(5)
+                    assert store.value("api/token_alias") is None
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+            except AssertionError as e:
+                errors.append(e)
+            staged.wait(5)
+
+        threads = [threading.Thread(target=commit), threading.Thread(target=roll_back)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert errors == []
+        assert store.value("api/token_alias", type=str) == "laptop"
+        assert store.value("api/token_expires_at") is None
+        assert set(store._pending) == {"api/token_alias"}
+
+
+def test_shared_store_is_per_scope():
+    """Every caller of shared() gets the same store for a scope."""
+    first = SettingsStore.shared("SelladoMX-test", "Scope")
+    assert SettingsStore.shared("SelladoMX-test", "Scope") is first
+    assert SettingsStore.shared("SelladoMX-test", "Other") is not first
+
+
+def test_file_name(store, ini_path):
+    """fileName() reports the backing file like QSettings does."""
+    assert store.fileName() == ini_path
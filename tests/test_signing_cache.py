@@ -0,0 +1,163 @@
+"""Tests for the content-addressed signing cache."""
+import hashlib
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from selladomx.signing.signing_cache import SigningCache, sha256_file
+from selladomx.signing.worker import SigningWorker
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create an empty cache backed by a temporary file."""
+    return SigningCache(tmp_path / "cache" / "signing_cache.json")
+
+
+@pytest.fixture
+def signed_output(tmp_path):
+    """A fake signed output file."""
+    path = tmp_path / "doc_firmado.pdf"
+    path.write_bytes(b"signed")
+    return path
+
+
+class TestSigningCache:
+    """Tests for lookup, invalidation and persistence."""
+
+    def test_sha256_file_matches_hashlib(self, tmp_path):
+        """The streaming hash matches a one-shot hash."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(os.urandom(3 * 1024 * 1024 + 7))
+
+        assert sha256_file(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def test_lookup_hit(self, cache, signed_output):
+        """A stored, unchanged output is returned with its verification URL."""
+        cache.store("abc", "01", signed_output, verification_url="https://v/1")
+
+        entry = cache.lookup("abc", "01", signed_output)
+
+        assert entry is not None
+        assert entry.verification_url == "https://v/1"
+
+    def test_lookup_miss_on_other_cert_or_path(self, cache, signed_output, tmp_path):
+        """The key includes the certificate serial and the expected output path."""
+        cache.store("abc", "01", signed_output)
+
+        assert cache.lookup("abc", "02", signed_output) is None
+        assert cache.lookup("abc", "01", tmp_path / "other_firmado.pdf") is None
+
+    def test_lookup_miss_when_output_changed_or_deleted(self, cache, signed_output):
+        """Entries are invalid once the signed file changes or disappears."""
+        cache.store("abc", "01", signed_output)
+
+        signed_output.write_bytes(b"tampered output")
+        assert cache.lookup("abc", "01", signed_output) is None
+
+        signed_output.unlink()
+        assert cache.lookup("abc", "01", signed_output) is None
+
+    def test_professional_requires_professional_entry(self, cache, signed_output):
+        """A free-TSA signature is not reused when professional TSA is requested."""
+        cache.store("abc", "01", signed_output, professional=False)
+
+        assert cache.lookup("abc", "01", signed_output, professional=True) is None
+        assert cache.lookup("abc", "01", signed_output, professional=False)
+
+    def test_lookup_miss_on_other_options(self, cache, signed_output):
+        """Only a signature made with the same TSA mode and options is reused."""
+        cache.store("abc", "01", signed_output, professional=True, options="B-T")
+
+        assert cache.lookup("abc", "01", signed_output, True, "B-LTA") is None
+        assert cache.lookup("abc", "01", signed_output, False, "B-T") is None
+        assert cache.lookup("abc", "01", signed_output, True, "B-T") is not None
+
+    def test_persistence(self, cache, signed_output):
+        """Saved entries are visible to a new cache instance."""
+        cache.store("abc", "01", signed_output, record_id="rec-1")
+        cache.save()
+
+        reloaded = SigningCache(cache.cache_file)
+        assert reloaded.lookup("abc", "01", signed_output).record_id == "rec-1"
+
+    def test_max_entries_evicts_oldest(self, tmp_path, signed_output):
+        """The oldest entries are dropped beyond max_entries."""
+        cache = SigningCache(tmp_path / "cache.json", max_entries=2)
+        for source in ("a", "b", "c"):
+            cache.store(source, "01", signed_output)
+
+        assert cache.lookup("a", "01", signed_output) is None
+        assert cache.lookup("c", "01", signed_output) is not None
+
+
+class TestWorkerReuse:
+    """Tests for SigningWorker skipping already-signed documents."""
+
+    @pytest.fixture
+    def sign(self, cache, tmp_path, run_worker):
+        """Sign doc.pdf with a mocked signer; returns (sign_once, signer)."""
+        source = tmp_path / "doc.pdf"
+        source.write_bytes(b"%PDF-1.7 source")
+
+        def fake_write(prepared):
+            prepared.output_path.write_bytes(b"signed")
+            return prepared.output_path
+
+        cert = MagicMock(serial_number=0x1234)
+        with patch("selladomx.signing.worker.PDFSigner") as mock_signer_cls:
+            signer = mock_signer_cls.return_value
+            signer.prepare.side_effect = lambda pdf_path, output_path, **kwargs: (
+                MagicMock(
+                    output_path=output_path,
+                    source_sha256=kwargs["source_sha256"] or sha256_file(pdf_path),
+                )
+            )
+            signer.write.side_effect = fake_write
+
+            def sign_once(**options):
+                worker = SigningWorker(
+                    pdf_paths=[source],
+                    cert=cert,
+                    private_key=MagicMock(),
+                    signing_cache=cache,
+                    **options,
+                )
+                completed = []
+                worker.file_completed.connect(completed.append)
+                run_worker(worker)
+                return completed
+
+            yield sign_once, signer
+
+    def test_second_run_reuses_signature(self, sign, cache, tmp_path):
+        """An identical document signed before is not signed again."""
+        sign_once, signer = sign
+
+        first = sign_once()
+        second = sign_once()
+
+        assert signer.write.call_count == 1
+        assert first[0].success is True
+        assert second[0].success is True
+        assert second[0].reused is True
+        assert "reutilizó" in second[0].message
+        assert (tmp_path / "doc_firmado.pdf").exists()
+        assert cache.cache_file.exists()
+
+    def test_other_signature_level_signs_again(self, sign):
+        """A signature made at another level is not reused."""
+        sign_once, signer = sign
+
+        sign_once(signature_level="B-T")
+        second = sign_once(signature_level="B-LTA")
+        third = sign_once(signature_level="B-LTA")
+
+        assert signer.write.call_count == 2
+        assert second[0].reused is False
+        # The digest taken for the cache lookup is not computed again
+        assert signer.prepare.call_args.kwargs["source_sha256"] == (
+            hashlib.sha256(b"%PDF-1.7 source").hexdigest()
+        )
+        assert third[0].reused is True
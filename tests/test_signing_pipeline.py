@@ -0,0 +1,188 @@
+"""Tests for the staged signing pipeline."""
+import threading
+import time
+
+import pytest
+
+from selladomx.signing.pipeline import SigningPipeline, Stage
+
+
+def _collect():
+    results = []
+    lock = threading.Lock()
+
+    def sink(item):
+        with lock:
+            results.append(item)
+        return item
+
+    return results, sink
+
+
+class TestSigningPipeline:
+    def test_items_flow_through_every_stage(self):
+        results, sink = _collect()
+        pipeline = SigningPipeline(
+            [Stage("double", lambda x: x * 2), Stage("sink", sink)],
+            on_error=lambda item, e: None,
+        )
+
+        pipeline.run(range(5))
+
+        assert results == [0, 2, 4, 6, 8]
+
+    def test_none_drops_item(self):
+        results, sink = _collect()
+        pipeline = SigningPipeline(
+            [Stage("odd", lambda x: x if x % 2 else None), Stage("sink", sink)],
+            on_error=lambda item, e: None,
+        )
+
+        pipeline.run(range(6))
+
+        assert results == [1, 3, 5]
+
+    def test_error_is_reported_and_item_dropped(self):
+        results, sink = _collect()
+        errors = []
+
+        def check(x):
+            if x == 2:
+                raise ValueError("bad item")
+            return x
+
+        pipeline = SigningPipeline(
+            [Stage("check", check), Stage("sink", sink)],
+            on_error=lambda item, e: errors.append((item, str(e))),
+        )
+
+        pipeline.run(range(4))
+
+        assert results == [0, 1, 3]
+        assert errors == [(2, "bad item")]
+
+    def test_cancel_stops_remaining_items(self):
+        results, sink = _collect()
+        seen = []
+        pipeline = None
+
+        def stop_at_three(x):
+            seen.append(x)
+            if x == 3:
+                pipeline.cancel()
+                return None
+            return x
+
+        pipeline = SigningPipeline(
+            [Stage("stop", stop_at_three), Stage("sink", sink)],
+            on_error=lambda item, e: None,
+        )
+
+        pipeline.run(range(100))
+
+        assert pipeline.cancelled
+        # Items after the cancel are skipped; earlier ones may or may not finish
+        assert seen == [0, 1, 2, 3]
+        assert set(results) <= {0, 1, 2}
+
+    def test_stages_overlap(self):
+        """A slow middle stage with several workers runs items concurrently."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow(x):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return x
+
+        results, sink = _collect()
+        pipeline = SigningPipeline(
+            [Stage("prepare", lambda x: x), Stage("seal", slow, 3), Stage("w", sink)],
+            on_error=lambda item, e: None,
+        )
+
+        pipeline.run(range(6))
+
+        assert sorted(results) == list(range(6))
+        assert peak > 1
+
+    def test_queues_are_bounded(self):
+        """The feeder waits while the next stage is backed up."""
+        release = threading.Event()
+        fed = []
+
+        def items():
+            for i in range(10):
+                fed.append(i)
+                yield i
+
+        pipeline = SigningPipeline(
+            [Stage("block", lambda x: release.wait() and x)],
+            on_error=lambda item, e: None,
+            queue_size=2,
+        )
+        runner = threading.Thread(target=pipeline.run, args=(items(),))
+        runner.start()
+        time.sleep(0.1)
+
+        # One item in the stage, two queued, one blocked on put()
+        assert len(fed) <= 4
+        release.set()
+        runner.join(timeout=5)
+        assert len(fed) == 10
+
+    def test_batch_stage_takes_queued_items(self):
+        """A batch stage gets everything queued while it was busy."""
+        release = threading.Event()
+        batches = []
+
+        def seal(items):
+            batches.append(list(items))
+            release.wait(5)
+            return items
+
+        results, sink = _collect()
+        pipeline = SigningPipeline(
+            [Stage("seal", seal, batch=4, batch_wait=0.01), Stage("w", sink)],
+            on_error=lambda item, e: None,
+            queue_size=4,
+        )
+        runner = threading.Thread(target=pipeline.run, args=(range(9),))
+        runner.start()
+        time.sleep(0.1)
+        release.set()
+        runner.join(timeout=5)
+
+        # The queue filled up while the first batch was blocked
+        assert len(batches[1]) == 4
+        assert [item for batch in batches for item in batch] == list(range(9))
+        assert results == list(range(9))
+
+    def test_batch_stage_error_reports_every_item(self):
+        errors = []
+
+        def seal(items):
+            if 2 in items:
+                raise ValueError("bad batch")
+            return items
+
+        results, sink = _collect()
+        pipeline = SigningPipeline(
+            [Stage("seal", seal, batch=2, batch_wait=1.0), Stage("w", sink)],
+            on_error=lambda item, e: errors.append(item),
+        )
+
+        pipeline.run(range(4))
+
+        assert sorted(errors) == [2, 3]
+        assert results == [0, 1]
+
+    def test_requires_a_stage(self):
+        with pytest.raises(ValueError):
+            SigningPipeline([], on_error=lambda item, e: None)
@@ -0,0 +1,96 @@
+"""Tests para el resultado estructurado de la firma"""
+import hashlib
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from selladomx.signing.result import ErrorCode, PhaseRecorder, SigningResult
+
+
+class TestSigningResult:
+    """Tests para SigningResult"""
+
+    def test_json_line(self):
+        result = SigningResult(
+            Path("/docs/a.pdf"),
+            error=ErrorCode.NETWORK,
+            message="Sin conexión",
+            phases={"read": 0.5},
+        )
+
+        data = json.loads(result.to_json())
+
+        assert result.success is False
+        assert data["source"] == "/docs/a.pdf"
+        assert data["output"] is None
+        assert data["error"] == "network"
+        assert data["success"] is False
+        assert data["phases"] == {"read": 0.5}
+
+    def test_phase_recorder_groups_by_document(self):
+        recorder = PhaseRecorder("signing_phase_seconds")
+        recorder("signing_phase_seconds", {"phase": "read"}, 0.25, "/a/doc.pdf")
+        recorder("signing_phase_seconds", {"phase": "read"}, 0.25, "/a/doc.pdf")
+        recorder("signing_phase_seconds", {"phase": "write"}, 1.0, "/b/doc.pdf")
+        recorder("tsa_request_seconds", {"provider": "x"}, 3.0, "/a/doc.pdf")
+
+        assert recorder.pop("/a/doc.pdf") == {"read": 0.5}
+        assert recorder.pop("/a/doc.pdf") == {}
+        assert recorder.pop("/b/doc.pdf") == {"write": 1.0}
+
+
+def test_worker_emits_structured_results(
+    make_pdf, signing_identity, dummy_timestamper, tmp_path, run_worker
+):
+    """El worker reporta rutas, hashes, tamaños y tiempos de cada archivo"""
+    from selladomx.signing.worker import SigningWorker
+
+    tsa_client = MagicMock()
+    tsa_client.get_timestamper.return_value = dummy_timestamper
+    source = make_pdf()
+    (tmp_path / "out").mkdir()
+    worker = SigningWorker(
+        [source, tmp_path / "falta.pdf"],
+        *signing_identity,
+        tsa_client=tsa_client,
+        output_dir=tmp_path / "out",
+    )
+    results = []
+    worker.file_completed.connect(results.append)
+    run_worker(worker)
+
+    signed, missing = sorted(results, key=lambda result: not result.success)
+    assert signed.success and signed.output.exists()
+    assert signed.source_sha256 == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert (
+        signed.output_sha256 == hashlib.sha256(signed.output.read_bytes()).hexdigest()
+    )
+    assert (signed.source_size, signed.output_size) == (
+        source.stat().st_size,
+        signed.output.stat().st_size,
+    )
+    assert {"read", "digest", "embed", "write"} <= set(signed.phases)
+    assert missing.error is ErrorCode.PDF
+    assert worker.errors == [missing]
+
+
+def test_worker_keeps_phases_of_same_named_files_apart(
+    make_pdf, signing_identity, dummy_timestamper, run_worker
+):
+    """Dos archivos con el mismo nombre en distintas carpetas no mezclan tiempos"""
+    from selladomx.signing.worker import SigningWorker
+
+    tsa_client = MagicMock()
+    tsa_client.get_timestamper.return_value = dummy_timestamper
+    worker = SigningWorker(
+        [make_pdf("enero/factura.pdf"), make_pdf("febrero/factura.pdf")],
+        *signing_identity,
+        tsa_client=tsa_client,
+    )
+    results = []
+    worker.file_completed.connect(results.append)
+    run_worker(worker)
+
+    assert [result.success for result in results] == [True, True]
+    for result in results:
+        assert {"read", "digest", "embed", "write"} <= set(result.phases)
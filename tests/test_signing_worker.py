@@ -1,10 +1,17 @@
 """Tests for SigningWorker error handling - no silent fallback to free TSA."""
+import asyncio
+import base64
 import hashlib
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch, PropertyMock
 
 import pytest
+from asn1crypto import tsp
+from PySide6.QtCore import QCoreApplication
 
+from selladomx.signing.result import ErrorCode
 from selladomx.signing.worker import SigningWorker
 from selladomx.api.exceptions import (
     AuthenticationError,
@@ -20,7 +27,7 @@ def mock_signer():
     with patch("selladomx.signing.worker.PDFSigner") as mock_cls:
         signer = mock_cls.return_value
         output_path = Path("/tmp/test_firmado.pdf")
-        signer.sign_pdf.return_value = output_path
+        signer.write.return_value = output_path
 
         # Mock output_path.read_bytes() and stat()
         with patch.object(Path, "read_bytes", return_value=b"signed-pdf-content"):
@@ -47,121 +54,127 @@ class TestSigningWorkerNoFallback:
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
     def test_insufficient_credits_emits_error_no_fallback(
-        self, mock_signer_cls, mock_api_cls
+        self, mock_signer_cls, mock_api_cls, run_worker
     ):
         """InsufficientCreditsError should emit failure, not silently sign with free TSA."""
         mock_api = mock_api_cls.return_value
         mock_api.request_tsa_sign.side_effect = InsufficientCreditsError()
 
-        # sign_pdf raises InsufficientCreditsError because APITimeStamper
-        # calls request_tsa_sign during signing
+        # seal raises InsufficientCreditsError because APITimeStamper
+        # calls request_tsa_sign while sealing
         mock_signer = mock_signer_cls.return_value
-        mock_signer.sign_pdf.side_effect = InsufficientCreditsError()
+        mock_signer.seal.side_effect = InsufficientCreditsError()
 
         worker = self._create_worker()
 
         # Collect emitted signals
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         finished_errors = []
         worker.finished.connect(lambda errs: finished_errors.extend(errs))
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         # Should have emitted file_completed with success=False
         assert len(completed_calls) == 1
-        filename, success, message, url = completed_calls[0]
-        assert success is False
-        assert "créditos" in message.lower()
-        assert url == ""
+        result = completed_calls[0]
+        assert result.success is False
+        assert result.error is ErrorCode.INSUFFICIENT_CREDITS
+        assert "créditos" in result.message.lower()
+        assert result.verification_url == ""
 
         # Should have errors
         assert len(finished_errors) == 1
 
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
-    def test_auth_error_emits_error_no_fallback(self, mock_signer_cls, mock_api_cls):
+    def test_auth_error_emits_error_no_fallback(
+        self, mock_signer_cls, mock_api_cls, run_worker
+    ):
         """AuthenticationError should emit failure, not silently sign with free TSA."""
         mock_signer = mock_signer_cls.return_value
-        mock_signer.sign_pdf.side_effect = AuthenticationError("Invalid token")
+        mock_signer.seal.side_effect = AuthenticationError("Invalid token")
 
         worker = self._create_worker()
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         finished_errors = []
         worker.finished.connect(lambda errs: finished_errors.extend(errs))
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         assert len(completed_calls) == 1
-        _, success, message, _ = completed_calls[0]
-        assert success is False
-        assert "token" in message.lower()
+        result = completed_calls[0]
+        assert result.error is ErrorCode.AUTHENTICATION
+        assert "token" in result.message.lower()
 
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
-    def test_network_error_emits_error_no_fallback(self, mock_signer_cls, mock_api_cls):
+    def test_network_error_emits_error_no_fallback(
+        self, mock_signer_cls, mock_api_cls, run_worker
+    ):
         """NetworkError should emit failure, not silently sign with free TSA."""
         mock_signer = mock_signer_cls.return_value
-        mock_signer.sign_pdf.side_effect = NetworkError("Connection refused")
+        mock_signer.seal.side_effect = NetworkError("Connection refused")
 
         worker = self._create_worker()
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         finished_errors = []
         worker.finished.connect(lambda errs: finished_errors.extend(errs))
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         assert len(completed_calls) == 1
-        _, success, message, _ = completed_calls[0]
-        assert success is False
-        assert "connection refused" in message.lower()
+        result = completed_calls[0]
+        assert result.error is ErrorCode.NETWORK
+        assert "connection refused" in result.message.lower()
 
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
-    def test_api_error_emits_error_no_fallback(self, mock_signer_cls, mock_api_cls):
+    def test_api_error_emits_error_no_fallback(
+        self, mock_signer_cls, mock_api_cls, run_worker
+    ):
         """Generic APIError should emit failure, not silently sign with free TSA."""
         mock_signer = mock_signer_cls.return_value
-        mock_signer.sign_pdf.side_effect = APIError("Server error", 500)
+        mock_signer.seal.side_effect = APIError("Server error", 500)
 
         worker = self._create_worker()
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         finished_errors = []
         worker.finished.connect(lambda errs: finished_errors.extend(errs))
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         assert len(completed_calls) == 1
-        _, success, message, _ = completed_calls[0]
-        assert success is False
+        assert completed_calls[0].error is ErrorCode.API
 
     @patch("selladomx.signing.worker.APITimeStamper")
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
     def test_professional_tsa_success_emits_verification_url(
-        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, run_worker
     ):
         """Successful professional TSA should emit verification URL."""
         mock_signer = mock_signer_cls.return_value
         output_path = Path("/tmp/test_firmado.pdf")
-        mock_signer.sign_pdf.return_value = output_path
+        mock_signer.write.return_value = output_path
 
         mock_api = mock_api_cls.return_value
         mock_api.complete_timestamp.return_value = {"success": True}
@@ -175,25 +188,50 @@ class TestSigningWorkerNoFallback:
         worker = self._create_worker()
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         assert len(completed_calls) == 1
-        _, success, _, url = completed_calls[0]
-        assert success is True
-        assert url == "https://selladomx.com/verify/abc123"
+        result = completed_calls[0]
+        assert result.success is True
+        assert result.verification_url == "https://selladomx.com/verify/abc123"
+        assert result.record_id == "test-record-id"
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_professional_tsa_reports_credits_remaining(
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, run_worker
+    ):
+        """The balance returned with each timestamp is forwarded to the UI."""
+        mock_signer_cls.return_value.write.return_value = Path("/tmp/x_firmado.pdf")
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 10}
+        mock_timestamper = mock_timestamper_cls.return_value
+        mock_timestamper.record_id = None
+        mock_timestamper.credits_remaining = 9
+
+        worker = self._create_worker()
+
+        credits = []
+        worker.credits_updated.connect(credits.append)
+
+        with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
+            run_worker(worker)
+
+        assert credits == [9]
 
     @patch("selladomx.signing.worker.SelladoMXAPIClient")
     @patch("selladomx.signing.worker.PDFSigner")
     def test_multiple_files_stops_on_first_tsa_error(
-        self, mock_signer_cls, mock_api_cls
+        self, mock_signer_cls, mock_api_cls, run_worker
     ):
         """When TSA fails, should stop processing remaining files."""
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 10}
         mock_signer = mock_signer_cls.return_value
-        mock_signer.sign_pdf.side_effect = InsufficientCreditsError()
+        mock_signer.seal.side_effect = InsufficientCreditsError()
 
         worker = SigningWorker(
             pdf_paths=[Path("/tmp/a.pdf"), Path("/tmp/b.pdf"), Path("/tmp/c.pdf")],
@@ -206,21 +244,21 @@ class TestSigningWorkerNoFallback:
         )
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
         with patch.object(Path, "read_bytes", return_value=b"content"):
             with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
-                worker.run()
+                run_worker(worker)
 
         # Should only have processed the first file, then stopped
         assert len(completed_calls) == 1
 
     @patch("selladomx.signing.worker.PDFSigner")
-    def test_free_tsa_signing_works_without_api(self, mock_signer_cls):
+    def test_free_tsa_signing_works_without_api(self, mock_signer_cls, run_worker):
         """Free TSA signing should work without API client."""
         mock_signer = mock_signer_cls.return_value
         output_path = Path("/tmp/test_firmado.pdf")
-        mock_signer.sign_pdf.return_value = output_path
+        mock_signer.write.return_value = output_path
 
         worker = SigningWorker(
             pdf_paths=[Path("/tmp/test.pdf")],
@@ -230,11 +268,300 @@ class TestSigningWorkerNoFallback:
         )
 
         completed_calls = []
-        worker.file_completed.connect(lambda *args: completed_calls.append(args))
+        worker.file_completed.connect(completed_calls.append)
 
-        worker.run()
+        run_worker(worker)
 
         assert len(completed_calls) == 1
-        _, success, _, url = completed_calls[0]
-        assert success is True
-        assert url == ""
+        result = completed_calls[0]
+        assert result.success is True
+        assert result.verification_url == ""
+        assert result.output == Path("/tmp/test_firmado.pdf")
+
+
+class TestSigningWorkerCreditPlanning:
+    """Test that the batch is planned against the balance before signing."""
+
+    def _create_worker(self, paths, credit_policy="professional_only"):
+        return SigningWorker(
+            pdf_paths=[Path(p) for p in paths],
+            cert=MagicMock(),
+            private_key=MagicMock(),
+            tsa_client=MagicMock(),
+            use_professional_tsa=True,
+            api_key="test-key",
+            credit_policy=credit_policy,
+        )
+
+    @pytest.fixture(autouse=True)
+    def _worker_runner(self, run_worker):
+        self.run_worker = run_worker
+
+    def _run(self, worker):
+        completed_calls = []
+        worker.file_completed.connect(completed_calls.append)
+        with patch.object(Path, "stat", return_value=MagicMock(st_size=100)):
+            self.run_worker(worker)
+        return completed_calls
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_files_beyond_balance_reported_upfront(
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, qtbot
+    ):
+        """Only funded files reach the API; the rest fail without a round-trip."""
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 1}
+        mock_signer_cls.return_value.write.return_value = Path("/tmp/a_firmado.pdf")
+        mock_timestamper_cls.return_value.record_id = None
+
+        worker = self._create_worker(["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/c.pdf"])
+        completed_calls = self._run(worker)
+
+        results = {result.source.name: result.success for result in completed_calls}
+        assert results == {"a.pdf": True, "b.pdf": False, "c.pdf": False}
+        assert mock_api_cls.return_value.get_balance.call_count == 1
+        assert mock_timestamper_cls.call_count == 1
+        assert len(worker.errors) == 2
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_fallback_policy_signs_overflow_with_free_tsa(
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, qtbot
+    ):
+        """With fallback_free, files beyond the balance use the free TSA."""
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 1}
+        mock_signer_cls.return_value.write.return_value = Path("/tmp/x_firmado.pdf")
+        mock_timestamper_cls.return_value.record_id = None
+
+        worker = self._create_worker(
+            ["/tmp/a.pdf", "/tmp/b.pdf", "/tmp/c.pdf"], credit_policy="fallback_free"
+        )
+        progress = []
+        worker.progress.connect(lambda current, total: progress.append(current))
+        completed_calls = self._run(worker)
+
+        assert all(result.success for result in completed_calls)
+        assert len(completed_calls) == 3
+        assert sorted(progress) == [1, 2, 3]
+        free_calls = [
+            call
+            for call in mock_signer_cls.call_args_list
+            if call.kwargs["timestamper"] is None
+        ]
+        assert len(free_calls) == 2
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_reused_files_take_no_credits(
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, tmp_path
+    ):
+        """Cached files are left out of the plan, so the credit goes to c.pdf."""
+        from selladomx.signing.signing_cache import SigningCache
+
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 1}
+        mock_timestamper_cls.return_value.record_id = None
+        mock_timestamper_cls.return_value.credits_remaining = None
+        signer = mock_signer_cls.return_value
+        signer.prepare.side_effect = lambda pdf_path, output_path, **_: MagicMock(
+            output_path=output_path, source_sha256="", output_size=1
+        )
+        paths = []
+        for name in ("a", "b", "c"):
+            path = tmp_path / f"{name}.pdf"
+            path.write_bytes(f"%PDF-1.7 {name}".encode())
+            paths.append(path)
+
+        cache = SigningCache(tmp_path / "cache.json")
+        cert = MagicMock(serial_number=0x1234)
+        worker = SigningWorker(
+            pdf_paths=paths,
+            cert=cert,
+            private_key=MagicMock(),
+            use_professional_tsa=True,
+            api_key="test-key",
+            signing_cache=cache,
+        )
+        for path in paths[:2]:
+            output = tmp_path / f"{path.stem}_firmado.pdf"
+            output.write_bytes(b"signed")
+            cache.store(
+                hashlib.sha256(path.read_bytes()).hexdigest(),
+                "1234",
+                output,
+                professional=True,
+                options=worker._cache_options(professional=True),
+            )
+        completed_calls = []
+        worker.file_completed.connect(completed_calls.append)
+        self.run_worker(worker)
+
+        results = {result.source.name: result for result in completed_calls}
+        assert [results[name].reused for name in ("a.pdf", "b.pdf")] == [True, True]
+        assert results["c.pdf"].success and not results["c.pdf"].reused
+        assert mock_timestamper_cls.call_args.kwargs["filename"] == "c.pdf"
+        assert worker.errors == []
+
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_fallback_policy_recovers_when_credits_run_out(
+        self, mock_signer_cls, mock_api_cls, qtbot
+    ):
+        """A stale balance does not stop the batch under fallback_free."""
+        mock_api_cls.return_value.get_balance.return_value = {"credits_remaining": 5}
+
+        def make_signer(*args, **kwargs):
+            signer = MagicMock()
+            if kwargs["timestamper"] is not None:
+                signer.seal.side_effect = InsufficientCreditsError()
+            signer.write.return_value = Path("/tmp/x_firmado.pdf")
+            return signer
+
+        mock_signer_cls.side_effect = make_signer
+
+        worker = self._create_worker(
+            ["/tmp/a.pdf", "/tmp/b.pdf"], credit_policy="fallback_free"
+        )
+        completed_calls = self._run(worker)
+
+        assert [result.success for result in completed_calls] == [True, True]
+        assert worker.errors == []
+
+    @patch("selladomx.signing.worker.APITimeStamper")
+    @patch("selladomx.signing.worker.SelladoMXAPIClient")
+    @patch("selladomx.signing.worker.PDFSigner")
+    def test_unknown_balance_tries_professional_tsa(
+        self, mock_signer_cls, mock_api_cls, mock_timestamper_cls, qtbot
+    ):
+        """If the balance cannot be fetched, every file goes to the API."""
+        mock_api_cls.return_value.get_balance.side_effect = NetworkError("offline")
+        mock_signer_cls.return_value.write.return_value = Path("/tmp/x_firmado.pdf")
+        mock_timestamper_cls.return_value.record_id = None
+
+        worker = self._create_worker(["/tmp/a.pdf", "/tmp/b.pdf"])
+        completed_calls = self._run(worker)
+
+        assert len(completed_calls) == 2
+        assert mock_timestamper_cls.call_count == 2
+
+
+class _BatchTSAAPI:
+    """Fake SelladoMX API that answers timestamp batches after a delay."""
+
+    def __init__(self, tsa_response, latency):
+        self.tsa_response_b64 = base64.b64encode(tsa_response.dump()).decode("ascii")
+        self.latency = latency
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def get_balance(self):
+        return {"credits_remaining": 1000}
+
+    def request_tsa_sign_batch(self, tsa_requests, chunk_size):
+        with self._lock:
+            self.batch_sizes.append(len(tsa_requests))
+        time.sleep(self.latency)  # One round trip per call
+        return [
+            {"record_id": payload["filename"], "tsa_resp_b64": self.tsa_response_b64}
+            for payload in tsa_requests
+        ]
+
+    def complete_timestamp(self, *args):
+        pass
+
+
+@patch("selladomx.signing.worker.PDFSigner")
+def test_professional_batches_fill_up(
+    mock_signer_cls, make_pdf, dummy_timestamper, qtbot
+):
+    """Files prepared while a batch is at the API form the next full batch."""
+    request = tsp.TimeStampReq(
+        {
+            "version": 1,
+            "message_imprint": {
+                "hash_algorithm": {"algorithm": "sha256"},
+                "hashed_message": bytes(32),
+            },
+            "cert_req": True,
+        }
+    )
+    api = _BatchTSAAPI(dummy_timestamper.request_tsa_response(request), latency=0.6)
+
+    def make_signer(*args, timestamper=None, **kwargs):
+        signer = MagicMock()
+
+        def prepare(pdf_path, *args, **kwargs):
+            time.sleep(0.05)  # Reading and hashing the document
+            return MagicMock(pdf_path=pdf_path)
+
+        signer.prepare.side_effect = prepare
+        signer.seal.side_effect = lambda prepared: asyncio.run(
+            timestamper.async_request_tsa_response(request)
+        )
+        signer.write.return_value = Path("/tmp/x_firmado.pdf")
+        return signer
+
+    mock_signer_cls.side_effect = make_signer
+    worker = SigningWorker(
+        [make_pdf(f"doc{i}.pdf") for i in range(40)],
+        cert=MagicMock(),
+        private_key=MagicMock(),
+        use_professional_tsa=True,
+        api_key="test-key",
+    )
+    with patch("selladomx.signing.worker.SelladoMXAPIClient", return_value=api):
+        worker.run()
+
+    assert worker.errors == []
+    assert sum(api.batch_sizes) == 40
+    # A partial batch while the queue first fills, then full ones
+    assert len(api.batch_sizes) <= 4, api.batch_sizes
+    assert max(api.batch_sizes) == 16, api.batch_sizes
+
+
+@patch("selladomx.signing.worker.PDFSigner")
+def test_interruption_finishes_in_flight_files_and_closes_report(
+    mock_signer_cls, make_pdf, tmp_path, qtbot
+):
+    """requestInterruption() stops the batch without losing the report."""
+    sealing = threading.Event()
+    resume = threading.Event()
+
+    def seal(prepared):
+        sealing.set()
+        resume.wait(5)
+
+    signer = mock_signer_cls.return_value
+    signer.prepare.side_effect = lambda pdf_path, *a, **k: MagicMock(
+        pdf_path=pdf_path,
+        source_sha256="ab" * 32,
+        source_size=100,
+        output_sha256="cd" * 32,
+        output_size=200,
+        tsa_provider="freetsa.org",
+    )
+    signer.seal.side_effect = seal
+    signer.write.return_value = Path("/tmp/x_firmado.pdf")
+    report_path = tmp_path / "reporte.jsonl"
+    worker = SigningWorker(
+        [make_pdf(f"doc{i}.pdf") for i in range(20)],
+        cert=MagicMock(),
+        private_key=MagicMock(),
+        tsa_client=MagicMock(),
+        report_path=report_path,
+    )
+    completed = []
+    worker.file_completed.connect(completed.append)
+
+    worker.start()
+    assert sealing.wait(5)
+    worker.requestInterruption()
+    resume.set()
+    assert worker.wait(5000)
+    QCoreApplication.processEvents()
+
+    assert 0 < len(completed) < 20
+    assert all(result.success for result in completed)
+    assert len(report_path.read_text().splitlines()) == len(completed)
@@ -0,0 +1,74 @@
+"""Startup regression checks: import budget and lazy heavy dependencies."""
+import json
+
+from selladomx.config import STARTUP_IMPORT_BUDGET_MS
+from selladomx.utils.startup_profiler import (
+    format_report,
+    heavy_modules_loaded,
+    parse_importtime,
+    profile_imports,
+    record_startup_metrics,
+    total_ms,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     requests.utils
+import time:      1500 |       2400 |   requests
+import time:       800 |       3200 | selladomx.main
+"""
+
+
+class TestParseImporttime:
+    """Tests for parsing -X importtime output."""
+
+    def test_parse(self):
+        """Each timing line becomes a record with its nesting depth."""
+        records = parse_importtime(SAMPLE)
+
+        assert [record.module for record in records] == [
+            "_io",
+            "requests.utils",
+            "requests",
+            "selladomx.main",
+        ]
+        assert records[1].depth == 2
+        assert records[3].cumulative_us == 3200
+        assert total_ms(records, "selladomx.main") == 3.2
+        assert heavy_modules_loaded(records) == ["requests"]
+
+    def test_report_lists_slowest_first(self):
+        """The report starts with the slowest cumulative import."""
+        report = format_report(parse_importtime(SAMPLE), top=2)
+
+        assert report.splitlines()[1].strip().endswith("selladomx.main")
+
+
+class TestStartupBudget:
+    """Regression benchmark for cold-start imports."""
+
+    def test_main_does_not_import_signing_stack(self):
+        """pyhanko, cryptography and requests load after the first frame."""
+        records = profile_imports("selladomx.main")
+
+        assert heavy_modules_loaded(records) == []
+
+    def test_main_import_within_budget(self):
+        """Importing selladomx.main stays within the startup budget."""
+        records = profile_imports("selladomx.main")
+
+        assert total_ms(records, "selladomx.main") < STARTUP_IMPORT_BUDGET_MS
+
+
+def test_record_startup_metrics(tmp_path):
+    """Each launch appends one JSON line."""
+    path = tmp_path / "startup.jsonl"
+
+    record_startup_metrics(str(path), version="1.0", first_frame_ms=250.0)
+    record_startup_metrics(str(path), version="1.1", first_frame_ms=240.0)
+
+    runs = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [run["version"] for run in runs] == ["1.0", "1.1"]
+    assert runs[0]["first_frame_ms"] == 250.0
+    assert "timestamp" in runs[0]
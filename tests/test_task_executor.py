@@ -0,0 +1,142 @@
+"""Tests for TaskExecutor - priorities, cancellation and GUI-thread delivery."""
+import threading
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QThread
+
+from selladomx.utils.task_executor import (
+    TaskCancelled,
+    TaskExecutor,
+    TaskPriority,
+)
+
+
+@pytest.fixture
+def executor(qtbot):
+    executor = TaskExecutor(max_threads=1)
+    yield executor
+    executor.shutdown()
+
+
+def _finish(executor):
+    """Wait for the pool and deliver the queued outcomes."""
+    assert executor.wait_for_done(5000)
+    QCoreApplication.processEvents()
+
+
+class TestTaskExecutor:
+    def test_result_delivered_on_gui_thread(self, executor):
+        threads = []
+        results = []
+        handle = executor.submit(
+            lambda: threads.append(QThread.currentThread()) or 42, name="answer"
+        )
+        handle.succeeded.connect(
+            lambda result: results.append((result, QThread.currentThread()))
+        )
+
+        _finish(executor)
+
+        gui_thread = QCoreApplication.instance().thread()
+        assert results == [(42, gui_thread)]
+        assert threads[0] is not gui_thread
+        assert handle.is_done()
+
+    def test_exception_delivered_as_failure(self, executor):
+        errors = []
+        handle = executor.submit(lambda: 1 / 0, name="broken")
+        handle.failed.connect(errors.append)
+
+        _finish(executor)
+
+        assert isinstance(errors[0], ZeroDivisionError)
+        assert executor.stats()["broken"].failures == 1
+
+    def test_higher_priority_starts_first(self, executor):
+        gate = threading.Event()
+        order = []
+        executor.submit(gate.wait, name="blocker")
+        executor.submit(lambda: order.append("low"), "low", TaskPriority.LOW)
+        executor.submit(lambda: order.append("high"), "high", TaskPriority.HIGH)
+        gate.set()
+
+        _finish(executor)
+
+        assert order == ["high", "low"]
+
+    def test_cancelled_before_start_never_runs(self, executor):
+        gate = threading.Event()
+        ran = []
+        cancelled = []
+        executor.submit(gate.wait, name="blocker")
+        handle = executor.submit(lambda: ran.append(True), name="victim")
+        handle.cancelled.connect(lambda: cancelled.append(True))
+        handle.cancel()
+        gate.set()
+
+        _finish(executor)
+
+        assert ran == []
+        assert cancelled == [True]
+        assert executor.stats()["victim"].cancellations == 1
+
+    def test_context_reports_progress_and_observes_cancellation(self, executor):
+        progress = []
+        succeeded = []
+
+        def task(context):
+            for i in range(3):
+                context.report(i)
+            context.token.cancel()
+            context.token.raise_if_cancelled()
+
+        handle = executor.submit(task, name="progress", with_context=True)
+        handle.progress.connect(progress.append)
+        handle.succeeded.connect(succeeded.append)
+
+        _finish(executor)
+
+        # Progress reported after cancellation is discarded with the result
+        assert progress == []
+        assert succeeded == []
+        assert executor.stats()["progress"].cancellations == 1
+
+    def test_progress_delivered_in_order(self, executor):
+        progress = []
+        handle = executor.submit(
+            lambda context: [context.report(i) for i in range(5)],
+            name="progress",
+            with_context=True,
+        )
+        handle.progress.connect(progress.append)
+
+        _finish(executor)
+
+        assert progress == [0, 1, 2, 3, 4]
+
+    def test_stats_record_wait_and_run_time(self, executor):
+        completed = []
+        executor.taskCompleted.connect(lambda *args: completed.append(args))
+        for _ in range(3):
+            executor.submit(lambda: None, name="noop")
+
+        _finish(executor)
+
+        stats = executor.stats()["noop"]
+        assert stats.count == 3
+        assert stats.max_wait >= stats.mean_wait >= 0
+        assert [name for name, *_ in completed] == ["noop"] * 3
+        assert executor.pending_count() == 0
+
+    def test_task_cancelled_exception_counts_as_cancellation(self, executor):
+        def task():
+            raise TaskCancelled()
+
+        failed = []
+        handle = executor.submit(task, name="stop")
+        handle.failed.connect(failed.append)
+
+        _finish(executor)
+
+        assert failed == []
+        assert executor.stats()["stop"].cancellations == 1
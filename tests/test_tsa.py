@@ -33,3 +33,183 @@ class TestTSAClient:
         # En producción, usarías pytest.mark.skipif
         result = client.test_connection()
         assert isinstance(result, bool)
+
+
+class _FakeBatchAPI:
+    """API falsa que registra las llamadas por lote"""
+
+    def __init__(self, results=None, error=None):
+        self.results = results
+        self.error = error
+        self.batches = []
+        self.single = []
+
+    def request_tsa_sign_batch(self, tsa_requests, chunk_size):
+        self.batches.append([r["filename"] for r in tsa_requests])
+        if self.error is not None:
+            raise self.error
+        if self.results is not None:
+            return self.results
+        return [{"record_id": r["filename"]} for r in tsa_requests]
+
+    def request_tsa_sign(self, **payload):
+        self.single.append(payload["filename"])
+        return {"record_id": payload["filename"]}
+
+
+class TestTimestampBatcher:
+    """Tests para el agrupador de sellos profesionales"""
+
+    def _request_all(self, batcher, names):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(len(names)) as pool:
+            futures = [
+                pool.submit(batcher.request, {"filename": name}) for name in names
+            ]
+            return [future.exception() or future.result() for future in futures]
+
+    def test_concurrent_requests_share_one_call(self):
+        """Las solicitudes simultáneas viajan en una sola llamada"""
+        from selladomx.signing.tsa import TimestampBatcher
+
+        api = _FakeBatchAPI()
+        batcher = TimestampBatcher(api, max_requests=4, max_wait=5.0)
+
+        results = self._request_all(batcher, ["a", "b", "c", "d"])
+
+        assert len(api.batches) == 1
+        assert sorted(api.batches[0]) == ["a", "b", "c", "d"]
+        assert [r["record_id"] for r in results] == ["a", "b", "c", "d"]
+
+    def test_partial_batch_sent_after_wait(self):
+        """Un lote incompleto se envía al agotarse la espera"""
+        from selladomx.signing.tsa import TimestampBatcher
+
+        api = _FakeBatchAPI()
+        batcher = TimestampBatcher(api, max_requests=10, max_wait=0.05)
+
+        assert batcher.request({"filename": "solo"}) == {"record_id": "solo"}
+        assert api.batches == [["solo"]]
+
+    def test_expected_batch_sent_without_waiting(self):
+        """Con expect() el lote sale en cuanto llegan todas las solicitudes"""
+        import time
+
+        from selladomx.signing.tsa import TimestampBatcher
+
+        api = _FakeBatchAPI()
+        batcher = TimestampBatcher(api, max_requests=10, max_wait=5.0)
+
+        batcher.expect(3)
+        start = time.monotonic()
+        self._request_all(batcher, ["a", "b", "c"])
+
+        assert time.monotonic() - start < 1
+        assert [sorted(batch) for batch in api.batches] == [["a", "b", "c"]]
+
+    def test_per_request_errors(self):
+        """Cada documento recibe su propio error del lote"""
+        from concurrent.futures import Future
+
+        from selladomx.api.exceptions import APIError, InsufficientCreditsError
+        from selladomx.signing.tsa import TimestampBatcher
+
+        api = _FakeBatchAPI(
+            results=[
+                {"record_id": "ok"},
+                {"error": "insufficient_credits", "message": "Sin créditos"},
+                {"error": "tsa_error", "message": "Falla", "status_code": 502},
+            ]
+        )
+        batcher = TimestampBatcher(api)
+
+        futures = [Future() for _ in range(3)]
+        batcher._send([({"filename": str(i)}, f) for i, f in enumerate(futures)])
+
+        assert futures[0].result() == {"record_id": "ok"}
+        assert isinstance(futures[1].exception(), InsufficientCreditsError)
+        error = futures[2].exception()
+        assert isinstance(error, APIError)
+        assert error.status_code == 502
+
+    def test_falls_back_to_single_requests_without_endpoint(self):
+        """Sin endpoint de lotes (404) se usa una llamada por documento"""
+        from selladomx.api.exceptions import APIError
+        from selladomx.signing.tsa import TimestampBatcher
+
+        api = _FakeBatchAPI(error=APIError("Not Found", status_code=404))
+        batcher = TimestampBatcher(api, max_requests=1)
+
+        assert batcher.request({"filename": "a"}) == {"record_id": "a"}
+        assert batcher.request({"filename": "b"}) == {"record_id": "b"}
+        assert len(api.batches) == 1
+        assert api.single == ["a", "b"]
+
+
+def test_api_timestamper_shares_dummy_token(monkeypatch, dummy_timestamper):
+    """Solo el primer documento pide el sello de estimación a la TSA gratuita"""
+    import asyncio
+    from unittest.mock import patch
+
+    from selladomx.signing.tsa import APITimeStamper
+
+    monkeypatch.setattr(APITimeStamper, "_shared_dummies", {})
+    with patch(
+        "selladomx.signing.tsa.TimedHTTPTimeStamper", return_value=dummy_timestamper
+    ) as free_tsa:
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            stamper = APITimeStamper(None, name, 100)
+            asyncio.run(stamper.async_dummy_response("sha256"))
+
+    assert free_tsa.call_count == 1
+
+
+class TestBatchClient:
+    """Tests para SelladoMXAPIClient.request_tsa_sign_batch"""
+
+    def test_chunks_and_keeps_granted_results(self):
+        """Un bloque fallido no descarta los sellos ya otorgados"""
+        from unittest.mock import patch
+
+        from selladomx.api.client import SelladoMXAPIClient
+        from selladomx.api.exceptions import NetworkError
+
+        client = SelladoMXAPIClient(api_key="smx_test")
+        responses = [
+            {
+                "results": [{"record_id": "1"}, {"record_id": "2"}],
+                "credits_remaining": 8,
+            },
+            NetworkError("timeout"),
+        ]
+
+        def fake_request(method, endpoint, json_data=None, require_auth=True):
+            assert endpoint == "/api/v1/timestamp/sign/batch"
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        with patch.object(client, "_request", side_effect=fake_request):
+            results = client.request_tsa_sign_batch(
+                [{"filename": str(i)} for i in range(4)], chunk_size=2
+            )
+
+        assert [r.get("record_id") for r in results[:2]] == ["1", "2"]
+        assert results[0]["credits_remaining"] == 8
+        assert [r["error"] for r in results[2:]] == ["network_error"] * 2
+
+    def test_first_chunk_failure_raises(self):
+        """Si ningún bloque se otorgó, el error se propaga"""
+        from unittest.mock import patch
+
+        from selladomx.api.client import SelladoMXAPIClient
+        from selladomx.api.exceptions import InsufficientCreditsError
+
+        client = SelladoMXAPIClient(api_key="smx_test")
+        with (
+            patch.object(client, "_request", side_effect=InsufficientCreditsError()),
+            pytest.raises(InsufficientCreditsError),
+        ):
+            client.request_tsa_sign_batch([{"filename": "a"}])
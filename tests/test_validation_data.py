@@ -0,0 +1,119 @@
+"""Tests para las firmas de largo plazo (PAdES B-LT/B-LTA)"""
+from unittest.mock import MagicMock
+
+import pytest
+from asn1crypto import x509 as asn1_x509
+from cryptography.hazmat.primitives import serialization
+from pyhanko.pdf_utils.reader import PdfFileReader
+
+from selladomx.errors import SigningError
+from selladomx.signing.pdf_signer import PDFSigner
+from selladomx.signing.validation_data import ValidationDataCache, load_certificates
+
+
+@pytest.fixture
+def cache(ca_identity):
+    """Caché sin descargas, con la CA de prueba como raíz de confianza"""
+    ca = asn1_x509.Certificate.load(
+        ca_identity.ca_cert.public_bytes(serialization.Encoding.DER)
+    )
+    return ValidationDataCache(trust_roots=[ca], allow_fetching=False)
+
+
+@pytest.fixture
+def tsa_client(ca_identity):
+    """Cliente TSA que sella con la TSA local de prueba"""
+    from pyhanko.sign.timestamps import DummyTimeStamper
+
+    tsa_cert, tsa_key = ca_identity.tsa_asn1()
+    client = MagicMock()
+    client.get_timestamper.return_value = DummyTimeStamper(
+        tsa_cert=tsa_cert, tsa_key=tsa_key
+    )
+    return client
+
+
+def _sign(ca_identity, pdf_path, **kwargs):
+    signer = PDFSigner(ca_identity.signer_cert, ca_identity.signer_key, **kwargs)
+    return signer.sign_pdf(pdf_path)
+
+
+def _read(pdf_path):
+    with open(pdf_path, "rb") as f:
+        reader = PdfFileReader(f)
+        return "/DSS" in reader.root, [
+            sig.sig_object_type for sig in reader.embedded_signatures
+        ]
+
+
+class TestSignatureLevels:
+    """Tests para los niveles B-T, B-LT y B-LTA"""
+
+    def test_b_t_has_no_validation_data(self, ca_identity, make_pdf, tsa_client):
+        output = _sign(ca_identity, make_pdf(), tsa_client=tsa_client)
+        assert _read(output) == (False, ["/Sig"])
+
+    def test_b_lt_embeds_dss(self, ca_identity, make_pdf, tsa_client, cache):
+        output = _sign(
+            ca_identity,
+            make_pdf(),
+            tsa_client=tsa_client,
+            level="B-LT",
+            validation_cache=cache,
+        )
+        assert _read(output) == (True, ["/Sig"])
+        assert PDFSigner.verify_signature(output) is True
+
+    def test_b_lta_adds_document_timestamp(
+        self, ca_identity, make_pdf, tsa_client, cache
+    ):
+        output = _sign(
+            ca_identity,
+            make_pdf(),
+            tsa_client=tsa_client,
+            level="B-LTA",
+            validation_cache=cache,
+        )
+        assert _read(output) == (True, ["/Sig", "/DocTimeStamp"])
+        assert PDFSigner.verify_signature(output) is True
+
+    def test_b_lta_requires_tsa(self, ca_identity, make_pdf, cache):
+        with pytest.raises(SigningError):
+            _sign(ca_identity, make_pdf(), level="B-LTA", validation_cache=cache)
+
+    def test_unknown_level_rejected(self, ca_identity):
+        with pytest.raises(ValueError):
+            PDFSigner(ca_identity.signer_cert, ca_identity.signer_key, level="B-X")
+
+
+class TestValidationDataCache:
+    """Tests para la caché de datos de validación"""
+
+    def test_batch_reuses_one_context(self, ca_identity, make_pdf, tsa_client, cache):
+        """Todos los documentos del mismo emisor comparten el contexto"""
+        for i in range(3):
+            _sign(
+                ca_identity,
+                make_pdf(f"doc{i}.pdf"),
+                tsa_client=tsa_client,
+                level="B-LT",
+                validation_cache=cache,
+            )
+
+        assert cache.misses == 1
+        assert cache.hits >= 2
+
+    def test_load_certificates_pem_and_der(self, ca_identity, tmp_path):
+        pem_path = tmp_path / "ca.pem"
+        der_path = tmp_path / "ca.cer"
+        pem_path.write_bytes(
+            ca_identity.ca_cert.public_bytes(serialization.Encoding.PEM)
+        )
+        der_path.write_bytes(
+            ca_identity.ca_cert.public_bytes(serialization.Encoding.DER)
+        )
+
+        certs = load_certificates([pem_path, der_path, tmp_path / "missing.pem"])
+
+        assert len(certs) == 2
+        assert certs[0].dump() == certs[1].dump()